@@ -3,7 +3,7 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -16,11 +16,15 @@ from app.schemas.user import (
     UserRoleUpdate,
     UserUpdate,
 )
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
 from app.utils.security import get_password_hash, require_admin
 
 router = APIRouter()
 
 
+_USER_SORT_KEYS = (SortKey(User.created_at), SortKey(User.id))
+
+
 @router.get("/users", response_model=UserListResponse)
 async def list_users(
     page: int = Query(1, ge=1),
@@ -28,6 +32,8 @@ async def list_users(
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
     search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(require_admin),
 ) -> UserListResponse:
@@ -46,21 +52,24 @@ async def list_users(
         )
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
     
     # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(User.created_at.desc())
+    try:
+        query = keyset_page(query, _USER_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     result = await db.execute(query)
-    users = result.scalars().all()
+    users, next_cursor = split_page(result.scalars().all(), _USER_SORT_KEYS, page_size)
     
     return UserListResponse(
         users=[UserResponse.model_validate(user) for user in users],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -2,10 +2,11 @@ from datetime import datetime
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import and_, asc, desc, func, or_, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import engine, get_db
 from app.models.appointment import Appointment
 from app.models.lead import Lead
 from app.models.user import User, UserRole
@@ -15,6 +16,14 @@ from app.schemas.appointment import (
     AppointmentResponse,
     AppointmentUpdate,
 )
+from app.services.export_service import build_export_statement, export_response, resolve_columns
+from app.utils.fulltext import (
+    appointment_matches,
+    appointment_snippets,
+    search_terms,
+    uses_fulltext,
+)
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
 from app.utils.security import get_current_user
 
 router = APIRouter()
@@ -51,6 +60,44 @@ def _appointment_to_response(
     )
 
 
+def _appointment_filters(
+    date_from: Optional[datetime],
+    date_to: Optional[datetime],
+    status_filter: Optional[str],
+    staff_id: Optional[int],
+    search: Optional[str],
+    dialect: str,
+) -> list:
+    filters = []
+    if date_from:
+        filters.append(Appointment.scheduled_for >= date_from)
+    if date_to:
+        filters.append(Appointment.scheduled_for <= date_to)
+    if status_filter:
+        filters.append(Appointment.status == status_filter)
+    if staff_id is not None:
+        filters.append(Lead.assigned_agent_id == staff_id)
+    if search and search_terms(search) and uses_fulltext(dialect):
+        matches = appointment_matches(dialect, search_terms(search), search)
+        filters.append(Appointment.id.in_(matches.with_only_columns(matches.selected_columns.id)))
+    elif search:
+        s = f"%{search.strip()}%"
+        filters.append(
+            or_(
+                Lead.name.ilike(s),
+                Lead.phone.ilike(s),
+                Lead.email.ilike(s),
+                Appointment.address.ilike(s),
+                Appointment.notes.ilike(s),
+                Appointment.contact_number.ilike(s),
+            )
+        )
+    return filters
+
+
+_KEYSET_SORTS = {"scheduled_for", "status", "created_at"}
+
+
 @router.get("/", response_model=AppointmentListResponse)
 async def list_appointments(
     page: int = Query(1, ge=1),
@@ -62,6 +109,8 @@ async def list_appointments(
     search: Optional[str] = None,
     sort_by: str = Query("scheduled_for"),
     sort_order: str = Query("desc"),
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> AppointmentListResponse:
@@ -70,44 +119,20 @@ async def list_appointments(
         .join(Lead, Lead.id == Appointment.lead_id)
         .outerjoin(User, User.id == Lead.assigned_agent_id)
     )
+    count_base = select(Appointment.id).join(Lead, Lead.id == Appointment.lead_id)
 
     if current_user.role == UserRole.AGENT.value:
         appt_query = appt_query.where(Lead.assigned_agent_id == current_user.id)
+        count_base = count_base.where(Lead.assigned_agent_id == current_user.id)
 
-    filters = []
-    if date_from:
-        filters.append(Appointment.scheduled_for >= date_from)
-    if date_to:
-        filters.append(Appointment.scheduled_for <= date_to)
-    if status_filter:
-        filters.append(Appointment.status == status_filter)
-    if staff_id is not None:
-        filters.append(Lead.assigned_agent_id == staff_id)
-    if search:
-        s = f"%{search.strip()}%"
-        filters.append(
-            or_(
-                Lead.name.ilike(s),
-                Lead.phone.ilike(s),
-                Lead.email.ilike(s),
-                Appointment.address.ilike(s),
-                Appointment.notes.ilike(s),
-                Appointment.contact_number.ilike(s),
-            )
-        )
+    dialect = db.get_bind().dialect.name
+    terms = search_terms(search) if search and uses_fulltext(dialect) else []
+    filters = _appointment_filters(date_from, date_to, status_filter, staff_id, search, dialect)
     if filters:
         appt_query = appt_query.where(and_(*filters))
+        count_base = count_base.where(and_(*filters))
 
-    count_query = (
-        select(func.count())
-        .select_from(Appointment)
-        .join(Lead, Lead.id == Appointment.lead_id)
-    )
-    if current_user.role == UserRole.AGENT.value:
-        count_query = count_query.where(Lead.assigned_agent_id == current_user.id)
-    if filters:
-        count_query = count_query.where(and_(*filters))
-    total = (await db.execute(count_query)).scalar() or 0
+    total, total_is_estimate = await count_rows(db, count_base, exact=exact_total)
 
     sort_columns = {
         "scheduled_for": Appointment.scheduled_for,
@@ -116,23 +141,128 @@ async def list_appointments(
         "staff": User.full_name,
         "created_at": Appointment.created_at,
     }
-    sort_col = sort_columns.get(sort_by, Appointment.scheduled_for)
-    sort_expr = asc(sort_col) if sort_order.lower() == "asc" else desc(sort_col)
-    appt_query = appt_query.order_by(sort_expr)
+    descending = sort_order.lower() != "asc"
+    if sort_by == "relevance" and terms:
+        matches = appointment_matches(dialect, terms, search).subquery()
+        appt_query = appt_query.join(matches, matches.c.id == Appointment.id)
+        sort_columns["relevance"] = matches.c.rank
+        # Rank is "lower is better"; relevance always lists the best matches first.
+        descending = False
+    if sort_by not in sort_columns:
+        sort_by = "scheduled_for"
+    sort_keys = (
+        SortKey(sort_columns[sort_by], descending),
+        SortKey(Appointment.id, descending),
+    )
+    # Client and staff names are nullable, so only offset paging is exact for them.
+    keyset_sortable = sort_by in _KEYSET_SORTS
+    if cursor and not keyset_sortable:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cursor pagination is not supported when sorting by {sort_by}",
+        )
+    try:
+        appt_query = keyset_page(appt_query, sort_keys, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    appt_query = appt_query.offset((page - 1) * page_size).limit(page_size)
     result = await db.execute(appt_query)
-    rows = result.all()
+    rows, next_cursor = split_page(
+        result.all(),
+        sort_keys,
+        page_size,
+        # Only keyset sorts are model attributes; other sorts get no cursor below.
+        values_of=lambda row: (getattr(row[0], sort_by, None), row[0].id),
+    )
+    if not keyset_sortable:
+        next_cursor = None
 
+    snippets = await appointment_snippets(db, terms, [row[0].id for row in rows]) if terms else {}
     appointments: List[AppointmentResponse] = []
     for appt, lead, staff in rows:
-        appointments.append(_appointment_to_response(appt, lead, staff))
+        response = _appointment_to_response(appt, lead, staff)
+        response.search_snippet = snippets.get(appt.id)
+        appointments.append(response)
 
     return AppointmentListResponse(
         appointments=appointments,
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
+
+
+APPOINTMENT_EXPORT_COLUMNS = {
+    "id": Appointment.id,
+    "call_id": Appointment.call_id,
+    "lead_id": Appointment.lead_id,
+    "scheduled_for": Appointment.scheduled_for,
+    "address": Appointment.address,
+    "contact_number": func.coalesce(Appointment.contact_number, Lead.phone),
+    "notes": Appointment.notes,
+    "status": Appointment.status,
+    "client_name": Lead.name,
+    "contact_phone": Lead.phone,
+    "contact_email": Lead.email,
+    "assigned_staff_id": Lead.assigned_agent_id,
+    "assigned_staff_name": User.full_name,
+    "created_at": Appointment.created_at,
+    "updated_at": Appointment.updated_at,
+}
+APPOINTMENT_EXPORT_DEFAULT_COLUMNS = [
+    "id",
+    "lead_id",
+    "scheduled_for",
+    "status",
+    "client_name",
+    "contact_number",
+    "address",
+    "assigned_staff_name",
+    "created_at",
+]
+
+
+@router.get("/export")
+async def export_appointments(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma separated column names"),
+    gzip: bool = False,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    staff_id: Optional[int] = None,
+    search: Optional[str] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every visible appointment matching the list filters as CSV or NDJSON."""
+    try:
+        selected = resolve_columns(
+            columns, APPOINTMENT_EXPORT_COLUMNS, APPOINTMENT_EXPORT_DEFAULT_COLUMNS
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = (
+        select(Appointment)
+        .join(Lead, Lead.id == Appointment.lead_id)
+        .outerjoin(User, User.id == Lead.assigned_agent_id)
+    )
+    if current_user.role == UserRole.AGENT.value:
+        query = query.where(Lead.assigned_agent_id == current_user.id)
+    filters = _appointment_filters(
+        date_from, date_to, status_filter, staff_id, search, engine.dialect.name
+    )
+    if filters:
+        query = query.where(and_(*filters))
+    return export_response(
+        build_export_statement(
+            query.order_by(Appointment.id), selected, APPOINTMENT_EXPORT_COLUMNS
+        ),
+        selected,
+        format,
+        filename="appointments",
+        compress=gzip,
     )
 
 
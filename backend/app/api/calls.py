@@ -3,16 +3,19 @@
 import asyncio
 import re
 import time
-from datetime import datetime, timedelta
-from typing import Dict, Optional
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
 from urllib.parse import urlparse
 from zoneinfo import ZoneInfo
 
 import httpx
 from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel, EmailStr
-from sqlalchemy import func, select
+from pydantic import BaseModel, EmailStr, Field
+from sqlalchemy import case, func, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 from sqlalchemy.ext.asyncio import AsyncSession
 
 try:
@@ -23,25 +26,40 @@ except ImportError:
     TwilioClient = None
 
 from app.config import settings
-from app.database import get_db
+from app.database import async_session_maker, get_db
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.call import Call, CallDirection, CallStatus
 from app.models.enquiry import Enquiry, EnquiryType
 from app.models.lead import Lead, LeadQuality, LeadSource, LeadStatus
 from app.models.notification import NotificationType
+from app.models.property import Property, PropertyStatus
 from app.models.user import User, UserRole
 from app.schemas.call import (
+    CALL_LIST_OPTIONAL_FIELDS,
+    CallListItem,
     CallListResponse,
     CallNotesUpdate,
     CallOutcomeUpdate,
+    CallReportFacets,
+    CallReportSearchResponse,
     CallResponse,
+    CallSummary,
     CallTranscript,
     DialRequest,
+    ToolLatencyStats,
     TranscriptMessage,
 )
+from app.services import caller_snapshot
 from app.services.blob_service import BlobService
+from app.services.export_service import build_export_statement, export_response, resolve_columns
+from app.services.lead_lookup import lead_phone_cache
+from app.services.lead_matching import Preferences, lead_matcher
 from app.services.notification_service import NotificationService
+from app.services.solar_sizing import size_for_bill, solar_sizer
+from app.services.tool_runtime import deferred_tasks, tool_latency
+from app.utils.geo import MAX_RADIUS_KM, haversine_km, locate, nearby
 from app.utils.logging import get_logger
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
 from app.utils.security import get_current_user
 from app.utils.utils import clean_indian_number
 
@@ -183,7 +201,102 @@ async def dial_number(
         )
 
 
-@router.get("/", response_model=CallListResponse)
+_CALL_SORT_KEYS = (SortKey(Call.created_at), SortKey(Call.id))
+# Columns behind the list schema; fields without a column keep their default.
+_CALL_LIST_COLUMNS = tuple(
+    name for name in CallSummary.model_fields if name in Call.__mapper__.column_attrs
+)
+
+
+def _resolve_list_fields(fields: Optional[str]) -> list[str]:
+    """Validate the comma separated ``fields`` selector of the call list endpoints."""
+    if not fields:
+        return []
+    names = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CALL_LIST_OPTIONAL_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown call list fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(names))
+
+
+def _call_list_query(extra_fields: list[str]):
+    """``select(Call)`` loading only the list columns plus any requested text fields.
+
+    Everything else is left unloaded with ``raiseload`` so a stray access fails
+    loudly instead of issuing a per-row lazy load.
+    """
+    columns = [getattr(Call, name) for name in (*_CALL_LIST_COLUMNS, *extra_fields)]
+    return select(Call).options(load_only(*columns, raiseload=True))
+
+
+def _call_list_items(calls, extra_fields: list[str]) -> list[CallListItem]:
+    names = (*_CALL_LIST_COLUMNS, *extra_fields)
+    return [
+        CallListItem(**{name: getattr(call, name) for name in names})
+        for call in calls
+    ]
+
+
+def _apply_call_filters(
+    query,
+    direction: Optional[str] = None,
+    status: Optional[str] = None,
+    outcome: Optional[str] = None,
+    handled_by_ai: Optional[bool] = None,
+    escalated: Optional[bool] = None,
+    from_number: Optional[str] = None,
+    lead_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    report_lead_status: Optional[str] = None,
+    min_estimated_kw: Optional[float] = None,
+    max_estimated_kw: Optional[float] = None,
+    visit_scheduled: Optional[bool] = None,
+    follow_up_required: Optional[bool] = None,
+    visit_date_from: Optional[date] = None,
+    visit_date_to: Optional[date] = None,
+    report_source: Optional[str] = None,
+):
+    if direction:
+        query = query.where(Call.direction == direction)
+    if status:
+        query = query.where(Call.status == status)
+    if outcome:
+        query = query.where(Call.outcome == outcome)
+    if handled_by_ai is not None:
+        query = query.where(Call.handled_by_ai == handled_by_ai)
+    if escalated is not None:
+        query = query.where(Call.escalated_to_human == escalated)
+    if from_number:
+        query = query.where(Call.from_number.contains(from_number))
+    if lead_id is not None:
+        query = query.where(Call.lead_id == lead_id)
+    if date_from:
+        query = query.where(Call.created_at >= date_from)
+    if date_to:
+        query = query.where(Call.created_at <= date_to)
+    # Section 7 report fields, via the typed report_* columns
+    if report_lead_status:
+        statuses = [v.strip().lower() for v in report_lead_status.split(",") if v.strip()]
+        query = query.where(Call.report_lead_status.in_(statuses))
+    if min_estimated_kw is not None:
+        query = query.where(Call.report_estimated_kw >= min_estimated_kw)
+    if max_estimated_kw is not None:
+        query = query.where(Call.report_estimated_kw <= max_estimated_kw)
+    if visit_scheduled is not None:
+        query = query.where(Call.report_visit_scheduled.is_(visit_scheduled))
+    if follow_up_required is not None:
+        query = query.where(Call.report_follow_up_required.is_(follow_up_required))
+    if visit_date_from:
+        query = query.where(Call.report_visit_date >= visit_date_from)
+    if visit_date_to:
+        query = query.where(Call.report_visit_date <= visit_date_to)
+    if report_source:
+        query = query.where(Call.report_source == report_source)
+    return query
+
+
+@router.get("/", response_model=CallListResponse, response_model_exclude_unset=True)
 async def list_calls(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
@@ -196,12 +309,31 @@ async def list_calls(
     lead_id: Optional[int] = None,
     date_from: Optional[datetime] = None,
     date_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
+    fields: Optional[str] = None,
+    report_lead_status: Optional[str] = None,
+    min_estimated_kw: Optional[float] = None,
+    max_estimated_kw: Optional[float] = None,
+    visit_scheduled: Optional[bool] = None,
+    follow_up_required: Optional[bool] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> CallListResponse:
-    """List calls with optional filters."""
+    """List calls with optional filters.
+
+    Pass the returned ``next_cursor`` as ``cursor`` to page by keyset instead of
+    offset. ``total`` is served from a short-lived count cache unless
+    ``exact_total`` is set. Rows omit the wide text columns; name any of
+    ``transcript_summary``, ``outcome_notes``, ``transcript_text`` or
+    ``structured_report`` in ``fields`` to include them.
+    """
     logger = get_logger("api.calls")
-    query = select(Call)
+    try:
+        extra_fields = _resolve_list_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = _call_list_query(extra_fields)
     
     logger.info(
         "list_calls_requested",
@@ -217,38 +349,38 @@ async def list_calls(
         lead_id=lead_id,
         date_from=str(date_from) if date_from else None,
         date_to=str(date_to) if date_to else None,
+        report_lead_status=report_lead_status,
     )
     
-    # Apply filters
-    if direction:
-        query = query.where(Call.direction == direction)
-    if status:
-        query = query.where(Call.status == status)
-    if outcome:
-        query = query.where(Call.outcome == outcome)
-    if handled_by_ai is not None:
-        query = query.where(Call.handled_by_ai == handled_by_ai)
-    if escalated is not None:
-        query = query.where(Call.escalated_to_human == escalated)
-    if from_number:
-        query = query.where(Call.from_number.contains(from_number))
-    if lead_id is not None:
-        query = query.where(Call.lead_id == lead_id)
-    if date_from:
-        query = query.where(Call.created_at >= date_from)
-    if date_to:
-        query = query.where(Call.created_at <= date_to)
+    query = _apply_call_filters(
+        query,
+        direction=direction,
+        status=status,
+        outcome=outcome,
+        handled_by_ai=handled_by_ai,
+        escalated=escalated,
+        from_number=from_number,
+        lead_id=lead_id,
+        date_from=date_from,
+        date_to=date_to,
+        report_lead_status=report_lead_status,
+        min_estimated_kw=min_estimated_kw,
+        max_estimated_kw=max_estimated_kw,
+        visit_scheduled=visit_scheduled,
+        follow_up_required=follow_up_required,
+    )
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
     
     # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(Call.created_at.desc())
+    try:
+        query = keyset_page(query, _CALL_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     result = await db.execute(query)
-    calls = result.scalars().all()
+    calls, next_cursor = split_page(result.scalars().all(), _CALL_SORT_KEYS, page_size)
     
     logger.info(
         "list_calls_result",
@@ -257,17 +389,22 @@ async def list_calls(
     )
     
     return CallListResponse(
-        calls=[CallResponse.model_validate(call) for call in calls],
+        calls=_call_list_items(calls, extra_fields),
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
     )
 
 
-@router.get("/recordings", response_model=CallListResponse)
+@router.get("/recordings", response_model=CallListResponse, response_model_exclude_unset=True)
 async def list_recordings(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
+    fields: Optional[str] = None,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> CallListResponse:
@@ -277,18 +414,20 @@ async def list_recordings(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only admin users can access call recordings",
         )
+    try:
+        extra_fields = _resolve_list_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    base_query = select(Call).where(Call.recording_url.is_not(None))
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    base_query = _call_list_query(extra_fields).where(Call.recording_url.is_not(None))
+    total, total_is_estimate = await count_rows(db, base_query, exact=exact_total)
 
-    query = (
-        base_query.order_by(Call.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-    )
+    try:
+        query = keyset_page(base_query, _CALL_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     result = await db.execute(query)
-    calls = result.scalars().all()
+    calls, next_cursor = split_page(result.scalars().all(), _CALL_SORT_KEYS, page_size)
 
     logger = get_logger("api.calls")
     logger.info(
@@ -298,10 +437,235 @@ async def list_recordings(
     )
 
     return CallListResponse(
-        calls=[CallResponse.model_validate(call) for call in calls],
+        calls=_call_list_items(calls, extra_fields),
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
+
+
+async def _report_facets(db: AsyncSession, filtered) -> CallReportFacets:
+    """Aggregate the report columns of every call matched by ``filtered``."""
+    matched = filtered.subquery()
+    rows = (
+        await db.execute(
+            select(
+                matched.c.report_lead_status,
+                func.count(),
+                func.sum(case((matched.c.report_visit_scheduled.is_(True), 1), else_=0)),
+                func.sum(case((matched.c.report_follow_up_required.is_(True), 1), else_=0)),
+                func.count(matched.c.report_estimated_kw),
+                func.sum(matched.c.report_estimated_kw),
+            ).group_by(matched.c.report_lead_status)
+        )
+    ).all()
+    kw_count = sum(row[4] for row in rows)
+    kw_total = float(sum(row[5] or 0 for row in rows))
+    return CallReportFacets(
+        by_lead_status={(row[0] or "unclassified"): row[1] for row in rows},
+        visits_scheduled=sum(row[2] or 0 for row in rows),
+        follow_ups_required=sum(row[3] or 0 for row in rows),
+        avg_estimated_kw=round(kw_total / kw_count, 2) if kw_count else None,
+        total_estimated_kw=round(kw_total, 2),
+    )
+
+
+@router.get(
+    "/reports/search",
+    response_model=CallReportSearchResponse,
+    response_model_exclude_unset=True,
+)
+async def search_call_reports(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    lead_status: Optional[str] = None,
+    min_estimated_kw: Optional[float] = None,
+    max_estimated_kw: Optional[float] = None,
+    visit_scheduled: Optional[bool] = None,
+    follow_up_required: Optional[bool] = None,
+    visit_date_from: Optional[date] = None,
+    visit_date_to: Optional[date] = None,
+    report_source: Optional[str] = None,
+    lead_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> CallReportSearchResponse:
+    """Search calls by their Section 7 report fields.
+
+    ``lead_status`` takes a comma separated list. ``facets`` aggregates the
+    whole result set (counts per lead status, scheduled visits, follow-ups and
+    estimated kW), all computed in SQL on the typed report columns.
+    """
+    try:
+        extra_fields = _resolve_list_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    def _filtered(query):
+        return _apply_call_filters(
+            query.where(Call.report_source.is_not(None)),
+            lead_id=lead_id,
+            date_from=date_from,
+            date_to=date_to,
+            report_lead_status=lead_status,
+            min_estimated_kw=min_estimated_kw,
+            max_estimated_kw=max_estimated_kw,
+            visit_scheduled=visit_scheduled,
+            follow_up_required=follow_up_required,
+            visit_date_from=visit_date_from,
+            visit_date_to=visit_date_to,
+            report_source=report_source,
+        )
+
+    facets = await _report_facets(
+        db,
+        _filtered(
+            select(
+                Call.report_lead_status,
+                Call.report_visit_scheduled,
+                Call.report_follow_up_required,
+                Call.report_estimated_kw,
+            )
+        ),
+    )
+    try:
+        query = keyset_page(
+            _filtered(_call_list_query(extra_fields)),
+            _CALL_SORT_KEYS,
+            page_size,
+            cursor=cursor,
+            page=page,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    result = await db.execute(query)
+    calls, next_cursor = split_page(result.scalars().all(), _CALL_SORT_KEYS, page_size)
+
+    get_logger("api.calls").info(
+        "search_call_reports_result",
+        user_id=current_user.id,
+        lead_status=lead_status,
+        total=sum(facets.by_lead_status.values()),
+        returned=len(calls),
+    )
+    return CallReportSearchResponse(
+        calls=_call_list_items(calls, extra_fields),
+        total=sum(facets.by_lead_status.values()),
+        page=page,
+        page_size=page_size,
+        next_cursor=next_cursor,
+        facets=facets,
+    )
+
+
+CALL_EXPORT_COLUMNS = {
+    "id": Call.id,
+    "call_sid": Call.call_sid,
+    "direction": Call.direction,
+    "from_number": Call.from_number,
+    "to_number": Call.to_number,
+    "status": Call.status,
+    "started_at": Call.started_at,
+    "answered_at": Call.answered_at,
+    "ended_at": Call.ended_at,
+    "duration_seconds": Call.duration_seconds,
+    "handled_by_ai": Call.handled_by_ai,
+    "escalated_to_human": Call.escalated_to_human,
+    "escalated_to_agent_id": Call.escalated_to_agent_id,
+    "outcome": Call.outcome,
+    "outcome_notes": Call.outcome_notes,
+    "lead_id": Call.lead_id,
+    "recording_url": Call.recording_url,
+    "transcript_summary": Call.transcript_summary,
+    "transcript_text": Call.transcript_text,
+    "report_lead_status": Call.report_lead_status,
+    "report_estimated_kw": Call.report_estimated_kw,
+    "report_monthly_bill": Call.report_monthly_bill,
+    "report_visit_scheduled": Call.report_visit_scheduled,
+    "report_visit_date": Call.report_visit_date,
+    "report_follow_up_required": Call.report_follow_up_required,
+    "created_at": Call.created_at,
+}
+CALL_EXPORT_DEFAULT_COLUMNS = [
+    "id",
+    "call_sid",
+    "direction",
+    "from_number",
+    "to_number",
+    "status",
+    "started_at",
+    "ended_at",
+    "duration_seconds",
+    "handled_by_ai",
+    "escalated_to_human",
+    "outcome",
+    "lead_id",
+    "created_at",
+]
+
+
+@router.get("/export")
+async def export_calls(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma separated column names"),
+    gzip: bool = False,
+    direction: Optional[str] = None,
+    status: Optional[str] = None,
+    outcome: Optional[str] = None,
+    handled_by_ai: Optional[bool] = None,
+    escalated: Optional[bool] = None,
+    from_number: Optional[str] = None,
+    lead_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    report_lead_status: Optional[str] = None,
+    min_estimated_kw: Optional[float] = None,
+    max_estimated_kw: Optional[float] = None,
+    visit_scheduled: Optional[bool] = None,
+    follow_up_required: Optional[bool] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every call matching the list filters as CSV or NDJSON."""
+    try:
+        selected = resolve_columns(columns, CALL_EXPORT_COLUMNS, CALL_EXPORT_DEFAULT_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = _apply_call_filters(
+        select(Call),
+        direction=direction,
+        status=status,
+        outcome=outcome,
+        handled_by_ai=handled_by_ai,
+        escalated=escalated,
+        from_number=from_number,
+        lead_id=lead_id,
+        date_from=date_from,
+        date_to=date_to,
+        report_lead_status=report_lead_status,
+        min_estimated_kw=min_estimated_kw,
+        max_estimated_kw=max_estimated_kw,
+        visit_scheduled=visit_scheduled,
+        follow_up_required=follow_up_required,
+    ).order_by(Call.id)
+    get_logger("api.calls").info(
+        "export_calls_requested",
+        user_id=current_user.id,
+        format=format,
+        columns=selected,
+        gzip=gzip,
+    )
+    return export_response(
+        build_export_statement(query, selected, CALL_EXPORT_COLUMNS),
+        selected,
+        format,
+        filename="calls",
+        compress=gzip,
     )
 
 
@@ -865,34 +1229,124 @@ class ToolSaveSummaryResponse(BaseModel):
     message: str
 
 
+class ToolFindNearbyPropertiesRequest(BaseModel):
+    location: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+    radius_km: float = Field(5.0, gt=0, le=MAX_RADIUS_KM)
+    property_type: Optional[str] = None
+    bedrooms: Optional[int] = None
+    max_price: Optional[float] = None
+    limit: int = Field(5, ge=1, le=20)
+
+
+class ToolNearbyProperty(BaseModel):
+    id: int
+    title: str
+    property_type: str
+    locality: Optional[str] = None
+    city: str
+    price: float
+    bedrooms: Optional[int] = None
+    distance_km: float
+
+
+class ToolFindNearbyPropertiesResponse(BaseModel):
+    success: bool
+    properties: List[ToolNearbyProperty] = []
+    message: str
+
+
+class ToolMatchPropertiesRequest(BaseModel):
+    phone: Optional[str] = None
+    location: Optional[str] = None
+    property_type: Optional[str] = None
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    limit: int = Field(5, ge=1, le=20)
+
+
+class ToolMatchedProperty(BaseModel):
+    id: int
+    title: str
+    property_type: str
+    locality: Optional[str] = None
+    city: str
+    price: float
+    size_sqft: float
+    bedrooms: Optional[int] = None
+    score: float
+
+
+class ToolMatchPropertiesResponse(BaseModel):
+    success: bool
+    lead_id: Optional[int] = None
+    total: int = 0
+    properties: List[ToolMatchedProperty] = []
+    message: str
+
+
+class ToolQuoteSystemRequest(BaseModel):
+    monthly_bill: Optional[float] = Field(None, gt=0)
+    estimated_kw: Optional[float] = Field(None, gt=0)  # Overrides the size implied by the bill
+    rooftop_available: Optional[bool] = None
+    roof_area_sqft: Optional[float] = Field(None, gt=0)
+    limit: int = Field(3, ge=1, le=10)
+
+
+class ToolSystemQuote(BaseModel):
+    product_id: int
+    name: str
+    manufacturer: str
+    panel_wattage: int
+    panel_count: int
+    system_kw: float
+    inverter_kw: float
+    price_inr: float
+    price_per_watt: float
+    efficiency: float
+    warranty_years: int
+    roof_area_sqft: Optional[float] = None
+    monthly_generation_kwh: float
+    score: float
+
+
+class ToolQuoteSystemResponse(BaseModel):
+    success: bool
+    target_kw: Optional[float] = None
+    total: int = 0
+    quotes: List[ToolSystemQuote] = []
+    message: str
+
+
 @router.post("/tools/create_lead", response_model=ToolCreateLeadResponse)
+@tool_latency.timed("create_lead")
 async def tool_create_lead(
     payload: ToolCreateLeadRequest,
     db: AsyncSession = Depends(get_db),
     api_key: str = Depends(verify_elevenlabs_api_key),
 ) -> ToolCreateLeadResponse:
-    result = await db.execute(select(Lead).where(Lead.phone == payload.phone))
-    lead = result.scalar_one_or_none()
-    
-    if lead:
-        updated = False
-        if payload.name and not lead.name:
-            lead.name = payload.name
-            updated = True
-        if payload.email and not lead.email:
-            lead.email = payload.email
-            updated = True
-        if payload.notes:
-            if lead.notes:
-                lead.notes = f"{lead.notes}\n\n{payload.notes}"
-            else:
-                lead.notes = payload.notes
-            updated = True
-        if updated:
+    cached = await lead_phone_cache.lookup(db, payload.phone)
+    if cached:
+        if (
+            (payload.name and not cached.name)
+            or (payload.email and not cached.email)
+            or payload.notes
+        ):
+            lead = await db.get(Lead, cached.id)
+            if payload.name and not lead.name:
+                lead.name = payload.name
+            if payload.email and not lead.email:
+                lead.email = payload.email
+            if payload.notes:
+                if lead.notes:
+                    lead.notes = f"{lead.notes}\n\n{payload.notes}"
+                else:
+                    lead.notes = payload.notes
             await db.flush()
         return ToolCreateLeadResponse(
             success=True,
-            lead_id=lead.id,
+            lead_id=cached.id,
             existing=True,
             message="Lead already existed and was updated.",
         )
@@ -907,8 +1361,20 @@ async def tool_create_lead(
         quality=LeadQuality.COLD.value,
     )
     db.add(lead)
-    await db.flush()
-    await db.refresh(lead)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # Another request created the same number (in another format) first.
+        await db.rollback()
+        existing = await lead_phone_cache.lookup(db, payload.phone)
+        if existing is None:
+            raise
+        return ToolCreateLeadResponse(
+            success=True,
+            lead_id=existing.id,
+            existing=True,
+            message="Lead already existed.",
+        )
     
     return ToolCreateLeadResponse(
         success=True,
@@ -919,6 +1385,7 @@ async def tool_create_lead(
 
 
 @router.post("/tools/get_existing_lead", response_model=ToolGetExistingLeadResponse)
+@tool_latency.timed("get_existing_lead")
 async def tool_get_existing_lead(
     payload: ToolGetExistingLeadRequest,
     db: AsyncSession = Depends(get_db),
@@ -930,14 +1397,11 @@ async def tool_get_existing_lead(
             detail="Either phone or email must be provided.",
         )
     
-    query = select(Lead)
     if payload.phone:
-        query = query.where(Lead.phone == payload.phone)
-    elif payload.email:
-        query = query.where(Lead.email == payload.email)
-    
-    result = await db.execute(query)
-    lead = result.scalar_one_or_none()
+        lead = await lead_phone_cache.lookup(db, payload.phone)
+    else:
+        result = await db.execute(select(Lead).where(Lead.email == payload.email).limit(1))
+        lead = result.scalar_one_or_none()
     
     if not lead:
         return ToolGetExistingLeadResponse(found=False)
@@ -954,6 +1418,7 @@ async def tool_get_existing_lead(
 
 
 @router.post("/tools/start_call", response_model=ToolStartCallResponse)
+@tool_latency.timed("start_call")
 async def tool_start_call(
     payload: ToolStartCallRequest,
     db: AsyncSession = Depends(get_db),
@@ -991,8 +1456,6 @@ async def tool_start_call(
         handled_by_ai=True,
     )
     db.add(call)
-    await db.flush()
-    await db.refresh(call)
     await db.commit()
     logger.info(
         "tool_start_call_created",
@@ -1006,7 +1469,25 @@ async def tool_start_call(
     )
 
 
+async def _notify_appointment_booked(lead_id: int, lead_phone: str, scheduled_for: datetime) -> None:
+    """Deferred: tell admins and managers about a booking made by the voice agent."""
+    scheduled_for_ist = scheduled_for.astimezone(ZoneInfo("Asia/Kolkata")).strftime("%Y-%m-%d %H:%M")
+    async with async_session_maker() as db:
+        notification_service = NotificationService(db)
+        result_users = await db.execute(
+            select(User.id).where(User.role.in_([UserRole.ADMIN.value, UserRole.MANAGER.value]))
+        )
+        await notification_service.notify_users(
+            result_users.scalars().all(),
+            message=f"Appointment booked for lead {lead_phone} on {scheduled_for_ist}",
+            notification_type=NotificationType.APPOINTMENT_BOOKED,
+            related_lead_id=lead_id,
+        )
+        await db.commit()
+
+
 @router.post("/tools/book_appointment", response_model=ToolBookAppointmentResponse)
+@tool_latency.timed("book_appointment")
 async def tool_book_appointment(
     payload: ToolBookAppointmentRequest,
     db: AsyncSession = Depends(get_db),
@@ -1023,8 +1504,7 @@ async def tool_book_appointment(
         contact_number=payload.contact_number,
     )
     try:
-        result = await db.execute(select(Lead).where(Lead.id == payload.lead_id))
-        lead = result.scalar_one_or_none()
+        lead = await db.get(Lead, payload.lead_id)
         if not lead:
             logger.warning(
                 "tool_book_appointment_lead_not_found",
@@ -1038,15 +1518,19 @@ async def tool_book_appointment(
             )
         contact_number = payload.contact_number or lead.phone
 
+        # One lookup for both identifiers; a call_sid match wins over a call_id match.
         call = None
+        call_matches = []
         if payload.external_call_id:
-            result_call = await db.execute(
-                select(Call).where(Call.call_sid == payload.external_call_id)
-            )
-            call = result_call.scalar_one_or_none()
-        if call is None and payload.call_id is not None:
-            result_call = await db.execute(select(Call).where(Call.id == payload.call_id))
-            call = result_call.scalar_one_or_none()
+            call_matches.append(Call.call_sid == payload.external_call_id)
+        if payload.call_id is not None:
+            call_matches.append(Call.id == payload.call_id)
+        if call_matches:
+            query = select(Call).where(or_(*call_matches))
+            if payload.external_call_id:
+                query = query.order_by(case((Call.call_sid == payload.external_call_id, 0), else_=1))
+            call = (await db.execute(query.limit(1))).scalar_one_or_none()
+        new_call = call is None
         if call is None:
             logger.warning(
                 "tool_book_appointment_call_not_found",
@@ -1073,13 +1557,27 @@ async def tool_book_appointment(
                     enquiry_id=None,
                     message="Call not found for appointment booking.",
                 )
-        result_appt = await db.execute(
-            select(Appointment).where(
-                Appointment.call_id == call.id,
-                Appointment.lead_id == lead.id,
+
+        # A call created just now cannot have an appointment or enquiry yet.
+        appointment = None
+        enquiry = None
+        if not new_call:
+            result_appt = await db.execute(
+                select(Appointment).where(
+                    Appointment.call_id == call.id,
+                    Appointment.lead_id == lead.id,
+                )
             )
-        )
-        appointment = result_appt.scalar_one_or_none()
+            appointment = result_appt.scalar_one_or_none()
+            result_enquiry = await db.execute(
+                select(Enquiry).where(
+                    Enquiry.call_id == call.id,
+                    Enquiry.lead_id == lead.id,
+                    Enquiry.enquiry_type == EnquiryType.SITE_VISIT.value,
+                )
+            )
+            enquiry = result_enquiry.scalar_one_or_none()
+
         if appointment is None:
             appointment = Appointment(
                 call_id=call.id,
@@ -1106,14 +1604,6 @@ async def tool_book_appointment(
         )
         if payload.notes:
             query_text = f"{query_text} Notes: {payload.notes}"
-        result_enquiry = await db.execute(
-            select(Enquiry).where(
-                Enquiry.call_id == call.id,
-                Enquiry.lead_id == lead.id,
-                Enquiry.enquiry_type == EnquiryType.SITE_VISIT.value,
-            )
-        )
-        enquiry = result_enquiry.scalar_one_or_none()
         if enquiry is None:
             enquiry = Enquiry(
                 call_id=call.id,
@@ -1128,9 +1618,6 @@ async def tool_book_appointment(
             enquiry.response_successful = True
         lead.status = LeadStatus.QUALIFIED.value
         lead.quality = LeadQuality.WARM.value
-        await db.flush()
-        await db.refresh(enquiry)
-        await db.refresh(appointment)
         await db.commit()
         logger.info(
             "tool_book_appointment_success",
@@ -1140,26 +1627,13 @@ async def tool_book_appointment(
             enquiry_id=enquiry.id,
         )
 
-        notification_service = NotificationService(db)
-        result_users = await db.execute(
-            select(User).where(
-                User.role.in_([UserRole.ADMIN.value, UserRole.MANAGER.value])
-            )
+        deferred_tasks.defer(
+            "notify_appointment_booked",
+            _notify_appointment_booked,
+            lead.id,
+            lead.phone,
+            payload.scheduled_for,
         )
-        admins = result_users.scalars().all()
-        scheduled_for_ist = appointment.scheduled_for.astimezone(ZoneInfo("Asia/Kolkata")).strftime(
-            "%Y-%m-%d %H:%M"
-        )
-        for admin in admins:
-            await notification_service.create_notification(
-                user_id=admin.id,
-                message=(
-                    f"Appointment booked for lead {lead.phone} on "
-                    f"{scheduled_for_ist}"
-                ),
-                notification_type=NotificationType.APPOINTMENT_BOOKED,
-                related_lead_id=lead.id,
-            )
         return ToolBookAppointmentResponse(
             success=True,
             lead_id=lead.id,
@@ -1178,6 +1652,7 @@ async def tool_book_appointment(
 
 
 @router.post("/tools/store_recording", response_model=ToolStoreRecordingResponse)
+@tool_latency.timed("store_recording")
 async def tool_store_recording(
     payload: ToolStoreRecordingRequest,
     db: AsyncSession = Depends(get_db),
@@ -1235,6 +1710,7 @@ async def tool_store_recording(
 
 
 @router.post("/tools/get_system_date", response_model=ToolGetSystemDateResponse)
+@tool_latency.timed("get_system_date")
 async def tool_get_system_date(
     api_key: str = Depends(verify_elevenlabs_api_key),
 ) -> ToolGetSystemDateResponse:
@@ -1248,6 +1724,7 @@ async def tool_get_system_date(
 
 
 @router.post("/tools/save_summary", response_model=ToolSaveSummaryResponse)
+@tool_latency.timed("save_summary")
 async def tool_save_summary(
     payload: ToolSaveSummaryRequest,
     db: AsyncSession = Depends(get_db),
@@ -1260,9 +1737,14 @@ async def tool_save_summary(
                 success=False,
                 message="Empty summary payload.",
             )
-        result = await db.execute(select(Call).where(Call.call_sid == payload.external_call_id))
-        call = result.scalar_one_or_none()
-        if not call:
+        result = await db.execute(
+            update(Call)
+            .where(Call.call_sid == payload.external_call_id)
+            .values(transcript_summary=payload.summary)
+            .returning(Call.id)
+        )
+        call_id = result.scalar_one_or_none()
+        if call_id is None:
             logger.warning(
                 "tool_save_summary_call_not_found",
                 external_call_id=payload.external_call_id,
@@ -1271,9 +1753,7 @@ async def tool_save_summary(
                 success=False,
                 message="Call not found for summary storage.",
             )
-        call.transcript_summary = payload.summary
-        await db.flush()
-        await db.refresh(call)
+        caller_snapshot.mark_stale(db, call_ids=[call_id])
         await db.commit()
         return ToolSaveSummaryResponse(
             success=True,
@@ -1292,6 +1772,183 @@ async def tool_save_summary(
         )
 
 
+@router.post("/tools/find_nearby_properties", response_model=ToolFindNearbyPropertiesResponse)
+@tool_latency.timed("find_nearby_properties")
+async def tool_find_nearby_properties(
+    payload: ToolFindNearbyPropertiesRequest,
+    db: AsyncSession = Depends(get_db),
+    api_key: str = Depends(verify_elevenlabs_api_key),
+) -> ToolFindNearbyPropertiesResponse:
+    if payload.latitude is not None and payload.longitude is not None:
+        center = (payload.latitude, payload.longitude)
+    elif payload.location:
+        center = await locate(db, payload.location)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Either location or latitude and longitude must be provided.",
+        )
+    if center is None:
+        return ToolFindNearbyPropertiesResponse(
+            success=False,
+            message=f"No listed properties found around {payload.location}.",
+        )
+
+    lat, lon = center
+    query = nearby(db.get_bind().dialect.name, lat, lon, radius_km=payload.radius_km).where(
+        Property.status == PropertyStatus.AVAILABLE.value
+    )
+    if payload.property_type:
+        query = query.where(Property.property_type == payload.property_type)
+    if payload.bedrooms is not None:
+        query = query.where(Property.bedrooms == payload.bedrooms)
+    if payload.max_price is not None:
+        query = query.where(Property.price <= payload.max_price)
+    properties = (await db.execute(query.limit(payload.limit))).scalars().all()
+
+    return ToolFindNearbyPropertiesResponse(
+        success=True,
+        properties=[
+            ToolNearbyProperty(
+                id=prop.id,
+                title=prop.title,
+                property_type=prop.property_type,
+                locality=prop.locality,
+                city=prop.city,
+                price=prop.price,
+                bedrooms=prop.bedrooms,
+                distance_km=round(haversine_km(lat, lon, prop.latitude, prop.longitude), 1),
+            )
+            for prop in properties
+        ],
+        message=(
+            f"Found {len(properties)} properties within {payload.radius_km:g} km."
+            if properties
+            else f"No matching properties within {payload.radius_km:g} km."
+        ),
+    )
+
+
+@router.post("/tools/match_properties", response_model=ToolMatchPropertiesResponse)
+@tool_latency.timed("match_properties")
+async def tool_match_properties(
+    payload: ToolMatchPropertiesRequest,
+    db: AsyncSession = Depends(get_db),
+    api_key: str = Depends(verify_elevenlabs_api_key),
+) -> ToolMatchPropertiesResponse:
+    """Listings matching the caller's saved preferences, overridden by any given here."""
+    lead = None
+    if payload.phone:
+        cached = await lead_phone_cache.lookup(db, payload.phone)
+        if cached:
+            lead = await db.get(Lead, cached.id)
+    saved = Preferences.of_lead(lead) if lead else Preferences()
+    preferences = Preferences(
+        location=payload.location or saved.location,
+        property_type=payload.property_type or saved.property_type,
+        budget_min=payload.budget_min if payload.budget_min is not None else saved.budget_min,
+        budget_max=payload.budget_max if payload.budget_max is not None else saved.budget_max,
+        size_min=saved.size_min,
+        size_max=saved.size_max,
+    )
+    lead_id = lead.id if lead else None
+    if not preferences.stated:
+        return ToolMatchPropertiesResponse(
+            success=False,
+            lead_id=lead_id,
+            message="No location, property type or budget known for this caller yet.",
+        )
+
+    total, matches = await lead_matcher.properties_for(preferences, limit=payload.limit)
+    result = await db.execute(select(Property).where(Property.id.in_([m.id for m in matches])))
+    properties = {prop.id: prop for prop in result.scalars().all()}
+    matched = []
+    for match in matches:
+        prop = properties.get(match.id)
+        if prop is None:
+            continue
+        matched.append(
+            ToolMatchedProperty(
+                id=prop.id,
+                title=prop.title,
+                property_type=prop.property_type,
+                locality=prop.locality,
+                city=prop.city,
+                price=prop.price,
+                size_sqft=prop.size_sqft,
+                bedrooms=prop.bedrooms,
+                score=match.score,
+            )
+        )
+    return ToolMatchPropertiesResponse(
+        success=True,
+        lead_id=lead_id,
+        total=total,
+        properties=matched,
+        message=(
+            f"Found {total} matching properties." if total else "No matching properties right now."
+        ),
+    )
+
+
+@router.post("/tools/quote_system", response_model=ToolQuoteSystemResponse)
+@tool_latency.timed("quote_system")
+async def tool_quote_system(
+    payload: ToolQuoteSystemRequest,
+    api_key: str = Depends(verify_elevenlabs_api_key),
+) -> ToolQuoteSystemResponse:
+    """Size a rooftop system from the caller's bill (or stated kW) and quote catalog panels."""
+    if payload.rooftop_available is False:
+        return ToolQuoteSystemResponse(
+            success=False,
+            message="A rooftop system needs usable roof space; offer a site visit instead.",
+        )
+    if payload.estimated_kw is not None:
+        target_kw = payload.estimated_kw
+    elif payload.monthly_bill is not None:
+        target_kw = size_for_bill(payload.monthly_bill)
+    else:
+        return ToolQuoteSystemResponse(
+            success=False, message="Ask for the monthly electricity bill or the required kW."
+        )
+
+    total, quotes = await solar_sizer.quote(
+        target_kw, roof_area_sqft=payload.roof_area_sqft, limit=payload.limit
+    )
+    target_kw = round(target_kw, 2)
+    if not quotes:
+        return ToolQuoteSystemResponse(
+            success=False,
+            target_kw=target_kw,
+            message=f"No panel in the catalog can build a {target_kw} kW system on this roof.",
+        )
+    best = quotes[0]
+    return ToolQuoteSystemResponse(
+        success=True,
+        target_kw=target_kw,
+        total=total,
+        quotes=[ToolSystemQuote(**asdict(quote)) for quote in quotes],
+        message=(
+            f"About {target_kw} kW needed. Best option: {best.panel_count} x "
+            f"{best.panel_wattage} W {best.name} ({best.system_kw} kW) "
+            f"for Rs {best.price_inr:,.0f} installed."
+        ),
+    )
+
+
+@router.get("/tools/latency", response_model=Dict[str, ToolLatencyStats])
+async def get_tool_latency(
+    current_user: User = Depends(get_current_user),
+) -> Dict[str, ToolLatencyStats]:
+    """Rolling p50/p99 of each voice agent tool against ``tool_latency_budget_ms``."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only admins can view tool latency.",
+        )
+    return {tool: ToolLatencyStats(**stats) for tool, stats in tool_latency.snapshot().items()}
+
+
 class HumanDialRequest(BaseModel):
     to_number: str
     lead_id: Optional[int] = None
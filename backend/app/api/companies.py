@@ -0,0 +1,201 @@
+"""Company profile, policy and offer management (what the voice agent is briefed with)."""
+
+import json
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.models.company import Company, CompanyPolicy, Offer, PolicyKind
+from app.models.user import User
+from app.schemas.company import (
+    CompanyCreate,
+    CompanyPolicyResponse,
+    CompanyPolicyUpdate,
+    CompanyResponse,
+    CompanyUpdate,
+    OfferCreate,
+    OfferResponse,
+    OfferUpdate,
+)
+from app.utils.security import require_admin
+
+router = APIRouter()
+
+
+async def _get_company(db: AsyncSession, company_id: int) -> Company:
+    company = await db.get(Company, company_id)
+    if not company:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Company not found",
+        )
+    return company
+
+
+async def _flush_unique_number(db: AsyncSession) -> None:
+    try:
+        await db.flush()
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Another company already uses this phone number",
+        )
+
+
+@router.get("/", response_model=List[CompanyResponse])
+async def list_companies(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> List[Company]:
+    result = await db.execute(select(Company).order_by(Company.name, Company.id))
+    return list(result.scalars().all())
+
+
+@router.post("/", response_model=CompanyResponse, status_code=status.HTTP_201_CREATED)
+async def create_company(
+    request: CompanyCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> Company:
+    company = Company(name=request.name, phone_number=request.phone_number, is_active=True)
+    if company.phone_e164 is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Phone number is not valid",
+        )
+    db.add(company)
+    await _flush_unique_number(db)
+    await db.refresh(company)
+    return company
+
+
+@router.put("/{company_id}", response_model=CompanyResponse)
+async def update_company(
+    company_id: int,
+    request: CompanyUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> Company:
+    company = await _get_company(db, company_id)
+    for field, value in request.model_dump(exclude_unset=True).items():
+        setattr(company, field, value)
+    if company.phone_e164 is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Phone number is not valid",
+        )
+    await _flush_unique_number(db)
+    await db.refresh(company)
+    return company
+
+
+@router.put("/{company_id}/policies/{kind}", response_model=CompanyPolicyResponse)
+async def set_company_policy(
+    company_id: int,
+    kind: PolicyKind,
+    request: CompanyPolicyUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> CompanyPolicyResponse:
+    """Create or replace a company's subsidy or EMI policy."""
+    await _get_company(db, company_id)
+    result = await db.execute(
+        select(CompanyPolicy).where(
+            CompanyPolicy.company_id == company_id,
+            CompanyPolicy.kind == kind.value,
+        )
+    )
+    policy = result.scalar_one_or_none()
+    details = json.dumps(request.details, ensure_ascii=False)
+    if policy is None:
+        policy = CompanyPolicy(company_id=company_id, kind=kind.value, details=details)
+        db.add(policy)
+    else:
+        policy.details = details
+    await db.flush()
+    await db.refresh(policy)
+    return CompanyPolicyResponse(
+        company_id=company_id,
+        kind=kind,
+        details=request.details,
+        updated_at=policy.updated_at,
+    )
+
+
+@router.delete("/{company_id}/policies/{kind}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_company_policy(
+    company_id: int,
+    kind: PolicyKind,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> None:
+    result = await db.execute(
+        select(CompanyPolicy).where(
+            CompanyPolicy.company_id == company_id,
+            CompanyPolicy.kind == kind.value,
+        )
+    )
+    policy = result.scalar_one_or_none()
+    if not policy:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Policy not found",
+        )
+    await db.delete(policy)
+    await db.flush()
+
+
+@router.get("/{company_id}/offers", response_model=List[OfferResponse])
+async def list_offers(
+    company_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> List[Offer]:
+    await _get_company(db, company_id)
+    result = await db.execute(
+        select(Offer).where(Offer.company_id == company_id).order_by(Offer.starts_at, Offer.id)
+    )
+    return list(result.scalars().all())
+
+
+@router.post(
+    "/{company_id}/offers",
+    response_model=OfferResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_offer(
+    company_id: int,
+    request: OfferCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> Offer:
+    await _get_company(db, company_id)
+    offer = Offer(company_id=company_id, is_active=True, **request.model_dump())
+    db.add(offer)
+    await db.flush()
+    await db.refresh(offer)
+    return offer
+
+
+@router.put("/offers/{offer_id}", response_model=OfferResponse)
+async def update_offer(
+    offer_id: int,
+    request: OfferUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_admin),
+) -> Offer:
+    offer = await db.get(Offer, offer_id)
+    if not offer:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Offer not found",
+        )
+    for field, value in request.model_dump(exclude_unset=True).items():
+        setattr(offer, field, value)
+    await db.flush()
+    await db.refresh(offer)
+    return offer
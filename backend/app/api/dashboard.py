@@ -1,23 +1,46 @@
 """API endpoints for dashboard statistics and metrics."""
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel, field_validator
+import numpy as np
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy import case, func, select
+from sqlalchemy.orm import load_only
 
 from app.database import async_session_maker
 from app.models.call import Call, CallStatus
 from app.models.lead import Lead, LeadQuality, LeadStatus
 from app.models.product import Product
+from app.services.dashboard_cache import CachedPayload, dashboard_cache
+from app.services.dashboard_realtime import register_connection, unregister_connection
+from app.services.solar_alert_engine import get_active_alerts, solar_alert_engine
+from app.services.solar_telemetry_store import TelemetrySample, solar_telemetry_store
 from app.utils.logging import get_logger
+from app.utils.security import get_websocket_user
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 logger = get_logger("api.dashboard")
 _ist_tz = ZoneInfo("Asia/Kolkata")
 
+_STATS_DEPENDENCIES = frozenset({"calls", "leads", "products"})
+_CHARTS_DEPENDENCIES = frozenset({"calls", "leads"})
+_RECENT_CALLS_DEPENDENCIES = frozenset({"calls"})
+_PENDING_FOLLOWUPS_DEPENDENCIES = frozenset({"leads"})
+
+
+def _cached_response(request: Request, entry: CachedPayload) -> Response:
+    """Serve a cached payload, answering 304 when the client already holds it."""
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if entry.etag in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
 
 class DashboardStats(BaseModel):
     """Dashboard statistics response."""
@@ -200,61 +223,81 @@ class SolarTelemetryUpdate(BaseModel):
     financial: FinancialMetrics
 
 
-@router.get("/charts", response_model=List[ChartDataPoint])
-async def get_dashboard_charts():
-    """Get chart data for the last 7 days."""
-    try:
-        async with async_session_maker() as db:
-            now = datetime.utcnow()
-            days = []
-            data = []
+class SolarTelemetrySample(SolarTelemetryUpdate):
+    site_id: str = Field("default", max_length=64)
+    timestamp: Optional[datetime] = None
+
+
+class SolarTelemetryBatch(BaseModel):
+    samples: List[SolarTelemetrySample] = Field(..., min_length=1, max_length=5000)
+
+
+async def _compute_dashboard_charts() -> List[ChartDataPoint]:
+    async with async_session_maker() as db:
+        now = datetime.utcnow()
+        days = []
+        data = []
+        
+        # Generate last 7 days
+        for i in range(6, -1, -1):
+            date = now - timedelta(days=i)
+            days.append(date.date())
             
-            # Generate last 7 days
-            for i in range(6, -1, -1):
-                date = now - timedelta(days=i)
-                days.append(date.date())
-                
-            for day in days:
-                # Count calls for this day
-                # SQLite-specific date handling
-                calls_count = await db.scalar(
-                    select(func.count(Call.id)).where(
-                        func.date(Call.created_at) == day.isoformat()
-                    )
-                )
-                
-                # Count leads for this day
-                leads_count = await db.scalar(
-                    select(func.count(Lead.id)).where(
-                        func.date(Lead.created_at) == day.isoformat()
-                    )
+        for day in days:
+            # Count calls for this day
+            # SQLite-specific date handling
+            calls_count = await db.scalar(
+                select(func.count(Call.id)).where(
+                    func.date(Call.created_at) == day.isoformat()
                 )
-                
-                data.append(
-                    ChartDataPoint(
-                        name=day.strftime("%a"), # Mon, Tue, etc.
-                        calls=calls_count or 0,
-                        leads=leads_count or 0
-                    )
+            )
+            
+            # Count leads for this day
+            leads_count = await db.scalar(
+                select(func.count(Lead.id)).where(
+                    func.date(Lead.created_at) == day.isoformat()
                 )
+            )
             
-            return data
+            data.append(
+                ChartDataPoint(
+                    name=day.strftime("%a"), # Mon, Tue, etc.
+                    calls=calls_count or 0,
+                    leads=leads_count or 0
+                )
+            )
+        
+        return data
+
+
+@router.get("/charts", response_model=List[ChartDataPoint])
+async def get_dashboard_charts(request: Request):
+    """Get chart data for the last 7 days."""
+    try:
+        entry = await dashboard_cache.get_or_compute(
+            "charts", _CHARTS_DEPENDENCIES, _compute_dashboard_charts
+        )
     except Exception as e:
         logger.error("get_charts_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    return _cached_response(request, entry)
 
 
 @router.get("/solar-realtime", response_model=SolarDashboardResponse)
-async def get_solar_realtime():
+async def get_solar_realtime(site_id: str = Query("default", max_length=64)):
     try:
         now = datetime.now(ZoneInfo("Asia/Kolkata"))
-        telemetry = None
+        telemetry = solar_telemetry_store.latest(site_id)
+        snapshot = telemetry.snapshot if telemetry else {}
 
-        perf_data: Dict[str, Any] = {}
-        env_data: Dict[str, Any] = {}
-        fin_data: Dict[str, Any] = {}
+        perf_data: Dict[str, Any] = snapshot.get("performance", {})
+        env_data: Dict[str, Any] = snapshot.get("environment", {})
+        fin_data: Dict[str, Any] = snapshot.get("financial", {})
         op_data: Dict[str, Any] = {}
-        trend_data: List[Dict[str, Any]] = []
+        trend_data: List[Dict[str, Any]] = [
+            {"timestamp": ts, "energy_kwh": energy}
+            for ts, energy in await solar_telemetry_store.energy_trend(site_id)
+        ]
 
         performance = SolarPerformanceMetrics(
             current_power_kw=float(perf_data.get("current_power_kw", 4.2)),
@@ -282,7 +325,9 @@ async def get_solar_realtime():
             trees_equivalent=float(fin_data.get("trees_equivalent", 5.0)),
         )
 
-        telemetry_created_at = telemetry.get("created_at") if telemetry else None
+        telemetry_created_at = (
+            datetime.fromtimestamp(telemetry.timestamp, tz=timezone.utc) if telemetry else None
+        )
         last_update_value = op_data.get("last_update") or telemetry_created_at or now
         if isinstance(last_update_value, str):
             last_update_dt = datetime.fromisoformat(last_update_value)
@@ -291,8 +336,21 @@ async def get_solar_realtime():
         if last_update_dt.tzinfo is None:
             last_update_dt = last_update_dt.replace(tzinfo=ZoneInfo("Asia/Kolkata"))
 
-        overall_status = str(op_data.get("overall_status", "ok"))
-        active_alarms = int(op_data.get("active_alarms", 0))
+        alerts_docs: List[Dict[str, Any]] = [
+            {
+                "id": alert.id,
+                "severity": alert.severity,
+                "message": alert.message,
+                # SQLite drops tzinfo; raised_at is always stored in UTC.
+                "created_at": alert.raised_at
+                if alert.raised_at.tzinfo
+                else alert.raised_at.replace(tzinfo=timezone.utc),
+            }
+            for alert in await get_active_alerts(site_id)
+        ]
+
+        overall_status = str(op_data.get("overall_status", "warning" if alerts_docs else "ok"))
+        active_alarms = int(op_data.get("active_alarms", len(alerts_docs)))
         uptime_percent = float(op_data.get("uptime_percent", 99.5))
 
         operational = OperationalStatus(
@@ -302,8 +360,6 @@ async def get_solar_realtime():
             last_update=last_update_dt,
         )
 
-        alerts_docs: List[Dict[str, Any]] = []
-
         alerts: List[SolarAlert] = []
         for doc in alerts_docs:
             created_at_value = doc.get("created_at", now)
@@ -359,139 +415,189 @@ async def get_solar_realtime():
 
 
 @router.post("/solar-telemetry")
-async def update_solar_telemetry(payload: SolarTelemetryUpdate):
+async def update_solar_telemetry(payload: Union[SolarTelemetryBatch, SolarTelemetrySample]):
+    """Ingest one telemetry sample or a batch of samples from one or more sites."""
     try:
         now = datetime.now(ZoneInfo("Asia/Kolkata"))
-
-        active_alarms = 0
-        alerts: List[Dict[str, Any]] = []
-
-        if payload.performance.system_efficiency_pct < 75.0:
-            active_alarms += 1
-            alerts.append(
-                {
-                    "severity": "warning",
-                    "message": "System efficiency below expected threshold.",
-                    "created_at": now,
-                }
+        samples = payload.samples if isinstance(payload, SolarTelemetryBatch) else [payload]
+
+        # Latest (normalized observed_at, sample, ingested sample) per site.
+        latest_by_site: Dict[str, Tuple[datetime, SolarTelemetrySample, TelemetrySample]] = {}
+        telemetry: List[TelemetrySample] = []
+        for sample in samples:
+            observed_at = sample.timestamp or now
+            if observed_at.tzinfo is None:
+                observed_at = observed_at.replace(tzinfo=timezone.utc)
+            ingested = TelemetrySample(
+                site_id=sample.site_id,
+                timestamp=observed_at.timestamp(),
+                power_kw=sample.performance.current_power_kw,
+                irradiance_w_m2=sample.environment.solar_irradiance_w_m2,
+                temperature_c=sample.environment.temperature_c,
+                efficiency_pct=sample.performance.system_efficiency_pct,
+                snapshot=sample.model_dump(include={"performance", "environment", "financial"}),
             )
-
-        high_irradiance = payload.environment.solar_irradiance_w_m2 > 800.0
-        low_output = (
-            payload.performance.current_power_kw
-            < payload.performance.total_capacity_kw * 0.5
+            telemetry.append(ingested)
+            current = latest_by_site.get(sample.site_id)
+            if current is None or current[0] <= observed_at:
+                latest_by_site[sample.site_id] = (observed_at, sample, ingested)
+
+        accepted = solar_telemetry_store.ingest(telemetry)
+        solar_telemetry_store.schedule_flush()
+
+        # Only sites whose newest sample was kept; retransmits and late samples
+        # must not move alert state.
+        site_ids, latest = [], []
+        for site_id, (_, sample, ingested) in latest_by_site.items():
+            if solar_telemetry_store.latest(site_id) is ingested:
+                site_ids.append(site_id)
+                latest.append(sample)
+        power = np.array([s.performance.current_power_kw for s in latest], dtype=float)
+        capacity = np.array([s.performance.total_capacity_kw for s in latest], dtype=float)
+        transitions = await solar_alert_engine.evaluate_and_persist(
+            site_ids,
+            {
+                "system_efficiency_pct": np.array(
+                    [s.performance.system_efficiency_pct for s in latest], dtype=float
+                ),
+                "solar_irradiance_w_m2": np.array(
+                    [s.environment.solar_irradiance_w_m2 for s in latest], dtype=float
+                ),
+                "output_ratio": np.divide(
+                    power, capacity, out=np.ones_like(power), where=capacity > 0
+                ),
+            },
         )
-        if high_irradiance and low_output:
-            active_alarms += 1
-            alerts.append(
-                {
-                    "severity": "warning",
-                    "message": "High irradiance but low power output detected.",
-                    "created_at": now,
-                }
-            )
 
-        return {"success": True}
+        return {
+            "success": True,
+            "accepted": accepted,
+            "received": len(samples),
+            "alerts_raised": sum(1 for t in transitions if t.raised),
+            "alerts_resolved": sum(1 for t in transitions if not t.raised),
+        }
     except Exception as e:
         logger.error("update_solar_telemetry_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _compute_dashboard_stats() -> DashboardStats:
+    async with async_session_maker() as db:
+        now = datetime.utcnow()
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        week_start = today_start - timedelta(days=now.weekday())
+        month_start = today_start.replace(day=1)
+        
+        # Calls stats
+        calls_today = await db.scalar(
+            select(func.count(Call.id)).where(Call.created_at >= today_start)
+        )
+        calls_week = await db.scalar(
+            select(func.count(Call.id)).where(Call.created_at >= week_start)
+        )
+        calls_month = await db.scalar(
+            select(func.count(Call.id)).where(Call.created_at >= month_start)
+        )
+        active_calls = await db.scalar(
+            select(func.count(Call.id)).where(Call.status == CallStatus.IN_PROGRESS.value)
+        )
+        
+        # Leads stats
+        total_leads = await db.scalar(select(func.count(Lead.id)))
+        hot_leads = await db.scalar(
+            select(func.count(Lead.id)).where(Lead.quality == LeadQuality.HOT.value)
+        )
+        warm_leads = await db.scalar(
+            select(func.count(Lead.id)).where(Lead.quality == LeadQuality.WARM.value)
+        )
+        cold_leads = await db.scalar(
+            select(func.count(Lead.id)).where(Lead.quality == LeadQuality.COLD.value)
+        )
+        
+        # Products stats (solar inventory)
+        total_products = await db.scalar(select(func.count(Product.id)))
+        active_products = await db.scalar(
+            select(func.count(Product.id)).where(Product.is_active)
+        )
+        
+        # Conversion rate (converted leads / total leads)
+        converted_leads = await db.scalar(
+            select(func.count(Lead.id)).where(Lead.status == LeadStatus.CONVERTED.value)
+        )
+        conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0.0
+        
+        return DashboardStats(
+            total_calls_today=calls_today or 0,
+            total_calls_week=calls_week or 0,
+            total_calls_month=calls_month or 0,
+            active_calls=active_calls or 0,
+            total_leads=total_leads or 0,
+            hot_leads=hot_leads or 0,
+            warm_leads=warm_leads or 0,
+            cold_leads=cold_leads or 0,
+            total_products=total_products or 0,
+            active_products=active_products or 0,
+            conversion_rate=round(conversion_rate, 2),
+        )
+
+
 @router.get("/stats", response_model=DashboardStats)
-async def get_dashboard_stats():
+async def get_dashboard_stats(request: Request):
     """Get overall dashboard statistics."""
     try:
-        async with async_session_maker() as db:
-            now = datetime.utcnow()
-            today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-            week_start = today_start - timedelta(days=now.weekday())
-            month_start = today_start.replace(day=1)
-            
-            # Calls stats
-            calls_today = await db.scalar(
-                select(func.count(Call.id)).where(Call.created_at >= today_start)
-            )
-            calls_week = await db.scalar(
-                select(func.count(Call.id)).where(Call.created_at >= week_start)
-            )
-            calls_month = await db.scalar(
-                select(func.count(Call.id)).where(Call.created_at >= month_start)
-            )
-            active_calls = await db.scalar(
-                select(func.count(Call.id)).where(Call.status == CallStatus.IN_PROGRESS.value)
-            )
-            
-            # Leads stats
-            total_leads = await db.scalar(select(func.count(Lead.id)))
-            hot_leads = await db.scalar(
-                select(func.count(Lead.id)).where(Lead.quality == LeadQuality.HOT.value)
-            )
-            warm_leads = await db.scalar(
-                select(func.count(Lead.id)).where(Lead.quality == LeadQuality.WARM.value)
-            )
-            cold_leads = await db.scalar(
-                select(func.count(Lead.id)).where(Lead.quality == LeadQuality.COLD.value)
-            )
-            
-            # Products stats (solar inventory)
-            total_products = await db.scalar(select(func.count(Product.id)))
-            active_products = await db.scalar(
-                select(func.count(Product.id)).where(Product.is_active)
-            )
-            
-            # Conversion rate (converted leads / total leads)
-            converted_leads = await db.scalar(
-                select(func.count(Lead.id)).where(Lead.status == LeadStatus.CONVERTED.value)
-            )
-            conversion_rate = (converted_leads / total_leads * 100) if total_leads > 0 else 0.0
-            
-            return DashboardStats(
-                total_calls_today=calls_today or 0,
-                total_calls_week=calls_week or 0,
-                total_calls_month=calls_month or 0,
-                active_calls=active_calls or 0,
-                total_leads=total_leads or 0,
-                hot_leads=hot_leads or 0,
-                warm_leads=warm_leads or 0,
-                cold_leads=cold_leads or 0,
-                total_products=total_products or 0,
-                active_products=active_products or 0,
-                conversion_rate=round(conversion_rate, 2),
-            )
+        entry = await dashboard_cache.get_or_compute(
+            "stats", _STATS_DEPENDENCIES, _compute_dashboard_stats
+        )
     except Exception as e:
         logger.error("get_stats_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    return _cached_response(request, entry)
+
+
+async def _compute_recent_calls(limit: int) -> List[RecentCallResponse]:
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(Call)
+            .options(
+                load_only(
+                    *(getattr(Call, name) for name in RecentCallResponse.model_fields),
+                    raiseload=True,
+                )
+            )
+            .order_by(Call.created_at.desc())
+            .limit(limit)
+        )
+        calls = result.scalars().all()
+        
+        return [
+            RecentCallResponse(
+                id=call.id,
+                call_sid=call.call_sid,
+                from_number=call.from_number,
+                to_number=call.to_number,
+                status=call.status,
+                duration_seconds=call.duration_seconds,
+                handled_by_ai=call.handled_by_ai,
+                transcript_summary=call.transcript_summary,
+                created_at=call.created_at,
+            )
+            for call in calls
+        ]
 
 
 @router.get("/recent-calls", response_model=List[RecentCallResponse])
-async def get_recent_calls(limit: int = Query(10, le=50)):
+async def get_recent_calls(request: Request, limit: int = Query(10, le=50)):
     """Get recent call activity."""
     try:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(Call)
-                .order_by(Call.created_at.desc())
-                .limit(limit)
-            )
-            calls = result.scalars().all()
-            
-            return [
-                RecentCallResponse(
-                    id=call.id,
-                    call_sid=call.call_sid,
-                    from_number=call.from_number,
-                    to_number=call.to_number,
-                    status=call.status,
-                    duration_seconds=call.duration_seconds,
-                    handled_by_ai=call.handled_by_ai,
-                    transcript_summary=call.transcript_summary,
-                    created_at=call.created_at,
-                )
-                for call in calls
-            ]
+        entry = await dashboard_cache.get_or_compute(
+            f"recent-calls:{limit}",
+            _RECENT_CALLS_DEPENDENCIES,
+            lambda: _compute_recent_calls(limit),
+        )
     except Exception as e:
         logger.error("get_recent_calls_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    return _cached_response(request, entry)
 
 
 class PendingFollowUp(BaseModel):
@@ -511,48 +617,57 @@ class PendingFollowUp(BaseModel):
         return v
 
 
+async def _compute_pending_followups(limit: int) -> List[PendingFollowUp]:
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(Lead)
+            .where(
+                Lead.status.in_([
+                    LeadStatus.NEW.value, 
+                    LeadStatus.CONTACTED.value,
+                    LeadStatus.QUALIFIED.value
+                ])
+            )
+            .order_by(
+                # Prioritize Hot > Warm > Cold, then by recency
+                case(
+                    (Lead.quality == LeadQuality.HOT.value, 1),
+                    (Lead.quality == LeadQuality.WARM.value, 2),
+                    (Lead.quality == LeadQuality.COLD.value, 3),
+                    else_=4
+                ),
+                Lead.updated_at.desc()
+            )
+            .limit(limit)
+        )
+        leads = result.scalars().all()
+        
+        return [
+            PendingFollowUp(
+                id=lead.id,
+                name=lead.name,
+                phone=lead.phone,
+                quality=lead.quality,
+                last_contact=lead.updated_at,
+                notes=lead.ai_summary or lead.notes
+            )
+            for lead in leads
+        ]
+
+
 @router.get("/pending-followups", response_model=List[PendingFollowUp])
-async def get_pending_followups(limit: int = Query(5, le=20)):
+async def get_pending_followups(request: Request, limit: int = Query(5, le=20)):
     """Get all leads needing attention (Hot/Warm or New/Contacted)."""
     try:
-        async with async_session_maker() as db:
-            result = await db.execute(
-                select(Lead)
-                .where(
-                    Lead.status.in_([
-                        LeadStatus.NEW.value, 
-                        LeadStatus.CONTACTED.value,
-                        LeadStatus.QUALIFIED.value
-                    ])
-                )
-                .order_by(
-                    # Prioritize Hot > Warm > Cold, then by recency
-                    case(
-                        (Lead.quality == LeadQuality.HOT.value, 1),
-                        (Lead.quality == LeadQuality.WARM.value, 2),
-                        (Lead.quality == LeadQuality.COLD.value, 3),
-                        else_=4
-                    ),
-                    Lead.updated_at.desc()
-                )
-                .limit(limit)
-            )
-            leads = result.scalars().all()
-            
-            return [
-                PendingFollowUp(
-                    id=lead.id,
-                    name=lead.name,
-                    phone=lead.phone,
-                    quality=lead.quality,
-                    last_contact=lead.updated_at,
-                    notes=lead.ai_summary or lead.notes
-                )
-                for lead in leads
-            ]
+        entry = await dashboard_cache.get_or_compute(
+            f"pending-followups:{limit}",
+            _PENDING_FOLLOWUPS_DEPENDENCIES,
+            lambda: _compute_pending_followups(limit),
+        )
     except Exception as e:
         logger.error("get_pending_followups_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+    return _cached_response(request, entry)
 
 
 @router.get("/agent-performance", response_model=List[AgentPerformance])
@@ -604,3 +719,22 @@ async def get_agent_performance():
     except Exception as e:
         logger.error("get_agent_performance_failed", error=str(e))
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/ws")
+async def dashboard_ws(websocket: WebSocket) -> None:
+    """Push batched stat deltas; clients seed their totals from the REST endpoints."""
+    user = await get_websocket_user(websocket.query_params.get("token"))
+    if user is None:
+        await websocket.close(code=1008)
+        return
+    await websocket.accept()
+    await register_connection(websocket)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        await unregister_connection(websocket)
+    except Exception:
+        await unregister_connection(websocket)
+        await websocket.close()
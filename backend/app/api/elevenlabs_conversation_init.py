@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-from typing import Any, Optional
+import asyncio
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, HTTPException, Request, status
 from pydantic import AliasChoices, BaseModel, ConfigDict, Field
 
+from app.services.caller_snapshot import get_caller_variables, unknown_caller_variables
 from app.services.elevenlabs_conversation_init_service import build_dynamic_context
 from app.utils.logging import get_logger
 
@@ -33,12 +35,27 @@ class ConversationInitRequest(BaseModel):
 
 class ConversationInitiationClientData(BaseModel):
     dynamic_context: str
+    dynamic_variables: Dict[str, Any] = Field(default_factory=dict)
 
 
 class ConversationInitResponse(BaseModel):
     conversation_initiation_client_data: ConversationInitiationClientData
 
 
+async def _caller_variables(payload: ConversationInitRequest) -> Dict[str, Any]:
+    """The caller's history; a lookup failure only costs the agent its memory."""
+    try:
+        return await get_caller_variables(payload.from_number)
+    except Exception as e:
+        logger.warning(
+            "caller_snapshot_lookup_failed",
+            error=str(e),
+            from_number=payload.from_number,
+            call_id=payload.call_id,
+        )
+        return unknown_caller_variables()
+
+
 @router.post("/conversation-init", response_model=ConversationInitResponse)
 async def conversation_init(request: Request) -> ConversationInitResponse:
     try:
@@ -56,19 +73,9 @@ async def conversation_init(request: Request) -> ConversationInitResponse:
         )
 
     try:
-        dynamic_context = await build_dynamic_context(to_number=payload.to_number)
-    except NotImplementedError:
-        logger.error("conversation_init_db_not_implemented", to_number=payload.to_number)
-        dynamic_context = (
-            "Company name: Unknown Company\n"
-            "Product catalog:\n"
-            "-\n"
-            "Subsidy information:\n"
-            "-\n"
-            "EMI policy:\n"
-            "-\n"
-            "Active offers:\n"
-            "-\n"
+        dynamic_context, dynamic_variables = await asyncio.gather(
+            build_dynamic_context(to_number=payload.to_number),
+            _caller_variables(payload),
         )
     except Exception as e:
         logger.error(
@@ -85,5 +92,6 @@ async def conversation_init(request: Request) -> ConversationInitResponse:
     return ConversationInitResponse(
         conversation_initiation_client_data=ConversationInitiationClientData(
             dynamic_context=dynamic_context,
+            dynamic_variables=dynamic_variables,
         )
     )
@@ -13,16 +13,20 @@ from zoneinfo import ZoneInfo
 
 import httpx
 from fastapi import APIRouter, HTTPException, Request
-from sqlalchemy import case, func, select
+from sqlalchemy import case, func, or_, select, update
 from sqlalchemy import insert as sa_insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
 
 from app.config import settings
 from app.database import async_session_maker
-from app.models.call import Call, CallStatus
+from app.models.call import Call, CallStatus, lead_last_call_update, structured_report_columns
 from app.models.elevenlabs_event_log import ElevenLabsEventLog
 from app.models.lead import Lead
+from app.services import caller_snapshot, dashboard_realtime
 from app.services.blob_service import BlobService
+from app.services.lead_summary_service import mark_calls_changed
+from app.services.report_fallback import REPORT_SOURCE_LLM, extract_local_report
 from app.utils.logging import get_logger
 
 router = APIRouter()
@@ -43,6 +47,8 @@ elevenlabs_client = (
 _elevenlabs_rate_state: Dict[str, list[float]] = {}
 _ELEVENLABS_RATE_WINDOW_SECONDS = 60.0
 _ELEVENLABS_RATE_LIMIT = 120
+_IST = ZoneInfo("Asia/Kolkata")
+_report_upgrades: set = set()
 
 
 def _safe_log(level: str, event: str, **kwargs: Any) -> None:
@@ -410,6 +416,9 @@ async def _upsert_call_by_sid(db: AsyncSession, values: dict) -> Call:
 
     clean_values = {k: v for k, v in values.items() if v is not None}
     clean_values.setdefault("handled_by_ai", True)
+    if "structured_report" in clean_values:
+        # Core inserts bypass the model's attribute events; derive the columns here.
+        clean_values.update(structured_report_columns(clean_values["structured_report"]))
 
     if dialect == "postgresql" and pg_insert is not None:
         insert_stmt = pg_insert(Call).values(**clean_values)
@@ -485,16 +494,37 @@ async def _upsert_call_by_sid(db: AsyncSession, values: dict) -> Call:
             "webhook_processed_at": coalesce_field("webhook_processed_at"),
             "updated_at": func.now(),
         }
-
+        if "structured_report" in clean_values:
+            for name in structured_report_columns(None):
+                update_values[name] = getattr(insert_stmt.excluded, name)
+
+        # Subqueries see the table as it was before the statement, so this is the
+        # status the row had before the update (NULL when the call is new).
+        previous = aliased(Call)
+        previous_status = (
+            select(previous.status)
+            .where(previous.call_sid == clean_values["call_sid"])
+            .scalar_subquery()
+        )
         stmt = (
             insert_stmt.on_conflict_do_update(
                 index_elements=[Call.call_sid],
                 set_=update_values,
             )
-            .returning(Call)
+            .returning(Call, previous_status)
         )
         result = await db.execute(stmt)
-        return result.scalar_one()
+        call, old_status = result.one()
+        # The Core upsert bypasses flush events, so flag the caller, push the
+        # dashboard deltas, queue the lead summary refresh and re-point the lead
+        # pointers explicitly: the call's lead, and any lead it was moved off.
+        caller_snapshot.mark_stale(db, call_ids=[call.id])
+        dashboard_realtime.mark_call_upsert(db, old_status, call.status)
+        mark_calls_changed(db, [call.lead_id])
+        await db.execute(
+            lead_last_call_update(or_(Lead.last_call_id == call.id, Lead.id == call.lead_id))
+        )
+        return call
 
     existing = await _find_call_by_sid(db, clean_values["call_sid"])
     if existing:
@@ -725,6 +755,74 @@ async def _handle_call_started(
     await _commit_with_retry(db, "call_started")
 
 
+def _report_source(structured_report: Optional[str]) -> Optional[str]:
+    """Where a stored report came from; reports predating the tag are LLM reports."""
+    if not structured_report:
+        return None
+    try:
+        report = json.loads(structured_report)
+    except ValueError:
+        return None
+    if not isinstance(report, dict) or not report:
+        return None
+    return report.get("report_source", REPORT_SOURCE_LLM)
+
+
+def _schedule_report_upgrade(
+    call_id: int, call_sid: str, lead_id: Optional[int], transcript: str
+) -> None:
+    task = asyncio.get_running_loop().create_task(
+        _upgrade_structured_report(call_id, call_sid, lead_id, transcript)
+    )
+    # Keep a reference so the task is not garbage-collected mid-flight.
+    _report_upgrades.add(task)
+    task.add_done_callback(_report_upgrades.discard)
+
+
+async def _upgrade_structured_report(
+    call_id: int, call_sid: str, lead_id: Optional[int], transcript: str
+) -> None:
+    from app.models.notification import NotificationType
+    from app.models.user import User, UserRole
+    from app.services.notification_service import NotificationService
+    from app.services.solar_report_service import SolarReportService
+
+    try:
+        report = await SolarReportService().generate_report(transcript)
+        if not report:
+            _safe_log("warning", "elevenlabs_structured_report_local_only", call_sid=call_sid)
+            return
+        report["report_source"] = REPORT_SOURCE_LLM
+        structured_report = json.dumps(report, ensure_ascii=False)
+        async with async_session_maker() as db:
+            await db.execute(
+                update(Call)
+                .where(Call.id == call_id)
+                .values(
+                    structured_report=structured_report,
+                    **structured_report_columns(structured_report),
+                )
+            )
+            caller_snapshot.mark_stale(db, call_ids=[call_id])
+            await db.commit()
+            _safe_log("info", "elevenlabs_structured_report_generated", call_sid=call_sid)
+
+            # Send notification to managers
+            notif_service = NotificationService(db)
+            users_res = await db.execute(select(User).where(User.role == UserRole.MANAGER.value))
+            for manager in users_res.scalars().all():
+                await notif_service.create_notification(
+                    user_id=manager.id,
+                    message=f"📊 Solar Sales Report ready for call {call_sid}",
+                    notification_type=NotificationType.CALL_REPORT_GENERATED,
+                    related_lead_id=lead_id,
+                    related_call_id=call_id,
+                )
+            await db.commit()
+    except Exception as report_err:
+        _safe_log("error", "report_generation_failed", call_sid=call_sid, error=str(report_err))
+
+
 async def _handle_post_call_transcription(
     db: AsyncSession, payload: dict, event_timestamp: int
 ) -> None:
@@ -843,40 +941,28 @@ async def _handle_post_call_transcription(
 
     await db.flush()
 
-    # Trigger Solar Report Generation (Section 7)
-    if transcript:
+    # Solar Report (Section 7): store the pattern-based report now and upgrade it
+    # to the LLM report in the background, so the call has data even if the LLM
+    # is slow or down. A report the LLM already produced is never downgraded.
+    upgrade_report = bool(transcript) and _report_source(call.structured_report) != REPORT_SOURCE_LLM
+    if upgrade_report:
         try:
-            from app.models.notification import NotificationType
-            from app.models.user import User, UserRole
-            from app.services.notification_service import NotificationService
-            from app.services.solar_report_service import SolarReportService
-
-            report_service = SolarReportService()
-            report = await report_service.generate_report(transcript)
-            if report:
-                call.structured_report = json.dumps(report, ensure_ascii=False)
-                _safe_log("info", "elevenlabs_structured_report_generated", call_sid=call_sid)
-                
-                # Send notification to managers
-                notif_service = NotificationService(db)
-                users_res = await db.execute(
-                    select(User).where(User.role == UserRole.MANAGER.value)
-                )
-                managers = users_res.scalars().all()
-                
-                for manager in managers:
-                    await notif_service.create_notification(
-                        user_id=manager.id,
-                        message=f"📊 Solar Sales Report ready for call {call_sid}",
-                        notification_type=NotificationType.CALL_REPORT_GENERATED,
-                        related_call_id=call.id,
-                        related_lead_id=call.lead_id,
-                    )
+            call_time = call.started_at or call.ended_at
+            if call_time.tzinfo is None:
+                # SQLite returns naive datetimes; they are stored as UTC.
+                call_time = call_time.replace(tzinfo=timezone.utc)
+            call.structured_report = json.dumps(
+                extract_local_report(transcript, reference=call_time.astimezone(_IST).date()),
+                ensure_ascii=False,
+            )
         except Exception as report_err:
-            _safe_log("error", "report_generation_failed", error=str(report_err))
+            # The LLM upgrade below still runs, so the call gets a report either way.
+            _safe_log("error", "local_report_extraction_failed", error=str(report_err))
 
     if not await _commit_with_retry(db, "post_call_transcription"):
         return
+    if upgrade_report:
+        _schedule_report_upgrade(call.id, call_sid, call.lead_id, transcript)
 
     _safe_log(
         "info",
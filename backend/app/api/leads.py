@@ -1,23 +1,22 @@
 """Leads API endpoints."""
 
 import json
-from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from datetime import datetime
+from typing import Optional
 from zoneinfo import ZoneInfo
 
-import anyio
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from openai import AzureOpenAI, OpenAI
-from sqlalchemy import and_, func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import settings
+from app.api.properties import property_to_response
 from app.database import get_db
-from app.models.appointment import Appointment
 from app.models.audit_log import AuditAction, AuditLog
 from app.models.call import Call
 from app.models.lead import Lead, LeadQuality, LeadStatus
 from app.models.notification import NotificationType
+from app.models.property import Property
 from app.models.user import User, UserRole
 from app.schemas.lead import (
     LeadAiSummaryResponse,
@@ -25,33 +24,46 @@ from app.schemas.lead import (
     LeadBulkAssign,
     LeadCreate,
     LeadListResponse,
+    LeadPropertyMatch,
+    LeadPropertyMatchesResponse,
     LeadQualityUpdate,
     LeadResponse,
     LeadStatusUpdate,
     LeadUpdate,
 )
+from app.services.export_service import build_export_statement, export_response, resolve_columns
+from app.services.lead_lookup import lead_phone_cache
+from app.services.lead_matching import Preferences, lead_matcher
+from app.services.lead_scoring import refresh_scores
+from app.services.lead_summary_service import lead_summary_service
 from app.services.notification_service import NotificationService
+from app.services.tool_runtime import deferred_tasks
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
 from app.utils.security import get_current_user, require_manager
 
 router = APIRouter()
 
 
-@router.get("/", response_model=LeadListResponse)
-async def list_leads(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(20, ge=1, le=100),
+_LEAD_SORT_KEYS = (SortKey(Lead.created_at), SortKey(Lead.id))
+_FOLLOW_UP_SORT_KEYS = (SortKey(Lead.lead_score), SortKey(Lead.id))
+_OPEN_LEAD_STATUSES = [
+    LeadStatus.NEW.value,
+    LeadStatus.CONTACTED.value,
+    LeadStatus.QUALIFIED.value,
+    LeadStatus.NEGOTIATING.value,
+]
+
+
+def _apply_lead_filters(
+    query,
+    current_user: User,
     quality: Optional[str] = None,
     status: Optional[str] = None,
     source: Optional[str] = None,
     assigned_agent_id: Optional[int] = None,
     unassigned: Optional[bool] = None,
     phone: Optional[str] = None,
-    db: AsyncSession = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-) -> LeadListResponse:
-    """List leads with optional filters. Agents see only their assigned leads."""
-    query = select(Lead)
-    
+):
     # Role-based filtering
     if current_user.role == UserRole.AGENT.value:
         query = query.where(Lead.assigned_agent_id == current_user.id)
@@ -72,35 +84,60 @@ async def list_leads(
         query = query.where(Lead.assigned_agent_id.is_(None))
     if phone:
         query = query.where(Lead.phone.contains(phone))
+    return query
+
+
+@router.get("/", response_model=LeadListResponse)
+async def list_leads(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    quality: Optional[str] = None,
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    assigned_agent_id: Optional[int] = None,
+    unassigned: Optional[bool] = None,
+    phone: Optional[str] = None,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> LeadListResponse:
+    """List leads with optional filters. Agents see only their assigned leads."""
+    query = _apply_lead_filters(
+        select(Lead),
+        current_user,
+        quality=quality,
+        status=status,
+        source=source,
+        assigned_agent_id=assigned_agent_id,
+        unassigned=unassigned,
+        phone=phone,
+    )
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
     
-    # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(Lead.created_at.desc())
+    # Apply pagination; the latest call note rides along through the last_call_id pointer
+    query = query.add_columns(Call.outcome_notes).outerjoin(
+        Call, Call.id == Lead.last_call_id
+    )
+    try:
+        query = keyset_page(query, _LEAD_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     result = await db.execute(query)
-    leads = result.scalars().all()
-
-    lead_ids = [lead.id for lead in leads]
-    last_call_notes_map: Dict[int, Optional[str]] = {}
-    if lead_ids:
-        calls_query = (
-            select(Call.lead_id, Call.outcome_notes)
-            .where(Call.lead_id.in_(lead_ids))
-            .order_by(Call.lead_id, Call.created_at.desc())
-        )
-        calls_result = await db.execute(calls_query)
-        for lead_id, outcome_notes in calls_result.all():
-            if lead_id not in last_call_notes_map:
-                last_call_notes_map[lead_id] = outcome_notes
+    rows, next_cursor = split_page(
+        result.all(),
+        _LEAD_SORT_KEYS,
+        page_size,
+        values_of=lambda row: (row[0].created_at, row[0].id),
+    )
     
     lead_responses: list[LeadResponse] = []
-    for lead in leads:
+    for lead, last_call_notes in rows:
         response = LeadResponse.model_validate(lead)
-        response.last_call_notes = last_call_notes_map.get(lead.id)
+        response.last_call_notes = last_call_notes
         lead_responses.append(response)
     
     return LeadListResponse(
@@ -108,6 +145,8 @@ async def list_leads(
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -118,9 +157,8 @@ async def create_lead(
     current_user: User = Depends(get_current_user),
 ) -> Lead:
     """Create a new lead."""
-    # Check if lead with same phone exists
-    result = await db.execute(select(Lead).where(Lead.phone == request.phone))
-    existing_lead = result.scalar_one_or_none()
+    # Check if lead with same phone exists (in any format)
+    existing_lead = await lead_phone_cache.lookup(db, request.phone)
     
     if existing_lead:
         raise HTTPException(
@@ -164,6 +202,134 @@ async def create_lead(
     return lead
 
 
+LEAD_EXPORT_COLUMNS = {
+    "id": Lead.id,
+    "name": Lead.name,
+    "phone": Lead.phone,
+    "email": Lead.email,
+    "quality": Lead.quality,
+    "status": Lead.status,
+    "source": Lead.source,
+    "preferred_location": Lead.preferred_location,
+    "preferred_property_type": Lead.preferred_property_type,
+    "budget_min": Lead.budget_min,
+    "budget_max": Lead.budget_max,
+    "notes": Lead.notes,
+    "ai_summary": Lead.ai_summary,
+    "assigned_agent_id": Lead.assigned_agent_id,
+    "next_follow_up": Lead.next_follow_up,
+    "follow_up_count": Lead.follow_up_count,
+    "converted_at": Lead.converted_at,
+    "conversion_value": Lead.conversion_value,
+    "last_contacted_at": Lead.last_contacted_at,
+    "created_at": Lead.created_at,
+    "updated_at": Lead.updated_at,
+}
+LEAD_EXPORT_DEFAULT_COLUMNS = [
+    "id",
+    "name",
+    "phone",
+    "email",
+    "quality",
+    "status",
+    "source",
+    "assigned_agent_id",
+    "next_follow_up",
+    "last_contacted_at",
+    "created_at",
+]
+
+
+@router.get("/export")
+async def export_leads(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma separated column names"),
+    gzip: bool = False,
+    quality: Optional[str] = None,
+    status: Optional[str] = None,
+    source: Optional[str] = None,
+    assigned_agent_id: Optional[int] = None,
+    unassigned: Optional[bool] = None,
+    phone: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(get_current_user),
+) -> StreamingResponse:
+    """Stream every visible lead matching the list filters as CSV or NDJSON."""
+    try:
+        selected = resolve_columns(columns, LEAD_EXPORT_COLUMNS, LEAD_EXPORT_DEFAULT_COLUMNS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    query = _apply_lead_filters(
+        select(Lead),
+        current_user,
+        quality=quality,
+        status=status,
+        source=source,
+        assigned_agent_id=assigned_agent_id,
+        unassigned=unassigned,
+        phone=phone,
+    )
+    if date_from:
+        query = query.where(Lead.created_at >= date_from)
+    if date_to:
+        query = query.where(Lead.created_at <= date_to)
+    return export_response(
+        build_export_statement(query.order_by(Lead.id), selected, LEAD_EXPORT_COLUMNS),
+        selected,
+        format,
+        filename="leads",
+        compress=gzip,
+    )
+
+
+@router.get("/follow-up-queue", response_model=LeadListResponse)
+async def get_follow_up_queue(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    quality: Optional[str] = None,
+    assigned_agent_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> LeadListResponse:
+    """Open leads ranked by their precomputed ``lead_score``, best first."""
+    query = _apply_lead_filters(
+        select(Lead),
+        current_user,
+        quality=quality,
+        assigned_agent_id=assigned_agent_id,
+    ).where(Lead.status.in_(_OPEN_LEAD_STATUSES), Lead.lead_score.is_not(None))
+
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
+    try:
+        query = keyset_page(query, _FOLLOW_UP_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    result = await db.execute(query)
+    leads, next_cursor = split_page(result.scalars().all(), _FOLLOW_UP_SORT_KEYS, page_size)
+    return LeadListResponse(
+        leads=[LeadResponse.model_validate(lead) for lead in leads],
+        total=total,
+        page=page,
+        page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
+
+
+@router.post("/scores/refresh", status_code=status.HTTP_202_ACCEPTED)
+async def refresh_lead_scores(
+    full: bool = False,
+    current_user: User = Depends(require_manager),
+) -> dict:
+    """Queue a rescore of leads whose score may have changed, or of every lead with ``full``."""
+    deferred_tasks.defer("refresh_lead_scores", refresh_scores, full=full)
+    return {"queued": True, "full": full}
+
+
 @router.get("/{lead_id}", response_model=LeadResponse)
 async def get_lead(
     lead_id: int,
@@ -465,242 +631,42 @@ async def bulk_assign_leads(
     )
 
 
-def _clamp_int(value: float, min_value: int, max_value: int) -> int:
-    return max(min_value, min(max_value, int(round(value))))
-
-
-def _build_heuristic_ai_summary(
-    lead: Lead,
-    calls: List[Call],
-    has_future_appointment: bool,
-) -> LeadAiSummaryResponse:
-    base_score_map = {
-        LeadQuality.COLD.value: 30,
-        LeadQuality.WARM.value: 60,
-        LeadQuality.HOT.value: 85,
-    }
-    score = float(base_score_map.get(lead.quality, 40))
-
-    status_boost = {
-        LeadStatus.NEW.value: 0,
-        LeadStatus.CONTACTED.value: 5,
-        LeadStatus.QUALIFIED.value: 12,
-        LeadStatus.NEGOTIATING.value: 18,
-        LeadStatus.CONVERTED.value: 35,
-        LeadStatus.LOST.value: -25,
-    }
-    score += float(status_boost.get(lead.status, 0))
-
-    if lead.last_contacted_at:
-        days = (datetime.now(timezone.utc) - lead.last_contacted_at).days
-        if days <= 2:
-            score += 6
-        elif days <= 7:
-            score += 3
-        elif days >= 30:
-            score -= 6
-
-    recent_calls = calls[:5]
-    sentiment_values = [
-        c.sentiment_score for c in recent_calls if c.sentiment_score is not None
-    ]
-    satisfaction_values = [
-        c.customer_satisfaction for c in recent_calls if c.customer_satisfaction is not None
-    ]
-    if sentiment_values:
-        score += float(sum(sentiment_values) / len(sentiment_values)) * 10.0
-    if satisfaction_values:
-        score += (float(sum(satisfaction_values) / len(satisfaction_values)) - 3.0) * 4.0
-
-    if has_future_appointment:
-        score += 10
-
-    lead_quality_score = _clamp_int(score, 0, 100)
-    likelihood_to_convert = _clamp_int(
-        lead_quality_score * 0.95 + (5 if has_future_appointment else 0),
-        0,
-        100,
-    )
-
-    engagement_level = "low"
-    if len(recent_calls) >= 2 or lead.follow_up_count >= 2:
-        engagement_level = "medium"
-    if lead_quality_score >= 70 or (
-        sentiment_values and sum(sentiment_values) / len(sentiment_values) > 0.25
-    ):
-        engagement_level = "high"
-
-    recommended_next_actions: List[str] = []
-    if lead.status in {LeadStatus.NEW.value, LeadStatus.CONTACTED.value}:
-        recommended_next_actions.append("Call within 24 hours and confirm needs.")
-    if (
-        lead.status in {LeadStatus.QUALIFIED.value, LeadStatus.NEGOTIATING.value}
-        and not has_future_appointment
-    ):
-        recommended_next_actions.append("Propose a site visit and share 2–3 matching options.")
-    if has_future_appointment:
-        recommended_next_actions.append("Confirm appointment details and send location/address.")
-    if lead.status == LeadStatus.LOST.value:
-        recommended_next_actions.append("Mark reason for loss and set a re-engagement reminder.")
-    if not recommended_next_actions:
-        recommended_next_actions.append("Review recent interactions and plan the next touchpoint.")
-
-    key_conversation_points: List[str] = []
-    for c in recent_calls:
-        if c.transcript_summary:
-            chunks = [p.strip() for p in c.transcript_summary.split(".") if p.strip()]
-            for chunk in chunks[:2]:
-                if chunk not in key_conversation_points:
-                    key_conversation_points.append(chunk)
-        if len(key_conversation_points) >= 5:
-            break
-    if not key_conversation_points:
-        if lead.preferred_location:
-            key_conversation_points.append(f"Preferred location: {lead.preferred_location}")
-        if lead.budget_max:
-            key_conversation_points.append(f"Budget up to: ₹{lead.budget_max}")
-
-    patterns: List[str] = []
-    if len(recent_calls) >= 3:
-        patterns.append("Multiple touchpoints recorded; follow up consistency matters.")
-    if sentiment_values and sum(sentiment_values) / len(sentiment_values) < -0.2:
-        patterns.append("Negative sentiment trend; address objections directly.")
-    if lead.follow_up_count >= 3:
-        patterns.append("High follow-up count; consider escalation or alternative channel.")
-    if not patterns:
-        patterns.append("No strong patterns detected yet.")
-
-    return LeadAiSummaryResponse(
-        lead_id=lead.id,
-        lead_quality_score=lead_quality_score,
-        engagement_level=engagement_level,
-        likelihood_to_convert=likelihood_to_convert,
-        recommended_next_actions=recommended_next_actions,
-        key_conversation_points=key_conversation_points,
-        patterns=patterns,
-        generated_at=datetime.now(ZoneInfo("Asia/Kolkata")),
-        source_call_ids=[c.id for c in recent_calls],
-    )
-
-
-def _try_build_openai_client() -> Optional[tuple[Any, str]]:
-    if (
-        settings.azure_openai_api_key
-        and settings.azure_openai_endpoint
-        and settings.azure_openai_deployment
-        and settings.azure_openai_api_version
-    ):
-        client = AzureOpenAI(
-            api_key=settings.azure_openai_api_key,
-            azure_endpoint=settings.azure_openai_endpoint,
-            api_version=settings.azure_openai_api_version,
-        )
-        return client, settings.azure_openai_deployment
-
-    if settings.openai_api_key:
-        client = OpenAI(api_key=settings.openai_api_key)
-        return client, "gpt-4o-mini"
-
-    return None
-
-
-async def _generate_ai_summary_via_llm(
-    lead: Lead,
-    calls: List[Call],
-    has_future_appointment: bool,
-) -> Optional[LeadAiSummaryResponse]:
-    client_and_model = _try_build_openai_client()
-    if not client_and_model:
-        return None
-
-    client, model = client_and_model
+@router.get("/{lead_id}/matches", response_model=LeadPropertyMatchesResponse)
+async def get_lead_property_matches(
+    lead_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+) -> LeadPropertyMatchesResponse:
+    """Available properties that fit the lead's location, type, budget and size preferences."""
+    lead = await db.get(Lead, lead_id)
+    if not lead:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
 
-    call_payload = []
-    for c in calls[:5]:
-        call_payload.append(
-            {
-                "id": c.id,
-                "created_at": c.created_at.isoformat() if c.created_at else None,
-                "direction": c.direction,
-                "status": c.status,
-                "outcome": c.outcome,
-                "outcome_notes": c.outcome_notes,
-                "sentiment_score": c.sentiment_score,
-                "customer_satisfaction": c.customer_satisfaction,
-                "transcript_summary": c.transcript_summary,
-            }
+    if current_user.role == UserRole.AGENT.value and lead.assigned_agent_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Access denied to this lead",
         )
 
-    system_text = (
-        "You generate concise, actionable lead insights for a sales CRM. "
-        "Return ONLY valid JSON. Do not include markdown."
+    preferences = Preferences.of_lead(lead)
+    if not preferences.stated:
+        return LeadPropertyMatchesResponse(lead_id=lead_id, total=0, matches=[])
+    total, matches = await lead_matcher.properties_for(preferences, limit=limit)
+    result = await db.execute(select(Property).where(Property.id.in_([m.id for m in matches])))
+    properties = {prop.id: prop for prop in result.scalars().all()}
+    return LeadPropertyMatchesResponse(
+        lead_id=lead_id,
+        total=total,
+        matches=[
+            LeadPropertyMatch(
+                score=match.score, property=property_to_response(properties[match.id])
+            )
+            for match in matches
+            if match.id in properties
+        ],
     )
 
-    user_text = json.dumps(
-        {
-            "lead": {
-                "id": lead.id,
-                "name": lead.name,
-                "phone": lead.phone,
-                "email": lead.email,
-                "quality": lead.quality,
-                "status": lead.status,
-                "source": lead.source,
-                "preferred_location": lead.preferred_location,
-                "preferred_property_type": lead.preferred_property_type,
-                "budget_min": lead.budget_min,
-                "budget_max": lead.budget_max,
-                "follow_up_count": lead.follow_up_count,
-                "last_contacted_at": (
-                    lead.last_contacted_at.isoformat() if lead.last_contacted_at else None
-                ),
-                "updated_at": lead.updated_at.isoformat() if lead.updated_at else None,
-            },
-            "recent_calls": call_payload,
-            "has_future_appointment": has_future_appointment,
-            "required_output_schema": {
-                "lead_quality_score": "integer 0-100",
-                "engagement_level": "one of: low, medium, high",
-                "likelihood_to_convert": "integer 0-100",
-                "recommended_next_actions": "array of strings",
-                "key_conversation_points": "array of strings",
-                "patterns": "array of strings",
-            },
-        },
-        ensure_ascii=False,
-    )
-
-    def _call_openai() -> LeadAiSummaryResponse:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": system_text},
-                {"role": "user", "content": user_text},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2,
-        )
-        content = response.choices[0].message.content or "{}"
-        parsed = json.loads(content)
-        return LeadAiSummaryResponse(
-            lead_id=lead.id,
-            lead_quality_score=_clamp_int(parsed.get("lead_quality_score", 50), 0, 100),
-            engagement_level=str(parsed.get("engagement_level", "medium")),
-            likelihood_to_convert=_clamp_int(parsed.get("likelihood_to_convert", 50), 0, 100),
-            recommended_next_actions=[
-                str(x) for x in (parsed.get("recommended_next_actions") or [])
-            ],
-            key_conversation_points=[str(x) for x in (parsed.get("key_conversation_points") or [])],
-            patterns=[str(x) for x in (parsed.get("patterns") or [])],
-            generated_at=datetime.now(ZoneInfo("Asia/Kolkata")),
-            source_call_ids=[c.id for c in calls[:5]],
-        )
-
-    try:
-        return await anyio.to_thread.run_sync(_call_openai)
-    except Exception:
-        return None
-
 
 @router.get("/{lead_id}/ai-summary", response_model=LeadAiSummaryResponse)
 async def get_lead_ai_summary(
@@ -720,30 +686,7 @@ async def get_lead_ai_summary(
             detail="Access denied to this lead",
         )
 
-    calls_result = await db.execute(
-        select(Call)
-        .where(Call.lead_id == lead.id)
-        .order_by(Call.created_at.desc())
-        .limit(5)
-    )
-    calls = list(calls_result.scalars().all())
-
-    now_utc = datetime.now(timezone.utc)
-    appointment_result = await db.execute(
-        select(func.count())
-        .select_from(Appointment)
-        .where(
-            and_(
-                Appointment.lead_id == lead.id,
-                Appointment.status.in_(["scheduled", "confirmed"]),
-                Appointment.scheduled_for >= now_utc - timedelta(minutes=1),
-            )
-        )
-    )
-    has_future_appointment = (appointment_result.scalar() or 0) > 0
-
-    llm_summary = await _generate_ai_summary_via_llm(lead, calls, has_future_appointment)
-    if llm_summary:
-        return llm_summary
-
-    return _build_heuristic_ai_summary(lead, calls, has_future_appointment)
+    try:
+        return await lead_summary_service.get_summary(db, lead)
+    except LookupError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Lead not found")
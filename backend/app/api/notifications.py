@@ -2,10 +2,10 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import async_session_maker, get_db
+from app.database import get_db
 from app.models.notification import Notification, NotificationPreference, NotificationType
 from app.models.user import User
 from app.schemas.notification import (
@@ -19,7 +19,8 @@ from app.schemas.notification import (
 )
 from app.services.notification_realtime import register_connection, unregister_connection
 from app.utils.logging import get_logger
-from app.utils.security import decode_access_token, get_current_user
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
+from app.utils.security import get_current_user, get_websocket_user
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 logger = get_logger("api.notifications")
@@ -46,6 +47,9 @@ async def notification_rate_limiter(current_user: User = Depends(get_current_use
     return current_user
 
 
+_NOTIFICATION_SORT_KEYS = (SortKey(Notification.created_at), SortKey(Notification.id))
+
+
 @router.get("/", response_model=NotificationListResponse)
 async def list_notifications(
     page: int = Query(1, ge=1),
@@ -54,6 +58,8 @@ async def list_notifications(
     type: Optional[NotificationType] = Query(None),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
+    cursor: Optional[str] = Query(None),
+    exact_total: bool = Query(False),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(notification_rate_limiter),
 ) -> NotificationListResponse:
@@ -66,27 +72,20 @@ async def list_notifications(
         query = query.where(Notification.created_at >= date_from)
     if date_to is not None:
         query = query.where(Notification.created_at <= date_to)
-    count_query = select(func.count()).select_from(Notification).where(
-        Notification.user_id == current_user.id
-    )
-    if is_read is not None:
-        count_query = count_query.where(Notification.is_read == is_read)
-    if type is not None:
-        count_query = count_query.where(Notification.type == type.value)
-    if date_from is not None:
-        count_query = count_query.where(Notification.created_at >= date_from)
-    if date_to is not None:
-        count_query = count_query.where(Notification.created_at <= date_to)
-    total = (await db.execute(count_query)).scalar() or 0
-    query = query.order_by(Notification.created_at.desc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
+    try:
+        query = keyset_page(query, _NOTIFICATION_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     result = await db.execute(query)
-    rows = result.scalars().all()
+    rows, next_cursor = split_page(result.scalars().all(), _NOTIFICATION_SORT_KEYS, page_size)
     return NotificationListResponse(
         notifications=[NotificationResponse.model_validate(n) for n in rows],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -229,18 +228,8 @@ async def update_preferences(
 
 @router.websocket("/ws")
 async def notifications_ws(websocket: WebSocket) -> None:
-    token = websocket.query_params.get("token")
-    if not token:
-        await websocket.close(code=1008)
-        return
-    token_data = decode_access_token(token)
-    if token_data is None:
-        await websocket.close(code=1008)
-        return
-    async with async_session_maker() as db:
-        result = await db.execute(select(User).where(User.id == token_data.sub))
-        user = result.scalar_one_or_none()
-    if not user or not user.is_active:
+    user = await get_websocket_user(websocket.query_params.get("token"))
+    if user is None:
         await websocket.close(code=1008)
         return
     await websocket.accept()
@@ -4,7 +4,7 @@ import json
 from typing import Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
@@ -20,6 +20,7 @@ from app.schemas.product import (
     ProductUpdate,
 )
 from app.services.notification_service import NotificationService
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
 from app.utils.security import get_current_user, require_admin
 
 router = APIRouter()
@@ -52,6 +53,12 @@ def product_to_response(product: Product) -> ProductResponse:
     )
 
 
+_PRODUCT_SORT_KEYS = (
+    SortKey(Product.wattage, descending=False),
+    SortKey(Product.id, descending=False),
+)
+
+
 @router.get("/", response_model=ProductListResponse)
 async def list_products(
     page: int = Query(1, ge=1),
@@ -60,6 +67,8 @@ async def list_products(
     min_wattage: Optional[int] = None,
     max_wattage: Optional[int] = None,
     manufacturer: Optional[str] = None,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ) -> ProductListResponse:
@@ -74,20 +83,23 @@ async def list_products(
     if manufacturer:
         query = query.where(Product.manufacturer.ilike(f"%{manufacturer}%"))
 
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
 
-    query = query.order_by(Product.wattage.asc())
-    query = query.offset((page - 1) * page_size).limit(page_size)
+    try:
+        query = keyset_page(query, _PRODUCT_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     result = await db.execute(query)
-    products = result.scalars().all()
+    products, next_cursor = split_page(result.scalars().all(), _PRODUCT_SORT_KEYS, page_size)
 
     return ProductListResponse(
         products=[product_to_response(p) for p in products],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
     )
 
 
@@ -1,7 +1,7 @@
 """Properties API endpoints."""
 
 import json
-from typing import Optional
+from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import and_, func, or_, select
@@ -9,13 +9,23 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.property import Property
+from app.models.lead import Lead
 from app.models.user import User
+from app.schemas.lead import PropertyLeadMatch, PropertyLeadMatchesResponse
 from app.schemas.property import (
     PropertyCreate,
+    PropertyFacetedListResponse,
+    PropertyFacets,
+    PropertyFacetValue,
     PropertyListResponse,
     PropertyResponse,
     PropertyUpdate,
 )
+from app.services.lead_matching import lead_matcher
+from app.services.property_facets import FacetSelection, facet_counts
+from app.utils.fulltext import property_matches, property_snippets, search_terms, uses_fulltext
+from app.utils.geo import MAX_RADIUS_KM, BoundingBox, haversine_km, nearby
+from app.utils.pagination import SortKey, count_rows, keyset_page, split_page
 from app.utils.security import require_manager
 
 router = APIRouter()
@@ -60,6 +70,9 @@ def property_to_response(prop: Property) -> PropertyResponse:
     )
 
 
+_PROPERTY_SORT_KEYS = (SortKey(Property.created_at), SortKey(Property.id))
+
+
 @router.get("/", response_model=PropertyListResponse)
 async def list_properties(
     page: int = Query(1, ge=1),
@@ -72,6 +85,8 @@ async def list_properties(
     max_price: Optional[float] = None,
     bedrooms: Optional[int] = None,
     is_featured: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    exact_total: bool = False,
     db: AsyncSession = Depends(get_db),
 ) -> PropertyListResponse:
     """List properties with optional filters."""
@@ -97,21 +112,81 @@ async def list_properties(
         query = query.where(Property.is_featured == is_featured)
     
     # Get total count
-    count_query = select(func.count()).select_from(query.subquery())
-    total = (await db.execute(count_query)).scalar() or 0
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
     
     # Apply pagination
-    query = query.offset((page - 1) * page_size).limit(page_size)
-    query = query.order_by(Property.created_at.desc())
+    try:
+        query = keyset_page(query, _PROPERTY_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     result = await db.execute(query)
-    properties = result.scalars().all()
+    properties, next_cursor = split_page(result.scalars().all(), _PROPERTY_SORT_KEYS, page_size)
     
     return PropertyListResponse(
         properties=[property_to_response(p) for p in properties],
         total=total,
         page=page,
         page_size=page_size,
+        next_cursor=next_cursor,
+        total_is_estimate=total_is_estimate,
+    )
+
+
+@router.get("/faceted", response_model=PropertyFacetedListResponse)
+async def list_properties_faceted(
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    city: List[str] = Query([]),
+    property_type: List[str] = Query([]),
+    bedrooms: List[int] = Query([]),
+    price_band: List[str] = Query([]),
+    locality: Optional[str] = None,
+    status: Optional[str] = None,
+    is_featured: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+) -> PropertyFacetedListResponse:
+    """List properties with multi-value filters, plus counts for each filter value.
+
+    Repeat a facet parameter to select several values (``?city=Pune&city=Mumbai``);
+    ``price_band`` takes the labels returned under ``facets.price_band``.
+    """
+    base = [Property.is_active.is_(True)]
+    if locality:
+        base.append(Property.locality.ilike(f"%{locality}%"))
+    if status:
+        base.append(Property.status == status)
+    if is_featured is not None:
+        base.append(Property.is_featured == is_featured)
+    selection = FacetSelection(
+        city=city, property_type=property_type, bedrooms=bedrooms, price_band=price_band
+    )
+
+    counts, total = await facet_counts(db, base, selection)
+
+    query = select(Property).where(*base, *selection.clauses())
+    try:
+        query = keyset_page(query, _PROPERTY_SORT_KEYS, page_size, cursor=cursor, page=page)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await db.execute(query)
+    properties, next_cursor = split_page(result.scalars().all(), _PROPERTY_SORT_KEYS, page_size)
+
+    return PropertyFacetedListResponse(
+        properties=[property_to_response(p) for p in properties],
+        total=total,
+        page=page,
+        page_size=page_size,
+        next_cursor=next_cursor,
+        # Cached combinations are exact until the next write to properties drops them.
+        total_is_estimate=False,
+        facets=PropertyFacets(
+            **{
+                name: [PropertyFacetValue(value=value, count=count) for value, count in values]
+                for name, values in counts.items()
+            }
+        ),
     )
 
 
@@ -166,7 +241,46 @@ async def search_properties(
     page_size: int = Query(20, ge=1, le=100),
     db: AsyncSession = Depends(get_db),
 ) -> PropertyListResponse:
-    """Search properties by location, title, or description."""
+    """Search properties by location, title, or description, best matches first."""
+    terms = search_terms(q)
+    dialect = db.get_bind().dialect.name
+    if not terms or not uses_fulltext(dialect):
+        return await _scan_properties(db, q, page, page_size)
+
+    matches = property_matches(dialect, terms).subquery()
+    # IN keeps the match set driving the count; a join lets SQLite probe FTS once per row.
+    count_query = select(func.count()).where(
+        Property.is_active.is_(True), Property.id.in_(select(matches.c.id))
+    )
+    total = (await db.execute(count_query)).scalar() or 0
+
+    query = (
+        select(Property)
+        .join(matches, matches.c.id == Property.id)
+        .where(Property.is_active.is_(True))
+    )
+    query = query.order_by(matches.c.rank, Property.is_featured.desc(), Property.id.desc())
+    query = query.offset((page - 1) * page_size).limit(page_size)
+    properties = (await db.execute(query)).scalars().all()
+    snippets = await property_snippets(db, terms, [p.id for p in properties])
+
+    responses = []
+    for prop in properties:
+        response = property_to_response(prop)
+        response.search_snippet = snippets.get(prop.id)
+        responses.append(response)
+    return PropertyListResponse(
+        properties=responses,
+        total=total,
+        page=page,
+        page_size=page_size,
+    )
+
+
+async def _scan_properties(
+    db: AsyncSession, q: str, page: int, page_size: int
+) -> PropertyListResponse:
+    """``ILIKE`` search for dialects without a full-text index (or queries with no words)."""
     search_term = f"%{q}%"
     
     query = select(Property).where(
@@ -201,6 +315,78 @@ async def search_properties(
     )
 
 
+@router.get("/nearby", response_model=PropertyListResponse)
+async def nearby_properties(
+    lat: Optional[float] = Query(None, ge=-90, le=90),
+    lon: Optional[float] = Query(None, ge=-180, le=180),
+    radius_km: Optional[float] = Query(None, gt=0, le=MAX_RADIUS_KM),
+    min_lat: Optional[float] = Query(None, ge=-90, le=90),
+    max_lat: Optional[float] = Query(None, ge=-90, le=90),
+    min_lon: Optional[float] = Query(None, ge=-180, le=180),
+    max_lon: Optional[float] = Query(None, ge=-180, le=180),
+    property_type: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    bedrooms: Optional[int] = None,
+    status: Optional[str] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(20, ge=1, le=100),
+    exact_total: bool = False,
+    db: AsyncSession = Depends(get_db),
+) -> PropertyListResponse:
+    """Properties within ``radius_km`` of ``lat``/``lon`` or inside a bounding box, nearest first.
+
+    With a box, distances are measured from ``lat``/``lon`` if given, else from the box centre.
+    """
+    bounds = (min_lat, max_lat, min_lon, max_lon)
+    box = None
+    if any(value is not None for value in bounds):
+        if any(value is None for value in bounds):
+            raise HTTPException(
+                status_code=400,
+                detail="min_lat, max_lat, min_lon and max_lon must be given together.",
+            )
+        if min_lat > max_lat or min_lon > max_lon:
+            raise HTTPException(status_code=400, detail="Bounding box minimums exceed maximums.")
+        box = BoundingBox(min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon)
+        if lat is None or lon is None:
+            lat, lon = box.center
+    elif lat is None or lon is None or radius_km is None:
+        raise HTTPException(
+            status_code=400,
+            detail="Give lat, lon and radius_km, or a bounding box.",
+        )
+
+    query = nearby(db.get_bind().dialect.name, lat, lon, radius_km=radius_km, box=box)
+    if property_type:
+        query = query.where(Property.property_type == property_type)
+    if min_price is not None:
+        query = query.where(Property.price >= min_price)
+    if max_price is not None:
+        query = query.where(Property.price <= max_price)
+    if bedrooms is not None:
+        query = query.where(Property.bedrooms == bedrooms)
+    if status:
+        query = query.where(Property.status == status)
+
+    total, total_is_estimate = await count_rows(db, query, exact=exact_total)
+    query = query.offset((page - 1) * page_size).limit(page_size)
+    properties = (await db.execute(query)).scalars().all()
+
+    responses = []
+    for prop in properties:
+        response = property_to_response(prop)
+        response.distance_km = round(haversine_km(lat, lon, prop.latitude, prop.longitude), 3)
+        responses.append(response)
+    return PropertyListResponse(
+        properties=responses,
+        total=total,
+        page=page,
+        page_size=page_size,
+        total_is_estimate=total_is_estimate,
+    )
+
+
 @router.get("/{property_id}", response_model=PropertyResponse)
 async def get_property(
     property_id: int,
@@ -219,6 +405,35 @@ async def get_property(
     return property_to_response(property_data)
 
 
+@router.get("/{property_id}/matching-leads", response_model=PropertyLeadMatchesResponse)
+async def get_property_matching_leads(
+    property_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(require_manager),
+) -> PropertyLeadMatchesResponse:
+    """Open leads whose location, type, budget and size preferences this property fits."""
+    property_data = await db.get(Property, property_id)
+    if not property_data:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Property not found",
+        )
+
+    total, matches = await lead_matcher.leads_for(property_data, limit=limit)
+    result = await db.execute(select(Lead).where(Lead.id.in_([m.id for m in matches])))
+    leads = {lead.id: lead for lead in result.scalars().all()}
+    return PropertyLeadMatchesResponse(
+        property_id=property_id,
+        total=total,
+        matches=[
+            PropertyLeadMatch(score=match.score, lead=leads[match.id])
+            for match in matches
+            if match.id in leads
+        ],
+    )
+
+
 @router.put("/{property_id}", response_model=PropertyResponse)
 async def update_property(
     property_id: int,
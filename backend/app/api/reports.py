@@ -4,8 +4,9 @@ from datetime import datetime, timedelta
 from typing import Optional
 from zoneinfo import ZoneInfo
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import and_, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, case, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -13,6 +14,7 @@ from app.models.call import Call, CallOutcome, CallStatus
 from app.models.lead import Lead, LeadQuality, LeadStatus
 from app.models.product import Product
 from app.models.user import User, UserRole
+from app.services.export_service import build_export_statement, export_response, resolve_columns
 from app.utils.security import get_current_user, require_manager
 
 router = APIRouter()
@@ -315,3 +317,114 @@ async def get_lead_analytics(
             "avg_conversion_days": round(avg_conversion_days, 2),
         }
     }
+
+
+def _report_datasets(date_from: datetime, date_to: datetime) -> dict:
+    """Row-level datasets behind the call, lead and agent reports for one period."""
+    assigned_leads = (
+        select(func.count(Lead.id))
+        .where(Lead.assigned_agent_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    converted_leads = (
+        select(func.count(Lead.id))
+        .where(
+            Lead.assigned_agent_id == User.id,
+            Lead.status == LeadStatus.CONVERTED.value,
+        )
+        .correlate(User)
+        .scalar_subquery()
+    )
+    escalated_calls = (
+        select(func.count(Call.id))
+        .where(
+            Call.escalated_to_agent_id == User.id,
+            Call.created_at >= date_from,
+            Call.created_at <= date_to,
+        )
+        .correlate(User)
+        .scalar_subquery()
+    )
+    return {
+        "calls": (
+            select(Call)
+            .where(and_(Call.created_at >= date_from, Call.created_at <= date_to))
+            .order_by(Call.id),
+            {
+                "id": Call.id,
+                "created_at": Call.created_at,
+                "direction": Call.direction,
+                "status": Call.status,
+                "outcome": Call.outcome,
+                "duration_seconds": Call.duration_seconds,
+                "handled_by_ai": Call.handled_by_ai,
+                "escalated_to_human": Call.escalated_to_human,
+                "escalated_to_agent_id": Call.escalated_to_agent_id,
+                "lead_id": Call.lead_id,
+            },
+        ),
+        "leads": (
+            select(Lead)
+            .where(and_(Lead.created_at >= date_from, Lead.created_at <= date_to))
+            .order_by(Lead.id),
+            {
+                "id": Lead.id,
+                "created_at": Lead.created_at,
+                "quality": Lead.quality,
+                "status": Lead.status,
+                "source": Lead.source,
+                "assigned_agent_id": Lead.assigned_agent_id,
+                "converted_at": Lead.converted_at,
+                "conversion_value": Lead.conversion_value,
+            },
+        ),
+        "agents": (
+            select(User).where(User.role == UserRole.AGENT.value).order_by(User.id),
+            {
+                "agent_id": User.id,
+                "agent_name": User.full_name,
+                "assigned_leads": assigned_leads,
+                "converted_leads": converted_leads,
+                "conversion_rate": case(
+                    (assigned_leads > 0, func.round(converted_leads * 100.0 / assigned_leads, 2)),
+                    else_=0,
+                ),
+                "escalated_calls": escalated_calls,
+            },
+        ),
+    }
+
+
+@router.get("/{dataset}/export")
+async def export_report_dataset(
+    dataset: str,
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    columns: Optional[str] = Query(None, description="Comma separated column names"),
+    gzip: bool = False,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: User = Depends(require_manager),
+) -> StreamingResponse:
+    """Stream the rows behind the calls, leads or agents report as CSV or NDJSON."""
+    if not date_from:
+        date_from = datetime.now(ZoneInfo("Asia/Kolkata")) - timedelta(days=30)
+    if not date_to:
+        date_to = datetime.now(ZoneInfo("Asia/Kolkata"))
+
+    datasets = _report_datasets(date_from, date_to)
+    if dataset not in datasets:
+        raise HTTPException(status_code=404, detail=f"Unknown report dataset: {dataset}")
+    query, available = datasets[dataset]
+    try:
+        selected = resolve_columns(columns, available, list(available))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return export_response(
+        build_export_statement(query, selected, available),
+        selected,
+        format,
+        filename=f"report_{dataset}",
+        compress=gzip,
+    )
@@ -63,6 +63,61 @@ class Settings(BaseSettings):
     elevenlabs_webhook_secret: str = ""
     enable_existing_outbound_flow: bool = False
 
+    # ---------------- LLM GATEWAY ----------------
+    llm_base_url: str = ""  # Any OpenAI-compatible endpoint, e.g. a local fake server
+    llm_model: str = ""
+    llm_max_concurrency: int = 8
+    llm_request_timeout_seconds: float = 60.0
+    llm_max_retries: int = 2
+    llm_retry_base_delay_seconds: float = 0.5
+    report_cache_max_bytes: int = 50 * 1024 * 1024
+    report_chunk_max_chars: int = 24000  # Longer transcripts are extracted chunk by chunk
+    report_chunk_overlap_turns: int = 2
+
+    # ---------------- VOICE AGENT TOOLS ----------------
+    tool_latency_budget_ms: float = 100.0  # p99 target for /calls/tools/* responses
+    tool_latency_window: int = 1000  # Recent samples kept per tool
+    conversation_context_ttl_seconds: float = 300.0  # Upper bound; writes invalidate sooner
+    caller_snapshot_max_bytes: int = 1024  # Encoded dynamic variables per caller
+    caller_snapshot_recent_calls: int = 3  # Calls summarised in caller_history
+
+    # ---------------- DASHBOARD ----------------
+    dashboard_cache_ttl_seconds: float = 5.0
+    dashboard_push_tick_seconds: float = 1.0
+
+    # ---------------- SOLAR TELEMETRY ----------------
+    solar_live_window_samples: int = 720
+    solar_rollup_flush_interval_seconds: float = 5.0  # Ingest requests never write rollups
+    solar_retention_1m_days: int = 2
+    solar_retention_15m_days: int = 35
+    solar_retention_1d_days: int = 730
+
+    # ---------------- SOLAR SIZING ----------------
+    solar_tariff_inr_per_kwh: float = 8.0
+    solar_generation_kwh_per_kw_month: float = 120.0  # ~4 peak sun hours a day
+    solar_max_system_kw: float = 50.0
+    solar_inverter_sizes_kw: List[float] = [1, 2, 3, 5, 6, 8, 10, 12, 15, 20, 25, 30, 40, 50]
+    solar_inverter_cost_inr_per_kw: float = 8_000.0
+    solar_installation_cost_inr_per_kw: float = 15_000.0  # Mounting, cabling, labour
+
+    # ---------------- EXPORTS ----------------
+    export_batch_size: int = 1000
+
+    # ---------------- PAGINATION ----------------
+    list_count_cache_ttl_seconds: float = 30.0
+
+    # ---------------- LEADS ----------------
+    lead_summary_refresh_delay_seconds: float = 5.0
+    lead_score_batch_size: int = 1000
+    lead_phone_cache_size: int = 10000  # Normalized phone -> lead entries kept in process
+
+    # ---------------- PROPERTIES ----------------
+    property_retrieval_top_k: int = 8  # Listings formatted into the agent's prompt per query
+    property_price_bands: List[float] = [2_500_000, 5_000_000, 10_000_000, 20_000_000, 50_000_000]
+    property_facet_cache_ttl_seconds: float = 30.0
+    property_facet_cache_size: int = 256  # Base filters whose combinations are kept in process
+    lead_match_budget_tolerance: float = 0.1  # Share a listing may exceed a lead's budget by
+
     @computed_field
     @property
     def websocket_url(self) -> str:
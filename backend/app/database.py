@@ -3,8 +3,8 @@
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
+from sqlalchemy import bindparam, select, text, update
 from sqlalchemy import inspect as sa_inspect
-from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
@@ -95,6 +95,15 @@ def _migrate_calls_table(connection) -> None:
         ("properties_discussed", "TEXT", "TEXT", "TEXT"),
         ("sentiment_score", "REAL", "DOUBLE PRECISION", "DOUBLE"),
         ("customer_satisfaction", "INTEGER", "INTEGER", "INTEGER"),
+        ("report_source", "VARCHAR(10)", "VARCHAR(10)", "VARCHAR(10)"),
+        ("report_lead_status", "VARCHAR(30)", "VARCHAR(30)", "VARCHAR(30)"),
+        ("report_confidence_score", "INTEGER", "INTEGER", "INTEGER"),
+        ("report_buying_timeline", "VARCHAR(30)", "VARCHAR(30)", "VARCHAR(30)"),
+        ("report_estimated_kw", "REAL", "DOUBLE PRECISION", "DOUBLE"),
+        ("report_monthly_bill", "REAL", "DOUBLE PRECISION", "DOUBLE"),
+        ("report_visit_scheduled", "BOOLEAN", "BOOLEAN", "BOOLEAN"),
+        ("report_visit_date", "DATE", "DATE", "DATE"),
+        ("report_follow_up_required", "BOOLEAN", "BOOLEAN", "BOOLEAN"),
     ]
 
     for name, sqlite_def, pg_def, generic_def in to_add:
@@ -103,6 +112,45 @@ def _migrate_calls_table(connection) -> None:
         except Exception:
             return
 
+    if "report_lead_status" not in columns:
+        try:
+            _backfill_call_report_columns(connection)
+        except Exception:
+            return
+
+
+def _backfill_call_report_columns(connection, batch_size: int = 500) -> None:
+    """Fill the typed ``report_*`` columns from existing structured reports once."""
+    from app.models.call import structured_report_columns
+
+    calls = Base.metadata.tables["calls"]
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(calls.c.id, calls.c.structured_report)
+            .where(calls.c.id > last_id, calls.c.structured_report.is_not(None))
+            .order_by(calls.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        connection.execute(
+            update(calls)
+            .where(calls.c.id == bindparam("call_pk"))
+            .values(
+                updated_at=calls.c.updated_at,
+                **{name: bindparam(f"new_{name}") for name in structured_report_columns(None)},
+            ),
+            [
+                {
+                    "call_pk": call_id,
+                    **{f"new_{name}": value for name, value in structured_report_columns(raw).items()},
+                }
+                for call_id, raw in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
 
 def _migrate_notifications_table(connection) -> None:
     inspector = sa_inspect(connection)
@@ -186,11 +234,137 @@ def _migrate_appointments_table(connection) -> None:
         return
 
 
+def _migrate_leads_table(connection) -> None:
+    inspector = sa_inspect(connection)
+    try:
+        columns = {col["name"] for col in inspector.get_columns("leads")}
+    except Exception:
+        return
+
+    timestamp_def = "TIMESTAMPTZ" if connection.dialect.name == "postgresql" else "DATETIME"
+    to_add: list[tuple[str, str]] = [
+        ("ai_summary_payload", "TEXT"),
+        ("ai_summary_fingerprint", "VARCHAR(64)"),
+        ("lead_score", "INTEGER"),
+        ("conversion_likelihood", "INTEGER"),
+        ("engagement_level", "VARCHAR(10)"),
+        ("lead_scored_at", timestamp_def),
+    ]
+    for name, column_def in to_add:
+        if name in columns:
+            continue
+        try:
+            connection.execute(text(f"ALTER TABLE leads ADD COLUMN {name} {column_def}"))
+        except Exception:
+            return
+
+    if "phone_e164" not in columns:
+        try:
+            connection.execute(text("ALTER TABLE leads ADD COLUMN phone_e164 VARCHAR(16)"))
+            _backfill_lead_phone_e164(connection)
+        except Exception:
+            return
+
+    if "last_call_id" in columns:
+        return
+    try:
+        connection.execute(text("ALTER TABLE leads ADD COLUMN last_call_id INTEGER"))
+        # Backfill the pointer once from existing calls.
+        connection.execute(
+            text(
+                "UPDATE leads SET last_call_id = ("
+                "SELECT calls.id FROM calls WHERE calls.lead_id = leads.id "
+                "ORDER BY calls.created_at DESC, calls.id DESC LIMIT 1)"
+            )
+        )
+    except Exception:
+        return
+
+
+def _backfill_lead_phone_e164(connection, batch_size: int = 500) -> None:
+    """Fill ``leads.phone_e164`` once; only the oldest lead per number gets it.
+
+    Leads that were stored twice under different formats keep NULL, so the unique
+    index can be built and lookups resolve to the original lead.
+    """
+    from app.utils.utils import normalize_phone
+
+    leads = Base.metadata.tables["leads"]
+    seen: set[str] = set()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            select(leads.c.id, leads.c.phone)
+            .where(leads.c.id > last_id)
+            .order_by(leads.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return
+        params = []
+        for lead_id, phone in rows:
+            normalized = normalize_phone(phone)
+            if normalized and normalized not in seen:
+                seen.add(normalized)
+                params.append({"lead_pk": lead_id, "new_phone_e164": normalized})
+        if params:
+            connection.execute(
+                update(leads)
+                .where(leads.c.id == bindparam("lead_pk"))
+                .values(phone_e164=bindparam("new_phone_e164"), updated_at=leads.c.updated_at),
+                params,
+            )
+        last_id = rows[-1][0]
+
+
+def _ensure_indexes(connection) -> None:
+    """Create model indexes that were declared after their table already existed."""
+    inspector = sa_inspect(connection)
+    for table in Base.metadata.sorted_tables:
+        try:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        except Exception:
+            continue
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            try:
+                index.create(connection)
+            except Exception:
+                continue
+
+
+def _ensure_fulltext_indexes(connection) -> None:
+    """Create the search structures behind /properties/search and appointment search."""
+    from app.utils.fulltext import ensure_postgres_fulltext, ensure_sqlite_fulltext
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        ensure_sqlite_fulltext(connection)
+    elif dialect == "postgresql":
+        ensure_postgres_fulltext(connection)
+
+
+def _ensure_geo_indexes(connection) -> None:
+    """Create the spatial index behind /properties/nearby."""
+    from app.utils.geo import ensure_postgres_geo, ensure_sqlite_geo
+
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        ensure_sqlite_geo(connection)
+    elif dialect == "postgresql":
+        ensure_postgres_geo(connection)
+
+
 def _init_and_migrate(connection) -> None:
     Base.metadata.create_all(connection)
     _migrate_calls_table(connection)
     _migrate_notifications_table(connection)
     _migrate_appointments_table(connection)
+    _migrate_leads_table(connection)
+    _ensure_indexes(connection)
+    _ensure_fulltext_indexes(connection)
+    _ensure_geo_indexes(connection)
 
 
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
@@ -12,6 +12,7 @@ from app.api.admin import router as admin_router
 from app.api.appointments import router as appointments_router
 from app.api.auth import router as auth_router
 from app.api.calls import router as calls_router
+from app.api.companies import router as companies_router
 from app.api.dashboard import router as dashboard_router
 from app.api.elevenlabs_calls import router as elevenlabs_calls_router
 from app.api.elevenlabs_conversation_init import router as elevenlabs_conversation_init_router
@@ -23,6 +24,8 @@ from app.api.properties import router as properties_router
 from app.api.reports import router as reports_router
 from app.config import settings
 from app.database import lifespan_db
+from app.services.solar_telemetry_store import solar_telemetry_store
+from app.services.tool_runtime import deferred_tasks
 from app.utils.logging import setup_logging
 
 # Setup logging
@@ -37,6 +40,9 @@ async def lifespan(app: FastAPI):
     
     async with lifespan_db():
         yield
+        # Let queued tool side effects finish before the engine is disposed.
+        await deferred_tasks.drain(timeout=10.0)
+        await solar_telemetry_store.flush()
 
 
 # Create FastAPI app
@@ -69,6 +75,7 @@ app.mount("/recordings", StaticFiles(directory=settings.recordings_dir), name="r
 app.include_router(auth_router, prefix="/auth", tags=["Authentication"])
 app.include_router(properties_router, prefix="/properties", tags=["Properties"])
 app.include_router(products_router, prefix="/products", tags=["Products"])
+app.include_router(companies_router, prefix="/companies", tags=["Companies"])
 app.include_router(leads_router, prefix="/leads", tags=["Leads"])
 app.include_router(calls_router, prefix="/calls", tags=["Calls"])
 app.include_router(reports_router, prefix="/reports", tags=["Reports"])
@@ -3,11 +3,16 @@
 from app.models.appointment import Appointment, AppointmentStatus
 from app.models.audit_log import AuditAction, AuditLog
 from app.models.call import Call, CallDirection, CallOutcome, CallStatus
+from app.models.caller_snapshot import CallerSnapshot
+from app.models.company import Company, CompanyPolicy, Offer, PolicyKind
 from app.models.elevenlabs_event_log import ElevenLabsEventLog
 from app.models.enquiry import Enquiry, EnquiryType
 from app.models.lead import Lead, LeadQuality, LeadSource, LeadStatus
 from app.models.notification import Notification, NotificationPreference, NotificationType
+from app.models.product import Product, ProductType
 from app.models.property import Property, PropertyStatus, PropertyType
+from app.models.report_cache import ReportCacheEntry
+from app.models.solar_telemetry import SolarAlert, SolarTelemetryRollup
 from app.models.user import User, UserRole
 
 __all__ = [
@@ -18,6 +23,9 @@ __all__ = [
     "Property",
     "PropertyType",
     "PropertyStatus",
+    # Product
+    "Product",
+    "ProductType",
     # Lead
     "Lead",
     "LeadQuality",
@@ -28,6 +36,12 @@ __all__ = [
     "CallDirection",
     "CallStatus",
     "CallOutcome",
+    "CallerSnapshot",
+    # Company
+    "Company",
+    "CompanyPolicy",
+    "Offer",
+    "PolicyKind",
     # Appointment
     "Appointment",
     "AppointmentStatus",
@@ -43,4 +57,9 @@ __all__ = [
     "AuditAction",
     # ElevenLabs
     "ElevenLabsEventLog",
+    # Solar telemetry
+    "SolarTelemetryRollup",
+    "SolarAlert",
+    # Report cache
+    "ReportCacheEntry",
 ]
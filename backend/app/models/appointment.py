@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import DateTime, ForeignKey, String, Text, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -23,6 +23,7 @@ class Appointment(Base):
     """Appointment model for storing finalized customer bookings."""
 
     __tablename__ = "appointments"
+    __table_args__ = (Index("ix_appointments_scheduled_for_id", "scheduled_for", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -1,11 +1,28 @@
 """Call model for VoIP call tracking."""
 
-from datetime import datetime
+import json
+import re
+from datetime import date, datetime
 from enum import Enum
-from typing import Optional
+from typing import Any, Dict, Optional
 
-from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, String, Text, func
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+    func,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.orm import Mapped, Session, mapped_column, relationship
 
 from app.database import Base
 
@@ -44,6 +61,12 @@ class Call(Base):
     """Call model for VoIP call tracking and recording."""
 
     __tablename__ = "calls"
+    __table_args__ = (
+        Index("ix_calls_created_at_id", "created_at", "id"),
+        Index("ix_calls_lead_id_created_at_id", "lead_id", "created_at", "id"),
+        Index("ix_calls_report_lead_status_created_at_id", "report_lead_status", "created_at", "id"),
+        Index("ix_calls_report_visit_scheduled_visit_date", "report_visit_scheduled", "report_visit_date"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
@@ -88,6 +111,18 @@ class Call(Base):
     
     # Section 7 Report
     structured_report: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Typed copies of key report fields, kept in sync with structured_report
+    report_source: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    report_lead_status: Mapped[Optional[str]] = mapped_column(String(30), nullable=True)
+    report_confidence_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    report_buying_timeline: Mapped[Optional[str]] = mapped_column(String(30), nullable=True)
+    report_estimated_kw: Mapped[Optional[float]] = mapped_column(Float, nullable=True, index=True)
+    report_monthly_bill: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    report_visit_scheduled: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    report_visit_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
+    report_follow_up_required: Mapped[Optional[bool]] = mapped_column(
+        Boolean, nullable=True, index=True
+    )
     
     # Outcome
     outcome: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
@@ -126,3 +161,134 @@ class Call(Base):
 
     def __repr__(self) -> str:
         return f"<Call {self.call_sid} ({self.status})>"
+
+
+_REPORT_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_UNKNOWN_VALUES = {"", "unknown", "null", "none", "n/a"}
+
+
+def _report_text(value: Any, length: int) -> Optional[str]:
+    if not isinstance(value, str) or value.strip().lower() in _UNKNOWN_VALUES:
+        return None
+    return value.strip().lower()[:length]
+
+
+def _report_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        match = _REPORT_NUMBER.search(value.replace(",", ""))
+        return float(match.group(0)) if match else None
+    return None
+
+
+def _report_bool(value: Any) -> Optional[bool]:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in {"true", "yes"}:
+        return True
+    if isinstance(value, str) and value.strip().lower() in {"false", "no"}:
+        return False
+    return None
+
+
+def _report_date(value: Any) -> Optional[date]:
+    if not isinstance(value, str):
+        return None
+    try:
+        return date.fromisoformat(value.strip()[:10])
+    except ValueError:
+        return None
+
+
+def structured_report_columns(structured_report: Optional[str]) -> Dict[str, Any]:
+    """Typed ``report_*`` column values for a Section 7 report JSON string.
+
+    Unparseable or missing values map to None so a malformed report never blocks
+    saving the call.
+    """
+    try:
+        report = json.loads(structured_report) if structured_report else {}
+    except ValueError:
+        report = {}
+    if not isinstance(report, dict):
+        report = {}
+
+    def section(name: str) -> Dict[str, Any]:
+        value = report.get(name)
+        return value if isinstance(value, dict) else {}
+
+    classification = section("lead_classification")
+    requirement = section("requirement")
+    visit = section("visit")
+    confidence = _report_number(classification.get("confidence_score"))
+    return {
+        # Reports predating the source tag came from the LLM.
+        "report_source": str(report.get("report_source") or "llm")[:10] if report else None,
+        "report_lead_status": _report_text(classification.get("lead_status"), 30),
+        "report_confidence_score": int(confidence) if confidence is not None else None,
+        "report_buying_timeline": _report_text(classification.get("buying_timeline"), 30),
+        "report_estimated_kw": _report_number(requirement.get("estimated_kw")),
+        "report_monthly_bill": _report_number(requirement.get("monthly_electricity_bill")),
+        "report_visit_scheduled": _report_bool(visit.get("visit_scheduled")),
+        "report_visit_date": _report_date(visit.get("visit_date")),
+        "report_follow_up_required": _report_bool(
+            section("call_analysis").get("follow_up_required")
+        ),
+    }
+
+
+@event.listens_for(Call.structured_report, "set")
+def _sync_report_columns(target: Call, value, oldvalue, initiator) -> None:
+    for name, column_value in structured_report_columns(value).items():
+        setattr(target, name, column_value)
+
+
+def latest_call_id_for(lead_id_column):
+    """Correlated subquery selecting the newest call id for ``lead_id_column``."""
+    return (
+        select(Call.id)
+        .where(Call.lead_id == lead_id_column)
+        .order_by(Call.created_at.desc(), Call.id.desc())
+        .limit(1)
+        .scalar_subquery()
+    )
+
+
+def lead_last_call_update(*criteria):
+    """UPDATE re-pointing ``leads.last_call_id`` for the leads matching ``criteria``.
+
+    ``updated_at`` is assigned to itself so the pointer move does not count as an
+    edit of the lead.
+    """
+    leads = Base.metadata.tables["leads"]
+    return (
+        update(leads)
+        .where(*criteria)
+        .values(last_call_id=latest_call_id_for(leads.c.id), updated_at=leads.c.updated_at)
+    )
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_lead_last_call(session: Session, flush_context) -> None:
+    """Re-point ``leads.last_call_id`` for every lead whose calls changed in this flush."""
+    lead_ids = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(obj, Call):
+            continue
+        state = inspect(obj)
+        lead_history = state.attrs.lead_id.history
+        if obj in session.dirty and not (
+            lead_history.has_changes() or state.attrs.created_at.history.has_changes()
+        ):
+            continue
+        lead_ids.update(lead_history.sum())
+        lead_ids.add(state.dict.get("lead_id"))
+    lead_ids.discard(None)
+    if not lead_ids:
+        return
+
+    leads = Base.metadata.tables["leads"]
+    session.connection().execute(lead_last_call_update(leads.c.id.in_(lead_ids)))
@@ -0,0 +1,24 @@
+"""Precomputed caller history served to the voice agent when a call starts."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Integer, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class CallerSnapshot(Base):
+    __tablename__ = "caller_snapshots"
+
+    phone_e164: Mapped[str] = mapped_column(String(16), primary_key=True)
+    lead_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
+    # Compact JSON of the agent's dynamic variables, kept under caller_snapshot_max_bytes
+    variables: Mapped[str] = mapped_column(Text, nullable=False)
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    # When the appointment mentioned in ``variables`` starts; it is hidden once past
+    appointment_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    refreshed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
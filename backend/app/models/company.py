@@ -0,0 +1,103 @@
+"""Company profile, sales policies and offers used to brief the voice agent."""
+
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class PolicyKind(str, Enum):
+    SUBSIDY = "subsidy"
+    EMI = "emi"
+
+
+class Company(Base):
+    """A business the agent answers for, identified by the number customers dial."""
+
+    __tablename__ = "companies"
+    __table_args__ = (Index("ix_companies_phone_e164", "phone_e164", unique=True),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    phone_number: Mapped[str] = mapped_column(String(20), nullable=False)
+    # Normalized copy of ``phone_number`` (kept in sync on assignment) used for lookups
+    phone_e164: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<Company {self.name} ({self.phone_number})>"
+
+
+class CompanyPolicy(Base):
+    """Subsidy or EMI terms for a company, stored as a JSON object."""
+
+    __tablename__ = "company_policies"
+    __table_args__ = (
+        UniqueConstraint("company_id", "kind", name="uq_company_policies_company_kind"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"), nullable=False)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    details: Mapped[str] = mapped_column(Text, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class Offer(Base):
+    """A promotion the agent may mention while it is active (times stored in UTC)."""
+
+    __tablename__ = "offers"
+    __table_args__ = (Index("ix_offers_company_active_starts_at", "company_id", "is_active", "starts_at"),)
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    company_id: Mapped[int] = mapped_column(ForeignKey("companies.id"), nullable=False)
+    title: Mapped[str] = mapped_column(String(255), nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    starts_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    ends_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<Offer {self.title}>"
+
+
+@event.listens_for(Company.phone_number, "set")
+def _sync_phone_e164(target: Company, value, oldvalue, initiator) -> None:
+    # Imported here: app.utils pulls in the schemas, which import the models.
+    from app.utils.utils import normalize_phone
+
+    target.phone_e164 = normalize_phone(value)
@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import TYPE_CHECKING, Optional
 
-from sqlalchemy import DateTime, Float, Integer, String, Text, func
+from sqlalchemy import DateTime, Float, Index, Integer, String, Text, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -44,12 +44,19 @@ class Lead(Base):
     """Lead model for customer/prospect management."""
 
     __tablename__ = "leads"
+    __table_args__ = (
+        Index("ix_leads_created_at_id", "created_at", "id"),
+        Index("ix_leads_lead_score_id", "lead_score", "id"),
+        Index("ix_leads_phone_e164", "phone_e164", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     
     # Customer Information
     name: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     phone: Mapped[str] = mapped_column(String(20), nullable=False, index=True)
+    # Normalized copy of ``phone`` (kept in sync on assignment) used for lookups
+    phone_e164: Mapped[Optional[str]] = mapped_column(String(16), nullable=True)
     email: Mapped[Optional[str]] = mapped_column(String(255), nullable=True)
     
     # Lead Classification
@@ -67,10 +74,15 @@ class Lead(Base):
     
     # Property Interest
     interested_property_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+
+    # Newest call for this lead, kept current on every flush that touches calls
+    last_call_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
     
     # Notes
     notes: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     ai_summary: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # AI-generated summary
+    ai_summary_payload: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON insights
+    ai_summary_fingerprint: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     
     # Assignment
     assigned_agent_id: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)
@@ -83,6 +95,12 @@ class Lead(Base):
     )
     follow_up_count: Mapped[int] = mapped_column(Integer, default=0)
     
+    # Batch scores (see services.lead_scoring)
+    lead_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    conversion_likelihood: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    engagement_level: Mapped[Optional[str]] = mapped_column(String(10), nullable=True)
+    lead_scored_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    
     # Conversion
     converted_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
     conversion_value: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
@@ -102,3 +120,11 @@ class Lead(Base):
 
     def __repr__(self) -> str:
         return f"<Lead {self.phone} ({self.quality})>"
+
+
+@event.listens_for(Lead.phone, "set")
+def _sync_phone_e164(target: Lead, value, oldvalue, initiator) -> None:
+    # Imported here: app.utils pulls in the schemas, which import this module.
+    from app.utils.utils import normalize_phone
+
+    target.phone_e164 = normalize_phone(value)
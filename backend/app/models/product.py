@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Float, Integer, String, Text, func
+from sqlalchemy import Boolean, DateTime, Float, Index, Integer, String, Text, func
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
@@ -18,6 +18,7 @@ class ProductType(str, Enum):
 
 class Product(Base):
     __tablename__ = "products"
+    __table_args__ = (Index("ix_products_active_wattage_id", "is_active", "wattage", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
 
@@ -0,0 +1,58 @@
+"""Downsampled solar telemetry tiers and the alerts raised from them."""
+
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Float, Integer, String, UniqueConstraint, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SolarTelemetryRollup(Base):
+    """One aggregated bucket (1m, 15m or 1d) of inverter telemetry for a site."""
+
+    __tablename__ = "solar_telemetry_rollups"
+    __table_args__ = (
+        UniqueConstraint(
+            "site_id",
+            "resolution",
+            "bucket_start",
+            name="uq_solar_rollup_bucket",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    site_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    resolution: Mapped[str] = mapped_column(String(8), nullable=False)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    sample_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    avg_power_kw: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    max_power_kw: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    energy_kwh: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    avg_irradiance_w_m2: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    avg_temperature_c: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+    avg_efficiency_pct: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)
+
+    def __repr__(self) -> str:
+        return f"<SolarTelemetryRollup {self.site_id} {self.resolution} {self.bucket_start}>"
+
+
+class SolarAlert(Base):
+    """A telemetry alert raised for a site by one alert rule."""
+
+    __tablename__ = "solar_alerts"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    site_id: Mapped[str] = mapped_column(String(64), nullable=False, index=True)
+    rule_id: Mapped[str] = mapped_column(String(64), nullable=False)
+    severity: Mapped[str] = mapped_column(String(20), nullable=False, default="warning")
+    message: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="active", index=True)
+    raised_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    resolved_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<SolarAlert {self.site_id} {self.rule_id} ({self.status})>"
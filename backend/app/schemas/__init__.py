@@ -10,13 +10,27 @@ from app.schemas.auth import (
 )
 from app.schemas.call import (
     CallCreate,
+    CallListItem,
     CallListResponse,
     CallNotesUpdate,
     CallOutcomeUpdate,
+    CallReportFacets,
+    CallReportSearchResponse,
     CallResponse,
     CallSearchParams,
     CallTranscript,
     CallUpdate,
+    ToolLatencyStats,
+)
+from app.schemas.company import (
+    CompanyCreate,
+    CompanyPolicyResponse,
+    CompanyPolicyUpdate,
+    CompanyResponse,
+    CompanyUpdate,
+    OfferCreate,
+    OfferResponse,
+    OfferUpdate,
 )
 from app.schemas.lead import (
     LeadAssign,
@@ -88,9 +102,22 @@ __all__ = [
     "CallCreate",
     "CallUpdate",
     "CallResponse",
+    "CallListItem",
     "CallListResponse",
     "CallSearchParams",
+    "CallReportFacets",
+    "CallReportSearchResponse",
     "CallOutcomeUpdate",
     "CallNotesUpdate",
     "CallTranscript",
+    "ToolLatencyStats",
+    # Company
+    "CompanyCreate",
+    "CompanyUpdate",
+    "CompanyResponse",
+    "CompanyPolicyUpdate",
+    "CompanyPolicyResponse",
+    "OfferCreate",
+    "OfferUpdate",
+    "OfferResponse",
 ]
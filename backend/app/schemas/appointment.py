@@ -21,6 +21,8 @@ class AppointmentResponse(BaseModel):
     assigned_staff_name: Optional[str] = None
     contact_phone: Optional[str] = None
     contact_email: Optional[str] = None
+    # Matched text with <mark> highlights, when the list is searched
+    search_snippet: Optional[str] = None
 
     created_at: datetime
     updated_at: datetime
@@ -34,6 +36,8 @@ class AppointmentListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class AppointmentUpdate(BaseModel):
@@ -1,7 +1,7 @@
 """Call schemas for request/response validation."""
 
-from datetime import datetime, timezone
-from typing import List, Optional
+from datetime import date, datetime, timezone
+from typing import Dict, List, Optional
 from zoneinfo import ZoneInfo
 
 from pydantic import BaseModel, Field, field_validator
@@ -58,8 +58,8 @@ class DialRequest(BaseModel):
     lead_id: Optional[int] = None
 
 
-class CallResponse(BaseModel):
-    """Call response schema."""
+class CallSummary(BaseModel):
+    """Call fields shown in list views; excludes the wide text columns."""
     id: int
     call_sid: str
     direction: str
@@ -79,16 +79,20 @@ class CallResponse(BaseModel):
     
     recording_url: Optional[str] = None
     transcript_id: Optional[str] = None
-    transcript_summary: Optional[str] = None
     
     outcome: Optional[str] = None
-    outcome_notes: Optional[str] = None
     
     lead_id: Optional[int] = None
     lead_created: bool
     
     sentiment_score: Optional[float] = None
     customer_satisfaction: Optional[int] = None
+
+    report_lead_status: Optional[str] = None
+    report_estimated_kw: Optional[float] = None
+    report_visit_scheduled: Optional[bool] = None
+    report_visit_date: Optional[date] = None
+    report_follow_up_required: Optional[bool] = None
     
     created_at: datetime
     updated_at: datetime
@@ -125,6 +129,29 @@ class CallResponse(BaseModel):
         return ist_value
 
 
+class CallResponse(CallSummary):
+    """Call response schema."""
+    transcript_summary: Optional[str] = None
+    outcome_notes: Optional[str] = None
+
+
+# Wide text columns a list request can opt into with ``fields=``.
+CALL_LIST_OPTIONAL_FIELDS = (
+    "transcript_summary",
+    "outcome_notes",
+    "transcript_text",
+    "structured_report",
+)
+
+
+class CallListItem(CallSummary):
+    """Call list row; optional text fields are only present when requested."""
+    transcript_summary: Optional[str] = None
+    outcome_notes: Optional[str] = None
+    transcript_text: Optional[str] = None
+    structured_report: Optional[str] = None
+
+
 class CallSearchParams(BaseModel):
     """Call search parameters."""
     direction: Optional[CallDirection] = None
@@ -141,10 +168,26 @@ class CallSearchParams(BaseModel):
 
 class CallListResponse(BaseModel):
     """Paginated call list response."""
-    calls: List[CallResponse]
+    calls: List[CallListItem]
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+
+
+class CallReportFacets(BaseModel):
+    """Aggregates over every call matching a report search."""
+    by_lead_status: Dict[str, int]
+    visits_scheduled: int
+    follow_ups_required: int
+    avg_estimated_kw: Optional[float] = None
+    total_estimated_kw: float = 0.0
+
+
+class CallReportSearchResponse(CallListResponse):
+    """Report search page plus facets over the full result set."""
+    facets: CallReportFacets
 
 
 class TranscriptMessage(BaseModel):
@@ -179,3 +222,13 @@ class CallTranscript(BaseModel):
     call_sid: str
     messages: List[TranscriptMessage]
     summary: Optional[str] = None
+
+
+class ToolLatencyStats(BaseModel):
+    """Rolling latency of one voice agent tool endpoint."""
+    count: int
+    p50_ms: float
+    p99_ms: float
+    max_ms: float
+    budget_ms: float
+    within_budget: bool
@@ -0,0 +1,85 @@
+"""Company, policy and offer schemas for the voice agent's briefing."""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.models.company import PolicyKind
+
+
+def _to_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Offer windows are compared in UTC; naive values are taken to be UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+class CompanyCreate(BaseModel):
+    name: str = Field(..., min_length=2, max_length=255)
+    phone_number: str = Field(..., min_length=5, max_length=20)
+
+
+class CompanyUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=2, max_length=255)
+    phone_number: Optional[str] = Field(None, min_length=5, max_length=20)
+    is_active: Optional[bool] = None
+
+
+class CompanyResponse(BaseModel):
+    id: int
+    name: str
+    phone_number: str
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CompanyPolicyUpdate(BaseModel):
+    details: Dict[str, Any]
+
+
+class CompanyPolicyResponse(BaseModel):
+    company_id: int
+    kind: PolicyKind
+    details: Dict[str, Any]
+    updated_at: datetime
+
+
+class OfferCreate(BaseModel):
+    title: str = Field(..., min_length=2, max_length=255)
+    description: Optional[str] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+
+    _utc_window = field_validator("starts_at", "ends_at")(_to_utc)
+
+
+class OfferUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=2, max_length=255)
+    description: Optional[str] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    is_active: Optional[bool] = None
+
+    _utc_window = field_validator("starts_at", "ends_at")(_to_utc)
+
+
+class OfferResponse(BaseModel):
+    id: int
+    company_id: int
+    title: str
+    description: Optional[str] = None
+    starts_at: Optional[datetime] = None
+    ends_at: Optional[datetime] = None
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
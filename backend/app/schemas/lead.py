@@ -7,6 +7,7 @@ from zoneinfo import ZoneInfo
 from pydantic import BaseModel, EmailStr, Field, field_validator
 
 from app.models.lead import LeadQuality, LeadSource, LeadStatus
+from app.schemas.property import PropertyResponse
 from app.utils.logging import get_logger
 
 _ist_tz = ZoneInfo("Asia/Kolkata")
@@ -84,6 +85,7 @@ class LeadResponse(LeadBase):
     interested_property_id: Optional[int] = None
     notes: Optional[str] = None
     ai_summary: Optional[str] = None
+    last_call_id: Optional[int] = None
     last_call_notes: Optional[str] = None
     
     assigned_agent_id: Optional[int] = None
@@ -92,6 +94,10 @@ class LeadResponse(LeadBase):
     next_follow_up: Optional[datetime] = None
     follow_up_count: int = 0
     
+    lead_score: Optional[int] = None
+    conversion_likelihood: Optional[int] = None
+    engagement_level: Optional[str] = None
+    
     converted_at: Optional[datetime] = None
     conversion_value: Optional[float] = None
     
@@ -148,6 +154,8 @@ class LeadListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class LeadAiSummaryResponse(BaseModel):
@@ -160,3 +168,28 @@ class LeadAiSummaryResponse(BaseModel):
     patterns: List[str]
     generated_at: datetime
     source_call_ids: List[int] = []
+    is_stale: bool = False
+
+
+class LeadPropertyMatch(BaseModel):
+    """An available listing that fits a lead's preferences."""
+    score: float
+    property: PropertyResponse
+
+
+class LeadPropertyMatchesResponse(BaseModel):
+    lead_id: int
+    total: int
+    matches: List[LeadPropertyMatch]
+
+
+class PropertyLeadMatch(BaseModel):
+    """An open lead whose preferences a listing fits."""
+    score: float
+    lead: LeadResponse
+
+
+class PropertyLeadMatchesResponse(BaseModel):
+    property_id: int
+    total: int
+    matches: List[PropertyLeadMatch]
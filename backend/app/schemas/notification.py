@@ -18,6 +18,7 @@ class NotificationResponse(BaseModel):
     type: NotificationType
     is_read: bool
     related_lead_id: Optional[int] = None
+    related_call_id: Optional[int] = None
     created_at: datetime
 
     class Config:
@@ -48,6 +49,8 @@ class NotificationListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
 
 
 class NotificationCreateRequest(BaseModel):
@@ -89,6 +89,10 @@ class PropertyResponse(PropertyBase):
     created_by: int
     created_at: datetime
     updated_at: datetime
+    # Matched text with <mark> highlights, on /properties/search results only
+    search_snippet: Optional[str] = None
+    # Great-circle distance from the query point, on /properties/nearby results only
+    distance_km: Optional[float] = None
 
     class Config:
         from_attributes = True
@@ -114,3 +118,24 @@ class PropertyListResponse(BaseModel):
     total: int
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
+    total_is_estimate: bool = False
+
+
+class PropertyFacetValue(BaseModel):
+    """One facet value and the number of listings that have it."""
+    value: str
+    count: int
+
+
+class PropertyFacets(BaseModel):
+    """Counts per filter dimension, each ignoring its own selection."""
+    city: List[PropertyFacetValue] = []
+    property_type: List[PropertyFacetValue] = []
+    bedrooms: List[PropertyFacetValue] = []
+    price_band: List[PropertyFacetValue] = []
+
+
+class PropertyFacetedListResponse(PropertyListResponse):
+    """Paginated property list with facet counts."""
+    facets: PropertyFacets
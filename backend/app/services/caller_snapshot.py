@@ -0,0 +1,450 @@
+"""Per-phone caller history for the voice agent, precomputed off the call path.
+
+A snapshot is the set of ElevenLabs dynamic variables describing what we know
+about a caller: the lead, their last few calls, the next appointment and the
+latest structured report. It is rebuilt in the deferred-task worker whenever a
+session that touched the caller's lead, calls or appointments commits. Paths
+that write with Core statements flag the rows with ``mark_stale``. At
+conversation start it is a single primary-key read.
+
+Snapshots are compact JSON kept under ``caller_snapshot_max_bytes``: summaries
+are shortened first, then the oldest calls are dropped.
+"""
+
+import asyncio
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import delete, event, func, inspect, or_, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import async_session_maker, engine
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.call import Call, CallDirection
+from app.models.caller_snapshot import CallerSnapshot
+from app.models.lead import Lead
+from app.services.tool_runtime import deferred_tasks
+from app.utils.logging import get_logger
+from app.utils.utils import normalize_phone
+
+logger = get_logger("services.caller_snapshot")
+
+_IST = ZoneInfo("Asia/Kolkata")
+_DIALECT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+_SESSION_INFO_KEY = "stale_callers"
+_SUMMARY_CHARS = 240
+_MIN_SUMMARY_CHARS = 60
+_UPCOMING_STATUSES = (AppointmentStatus.SCHEDULED.value, AppointmentStatus.CONFIRMED.value)
+# Only these columns show up in a snapshot; other writes do not make it stale.
+_LEAD_FIELDS = ("name", "phone", "status", "quality")
+_CALL_FIELDS = (
+    "direction",
+    "from_number",
+    "to_number",
+    "lead_id",
+    "outcome",
+    "transcript_summary",
+    "report_lead_status",
+    "report_estimated_kw",
+    "report_monthly_bill",
+    "report_buying_timeline",
+    "report_visit_date",
+)
+
+
+def unknown_caller_variables() -> Dict[str, Any]:
+    """The variables for a caller we know nothing about (every key is always present)."""
+    return {
+        "caller_known": False,
+        "caller_name": "",
+        "caller_lead_status": "",
+        "caller_lead_quality": "",
+        "caller_previous_calls": 0,
+        "caller_last_call_date": "",
+        "caller_history": "",
+        "caller_upcoming_appointment": "",
+        "caller_last_report": "",
+    }
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+def _ist_date(value: Optional[datetime]) -> str:
+    value = _as_utc(value)
+    return value.astimezone(_IST).strftime("%Y-%m-%d") if value else ""
+
+
+def _number_variants(phone_e164: str) -> Set[str]:
+    """Formats a caller's number may have been stored in on ``calls``."""
+    variants = {phone_e164, phone_e164[1:]}
+    if phone_e164.startswith("+91") and len(phone_e164) == 13:
+        national = phone_e164[3:]
+        variants.update({national, f"0{national}"})
+    return variants
+
+
+def _customer_number(
+    direction: Optional[str], from_number: Optional[str], to_number: Optional[str]
+) -> Optional[str]:
+    number = to_number if direction == CallDirection.OUTBOUND.value else from_number
+    return normalize_phone(number)
+
+
+def _report_text(row) -> str:
+    parts = []
+    if row.report_lead_status:
+        parts.append(f"lead {row.report_lead_status}")
+    if row.report_estimated_kw:
+        parts.append(f"~{row.report_estimated_kw:g} kW")
+    if row.report_monthly_bill:
+        parts.append(f"bill Rs {row.report_monthly_bill:.0f}/month")
+    if row.report_buying_timeline:
+        parts.append(f"timeline {row.report_buying_timeline}")
+    if row.report_visit_date:
+        parts.append(f"visit {row.report_visit_date.isoformat()}")
+    return "; ".join(parts)
+
+
+def _history_line(row, summary_chars: int) -> str:
+    head = f"{_ist_date(row.created_at)} {row.direction}"
+    if row.outcome:
+        head = f"{head}, {row.outcome}"
+    summary = " ".join((row.transcript_summary or "").split())
+    if len(summary) > summary_chars:
+        summary = summary[: summary_chars - 3].rstrip() + "..."
+    return f"{head}: {summary}" if summary else head
+
+
+def _encode(variables: Dict[str, Any]) -> str:
+    return json.dumps(variables, ensure_ascii=False, separators=(",", ":"))
+
+
+def fit_to_budget(variables: Dict[str, Any], history: List[Any], max_bytes: int) -> str:
+    """Fill ``caller_history`` from ``history`` (newest first) and encode within ``max_bytes``."""
+    summary_chars = _SUMMARY_CHARS
+    while True:
+        variables["caller_history"] = "\n".join(
+            _history_line(row, summary_chars) for row in history
+        )
+        encoded = _encode(variables)
+        if len(encoded.encode("utf-8")) <= max_bytes:
+            return encoded
+        if summary_chars > _MIN_SUMMARY_CHARS:
+            summary_chars = max(_MIN_SUMMARY_CHARS, summary_chars // 2)
+        elif history:
+            history = history[:-1]
+        else:
+            break
+    # Only free-text fields are left to shorten.
+    for key in ("caller_last_report", "caller_upcoming_appointment", "caller_name"):
+        variables[key] = variables[key][:64]
+        encoded = _encode(variables)
+        if len(encoded.encode("utf-8")) <= max_bytes:
+            break
+    return encoded
+
+
+async def build_caller_variables(
+    db: AsyncSession, phone_e164: str
+) -> Tuple[Optional[int], Optional[Dict[str, Any]], Optional[datetime]]:
+    """(lead id, variables, appointment time) for a caller; variables is None if unknown."""
+    lead = (
+        await db.execute(
+            select(Lead.id, Lead.name, Lead.status, Lead.quality)
+            .where(Lead.phone_e164 == phone_e164)
+            .limit(1)
+        )
+    ).first()
+    call_filter = Call.from_number.in_(_number_variants(phone_e164))
+    if lead is not None:
+        call_filter = or_(Call.lead_id == lead.id, call_filter)
+
+    calls = (
+        await db.execute(
+            select(Call.created_at, Call.direction, Call.outcome, Call.transcript_summary)
+            .where(call_filter)
+            .order_by(Call.created_at.desc(), Call.id.desc())
+            .limit(settings.caller_snapshot_recent_calls)
+        )
+    ).all()
+    if lead is None and not calls:
+        return None, None, None
+
+    call_count = (
+        await db.execute(select(func.count()).select_from(Call).where(call_filter))
+    ).scalar_one()
+    report = (
+        await db.execute(
+            select(
+                Call.report_lead_status,
+                Call.report_estimated_kw,
+                Call.report_monthly_bill,
+                Call.report_buying_timeline,
+                Call.report_visit_date,
+            )
+            .where(call_filter, Call.structured_report.is_not(None))
+            .order_by(Call.created_at.desc(), Call.id.desc())
+            .limit(1)
+        )
+    ).first()
+    appointment = None
+    if lead is not None:
+        appointment = (
+            await db.execute(
+                select(Appointment.scheduled_for, Appointment.address, Appointment.status)
+                .where(
+                    Appointment.lead_id == lead.id,
+                    Appointment.status.in_(_UPCOMING_STATUSES),
+                    Appointment.scheduled_for >= datetime.now(timezone.utc),
+                )
+                .order_by(Appointment.scheduled_for)
+                .limit(1)
+            )
+        ).first()
+
+    variables = unknown_caller_variables()
+    variables.update(
+        caller_known=True,
+        caller_name=(lead.name or "") if lead else "",
+        caller_lead_status=lead.status if lead else "",
+        caller_lead_quality=lead.quality if lead else "",
+        caller_previous_calls=call_count,
+        caller_last_call_date=_ist_date(calls[0].created_at) if calls else "",
+        caller_last_report=_report_text(report) if report else "",
+    )
+    appointment_at = None
+    if appointment is not None:
+        appointment_at = _as_utc(appointment.scheduled_for)
+        when = appointment_at.astimezone(_IST).strftime("%Y-%m-%d %H:%M IST")
+        variables["caller_upcoming_appointment"] = (
+            f"{when} at {appointment.address} ({appointment.status})"
+        )
+    return (lead.id if lead else None), fit_to_budget(
+        variables, list(calls), settings.caller_snapshot_max_bytes
+    ), appointment_at
+
+
+# (phone_e164, lead_id, encoded variables or None for an unknown caller, appointment_at)
+BuiltSnapshot = Tuple[str, Optional[int], Optional[str], Optional[datetime]]
+
+
+def _snapshot_values(built: BuiltSnapshot) -> Dict[str, Any]:
+    phone_e164, lead_id, encoded, appointment_at = built
+    return {
+        "phone_e164": phone_e164,
+        "lead_id": lead_id,
+        "variables": encoded,
+        "size_bytes": len(encoded.encode("utf-8")),
+        "appointment_at": appointment_at,
+    }
+
+
+async def _store(snapshots: List[BuiltSnapshot]) -> None:
+    """Write rebuilt snapshots; unknown callers are rebuilt on demand rather than stored.
+
+    On SQLite and Postgres every statement autocommits, so a refresh dropped
+    mid-write (e.g. with its event loop) cannot leave a write transaction open.
+    """
+    unknown = [snapshot[0] for snapshot in snapshots if snapshot[2] is None]
+    rows = [_snapshot_values(snapshot) for snapshot in snapshots if snapshot[2] is not None]
+    dialect_insert = _DIALECT_INSERTS.get(engine.dialect.name)
+    if dialect_insert is None:
+        async with async_session_maker() as db:
+            if unknown:
+                await db.execute(
+                    delete(CallerSnapshot).where(CallerSnapshot.phone_e164.in_(unknown))
+                )
+            for values in rows:
+                await db.merge(CallerSnapshot(**values))
+            await db.commit()
+        return
+
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        if unknown:
+            await conn.execute(delete(CallerSnapshot).where(CallerSnapshot.phone_e164.in_(unknown)))
+        if rows:
+            statement = dialect_insert(CallerSnapshot)
+            await conn.execute(
+                statement.on_conflict_do_update(
+                    index_elements=[CallerSnapshot.phone_e164],
+                    set_={
+                        **{
+                            name: statement.excluded[name]
+                            for name in rows[0]
+                            if name != "phone_e164"
+                        },
+                        "refreshed_at": func.now(),
+                    },
+                ),
+                rows,
+            )
+
+
+async def refresh_caller_snapshots(
+    phones: Iterable[str] = (),
+    lead_ids: Iterable[int] = (),
+    call_ids: Iterable[int] = (),
+) -> int:
+    """Rebuild the snapshots of every caller identified by number, lead or call."""
+    phones, lead_ids, call_ids = set(phones), set(lead_ids), set(call_ids)
+    async with async_session_maker() as db:
+        keys = {key for key in map(normalize_phone, phones) if key}
+        if lead_ids:
+            result = await db.execute(select(Lead.phone_e164).where(Lead.id.in_(lead_ids)))
+            keys.update(key for key in result.scalars().all() if key)
+        if call_ids:
+            result = await db.execute(
+                select(Call.direction, Call.from_number, Call.to_number).where(
+                    Call.id.in_(call_ids)
+                )
+            )
+            keys.update(key for key in (_customer_number(*row) for row in result.all()) if key)
+        snapshots = [(key, *await build_caller_variables(db, key)) for key in sorted(keys)]
+    # Building only reads; the writes happen after the session is released.
+    await _store(snapshots)
+    return len(keys)
+
+
+async def get_caller_variables(phone: Optional[str]) -> Dict[str, Any]:
+    """The dynamic variables for ``phone``: one primary-key read when a snapshot exists."""
+    key = normalize_phone(phone)
+    if key is None:
+        return unknown_caller_variables()
+    async with async_session_maker() as db:
+        row = (
+            await db.execute(
+                select(CallerSnapshot.variables, CallerSnapshot.appointment_at).where(
+                    CallerSnapshot.phone_e164 == key
+                )
+            )
+        ).first()
+        if row is None:
+            # No snapshot yet (unknown caller, or history predating snapshots).
+            _, encoded, _ = await build_caller_variables(db, key)
+            if encoded is None:
+                return unknown_caller_variables()
+            schedule_refresh(phones=[key])
+            return json.loads(encoded)
+
+    variables = json.loads(row.variables)
+    appointment_at = _as_utc(row.appointment_at)
+    if appointment_at is not None and appointment_at <= datetime.now(timezone.utc):
+        variables["caller_upcoming_appointment"] = ""
+        schedule_refresh(phones=[key])
+    return variables
+
+
+class _RefreshQueue:
+    """Coalesces stale callers into one deferred refresh job per event loop.
+
+    The pending job is tracked as a future of the loop it was queued on, so a job
+    dropped with its loop (or one already running) never blocks later refreshes.
+    """
+
+    def __init__(self):
+        self._phones: Set[str] = set()
+        self._lead_ids: Set[int] = set()
+        self._call_ids: Set[int] = set()
+        self._job: Optional[asyncio.Future] = None
+
+    def add(self, phones: Iterable[str], lead_ids: Iterable[int], call_ids: Iterable[int]) -> None:
+        self._phones.update(phones)
+        self._lead_ids.update(lead_ids)
+        self._call_ids.update(call_ids)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No running event loop (e.g. a sync script); the next async write catches up.
+            return
+        job = self._job
+        if job is not None and not job.done() and job.get_loop() is loop:
+            return
+        self._job = loop.create_future()
+        deferred_tasks.defer("refresh_caller_snapshots", self._run, self._job)
+
+    async def _run(self, job: asyncio.Future) -> None:
+        # Callers added from here on need a job of their own.
+        if not job.done():
+            job.set_result(None)
+        phones, self._phones = self._phones, set()
+        lead_ids, self._lead_ids = self._lead_ids, set()
+        call_ids, self._call_ids = self._call_ids, set()
+        await refresh_caller_snapshots(phones, lead_ids, call_ids)
+
+
+_refresh_queue = _RefreshQueue()
+
+
+def schedule_refresh(
+    phones: Iterable[str] = (),
+    lead_ids: Iterable[int] = (),
+    call_ids: Iterable[int] = (),
+) -> None:
+    _refresh_queue.add(phones, lead_ids, call_ids)
+
+
+def mark_stale(
+    session,
+    phones: Iterable[str] = (),
+    lead_ids: Iterable[int] = (),
+    call_ids: Iterable[int] = (),
+) -> None:
+    """Refresh these callers once ``session`` commits (for writes made with Core statements)."""
+    session = getattr(session, "sync_session", session)
+    pending = session.info.setdefault(
+        _SESSION_INFO_KEY, {"phones": set(), "lead_ids": set(), "call_ids": set()}
+    )
+    pending["phones"].update(p for p in phones if p)
+    pending["lead_ids"].update(i for i in lead_ids if i is not None)
+    pending["call_ids"].update(i for i in call_ids if i is not None)
+
+
+def _changed(state, fields: Tuple[str, ...]) -> bool:
+    return any(state.attrs[name].history.has_changes() for name in fields)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stale_callers(session: Session, flush_context) -> None:
+    phones: Set[str] = set()
+    lead_ids: Set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Lead):
+            state = inspect(obj)
+            if obj in session.dirty and not _changed(state, _LEAD_FIELDS):
+                continue
+            phones.update(p for p in state.attrs.phone_e164.history.sum() if p)
+        elif isinstance(obj, Call):
+            state = inspect(obj)
+            if obj in session.dirty and not _changed(state, _CALL_FIELDS):
+                continue
+            phones.add(_customer_number(obj.direction, obj.from_number, obj.to_number))
+            lead_ids.update(state.attrs.lead_id.history.sum())
+        elif isinstance(obj, Appointment):
+            lead_ids.add(inspect(obj).dict.get("lead_id"))
+    phones.discard(None)
+    lead_ids.discard(None)
+    if phones or lead_ids:
+        mark_stale(session, phones=phones, lead_ids=lead_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _refresh_stale_callers(session: Session) -> None:
+    pending = session.info.pop(_SESSION_INFO_KEY, None)
+    if pending and any(pending.values()):
+        schedule_refresh(pending["phones"], pending["lead_ids"], pending["call_ids"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stale_callers(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
@@ -0,0 +1,202 @@
+"""In-process change events raised when ORM sessions commit writes.
+
+``publish`` reports the tables a commit touched. Caches that follow single rows
+use a ``WriteWatcher`` for the keys written to one table, and ``StaleRows`` to
+track what their in-memory copy must refetch.
+"""
+
+from typing import Callable, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.utils.logging import get_logger
+
+logger = get_logger("services.change_events")
+
+ChangeListener = Callable[[Set[str]], None]
+
+_listeners: List[ChangeListener] = []
+_SESSION_INFO_KEY = "changed_tables"
+
+
+def subscribe(listener: ChangeListener) -> None:
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def unsubscribe(listener: ChangeListener) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def publish(tables: Set[str]) -> None:
+    if not tables:
+        return
+    for listener in list(_listeners):
+        try:
+            listener(set(tables))
+        except Exception as e:
+            logger.error("change_listener_failed", tables=sorted(tables), error=str(e))
+
+
+def _record_tables(session: Session, tables: Set[str]) -> None:
+    if not tables:
+        return
+    pending = session.info.setdefault(_SESSION_INFO_KEY, set())
+    pending.update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session: Session, flush_context) -> None:
+    tables: Set[str] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table:
+            tables.add(table)
+    _record_tables(session, tables)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement_tables(orm_execute_state) -> None:
+    if not (
+        orm_execute_state.is_insert
+        or orm_execute_state.is_update
+        or orm_execute_state.is_delete
+    ):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None:
+        _record_tables(orm_execute_state.session, {mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed_tables(session: Session) -> None:
+    tables = session.info.pop(_SESSION_INFO_KEY, None)
+    if tables:
+        publish(tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tables(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+# ---- per-table write tracking for in-process caches ----
+
+RELOAD = "*"
+# Refetching more rows than this by id is slower than reloading.
+MAX_REFETCH = 500
+
+
+class WriteWatcher:
+    """Collects the rows of one table written in a session and reports them on commit.
+
+    ORM flushes contribute ``keys(obj)`` for every new, changed or deleted instance
+    of ``model``. Bulk statements on its table contribute ``RELOAD``, since their
+    rows cannot be known, except updates that set none of ``columns``. Nothing is
+    reported for work that is rolled back.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model,
+        on_commit: Callable[[Set], None],
+        keys: Callable[[object], Iterable] = lambda obj: (obj.id,),
+        columns: Optional[Set[str]] = None,
+    ):
+        self._info_key = f"written_{name}"
+        self._model = model
+        self._on_commit = on_commit
+        self._keys = keys
+        self._columns = columns
+        event.listen(Session, "after_flush", self._collect_flushed)
+        event.listen(Session, "do_orm_execute", self._collect_statement)
+        event.listen(Session, "after_commit", self._report_committed)
+        event.listen(Session, "after_rollback", self._discard)
+
+    def pending(self, session) -> Set:
+        """Keys this session has written but not yet committed."""
+        session = getattr(session, "sync_session", session)
+        return session.info.get(self._info_key) or set()
+
+    def _record(self, session: Session, keys: Iterable) -> None:
+        keys = {key for key in keys if key is not None}
+        if keys:
+            session.info.setdefault(self._info_key, set()).update(keys)
+
+    def _collect_flushed(self, session: Session, flush_context) -> None:
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, self._model):
+                self._record(session, self._keys(obj))
+
+    def _collect_statement(self, orm_execute_state) -> None:
+        if not (
+            orm_execute_state.is_insert
+            or orm_execute_state.is_update
+            or orm_execute_state.is_delete
+        ):
+            return
+        statement = orm_execute_state.statement
+        table = getattr(statement, "table", None)
+        if getattr(table, "name", None) != self._model.__tablename__:
+            return
+        if orm_execute_state.is_update and not self._sets_watched_column(statement):
+            return
+        self._record(orm_execute_state.session, [RELOAD])
+
+    def _sets_watched_column(self, statement) -> bool:
+        values = getattr(statement, "_values", None)
+        if self._columns is None or not values:
+            return True
+        return any(getattr(column, "key", column) in self._columns for column in values)
+
+    def _report_committed(self, session: Session) -> None:
+        keys = session.info.pop(self._info_key, None)
+        if keys:
+            self._on_commit(keys)
+
+    def _discard(self, session: Session) -> None:
+        session.info.pop(self._info_key, None)
+
+
+class StaleRows:
+    """What an in-memory copy of a table must fetch before it is next read.
+
+    It starts out needing a full load. ``take`` claims the pending work for one
+    sync; anything marked after that (including a reload) waits for the next
+    sync instead of being overwritten when a slow load finishes.
+    """
+
+    def __init__(self) -> None:
+        self._reload = True
+        self._ids: Set = set()
+
+    @property
+    def fresh(self) -> bool:
+        return not self._reload and not self._ids
+
+    def mark(self, ids: Iterable) -> None:
+        """Refetch these ids (or reload everything for ``RELOAD``) on the next sync."""
+        for item_id in ids:
+            if item_id == RELOAD:
+                self._reload = True
+                break
+            self._ids.add(item_id)
+        if self._reload or len(self._ids) > MAX_REFETCH:
+            self._reload = True
+            self._ids.clear()
+
+    def take(self) -> Optional[Set]:
+        """Claim the pending work: None for a full load, else the ids to refetch."""
+        if self._reload:
+            self._reload = False
+            self._ids.clear()
+            return None
+        ids, self._ids = self._ids, set()
+        return ids
+
+    def restore(self, claimed: Optional[Set]) -> None:
+        """Hand back work from ``take`` whose sync failed."""
+        self.mark([RELOAD] if claimed is None else claimed)
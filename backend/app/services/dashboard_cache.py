@@ -0,0 +1,120 @@
+"""Short-lived response cache for dashboard endpoints."""
+
+import asyncio
+import hashlib
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Set
+
+from fastapi.encoders import jsonable_encoder
+
+from app.config import settings
+from app.services import change_events
+from app.utils.logging import get_logger
+
+logger = get_logger("services.dashboard_cache")
+
+# Result handed to waiters when the request computing an entry is cancelled.
+_ABANDONED = object()
+
+
+@dataclass(frozen=True)
+class CachedPayload:
+    body: bytes
+    etag: str
+    expires_at: float
+    dependencies: FrozenSet[str]
+
+
+def _serialize(value: Any) -> tuple[bytes, str]:
+    body = json.dumps(
+        jsonable_encoder(value),
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+    return body, etag
+
+
+class DashboardCache:
+    """TTL cache that coalesces concurrent misses and drops entries on table writes."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, CachedPayload] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._inflight_dependencies: Dict[str, FrozenSet[str]] = {}
+        self._generations: Dict[str, int] = {}
+
+    async def get_or_compute(
+        self,
+        key: str,
+        dependencies: FrozenSet[str],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> CachedPayload:
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                return entry
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._compute(key, dependencies, compute)
+            entry = await asyncio.shield(inflight)
+            # Otherwise the request computing it was cancelled; compute it here.
+            if entry is not _ABANDONED:
+                return entry
+
+    async def _compute(
+        self,
+        key: str,
+        dependencies: FrozenSet[str],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> CachedPayload:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        self._inflight_dependencies[key] = dependencies
+        generation = self._generations.get(key, 0)
+        try:
+            body, etag = _serialize(await compute())
+            entry = CachedPayload(
+                body=body,
+                etag=etag,
+                expires_at=time.monotonic() + self.ttl_seconds,
+                dependencies=dependencies,
+            )
+            if self._generations.get(key, 0) == generation:
+                self._entries[key] = entry
+            future.set_result(entry)
+            return entry
+        except asyncio.CancelledError:
+            # Only this request was cancelled; waiters take over rather than fail.
+            future.set_result(_ABANDONED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise the error; mark it retrieved so the loop does not warn.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+            self._inflight_dependencies.pop(key, None)
+
+    def invalidate(self, tables: Set[str]) -> None:
+        stale = [
+            key for key, entry in self._entries.items() if entry.dependencies & tables
+        ]
+        for key in stale:
+            self._entries.pop(key, None)
+        for key, dependencies in list(self._inflight_dependencies.items()):
+            if dependencies & tables:
+                self._generations[key] = self._generations.get(key, 0) + 1
+        if stale:
+            logger.debug("dashboard_cache_invalidated", tables=sorted(tables), keys=stale)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+dashboard_cache = DashboardCache(ttl_seconds=settings.dashboard_cache_ttl_seconds)
+change_events.subscribe(dashboard_cache.invalidate)
@@ -0,0 +1,234 @@
+"""Live dashboard deltas pushed to websocket subscribers.
+
+Committed writes to calls and leads are turned into stat deltas by ORM session
+listeners, accumulated in memory, and flushed to every subscriber once per tick
+so a burst of writes produces a single frame and no database reads.
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Set
+
+from fastapi import WebSocket
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.call import Call, CallStatus
+from app.models.lead import Lead, LeadStatus
+from app.utils.logging import get_logger
+
+logger = get_logger("services.dashboard_realtime")
+
+active_dashboard_connections: Set[WebSocket] = set()
+
+_SESSION_INFO_KEY = "dashboard_deltas"
+_TERMINAL_CALL_STATUSES = {
+    CallStatus.COMPLETED.value,
+    CallStatus.FAILED.value,
+    CallStatus.NO_ANSWER.value,
+    CallStatus.BUSY.value,
+    CallStatus.CANCELLED.value,
+}
+
+
+class _DeltaBatch:
+    """Counters and change lists accumulated between two ticks."""
+
+    def __init__(self) -> None:
+        self.counters: Counter = Counter()
+        self.leads_by_quality: Counter = Counter()
+        self.lead_status_changes: List[Dict[str, Any]] = []
+
+    def __bool__(self) -> bool:
+        return (
+            any(self.counters.values())
+            or any(self.leads_by_quality.values())
+            or bool(self.lead_status_changes)
+        )
+
+    def merge(self, other: "_DeltaBatch") -> None:
+        self.counters.update(other.counters)
+        self.leads_by_quality.update(other.leads_by_quality)
+        self.lead_status_changes.extend(other.lead_status_changes)
+
+    def to_payload(self) -> Dict[str, Any]:
+        return {
+            "calls_created": self.counters["calls_created"],
+            "calls_completed": self.counters["calls_completed"],
+            "active_calls": self.counters["active_calls"],
+            "leads_created": self.counters["leads_created"],
+            "converted_leads": self.counters["converted_leads"],
+            "leads_by_quality": {k: v for k, v in self.leads_by_quality.items() if v},
+            "lead_status_changes": self.lead_status_changes,
+        }
+
+
+_pending = _DeltaBatch()
+_flush_task: Optional[asyncio.Task] = None
+_sequence = 0
+
+
+async def register_connection(websocket: WebSocket) -> None:
+    active_dashboard_connections.add(websocket)
+
+
+async def unregister_connection(websocket: WebSocket) -> None:
+    active_dashboard_connections.discard(websocket)
+
+
+def _history(obj: Any, attr: str) -> tuple[Optional[Any], Optional[Any], bool]:
+    history = inspect(obj).attrs[attr].history
+    if not history.has_changes():
+        return None, None, False
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new, True
+
+
+def _call_deltas(batch: _DeltaBatch, call: Call, is_new: bool, is_deleted: bool) -> None:
+    in_progress = CallStatus.IN_PROGRESS.value
+    if is_new:
+        batch.counters["calls_created"] += 1
+        if call.status == in_progress:
+            batch.counters["active_calls"] += 1
+        return
+    if is_deleted:
+        if call.status == in_progress:
+            batch.counters["active_calls"] -= 1
+        return
+    old, new, changed = _history(call, "status")
+    if changed:
+        _call_status_deltas(batch, old, new)
+
+
+def _call_status_deltas(batch: _DeltaBatch, old: Optional[str], new: Optional[str]) -> None:
+    in_progress = CallStatus.IN_PROGRESS.value
+    if old == new:
+        return
+    if old == in_progress:
+        batch.counters["active_calls"] -= 1
+    if new == in_progress:
+        batch.counters["active_calls"] += 1
+    if new in _TERMINAL_CALL_STATUSES and old not in _TERMINAL_CALL_STATUSES:
+        batch.counters["calls_completed"] += 1
+
+
+def _lead_deltas(batch: _DeltaBatch, lead: Lead, is_new: bool, is_deleted: bool) -> None:
+    converted = LeadStatus.CONVERTED.value
+    if is_new:
+        batch.counters["leads_created"] += 1
+        batch.leads_by_quality[lead.quality] += 1
+        if lead.status == converted:
+            batch.counters["converted_leads"] += 1
+        return
+    if is_deleted:
+        batch.leads_by_quality[lead.quality] -= 1
+        if lead.status == converted:
+            batch.counters["converted_leads"] -= 1
+        return
+    old_quality, new_quality, changed = _history(lead, "quality")
+    if changed and old_quality != new_quality:
+        if old_quality is not None:
+            batch.leads_by_quality[old_quality] -= 1
+        if new_quality is not None:
+            batch.leads_by_quality[new_quality] += 1
+    old_status, new_status, changed = _history(lead, "status")
+    if changed and old_status != new_status:
+        if old_status == converted:
+            batch.counters["converted_leads"] -= 1
+        if new_status == converted:
+            batch.counters["converted_leads"] += 1
+        batch.lead_status_changes.append(
+            {"lead_id": lead.id, "from": old_status, "to": new_status}
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_dashboard_deltas(session: Session, flush_context) -> None:
+    if not active_dashboard_connections:
+        return
+    batch = _DeltaBatch()
+    for objects, is_new, is_deleted in (
+        (session.new, True, False),
+        (session.dirty, False, False),
+        (session.deleted, False, True),
+    ):
+        for obj in objects:
+            if isinstance(obj, Call):
+                _call_deltas(batch, obj, is_new, is_deleted)
+            elif isinstance(obj, Lead):
+                _lead_deltas(batch, obj, is_new, is_deleted)
+    if batch:
+        session.info.setdefault(_SESSION_INFO_KEY, _DeltaBatch()).merge(batch)
+
+
+def mark_call_upsert(session, previous_status: Optional[str], status: Optional[str]) -> None:
+    """Record a call written with a Core upsert; ``previous_status`` is None for an insert."""
+    session = getattr(session, "sync_session", session)
+    if not active_dashboard_connections:
+        return
+    batch = _DeltaBatch()
+    if previous_status is None:
+        # Same as an ORM insert: a new call only counts as created (and active).
+        batch.counters["calls_created"] += 1
+        if status == CallStatus.IN_PROGRESS.value:
+            batch.counters["active_calls"] += 1
+    else:
+        _call_status_deltas(batch, previous_status, status)
+    if batch:
+        session.info.setdefault(_SESSION_INFO_KEY, _DeltaBatch()).merge(batch)
+
+
+@event.listens_for(Session, "after_commit")
+def _queue_committed_deltas(session: Session) -> None:
+    batch = session.info.pop(_SESSION_INFO_KEY, None)
+    if batch:
+        queue_deltas(batch)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_deltas(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
+
+
+def queue_deltas(batch: _DeltaBatch) -> None:
+    global _flush_task
+    _pending.merge(batch)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    if _flush_task is None or _flush_task.done():
+        _flush_task = loop.create_task(_flush_after_tick())
+
+
+async def _flush_after_tick() -> None:
+    global _pending, _sequence
+    await asyncio.sleep(settings.dashboard_push_tick_seconds)
+    batch, _pending = _pending, _DeltaBatch()
+    if not batch or not active_dashboard_connections:
+        return
+    _sequence += 1
+    await broadcast(
+        {
+            "type": "dashboard_delta",
+            "sequence": _sequence,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "deltas": batch.to_payload(),
+        }
+    )
+
+
+async def broadcast(payload: dict) -> None:
+    disconnected = []
+    for ws in list(active_dashboard_connections):
+        try:
+            await ws.send_json(payload)
+        except Exception:
+            disconnected.append(ws)
+    for ws in disconnected:
+        active_dashboard_connections.discard(ws)
+    if disconnected:
+        logger.info("dashboard_ws_pruned", count=len(disconnected))
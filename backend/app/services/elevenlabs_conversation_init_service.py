@@ -1,11 +1,32 @@
 from __future__ import annotations
 
+import asyncio
 import inspect
-from typing import Any, Optional
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
 
 from pydantic import BaseModel, ConfigDict
+from sqlalchemy import func, or_, select
 
+from app.config import settings
+from app.database import async_session_maker
+from app.models.company import Company as CompanyRecord
+from app.models.company import CompanyPolicy, Offer, PolicyKind
+from app.models.product import Product
+from app.services import change_events
 from app.utils.elevenlabs_dynamic_context import format_dynamic_context
+from app.utils.logging import get_logger
+from app.utils.utils import normalize_phone
+
+logger = get_logger("services.elevenlabs_conversation_init")
+
+UNKNOWN_COMPANY = "Unknown Company"
+# Writes to any of these tables can change a rendered context.
+CONTEXT_TABLES = frozenset({"companies", "company_policies", "offers", "products"})
+# Result handed to waiters when the request building a context is cancelled.
+_ABANDONED = object()
 
 
 class Company(BaseModel):
@@ -20,57 +41,233 @@ async def _maybe_await(value: Any) -> Any:
     return value
 
 
-async def get_company_by_number(to_number: str) -> Any:
-    raise NotImplementedError
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
+
+
+# Each fetch opens its own session so a cache miss can run them concurrently.
+
+
+async def get_company_by_number(to_number: str) -> Optional[Dict[str, Any]]:
+    number = normalize_phone(to_number)
+    if number is None:
+        return None
+    async with async_session_maker() as db:
+        row = (
+            await db.execute(
+                select(CompanyRecord.id, CompanyRecord.name).where(
+                    CompanyRecord.phone_e164 == number,
+                    CompanyRecord.is_active.is_(True),
+                )
+            )
+        ).first()
+    if row is None:
+        return None
+    return {"id": str(row.id), "name": row.name}
+
 
+async def get_products(company_id: str) -> list[Dict[str, Any]]:
+    """Active catalog entries; the product catalog is shared by every company."""
+    async with async_session_maker() as db:
+        rows = (
+            await db.execute(
+                select(Product.name, Product.price_inr, Product.model_number)
+                .where(Product.is_active.is_(True))
+                .order_by(Product.wattage, Product.id)
+            )
+        ).all()
+    return [{"name": name, "price": price, "sku": sku} for name, price, sku in rows]
 
-async def get_products(company_id: str) -> Any:
-    raise NotImplementedError
+
+async def _get_policy(company_id: str, kind: PolicyKind) -> Any:
+    async with async_session_maker() as db:
+        details = (
+            await db.execute(
+                select(CompanyPolicy.details).where(
+                    CompanyPolicy.company_id == int(company_id),
+                    CompanyPolicy.kind == kind.value,
+                )
+            )
+        ).scalar_one_or_none()
+    if details is None:
+        return None
+    try:
+        return json.loads(details)
+    except ValueError:
+        return details
 
 
 async def get_subsidy(company_id: str) -> Any:
-    raise NotImplementedError
+    return await _get_policy(company_id, PolicyKind.SUBSIDY)
 
 
 async def get_emi_policy(company_id: str) -> Any:
-    raise NotImplementedError
+    return await _get_policy(company_id, PolicyKind.EMI)
 
 
-async def get_active_offers(company_id: str) -> Any:
-    raise NotImplementedError
+async def get_active_offers(company_id: str) -> list[Dict[str, Any]]:
+    now = datetime.now(timezone.utc)
+    async with async_session_maker() as db:
+        rows = (
+            await db.execute(
+                select(Offer.title, Offer.description)
+                .where(
+                    Offer.company_id == int(company_id),
+                    Offer.is_active.is_(True),
+                    or_(Offer.starts_at.is_(None), Offer.starts_at <= now),
+                    or_(Offer.ends_at.is_(None), Offer.ends_at > now),
+                )
+                .order_by(Offer.starts_at, Offer.id)
+            )
+        ).all()
+    return [{"title": title, "description": description} for title, description in rows]
 
 
-async def build_dynamic_context(*, to_number: str) -> str:
+async def _next_offer_change(company_id: str) -> Optional[datetime]:
+    """When an offer next starts or ends, i.e. when the active offers change."""
+    now = datetime.now(timezone.utc)
+    company_offers = (Offer.company_id == int(company_id), Offer.is_active.is_(True))
+    async with async_session_maker() as db:
+        row = (
+            await db.execute(
+                select(
+                    select(func.min(Offer.starts_at))
+                    .where(*company_offers, Offer.starts_at > now)
+                    .scalar_subquery(),
+                    select(func.min(Offer.ends_at))
+                    .where(*company_offers, Offer.ends_at > now)
+                    .scalar_subquery(),
+                )
+            )
+        ).one()
+    changes = [_as_utc(value) for value in row if value is not None]
+    return min(changes) if changes else None
+
+
+async def _render_context(to_number: str) -> Tuple[str, Optional[datetime]]:
+    """The context for ``to_number`` and when it stops being valid (None: only on writes)."""
     company_raw = await _maybe_await(get_company_by_number(to_number))
     if not company_raw:
-        return format_dynamic_context(
-            company_name="Unknown Company",
-            products=[],
-            subsidy=None,
-            emi_policy=None,
-            offers=[],
+        return (
+            format_dynamic_context(
+                company_name=UNKNOWN_COMPANY,
+                products=[],
+                subsidy=None,
+                emi_policy=None,
+                offers=[],
+            ),
+            None,
         )
 
     company = Company.model_validate(company_raw)
     company_id = (company.id or "").strip()
     if not company_id:
-        return format_dynamic_context(
-            company_name=company.name or "Unknown Company",
-            products=[],
-            subsidy=None,
-            emi_policy=None,
-            offers=[],
+        return (
+            format_dynamic_context(
+                company_name=company.name or UNKNOWN_COMPANY,
+                products=[],
+                subsidy=None,
+                emi_policy=None,
+                offers=[],
+            ),
+            None,
         )
 
-    products = await _maybe_await(get_products(company_id))
-    subsidy = await _maybe_await(get_subsidy(company_id))
-    emi_policy = await _maybe_await(get_emi_policy(company_id))
-    offers = await _maybe_await(get_active_offers(company_id))
+    products, subsidy, emi_policy, offers, next_change = await asyncio.gather(
+        _maybe_await(get_products(company_id)),
+        _maybe_await(get_subsidy(company_id)),
+        _maybe_await(get_emi_policy(company_id)),
+        _maybe_await(get_active_offers(company_id)),
+        _next_offer_change(company_id),
+    )
 
-    return format_dynamic_context(
-        company_name=company.name or "Unknown Company",
+    context = format_dynamic_context(
+        company_name=company.name or UNKNOWN_COMPANY,
         products=list(products or []),
         subsidy=subsidy,
         emi_policy=emi_policy,
         offers=list(offers or []),
     )
+    return context, next_change
+
+
+class ConversationContextCache:
+    """Rendered context per dialled number, coalescing concurrent misses.
+
+    Entries live until a write to one of ``CONTEXT_TABLES`` commits, the next
+    offer starts or ends, or ``ttl_seconds`` passes, whichever comes first.
+    """
+
+    def __init__(self, ttl_seconds: Optional[float] = None):
+        self.ttl_seconds = ttl_seconds or settings.conversation_context_ttl_seconds
+        self._entries: Dict[str, Tuple[str, float]] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generation = 0
+
+    async def get_or_build(
+        self,
+        key: str,
+        build: Callable[[], Awaitable[Tuple[str, Optional[datetime]]]],
+    ) -> str:
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                return await self._build(key, build)
+            context = await asyncio.shield(inflight)
+            # Otherwise the request building it was cancelled; build it here.
+            if context is not _ABANDONED:
+                return context
+
+    async def _build(
+        self,
+        key: str,
+        build: Callable[[], Awaitable[Tuple[str, Optional[datetime]]]],
+    ) -> str:
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self._generation
+        try:
+            context, valid_until = await build()
+            lifetime = self.ttl_seconds
+            if valid_until is not None:
+                until_change = (valid_until - datetime.now(timezone.utc)).total_seconds()
+                lifetime = max(0.0, min(lifetime, until_change))
+            # A write that committed while we were reading may not be reflected.
+            if generation == self._generation:
+                self._entries[key] = (context, time.monotonic() + lifetime)
+            future.set_result(context)
+            return context
+        except asyncio.CancelledError:
+            # Only this request was cancelled; waiters take over rather than fail.
+            future.set_result(_ABANDONED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise the error; mark it retrieved so the loop does not warn.
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def invalidate(self, tables: Set[str]) -> None:
+        if tables & CONTEXT_TABLES:
+            self.clear()
+            logger.debug("conversation_context_invalidated", tables=sorted(tables))
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+
+
+conversation_context_cache = ConversationContextCache()
+change_events.subscribe(conversation_context_cache.invalidate)
+
+
+async def build_dynamic_context(*, to_number: str) -> str:
+    key = normalize_phone(to_number) or to_number.strip()
+    return await conversation_context_cache.get_or_build(key, lambda: _render_context(to_number))
@@ -0,0 +1,128 @@
+"""Read-through LRU of leads keyed by normalized phone number.
+
+The voice agent looks the caller up several times per conversation, so tool
+lookups go through this cache instead of hitting ``leads`` each time. Misses are
+cached too ("no lead for this number"). Entries are dropped when a session that
+wrote the lead commits, and the whole cache is cleared after bulk statements on
+``leads`` that may add a cached lead or change its fields, since their rows
+cannot be known.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Iterable, Optional, Set, Union
+
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.lead import Lead
+from app.services.change_events import RELOAD, WriteWatcher
+from app.utils.utils import normalize_phone
+
+_NO_LEAD = object()
+_CACHED_COLUMNS = {"name", "phone", "phone_e164", "email", "quality", "status"}
+
+
+@dataclass(frozen=True)
+class CachedLead:
+    id: int
+    name: Optional[str]
+    phone: str
+    email: Optional[str]
+    quality: str
+    status: str
+
+    @classmethod
+    def from_lead(cls, lead: Lead) -> "CachedLead":
+        return cls(
+            id=lead.id,
+            name=lead.name,
+            phone=lead.phone,
+            email=lead.email,
+            quality=lead.quality,
+            status=lead.status,
+        )
+
+
+class LeadPhoneCache:
+    def __init__(self, max_entries: Optional[int] = None):
+        self.max_entries = max_entries or settings.lead_phone_cache_size
+        self._entries: "OrderedDict[str, Union[CachedLead, object]]" = OrderedDict()
+        # Bumped on every invalidation; a lookup that raced with one is not stored.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    async def lookup(self, db: AsyncSession, phone: Optional[str]) -> Optional[CachedLead]:
+        """The lead for ``phone`` in any common format, or None."""
+        key = normalize_phone(phone)
+        if key is None:
+            if not phone:
+                return None
+            # Not a recognizable number: exact match only, and not worth caching.
+            result = await db.execute(select(Lead).where(Lead.phone == phone).limit(1))
+            lead = result.scalar_one_or_none()
+            return CachedLead.from_lead(lead) if lead is not None else None
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return None if entry is _NO_LEAD else entry
+
+        self.misses += 1
+        generation = self._generation
+        result = await db.execute(select(Lead).where(Lead.phone_e164 == key).limit(1))
+        lead = result.scalar_one_or_none()
+        cached = CachedLead.from_lead(lead) if lead is not None else None
+        if generation == self._generation and not _pending_write(db, key):
+            self._store(key, cached if cached is not None else _NO_LEAD)
+        return cached
+
+    def _store(self, key: str, entry: Union[CachedLead, object]) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, keys: Iterable[str]) -> None:
+        self._generation += 1
+        for key in keys:
+            if key == RELOAD:
+                self._entries.clear()
+                return
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.invalidate([RELOAD])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+lead_phone_cache = LeadPhoneCache()
+
+
+def _pending_write(db: AsyncSession, key: str) -> bool:
+    """Whether this session has flushed, uncommitted writes to ``key``'s lead."""
+    pending = _lead_writes.pending(db)
+    return key in pending or RELOAD in pending
+
+
+def _lead_keys(lead: Lead) -> Set[str]:
+    state = inspect(lead)
+    keys = {normalize_phone(phone) for phone in state.attrs.phone.history.sum()}
+    keys.update(state.attrs.phone_e164.history.sum())
+    keys.add(state.dict.get("phone_e164"))
+    keys.discard(None)
+    return keys
+
+
+# Derived data (scores, summaries) is written in bulk and is not part of CachedLead.
+_lead_writes = WriteWatcher(
+    "lead_phone_keys",
+    Lead,
+    lead_phone_cache.invalidate,
+    keys=_lead_keys,
+    columns=_CACHED_COLUMNS,
+)
@@ -0,0 +1,457 @@
+"""Matching between lead preferences and property inventory, in both directions.
+
+Open leads with at least one stated preference, and available listings, are
+held as NumPy column arrays. A lead's preferences are checked against every
+listing (or a listing against every lead) with a few vectorized comparisons.
+Nothing is indexed per value, so 200k leads take a few milliseconds.
+
+Place names are lower-cased and interned to integer codes. A lead's preferred
+location is its first comma-separated part ("Whitefield" in "Whitefield,
+Bangalore"), and it matches listings whose locality or city has that name.
+Listed prices may exceed the budget range by ``lead_match_budget_tolerance``.
+
+Both sides load on first use. Rows written through the ORM are refetched by id
+on the next match after their session commits. Bulk statements that may set a
+matched column reload that side.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import or_, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.lead import Lead, LeadStatus
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.services.change_events import RELOAD, StaleRows, WriteWatcher
+
+_MIN_CAPACITY = 1024
+# Location component of the score: locality named, city named, no preference.
+_LOCALITY_SCORE, _CITY_SCORE, _ANYWHERE_SCORE = 1.0, 0.7, 0.4
+_LOCATION_WEIGHT, _BUDGET_WEIGHT = 0.6, 0.4
+_TYPES = [kind.value for kind in PropertyType]
+_TYPE_ALIASES = {"flat": PropertyType.APARTMENT.value, "flats": PropertyType.APARTMENT.value}
+_CLOSED_STATUSES = (LeadStatus.CONVERTED.value, LeadStatus.LOST.value)
+_LEAD_COLUMNS = (
+    Lead.id,
+    Lead.preferred_location,
+    Lead.preferred_property_type,
+    Lead.budget_min,
+    Lead.budget_max,
+    Lead.preferred_size_min,
+    Lead.preferred_size_max,
+    Lead.lead_score,
+)
+_PROPERTY_COLUMNS = (
+    Property.id,
+    Property.city,
+    Property.locality,
+    Property.property_type,
+    Property.price,
+    Property.size_sqft,
+)
+_LEAD_DTYPES = {
+    "id": np.int64,
+    "place": np.int32,
+    "type": np.int16,
+    "budget_min": np.float64,
+    "budget_max": np.float64,
+    "budget_stated": np.bool_,
+    "size_min": np.float64,
+    "size_max": np.float64,
+    "lead_score": np.float32,
+}
+_PROPERTY_DTYPES = {
+    "id": np.int64,
+    "city": np.int32,
+    "locality": np.int32,
+    "type": np.int16,
+    "price": np.float64,
+    "size": np.float64,
+}
+
+
+@lru_cache(maxsize=256)
+def _type_code(value: Optional[str]) -> int:
+    value = (value or "").strip().lower()
+    value = _TYPE_ALIASES.get(value, value)
+    return _TYPES.index(value) if value in _TYPES else -1
+
+
+@dataclass(frozen=True)
+class Preferences:
+    location: Optional[str] = None
+    property_type: Optional[str] = None
+    budget_min: Optional[float] = None
+    budget_max: Optional[float] = None
+    size_min: Optional[float] = None
+    size_max: Optional[float] = None
+
+    @classmethod
+    def of_lead(cls, lead) -> "Preferences":
+        return cls(
+            location=lead.preferred_location,
+            property_type=lead.preferred_property_type,
+            budget_min=lead.budget_min,
+            budget_max=lead.budget_max,
+            size_min=lead.preferred_size_min,
+            size_max=lead.preferred_size_max,
+        )
+
+    @property
+    def stated(self) -> bool:
+        return any(
+            value is not None and value != ""
+            for value in (self.location, self.property_type, self.budget_min, self.budget_max)
+        )
+
+
+@dataclass(frozen=True)
+class Match:
+    id: int
+    score: float
+
+
+class _Columns:
+    """Column arrays with an id -> row map; removed rows stay masked until compaction."""
+
+    def __init__(self, dtypes: Dict[str, Any]):
+        self._dtypes = dtypes
+        self._reset(0)
+
+    def _reset(self, capacity: int) -> None:
+        self._arrays = {name: np.zeros(capacity, dtype) for name, dtype in self._dtypes.items()}
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._rows: Dict[int, int] = {}
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def load(self, columns: Dict[str, np.ndarray]) -> None:
+        count = len(columns["id"])
+        self._reset(max(_MIN_CAPACITY, count))
+        for name, array in self._arrays.items():
+            array[:count] = columns[name]
+        self._alive[:count] = True
+        self._rows = {int(item_id): row for row, item_id in enumerate(columns["id"])}
+        self._size = count
+
+    def put(self, columns: Dict[str, np.ndarray]) -> None:
+        """Insert or replace the rows in ``columns``."""
+        for i, item_id in enumerate(columns["id"].tolist()):
+            self.remove(item_id)
+            if self._size == self._alive.size:
+                self._grow()
+            row = self._size
+            for name, array in self._arrays.items():
+                array[row] = columns[name][i]
+            self._alive[row] = True
+            self._rows[item_id] = row
+            self._size += 1
+
+    def remove(self, item_id: int) -> None:
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return
+        self._alive[row] = False
+        if self._size > _MIN_CAPACITY and len(self._rows) < self._size // 2:
+            self._compact()
+
+    def _grow(self) -> None:
+        capacity = max(_MIN_CAPACITY, self._alive.size * 2)
+        for name, array in self._arrays.items():
+            grown = np.zeros(capacity, array.dtype)
+            grown[: self._size] = array[: self._size]
+            self._arrays[name] = grown
+        alive = np.zeros(capacity, dtype=bool)
+        alive[: self._size] = self._alive[: self._size]
+        self._alive = alive
+
+    def _compact(self) -> None:
+        keep = np.flatnonzero(self._alive[: self._size])
+        for array in self._arrays.values():
+            array[: keep.size] = array[keep]
+        self._alive[: keep.size] = True
+        self._alive[keep.size :] = False
+        self._size = int(keep.size)
+        ids = self._arrays["id"][: self._size]
+        self._rows = {int(item_id): row for row, item_id in enumerate(ids)}
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._arrays[name][: self._size]
+
+    @property
+    def alive(self) -> np.ndarray:
+        return self._alive[: self._size]
+
+
+def _bounds(values: Sequence[Optional[float]], default: float) -> np.ndarray:
+    """Float column with missing (or non-positive) bounds replaced by ``default``."""
+    array = np.array(values, dtype=np.float64)
+    array[np.isnan(array) | (array <= 0)] = default
+    return array
+
+
+def _first(columns: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    return {name: values[0] for name, values in columns.items()}
+
+
+def _ranked(
+    ids: np.ndarray, mask: np.ndarray, score: np.ndarray, tiebreak: np.ndarray, limit: int
+) -> Tuple[int, List[Match]]:
+    hits = np.flatnonzero(mask)
+    if hits.size > limit:
+        # Everything scoring at least the limit-th best, so ties are broken in full.
+        threshold = np.partition(score[hits], hits.size - limit)[hits.size - limit]
+        candidates = hits[score[hits] >= threshold]
+    else:
+        candidates = hits
+    order = np.lexsort((-tiebreak[candidates], -score[candidates]))[:limit]
+    top = candidates[order]
+    matches = [Match(id=int(i), score=round(float(s), 3)) for i, s in zip(ids[top], score[top])]
+    return int(hits.size), matches
+
+
+class LeadMatcher:
+    def __init__(self):
+        self._leads = _Columns(_LEAD_DTYPES)
+        self._properties = _Columns(_PROPERTY_DTYPES)
+        self._places: Dict[str, int] = {}
+        # Raw place text -> code, so repeated spellings skip normalization.
+        self._raw_places: Dict[Optional[str], int] = {}
+        self._stale = {"leads": StaleRows(), "properties": StaleRows()}
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---- records ----
+
+    def _place(self, name: Optional[str]) -> int:
+        code = self._raw_places.get(name)
+        if code is None:
+            key = (name or "").split(",")[0].strip().lower()
+            code = self._places.setdefault(key, len(self._places)) if key else -1
+            self._raw_places[name] = code
+        return code
+
+    def _preference_columns(
+        self,
+        locations: Sequence[Optional[str]],
+        property_types: Sequence[Optional[str]],
+        budget_min: Sequence[Optional[float]],
+        budget_max: Sequence[Optional[float]],
+        size_min: Sequence[Optional[float]],
+        size_max: Sequence[Optional[float]],
+    ) -> Dict[str, np.ndarray]:
+        low, high = _bounds(budget_min, 0.0), _bounds(budget_max, np.inf)
+        return {
+            "place": np.array([self._place(value) for value in locations], dtype=np.int32),
+            "type": np.array([_type_code(value) for value in property_types], dtype=np.int16),
+            "budget_min": low,
+            "budget_max": high,
+            "budget_stated": (low > 0) | np.isfinite(high),
+            "size_min": _bounds(size_min, 0.0),
+            "size_max": _bounds(size_max, np.inf),
+        }
+
+    def _lead_columns(self, rows: Sequence[Sequence[Any]]) -> Dict[str, np.ndarray]:
+        """Columns for rows of ``_LEAD_COLUMNS``."""
+        ids, locations, types, budget_min, budget_max, size_min, size_max, scores = (
+            zip(*rows) if rows else [()] * len(_LEAD_COLUMNS)
+        )
+        columns = self._preference_columns(
+            locations, types, budget_min, budget_max, size_min, size_max
+        )
+        columns["id"] = np.array(ids, dtype=np.int64)
+        columns["lead_score"] = _bounds(scores, 0.0)
+        return columns
+
+    def _property_columns(self, rows: Sequence[Sequence[Any]]) -> Dict[str, np.ndarray]:
+        """Columns for rows of ``_PROPERTY_COLUMNS``."""
+        ids, cities, localities, types, prices, sizes = (
+            zip(*rows) if rows else [()] * len(_PROPERTY_COLUMNS)
+        )
+        return {
+            "id": np.array(ids, dtype=np.int64),
+            "city": np.array([self._place(value) for value in cities], dtype=np.int32),
+            "locality": np.array([self._place(value) for value in localities], dtype=np.int32),
+            "type": np.array([_type_code(value) for value in types], dtype=np.int16),
+            "price": np.array(prices, dtype=np.float64),
+            "size": np.array(sizes, dtype=np.float64),
+        }
+
+    # ---- maintenance ----
+
+    def invalidate(self, side: str, ids: Iterable) -> None:
+        """Refetch these rows of ``side`` (or reload it for ``"*"``) before the next match."""
+        self._stale[side].mark(ids)
+
+    def clear(self) -> None:
+        self.invalidate("leads", [RELOAD])
+        self.invalidate("properties", [RELOAD])
+
+    def _fresh(self) -> bool:
+        return all(stale.fresh for stale in self._stale.values())
+
+    async def _sync(self) -> None:
+        if self._fresh():
+            return
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            if self._fresh():
+                return
+            sources = (
+                ("leads", self._leads, _LEAD_COLUMNS, _open_leads(), self._lead_columns),
+                (
+                    "properties",
+                    self._properties,
+                    _PROPERTY_COLUMNS,
+                    _available_properties(),
+                    self._property_columns,
+                ),
+            )
+            for side, table, columns, criteria, to_columns in sources:
+                stale = self._stale[side]
+                if stale.fresh:
+                    continue
+                ids = stale.take()
+                statement = select(*columns).where(*criteria)
+                if ids is not None:
+                    statement = statement.where(columns[0].in_(ids))
+                try:
+                    async with async_session_maker() as db:
+                        rows = (await db.execute(statement)).all()
+                except Exception:
+                    stale.restore(ids)
+                    raise
+                if ids is None:
+                    table.load(to_columns(rows))
+                    continue
+                for item_id in ids:
+                    table.remove(item_id)
+                table.put(to_columns(rows))
+
+    # ---- matching ----
+
+    async def properties_for(
+        self, preferences: Preferences, *, limit: int
+    ) -> Tuple[int, List[Match]]:
+        """``(total, best matches)`` among available listings for a set of preferences."""
+        await self._sync()
+        lead = _first(
+            self._preference_columns(
+                [preferences.location],
+                [preferences.property_type],
+                [preferences.budget_min],
+                [preferences.budget_max],
+                [preferences.size_min],
+                [preferences.size_max],
+            )
+        )
+        table = self._properties
+        tolerance = settings.lead_match_budget_tolerance
+        price = table["price"]
+
+        mask = table.alive.copy()
+        location = np.full(price.size, _ANYWHERE_SCORE)
+        if lead["place"] >= 0:
+            in_locality = table["locality"] == lead["place"]
+            in_city = table["city"] == lead["place"]
+            mask &= in_locality | in_city
+            location = np.where(in_locality, _LOCALITY_SCORE, _CITY_SCORE)
+        if lead["type"] >= 0:
+            mask &= table["type"] == lead["type"]
+        mask &= price >= lead["budget_min"] * (1 - tolerance)
+        mask &= price <= lead["budget_max"] * (1 + tolerance)
+        mask &= (table["size"] >= lead["size_min"]) & (table["size"] <= lead["size_max"])
+        budget = np.full(price.size, 0.5)
+        if lead["budget_stated"]:
+            in_budget = (price >= lead["budget_min"]) & (price <= lead["budget_max"])
+            budget = np.where(in_budget, 1.0, 0.5)
+
+        score = _LOCATION_WEIGHT * location + _BUDGET_WEIGHT * budget
+        # Newest listings first among equal scores.
+        return _ranked(table["id"], mask, score, table["id"], limit)
+
+    async def leads_for(self, listing, *, limit: int) -> Tuple[int, List[Match]]:
+        """``(total, best matches)`` among open leads for a listing (any object with
+        ``id``, ``city``, ``locality``, ``property_type``, ``price`` and ``size_sqft``)."""
+        await self._sync()
+        listing = _first(
+            self._property_columns(
+                [
+                    (
+                        listing.id,
+                        listing.city,
+                        listing.locality,
+                        listing.property_type,
+                        listing.price,
+                        listing.size_sqft,
+                    )
+                ]
+            )
+        )
+        table = self._leads
+        tolerance = settings.lead_match_budget_tolerance
+        place, price = table["place"], listing["price"]
+
+        in_locality = (place >= 0) & (place == listing["locality"])
+        in_city = (place >= 0) & (place == listing["city"])
+        mask = table.alive & ((place < 0) | in_locality | in_city)
+        mask &= (table["type"] < 0) | (table["type"] == listing["type"])
+        mask &= price >= table["budget_min"] * (1 - tolerance)
+        mask &= price <= table["budget_max"] * (1 + tolerance)
+        mask &= (listing["size"] >= table["size_min"]) & (listing["size"] <= table["size_max"])
+        location = np.where(
+            in_locality, _LOCALITY_SCORE, np.where(in_city, _CITY_SCORE, _ANYWHERE_SCORE)
+        )
+        in_budget = (price >= table["budget_min"]) & (price <= table["budget_max"])
+        budget = np.where(table["budget_stated"] & in_budget, 1.0, 0.5)
+
+        score = _LOCATION_WEIGHT * location + _BUDGET_WEIGHT * budget
+        # Higher scored leads first among equal scores.
+        return _ranked(table["id"], mask, score, table["lead_score"], limit)
+
+
+def _open_leads() -> tuple:
+    return (
+        Lead.status.not_in(_CLOSED_STATUSES),
+        or_(
+            Lead.preferred_location.is_not(None),
+            Lead.preferred_property_type.is_not(None),
+            Lead.budget_min.is_not(None),
+            Lead.budget_max.is_not(None),
+        ),
+    )
+
+
+def _available_properties() -> tuple:
+    return (Property.status == PropertyStatus.AVAILABLE.value, Property.is_active.is_(True))
+
+
+lead_matcher = LeadMatcher()
+
+# Columns that affect matching, per side; bulk updates that set none of them
+# (AI summaries, scores) are ignored.
+_WATCHED = {
+    "leads": {column.key for column in _LEAD_COLUMNS} | {"status"},
+    "properties": {column.key for column in _PROPERTY_COLUMNS} | {"status", "is_active"},
+}
+WriteWatcher(
+    "lead_matching_leads",
+    Lead,
+    partial(lead_matcher.invalidate, "leads"),
+    columns=_WATCHED["leads"],
+)
+WriteWatcher(
+    "lead_matching_properties",
+    Property,
+    partial(lead_matcher.invalidate, "properties"),
+    columns=_WATCHED["properties"],
+)
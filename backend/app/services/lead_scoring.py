@@ -0,0 +1,296 @@
+"""Batch lead scoring for the follow-up queue.
+
+Computes the same quality score, conversion likelihood and engagement level as
+``build_heuristic_summary`` for many leads at once: lead columns and per-lead
+aggregates of the latest calls are loaded column-wise a chunk at a time, scored
+with NumPy and written back with one executemany UPDATE per chunk. Incremental
+runs only visit leads whose row, calls or appointments changed since they were
+last scored, or whose score has since moved with time alone: the last contact
+aged past a step of the contact bonus, or an upcoming appointment started.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import and_, bindparam, exists, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.lead import Lead
+from app.services.lead_summary_service import (
+    DEFAULT_BASE_SCORE,
+    QUALITY_BASE_SCORES,
+    RECENT_CALLS,
+    STATUS_SCORE_BOOSTS,
+)
+from app.utils.logging import get_logger
+
+logger = get_logger("services.lead_scoring")
+
+ENGAGEMENT_LEVELS = np.array(["low", "medium", "high"])
+# Contact ages at which the contact bonus in ``compute_scores`` changes: it
+# counts whole days, so "<= 2 days" ends three days after the last contact.
+_CONTACT_AGE_STEPS = (timedelta(days=3), timedelta(days=8), timedelta(days=30))
+_UPCOMING_STATUSES = ("scheduled", "confirmed")
+# Appointments still count as upcoming this long after their start time.
+_APPOINTMENT_GRACE = timedelta(minutes=1)
+
+
+@dataclass
+class LeadScores:
+    lead_ids: np.ndarray
+    scores: np.ndarray
+    likelihoods: np.ndarray
+    engagement: np.ndarray
+
+
+def _lookup(values: Sequence[Optional[str]], table: dict, default: float) -> np.ndarray:
+    """Map a string column through ``table`` once per distinct value."""
+    keys = np.array(["" if v is None else v for v in values], dtype=object)
+    if keys.size == 0:
+        return np.zeros(0)
+    distinct, inverse = np.unique(keys, return_inverse=True)
+    return np.array([table.get(k, default) for k in distinct], dtype=float)[inverse]
+
+
+def compute_scores(
+    quality: Sequence[Optional[str]],
+    status: Sequence[Optional[str]],
+    days_since_contact: np.ndarray,
+    follow_up_count: np.ndarray,
+    recent_calls: np.ndarray,
+    sentiment_avg: np.ndarray,
+    satisfaction_avg: np.ndarray,
+    has_future_appointment: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorised ``build_heuristic_summary`` scoring.
+
+    Missing contact dates and averages are NaN. Returns quality scores,
+    conversion likelihoods and engagement level indexes into ``ENGAGEMENT_LEVELS``.
+    """
+    score = _lookup(quality, QUALITY_BASE_SCORES, DEFAULT_BASE_SCORE)
+    score += _lookup(status, STATUS_SCORE_BOOSTS, 0)
+
+    days = days_since_contact  # NaN compares False, so leads never contacted get 0
+    score += np.select([days <= 2, days <= 7, days >= 30], [6.0, 3.0, -6.0], default=0.0)
+
+    has_sentiment = ~np.isnan(sentiment_avg)
+    has_satisfaction = ~np.isnan(satisfaction_avg)
+    score += np.where(has_sentiment, np.nan_to_num(sentiment_avg) * 10.0, 0.0)
+    score += np.where(has_satisfaction, (np.nan_to_num(satisfaction_avg) - 3.0) * 4.0, 0.0)
+    score += np.where(has_future_appointment, 10.0, 0.0)
+
+    scores = np.clip(np.round(score), 0, 100).astype(np.int64)
+    likelihoods = np.clip(
+        np.round(scores * 0.95 + np.where(has_future_appointment, 5.0, 0.0)), 0, 100
+    ).astype(np.int64)
+
+    engagement = np.where((recent_calls >= 2) | (follow_up_count >= 2), 1, 0)
+    positive = has_sentiment & (np.nan_to_num(sentiment_avg) > 0.25)
+    engagement = np.where((scores >= 70) | positive, 2, engagement)
+    return scores, likelihoods, engagement
+
+
+def _days_since(values: Sequence[Optional[datetime]], now: datetime) -> np.ndarray:
+    stamps = np.array(
+        [
+            np.nan
+            if v is None
+            else (v if v.tzinfo else v.replace(tzinfo=timezone.utc)).timestamp()
+            for v in values
+        ],
+        dtype=float,
+    )
+    return np.floor((now.timestamp() - stamps) / 86400.0)
+
+
+def _aligned(lead_ids: np.ndarray, keys: Sequence[int], values: Sequence, fill: float) -> np.ndarray:
+    """Scatter per-lead aggregate ``values`` onto the sorted ``lead_ids`` array."""
+    out = np.full(lead_ids.size, fill, dtype=float)
+    if keys:
+        positions = np.searchsorted(lead_ids, np.asarray(keys, dtype=np.int64))
+        out[positions] = np.array([fill if v is None else v for v in values], dtype=float)
+    return out
+
+
+async def score_chunk(db: AsyncSession, lead_ids: Sequence[int], now: datetime) -> LeadScores:
+    ids = np.sort(np.asarray(lead_ids, dtype=np.int64))
+    id_list = ids.tolist()
+
+    lead_rows = (
+        await db.execute(
+            select(
+                Lead.id,
+                Lead.quality,
+                Lead.status,
+                Lead.last_contacted_at,
+                Lead.follow_up_count,
+            )
+            .where(Lead.id.in_(id_list))
+            .order_by(Lead.id)
+        )
+    ).all()
+    ids = np.array([row[0] for row in lead_rows], dtype=np.int64)
+    _, quality, status, last_contacted, follow_ups = zip(*lead_rows) if lead_rows else ((),) * 5
+
+    ranked = (
+        select(
+            Call.lead_id,
+            Call.sentiment_score,
+            Call.customer_satisfaction,
+            func.row_number()
+            .over(partition_by=Call.lead_id, order_by=(Call.created_at.desc(), Call.id.desc()))
+            .label("rn"),
+        )
+        .where(Call.lead_id.in_(id_list))
+        .subquery()
+    )
+    call_rows = (
+        await db.execute(
+            select(
+                ranked.c.lead_id,
+                func.count(),
+                func.avg(ranked.c.sentiment_score),
+                func.avg(ranked.c.customer_satisfaction),
+            )
+            .where(ranked.c.rn <= RECENT_CALLS)
+            .group_by(ranked.c.lead_id)
+        )
+    ).all()
+    call_lead_ids, call_counts, sentiments, satisfactions = (
+        zip(*call_rows) if call_rows else ((), (), (), ())
+    )
+
+    appointment_rows = (
+        await db.execute(
+            select(Appointment.lead_id)
+            .where(
+                Appointment.lead_id.in_(id_list),
+                Appointment.status.in_(_UPCOMING_STATUSES),
+                Appointment.scheduled_for >= now - _APPOINTMENT_GRACE,
+            )
+            .distinct()
+        )
+    ).scalars().all()
+
+    scores, likelihoods, engagement = compute_scores(
+        quality=quality,
+        status=status,
+        days_since_contact=_days_since(last_contacted, now),
+        follow_up_count=np.array([n or 0 for n in follow_ups], dtype=float),
+        recent_calls=_aligned(ids, call_lead_ids, call_counts, 0.0),
+        sentiment_avg=_aligned(ids, call_lead_ids, sentiments, np.nan),
+        satisfaction_avg=_aligned(ids, call_lead_ids, satisfactions, np.nan),
+        has_future_appointment=np.isin(ids, np.asarray(appointment_rows, dtype=np.int64)),
+    )
+    return LeadScores(ids, scores, likelihoods, ENGAGEMENT_LEVELS[engagement])
+
+
+async def _write_scores(db: AsyncSession, batch: LeadScores, scored_at: datetime) -> None:
+    if batch.lead_ids.size == 0:
+        return
+    leads = Lead.__table__
+    statement = (
+        update(leads)
+        .where(leads.c.id == bindparam("lead_pk"))
+        .values(
+            lead_score=bindparam("score"),
+            conversion_likelihood=bindparam("likelihood"),
+            engagement_level=bindparam("engagement"),
+            lead_scored_at=bindparam("scored_at"),
+            # Scoring is derived data; leave updated_at (and summary fingerprints) alone.
+            updated_at=leads.c.updated_at,
+        )
+    )
+    await db.execute(
+        statement,
+        [
+            {
+                "lead_pk": int(lead_id),
+                "score": int(score),
+                "likelihood": int(likelihood),
+                "engagement": str(level),
+                "scored_at": scored_at,
+            }
+            for lead_id, score, likelihood, level in zip(
+                batch.lead_ids, batch.scores, batch.likelihoods, batch.engagement
+            )
+        ],
+    )
+
+
+def _later(dialect: str, column, offset: timedelta, other):
+    """``column + offset > other``; SQLite has no interval arithmetic on timestamps."""
+    if dialect == "sqlite":
+        return func.julianday(column) + offset.total_seconds() / 86400 > func.julianday(other)
+    return column + offset > other
+
+
+def _needs_scoring(dialect: str, now: datetime):
+    since = Lead.lead_scored_at
+    contact_aged = [
+        and_(
+            Lead.last_contacted_at <= now - step,
+            _later(dialect, Lead.last_contacted_at, step, since),
+        )
+        for step in _CONTACT_AGE_STEPS
+    ]
+    appointment_passed = exists().where(
+        and_(
+            Appointment.lead_id == Lead.id,
+            Appointment.status.in_(_UPCOMING_STATUSES),
+            Appointment.scheduled_for < now - _APPOINTMENT_GRACE,
+            _later(dialect, Appointment.scheduled_for, _APPOINTMENT_GRACE, since),
+        )
+    )
+    return or_(
+        since.is_(None),
+        Lead.updated_at > since,
+        exists().where(and_(Call.lead_id == Lead.id, Call.updated_at > since)),
+        exists().where(and_(Appointment.lead_id == Lead.id, Appointment.updated_at > since)),
+        *contact_aged,
+        appointment_passed,
+    )
+
+
+async def score_leads(db: AsyncSession, full: bool = False, batch_size: Optional[int] = None) -> int:
+    """Score every lead (``full``) or only leads touched since their last score.
+
+    Returns the number of leads scored. Each chunk is committed on its own so a
+    long run holds no long transaction.
+    """
+    batch_size = batch_size or settings.lead_score_batch_size
+    now = datetime.now(timezone.utc)
+    # Timestamps written by the database have whole-second precision; step back
+    # one second so a change racing this run is picked up by the next one.
+    scored_at = now - timedelta(seconds=1)
+    dialect = db.get_bind().dialect.name
+
+    scored = 0
+    last_id = 0
+    while True:
+        query = select(Lead.id).where(Lead.id > last_id).order_by(Lead.id).limit(batch_size)
+        if not full:
+            query = query.where(_needs_scoring(dialect, now))
+        lead_ids = (await db.execute(query)).scalars().all()
+        if not lead_ids:
+            break
+        batch = await score_chunk(db, lead_ids, now)
+        await _write_scores(db, batch, scored_at)
+        await db.commit()
+        scored += int(batch.lead_ids.size)
+        last_id = lead_ids[-1]
+
+    logger.info("lead_scores_refreshed", scored=scored, full=full)
+    return scored
+
+
+async def refresh_scores(full: bool = False) -> int:
+    """``score_leads`` in a session of its own, for runs in the background."""
+    async with async_session_maker() as db:
+        return await score_leads(db, full=full)
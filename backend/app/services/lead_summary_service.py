@@ -0,0 +1,438 @@
+"""Persisted, fingerprinted lead AI summaries.
+
+A summary is stored on the lead together with a fingerprint of what it was built
+from (the lead's ``updated_at``, its latest calls' ids and ``updated_at`` and
+whether a visit is booked). Requests are served from the stored copy while the
+fingerprint matches; otherwise one generation per lead runs at a time and every
+concurrent caller awaits it. Leads whose summaries have been served are
+regenerated in the background shortly after new call data lands.
+"""
+
+import asyncio
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, event, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.appointment import Appointment
+from app.models.call import Call
+from app.models.lead import Lead, LeadQuality, LeadStatus
+from app.schemas.lead import LeadAiSummaryResponse
+from app.services.llm_gateway import LLMGatewayError, llm_gateway
+from app.utils.logging import get_logger
+
+logger = get_logger("services.lead_summary")
+
+RECENT_CALLS = 5
+
+# Score tables shared with the batch scorer in ``lead_scoring``.
+QUALITY_BASE_SCORES = {
+    LeadQuality.COLD.value: 30,
+    LeadQuality.WARM.value: 60,
+    LeadQuality.HOT.value: 85,
+}
+DEFAULT_BASE_SCORE = 40
+STATUS_SCORE_BOOSTS = {
+    LeadStatus.NEW.value: 0,
+    LeadStatus.CONTACTED.value: 5,
+    LeadStatus.QUALIFIED.value: 12,
+    LeadStatus.NEGOTIATING.value: 18,
+    LeadStatus.CONVERTED.value: 35,
+    LeadStatus.LOST.value: -25,
+}
+_SESSION_INFO_KEY = "lead_summary_refresh"
+
+
+def _clamp_int(value: float, min_value: int, max_value: int) -> int:
+    return max(min_value, min(max_value, int(round(value))))
+
+
+def build_heuristic_summary(
+    lead: Lead,
+    calls: List[Call],
+    has_future_appointment: bool,
+) -> LeadAiSummaryResponse:
+    score = float(QUALITY_BASE_SCORES.get(lead.quality, DEFAULT_BASE_SCORE))
+    score += float(STATUS_SCORE_BOOSTS.get(lead.status, 0))
+
+    if lead.last_contacted_at:
+        last_contacted_at = lead.last_contacted_at
+        if last_contacted_at.tzinfo is None:
+            last_contacted_at = last_contacted_at.replace(tzinfo=timezone.utc)
+        days = (datetime.now(timezone.utc) - last_contacted_at).days
+        if days <= 2:
+            score += 6
+        elif days <= 7:
+            score += 3
+        elif days >= 30:
+            score -= 6
+
+    recent_calls = calls[:5]
+    sentiment_values = [
+        c.sentiment_score for c in recent_calls if c.sentiment_score is not None
+    ]
+    satisfaction_values = [
+        c.customer_satisfaction for c in recent_calls if c.customer_satisfaction is not None
+    ]
+    if sentiment_values:
+        score += float(sum(sentiment_values) / len(sentiment_values)) * 10.0
+    if satisfaction_values:
+        score += (float(sum(satisfaction_values) / len(satisfaction_values)) - 3.0) * 4.0
+
+    if has_future_appointment:
+        score += 10
+
+    lead_quality_score = _clamp_int(score, 0, 100)
+    likelihood_to_convert = _clamp_int(
+        lead_quality_score * 0.95 + (5 if has_future_appointment else 0),
+        0,
+        100,
+    )
+
+    engagement_level = "low"
+    if len(recent_calls) >= 2 or lead.follow_up_count >= 2:
+        engagement_level = "medium"
+    if lead_quality_score >= 70 or (
+        sentiment_values and sum(sentiment_values) / len(sentiment_values) > 0.25
+    ):
+        engagement_level = "high"
+
+    recommended_next_actions: List[str] = []
+    if lead.status in {LeadStatus.NEW.value, LeadStatus.CONTACTED.value}:
+        recommended_next_actions.append("Call within 24 hours and confirm needs.")
+    if (
+        lead.status in {LeadStatus.QUALIFIED.value, LeadStatus.NEGOTIATING.value}
+        and not has_future_appointment
+    ):
+        recommended_next_actions.append("Propose a site visit and share 2–3 matching options.")
+    if has_future_appointment:
+        recommended_next_actions.append("Confirm appointment details and send location/address.")
+    if lead.status == LeadStatus.LOST.value:
+        recommended_next_actions.append("Mark reason for loss and set a re-engagement reminder.")
+    if not recommended_next_actions:
+        recommended_next_actions.append("Review recent interactions and plan the next touchpoint.")
+
+    key_conversation_points: List[str] = []
+    for c in recent_calls:
+        if c.transcript_summary:
+            chunks = [p.strip() for p in c.transcript_summary.split(".") if p.strip()]
+            for chunk in chunks[:2]:
+                if chunk not in key_conversation_points:
+                    key_conversation_points.append(chunk)
+        if len(key_conversation_points) >= 5:
+            break
+    if not key_conversation_points:
+        if lead.preferred_location:
+            key_conversation_points.append(f"Preferred location: {lead.preferred_location}")
+        if lead.budget_max:
+            key_conversation_points.append(f"Budget up to: ₹{lead.budget_max}")
+
+    patterns: List[str] = []
+    if len(recent_calls) >= 3:
+        patterns.append("Multiple touchpoints recorded; follow up consistency matters.")
+    if sentiment_values and sum(sentiment_values) / len(sentiment_values) < -0.2:
+        patterns.append("Negative sentiment trend; address objections directly.")
+    if lead.follow_up_count >= 3:
+        patterns.append("High follow-up count; consider escalation or alternative channel.")
+    if not patterns:
+        patterns.append("No strong patterns detected yet.")
+
+    return LeadAiSummaryResponse(
+        lead_id=lead.id,
+        lead_quality_score=lead_quality_score,
+        engagement_level=engagement_level,
+        likelihood_to_convert=likelihood_to_convert,
+        recommended_next_actions=recommended_next_actions,
+        key_conversation_points=key_conversation_points,
+        patterns=patterns,
+        generated_at=datetime.now(ZoneInfo("Asia/Kolkata")),
+        source_call_ids=[c.id for c in recent_calls],
+    )
+
+
+async def _generate_via_llm(
+    lead: Lead,
+    calls: List[Call],
+    has_future_appointment: bool,
+) -> Optional[LeadAiSummaryResponse]:
+    if not llm_gateway.configured:
+        return None
+
+    call_payload = []
+    for c in calls[:5]:
+        call_payload.append(
+            {
+                "id": c.id,
+                "created_at": c.created_at.isoformat() if c.created_at else None,
+                "direction": c.direction,
+                "status": c.status,
+                "outcome": c.outcome,
+                "outcome_notes": c.outcome_notes,
+                "sentiment_score": c.sentiment_score,
+                "customer_satisfaction": c.customer_satisfaction,
+                "transcript_summary": c.transcript_summary,
+            }
+        )
+
+    system_text = (
+        "You generate concise, actionable lead insights for a sales CRM. "
+        "Return ONLY valid JSON. Do not include markdown."
+    )
+
+    user_text = json.dumps(
+        {
+            "lead": {
+                "id": lead.id,
+                "name": lead.name,
+                "phone": lead.phone,
+                "email": lead.email,
+                "quality": lead.quality,
+                "status": lead.status,
+                "source": lead.source,
+                "preferred_location": lead.preferred_location,
+                "preferred_property_type": lead.preferred_property_type,
+                "budget_min": lead.budget_min,
+                "budget_max": lead.budget_max,
+                "follow_up_count": lead.follow_up_count,
+                "last_contacted_at": (
+                    lead.last_contacted_at.isoformat() if lead.last_contacted_at else None
+                ),
+                "updated_at": lead.updated_at.isoformat() if lead.updated_at else None,
+            },
+            "recent_calls": call_payload,
+            "has_future_appointment": has_future_appointment,
+            "required_output_schema": {
+                "lead_quality_score": "integer 0-100",
+                "engagement_level": "one of: low, medium, high",
+                "likelihood_to_convert": "integer 0-100",
+                "recommended_next_actions": "array of strings",
+                "key_conversation_points": "array of strings",
+                "patterns": "array of strings",
+            },
+        },
+        ensure_ascii=False,
+    )
+
+    try:
+        parsed = await llm_gateway.complete_json(
+            [
+                {"role": "system", "content": system_text},
+                {"role": "user", "content": user_text},
+            ],
+            purpose="summary",
+            temperature=0.2,
+        )
+        return LeadAiSummaryResponse(
+            lead_id=lead.id,
+            lead_quality_score=_clamp_int(parsed.get("lead_quality_score", 50), 0, 100),
+            engagement_level=str(parsed.get("engagement_level", "medium")),
+            likelihood_to_convert=_clamp_int(parsed.get("likelihood_to_convert", 50), 0, 100),
+            recommended_next_actions=[
+                str(x) for x in (parsed.get("recommended_next_actions") or [])
+            ],
+            key_conversation_points=[str(x) for x in (parsed.get("key_conversation_points") or [])],
+            patterns=[str(x) for x in (parsed.get("patterns") or [])],
+            generated_at=datetime.now(ZoneInfo("Asia/Kolkata")),
+            source_call_ids=[c.id for c in calls[:5]],
+        )
+    except (LLMGatewayError, ValueError, TypeError):
+        return None
+
+
+def _iso(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+
+def summary_fingerprint(
+    lead: Lead,
+    call_versions: Sequence[tuple[int, Optional[datetime]]],
+    has_future_appointment: bool,
+) -> str:
+    parts = [str(lead.id), _iso(lead.updated_at), str(has_future_appointment)]
+    parts.extend(f"{call_id}:{_iso(updated_at)}" for call_id, updated_at in call_versions)
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def _summary_text(summary: LeadAiSummaryResponse) -> str:
+    """Plain-text rendering stored in ``Lead.ai_summary`` for list and dashboard views."""
+    points = summary.key_conversation_points[:3] + summary.recommended_next_actions[:1]
+    return " ".join(p.rstrip(".") + "." for p in points if p)
+
+
+def _stored_summary(lead: Lead) -> Optional[LeadAiSummaryResponse]:
+    if not lead.ai_summary_payload:
+        return None
+    try:
+        return LeadAiSummaryResponse.model_validate_json(lead.ai_summary_payload)
+    except ValueError:
+        return None
+
+
+async def _has_future_appointment(db: AsyncSession, lead_id: int) -> bool:
+    now_utc = datetime.now(timezone.utc)
+    result = await db.execute(
+        select(func.count())
+        .select_from(Appointment)
+        .where(
+            and_(
+                Appointment.lead_id == lead_id,
+                Appointment.status.in_(["scheduled", "confirmed"]),
+                Appointment.scheduled_for >= now_utc - timedelta(minutes=1),
+            )
+        )
+    )
+    return (result.scalar() or 0) > 0
+
+
+class LeadSummaryService:
+    def __init__(self) -> None:
+        self._inflight: Dict[int, asyncio.Task] = {}
+        # Leads with a stored summary that this process has served; only these are
+        # refreshed in the background, everything else is generated on first view.
+        self._tracked: Set[int] = set()
+        self._pending: Set[int] = set()
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    async def get_summary(self, db: AsyncSession, lead: Lead) -> LeadAiSummaryResponse:
+        """Return the stored summary when current, else the shared regeneration.
+
+        A stale stored summary is returned immediately (flagged ``is_stale``) while
+        the regeneration runs in the background.
+        """
+        versions = await db.execute(
+            select(Call.id, Call.updated_at)
+            .where(Call.lead_id == lead.id)
+            .order_by(Call.created_at.desc(), Call.id.desc())
+            .limit(RECENT_CALLS)
+        )
+        fingerprint = summary_fingerprint(
+            lead,
+            [tuple(row) for row in versions.all()],
+            await _has_future_appointment(db, lead.id),
+        )
+        stored = _stored_summary(lead)
+        if stored is not None:
+            self._tracked.add(lead.id)
+            if lead.ai_summary_fingerprint == fingerprint:
+                return stored
+            self.refresh(lead.id)
+            return stored.model_copy(update={"is_stale": True})
+
+        summary = await asyncio.shield(self.refresh(lead.id))
+        if summary is None:
+            raise LookupError(f"Lead {lead.id} not found")
+        return summary
+
+    def refresh(self, lead_id: int) -> asyncio.Task:
+        """Start (or join) the regeneration of one lead's summary."""
+        task = self._inflight.get(lead_id)
+        if task is None:
+            task = asyncio.get_running_loop().create_task(self._regenerate(lead_id))
+            self._inflight[lead_id] = task
+            task.add_done_callback(lambda _: self._inflight.pop(lead_id, None))
+        return task
+
+    async def _regenerate(self, lead_id: int) -> Optional[LeadAiSummaryResponse]:
+        async with async_session_maker() as db:
+            lead = (await db.execute(select(Lead).where(Lead.id == lead_id))).scalar_one_or_none()
+            if lead is None:
+                return None
+            calls_result = await db.execute(
+                select(Call)
+                .where(Call.lead_id == lead_id)
+                .order_by(Call.created_at.desc(), Call.id.desc())
+                .limit(RECENT_CALLS)
+            )
+            calls = list(calls_result.scalars().all())
+            has_future_appointment = await _has_future_appointment(db, lead_id)
+            fingerprint = summary_fingerprint(
+                lead, [(c.id, c.updated_at) for c in calls], has_future_appointment
+            )
+
+            summary = await _generate_via_llm(lead, calls, has_future_appointment)
+            if summary is None:
+                summary = build_heuristic_summary(lead, calls, has_future_appointment)
+
+            # Keep updated_at as is: it is part of the fingerprint.
+            await db.execute(
+                update(Lead)
+                .where(Lead.id == lead_id)
+                .values(
+                    ai_summary=_summary_text(summary),
+                    ai_summary_payload=summary.model_dump_json(),
+                    ai_summary_fingerprint=fingerprint,
+                    updated_at=Lead.updated_at,
+                )
+            )
+            await db.commit()
+        self._tracked.add(lead_id)
+        logger.info("lead_summary_generated", lead_id=lead_id, calls=len(calls))
+        return summary
+
+    def track(self, lead_ids: Iterable[int]) -> Set[int]:
+        return {lead_id for lead_id in lead_ids if lead_id in self._tracked}
+
+    def schedule(self, lead_ids: Set[int]) -> None:
+        """Queue background refreshes, coalescing bursts of call updates."""
+        self._pending.update(lead_ids)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._refresh_task = loop.create_task(self._refresh_pending())
+
+    async def _refresh_pending(self) -> None:
+        # Leads scheduled while a batch refreshes are picked up by the next pass;
+        # ``schedule`` does not start a second task while this one is running.
+        while self._pending:
+            await asyncio.sleep(settings.lead_summary_refresh_delay_seconds)
+            lead_ids, self._pending = self._pending, set()
+            for lead_id in sorted(lead_ids):
+                try:
+                    await self.refresh(lead_id)
+                except Exception as e:
+                    logger.error("lead_summary_refresh_failed", lead_id=lead_id, error=str(e))
+
+
+lead_summary_service = LeadSummaryService()
+
+
+def mark_calls_changed(session, lead_ids: Iterable[Optional[int]]) -> None:
+    """Refresh these leads' summaries once ``session`` commits (for Core writes to calls)."""
+    session = getattr(session, "sync_session", session)
+    tracked = lead_summary_service.track(lead_ids)
+    if tracked:
+        session.info.setdefault(_SESSION_INFO_KEY, set()).update(tracked)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_summary_refreshes(session: Session, flush_context) -> None:
+    mark_calls_changed(
+        session,
+        (
+            inspect(obj).dict.get("lead_id")
+            for obj in (*session.new, *session.dirty)
+            if isinstance(obj, Call)
+        ),
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _schedule_summary_refreshes(session: Session) -> None:
+    lead_ids = session.info.pop(_SESSION_INFO_KEY, None)
+    if lead_ids:
+        lead_summary_service.schedule(lead_ids)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_summary_refreshes(session: Session) -> None:
+    session.info.pop(_SESSION_INFO_KEY, None)
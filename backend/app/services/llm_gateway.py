@@ -0,0 +1,263 @@
+"""Process-wide async gateway for chat-completion calls.
+
+Every LLM request in the app goes through one ``AsyncOpenAI``/``AsyncAzureOpenAI``
+client whose httpx pool keeps connections warm. A priority semaphore caps the
+number of requests in flight and lets structured reports jump ahead of lead
+summaries. Transient failures are retried with exponentially growing, fully
+jittered back-off, and each request's latency and token usage is recorded.
+
+``llm_base_url`` (or an injected httpx transport) points the gateway at any
+OpenAI-compatible endpoint, such as a local fake server in tests.
+"""
+
+import asyncio
+import heapq
+import itertools
+import json
+import random
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncAzureOpenAI,
+    AsyncOpenAI,
+    InternalServerError,
+    RateLimitError,
+)
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger("services.llm_gateway")
+
+# Lower value is served first when requests queue for a slot.
+PURPOSE_PRIORITIES = {"report": 0, "summary": 1}
+DEFAULT_MODEL = "gpt-4o-mini"
+
+_RETRYABLE_ERRORS = (APIConnectionError, APITimeoutError, InternalServerError, RateLimitError)
+_MAX_RETRY_DELAY_SECONDS = 10.0
+
+
+class LLMGatewayError(Exception):
+    """Raised when a request fails after its retries or no LLM is configured."""
+
+
+@dataclass(frozen=True)
+class LLMUsage:
+    purpose: str
+    model: str
+    latency_ms: float
+    attempts: int
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class _PrioritySemaphore:
+    """Counting semaphore that wakes the waiter with the lowest priority value first."""
+
+    def __init__(self, slots: int):
+        self._free = slots
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    async def acquire(self, priority: int) -> None:
+        if self._free > 0 and not self._waiters:
+            self._free -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._free += 1
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        retry_base_delay_seconds: Optional[float] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+        self.timeout_seconds = timeout_seconds or settings.llm_request_timeout_seconds
+        self.max_retries = settings.llm_max_retries if max_retries is None else max_retries
+        self.retry_base_delay_seconds = (
+            settings.llm_retry_base_delay_seconds
+            if retry_base_delay_seconds is None
+            else retry_base_delay_seconds
+        )
+        self._transport = transport
+        self._client: Optional[Tuple[Any, str]] = None
+        self._slots = _PrioritySemaphore(self.max_concurrency)
+        self.recent_usage: Deque[LLMUsage] = deque(maxlen=500)
+        self.token_totals: Counter = Counter()
+
+    @property
+    def configured(self) -> bool:
+        return bool(
+            self._transport is not None
+            or settings.llm_base_url
+            or settings.openai_api_key
+            or (settings.azure_openai_api_key and settings.azure_openai_endpoint)
+        )
+
+    @property
+    def model(self) -> str:
+        """Model (or Azure deployment) that requests will be sent to."""
+        if self._transport is None and not settings.llm_base_url:
+            if settings.azure_openai_api_key and settings.azure_openai_endpoint:
+                return settings.azure_openai_deployment
+        return settings.llm_model or DEFAULT_MODEL
+
+    def _build_client(self) -> Tuple[Any, str]:
+        http_client = httpx.AsyncClient(
+            transport=self._transport,
+            timeout=self.timeout_seconds,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+        if self._transport is not None or settings.llm_base_url:
+            client = AsyncOpenAI(
+                api_key=settings.openai_api_key or "local",
+                base_url=settings.llm_base_url or "http://llm.local/v1",
+                http_client=http_client,
+                max_retries=0,
+            )
+            return client, self.model
+        if settings.azure_openai_api_key and settings.azure_openai_endpoint:
+            client = AsyncAzureOpenAI(
+                api_key=settings.azure_openai_api_key,
+                azure_endpoint=settings.azure_openai_endpoint,
+                api_version=settings.azure_openai_api_version,
+                http_client=http_client,
+                max_retries=0,
+            )
+            return client, self.model
+        client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            http_client=http_client,
+            max_retries=0,
+        )
+        return client, self.model
+
+    def _get_client(self) -> Tuple[Any, str]:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    @asynccontextmanager
+    async def _slot(self, purpose: str) -> AsyncIterator[None]:
+        await self._slots.acquire(PURPOSE_PRIORITIES.get(purpose, len(PURPOSE_PRIORITIES)))
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    def _retry_delay(self, attempt: int) -> float:
+        ceiling = min(_MAX_RETRY_DELAY_SECONDS, self.retry_base_delay_seconds * 2 ** attempt)
+        return random.uniform(0, ceiling)
+
+    async def complete(
+        self,
+        messages: List[Dict[str, str]],
+        purpose: str,
+        temperature: float = 0.2,
+        json_response: bool = False,
+    ) -> str:
+        """Run one chat completion and return the message content."""
+        if not self.configured:
+            raise LLMGatewayError("No LLM endpoint configured")
+        client, model = self._get_client()
+        kwargs: Dict[str, Any] = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "timeout": self.timeout_seconds,
+        }
+        if json_response:
+            kwargs["response_format"] = {"type": "json_object"}
+
+        started = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                async with self._slot(purpose):
+                    response = await client.chat.completions.create(**kwargs)
+                break
+            except _RETRYABLE_ERRORS as e:
+                if attempt >= self.max_retries:
+                    logger.error(
+                        "llm_request_failed", purpose=purpose, attempts=attempt + 1, error=str(e)
+                    )
+                    raise LLMGatewayError(str(e)) from e
+                await asyncio.sleep(self._retry_delay(attempt))
+                attempt += 1
+            except Exception as e:
+                logger.error("llm_request_failed", purpose=purpose, attempts=attempt + 1, error=str(e))
+                raise LLMGatewayError(str(e)) from e
+
+        self._record(purpose, model, started, attempt + 1, response)
+        return response.choices[0].message.content or ""
+
+    async def complete_json(
+        self,
+        messages: List[Dict[str, str]],
+        purpose: str,
+        temperature: float = 0.2,
+    ) -> Dict[str, Any]:
+        content = await self.complete(messages, purpose, temperature, json_response=True)
+        try:
+            parsed = json.loads(content or "{}")
+        except ValueError as e:
+            raise LLMGatewayError("LLM returned invalid JSON") from e
+        if not isinstance(parsed, dict):
+            raise LLMGatewayError("LLM returned a non-object JSON value")
+        return parsed
+
+    def _record(self, purpose: str, model: str, started: float, attempts: int, response) -> None:
+        usage = getattr(response, "usage", None)
+        record = LLMUsage(
+            purpose=purpose,
+            model=model,
+            latency_ms=round((time.perf_counter() - started) * 1000, 1),
+            attempts=attempts,
+            prompt_tokens=getattr(usage, "prompt_tokens", 0) or 0,
+            completion_tokens=getattr(usage, "completion_tokens", 0) or 0,
+        )
+        self.recent_usage.append(record)
+        self.token_totals[f"{purpose}.prompt"] += record.prompt_tokens
+        self.token_totals[f"{purpose}.completion"] += record.completion_tokens
+        logger.info(
+            "llm_request_completed",
+            purpose=purpose,
+            model=model,
+            latency_ms=record.latency_ms,
+            attempts=attempts,
+            prompt_tokens=record.prompt_tokens,
+            completion_tokens=record.completion_tokens,
+        )
+
+
+llm_gateway = LLMGateway()
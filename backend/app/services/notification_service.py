@@ -1,4 +1,5 @@
-from typing import Optional
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -33,6 +34,7 @@ class NotificationService:
         message: str,
         notification_type: NotificationType,
         related_lead_id: Optional[int] = None,
+        related_call_id: Optional[int] = None,
     ) -> Optional[Notification]:
         enabled = await self._is_enabled(user_id, notification_type)
         if not enabled:
@@ -43,21 +45,60 @@ class NotificationService:
             type=notification_type.value,
             is_read=False,
             related_lead_id=related_lead_id,
+            related_call_id=related_call_id,
         )
         self.db.add(notification)
         await self.db.flush()
         await self.db.refresh(notification)
-        await send_notification(
-            user_id,
-            {
-                "id": notification.id,
-                "user_id": notification.user_id,
-                "message": notification.message,
-                "type": notification.type,
-                "is_read": notification.is_read,
-                "related_lead_id": notification.related_lead_id,
-                "created_at": notification.created_at.isoformat(),
-            },
-        )
+        await send_notification(notification.user_id, _payload(notification))
         return notification
 
+    async def notify_users(
+        self,
+        user_ids: Sequence[int],
+        message: str,
+        notification_type: NotificationType,
+        related_lead_id: Optional[int] = None,
+    ) -> List[Notification]:
+        """Create the same notification for many users with one preference query and one flush."""
+        if not user_ids:
+            return []
+        result = await self.db.execute(
+            select(NotificationPreference.user_id).where(
+                NotificationPreference.user_id.in_(user_ids),
+                NotificationPreference.notification_type == notification_type.value,
+                NotificationPreference.enabled.is_(False),
+            )
+        )
+        disabled = set(result.scalars().all())
+        created_at = datetime.now(timezone.utc)
+        notifications = [
+            Notification(
+                user_id=user_id,
+                message=message,
+                type=notification_type.value,
+                is_read=False,
+                related_lead_id=related_lead_id,
+                created_at=created_at,
+            )
+            for user_id in dict.fromkeys(user_ids)
+            if user_id not in disabled
+        ]
+        self.db.add_all(notifications)
+        await self.db.flush()
+        for notification in notifications:
+            await send_notification(notification.user_id, _payload(notification))
+        return notifications
+
+
+def _payload(notification: Notification) -> dict:
+    return {
+        "id": notification.id,
+        "user_id": notification.user_id,
+        "message": notification.message,
+        "type": notification.type,
+        "is_read": notification.is_read,
+        "related_lead_id": notification.related_lead_id,
+        "related_call_id": notification.related_call_id,
+        "created_at": notification.created_at.isoformat(),
+    }
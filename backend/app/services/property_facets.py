@@ -0,0 +1,186 @@
+"""Facet counts (city, type, bedrooms, price band) for property list filters.
+
+Every facet is counted with the other facets' selections applied but not its own,
+so a UI can show how many listings each additional choice would add. One grouped
+aggregate over all four dimensions feeds every facet: the table is scanned once,
+and the per-facet roll-ups run over the (few hundred) combinations it returns.
+Those combinations depend only on the non-facet filters. They are cached briefly,
+for the most recently used filters, and dropped on any committed write to
+``properties``.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import ColumnElement, Select, and_, case, false, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.property import Property
+from app.services import change_events
+
+FACETS = ("city", "property_type", "bedrooms", "price_band")
+
+FacetCounts = Dict[str, List[Tuple[str, int]]]
+
+
+def price_bands() -> List[Tuple[str, float, Optional[float]]]:
+    """``(label, lower, upper)`` for each configured band; the last is open-ended."""
+    edges = [0.0, *sorted(settings.property_price_bands)]
+    bands = []
+    for lower, upper in zip(edges, edges[1:] + [None]):
+        label = f"{lower:.0f}-{upper:.0f}" if upper is not None else f"{lower:.0f}+"
+        bands.append((label, lower, upper))
+    return bands
+
+
+def _in_band(lower: float, upper: Optional[float]) -> ColumnElement:
+    if upper is None:
+        return Property.price >= lower
+    return and_(Property.price >= lower, Property.price < upper)
+
+
+def _price_band_column() -> ColumnElement:
+    bands = price_bands()
+    return case(
+        *[(_in_band(lower, upper), label) for label, lower, upper in bands[:-1]],
+        else_=bands[-1][0],
+    )
+
+
+@dataclass
+class FacetSelection:
+    """Values picked per facet; values within a facet are ORed, facets are ANDed."""
+
+    city: Sequence[str] = field(default_factory=list)
+    property_type: Sequence[str] = field(default_factory=list)
+    bedrooms: Sequence[int] = field(default_factory=list)
+    price_band: Sequence[str] = field(default_factory=list)
+
+    def clauses(self, skip: Optional[str] = None) -> List[ColumnElement]:
+        clauses = []
+        if self.city and skip != "city":
+            clauses.append(Property.city.in_(self.city))
+        if self.property_type and skip != "property_type":
+            clauses.append(Property.property_type.in_(self.property_type))
+        if self.bedrooms and skip != "bedrooms":
+            clauses.append(Property.bedrooms.in_(self.bedrooms))
+        if self.price_band and skip != "price_band":
+            picked = [
+                _in_band(lower, upper)
+                for label, lower, upper in price_bands()
+                if label in self.price_band
+            ]
+            clauses.append(or_(*picked) if picked else false())
+        return clauses
+
+
+# (city, property_type, bedrooms, price_band, count)
+Combination = Tuple[str, str, Optional[int], str, int]
+
+
+def combinations_query(base: Sequence[ColumnElement]) -> Select:
+    """Listing counts per (city, type, bedrooms, price band) under the non-facet filters."""
+    band = _price_band_column()
+    return (
+        select(Property.city, Property.property_type, Property.bedrooms, band, func.count())
+        .where(*base)
+        .group_by(Property.city, Property.property_type, Property.bedrooms, band)
+    )
+
+
+def _ordered(name: str, counts: Dict[str, int]) -> List[Tuple[str, int]]:
+    if name == "price_band":
+        return [(label, counts[label]) for label, _, _ in price_bands() if label in counts]
+    if name == "bedrooms":
+        return sorted(counts.items(), key=lambda item: int(item[0]))
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+def roll_up(
+    combinations: Sequence[Combination], selection: FacetSelection
+) -> Tuple[FacetCounts, int]:
+    """Counts per facet value, each ignoring its own selection, plus the fully filtered total."""
+    picked = {
+        "city": set(selection.city),
+        "property_type": set(selection.property_type),
+        "bedrooms": {str(value) for value in selection.bedrooms},
+        "price_band": set(selection.price_band),
+    }
+    grouped: Dict[str, Dict[str, int]] = {name: {} for name in FACETS}
+    total = 0
+    for city, property_type, bedrooms, band, count in combinations:
+        values = {
+            "city": city,
+            "property_type": property_type,
+            "bedrooms": str(bedrooms) if bedrooms is not None else None,
+            "price_band": band,
+        }
+        misses = [name for name in FACETS if picked[name] and values[name] not in picked[name]]
+        if not misses:
+            total += count
+        if len(misses) > 1:
+            continue
+        for name in misses or FACETS:
+            if values[name] is not None:
+                grouped[name][values[name]] = grouped[name].get(values[name], 0) + count
+    counts = {name: _ordered(name, values) for name, values in grouped.items()}
+    return counts, total
+
+
+class _FacetCache:
+    """LRU of grouped combinations per base filter, dropped as soon as properties are written."""
+
+    def __init__(self, max_entries: Optional[int] = None) -> None:
+        self.max_entries = max_entries or settings.property_facet_cache_size
+        self._entries: "OrderedDict[str, Tuple[float, List[Combination]]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[List[Combination]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key: str, value: List[Combination]) -> None:
+        now = time.monotonic()
+        # Filters include free text (locality), so expired keys are not asked for again.
+        for stale in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+            del self._entries[stale]
+        self._entries[key] = (now + settings.property_facet_cache_ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self, tables: Set[str]) -> None:
+        if Property.__tablename__ in tables:
+            self._entries.clear()
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+facet_cache = _FacetCache()
+change_events.subscribe(facet_cache.invalidate)
+
+
+async def facet_counts(
+    db: AsyncSession, base: Sequence[ColumnElement], selection: FacetSelection
+) -> Tuple[FacetCounts, int]:
+    """Return ``(counts per facet, total matching every filter)``."""
+    statement = combinations_query(base)
+    compiled = statement.compile(db.get_bind())
+    key = f"{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])!r}"
+    combinations = facet_cache.get(key)
+    if combinations is None:
+        combinations = [tuple(row) for row in (await db.execute(statement)).all()]
+        facet_cache.put(key, combinations)
+    return roll_up(combinations, selection)
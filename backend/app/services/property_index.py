@@ -0,0 +1,330 @@
+"""In-memory retrieval index over available property listings.
+
+The voice agent's prompt used to carry every available listing. This index
+keeps a BM25 inverted index over title, locality, city and description plus the
+columns used as structured filters (price, bedrooms, type). It answers
+``search`` with the top-k listings for a query, so prompt size stays fixed as
+inventory grows.
+
+The index is loaded on first use. Listings written through the ORM are
+refetched by id on the next query after their session commits. Bulk statements
+on ``properties`` reload it.
+"""
+
+import asyncio
+import heapq
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import select
+
+from app.database import async_session_maker
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.services.change_events import RELOAD, StaleRows, WriteWatcher
+
+_K1 = 1.2
+_COMMON_TERM_SHARE = 0.2
+_B = 0.75
+_FIELD_WEIGHTS = (("title", 2), ("locality", 2), ("city", 2), ("description", 1))
+_STOPWORDS = frozenset(
+    "a an and are at for from i in is it looking me my near of on or show the to want with".split()
+)
+_TOKEN = re.compile(r"[a-z0-9]+")
+_BEDROOMS = re.compile(r"\b(\d{1,2})\s*(?:bhk|bed(?:room)?s?)\b")
+_PRICE = r"(?:rs\.?|inr|₹)?\s*(\d+(?:\.\d+)?)\s*(lakhs?|lacs?|l|crores?|cr)?\b"
+_MAX_PRICE = re.compile(r"\b(?:under|below|upto|up to|within|less than|max(?:imum)?)\s*" + _PRICE)
+_MIN_PRICE = re.compile(r"\b(?:above|over|more than|min(?:imum)?|starting)\s*" + _PRICE)
+_UNITS = {
+    **dict.fromkeys(("l", "lakh", "lakhs", "lac", "lacs"), 1e5),
+    **dict.fromkeys(("cr", "crore", "crores"), 1e7),
+}
+_TYPE_WORDS = {kind.value: kind.value for kind in PropertyType}
+_TYPE_WORDS.update({"flat": PropertyType.APARTMENT.value, "flats": PropertyType.APARTMENT.value})
+_COLUMNS = (
+    Property.id,
+    Property.title,
+    Property.description,
+    Property.property_type,
+    Property.address,
+    Property.city,
+    Property.state,
+    Property.country,
+    Property.locality,
+    Property.price,
+    Property.size_sqft,
+    Property.bedrooms,
+    Property.is_featured,
+)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return [token for token in _TOKEN.findall((text or "").lower()) if token not in _STOPWORDS]
+
+
+@dataclass(frozen=True)
+class IndexedProperty:
+    id: int
+    title: str
+    property_type: str
+    address: str
+    city: str
+    state: str
+    country: str
+    locality: Optional[str]
+    price: float
+    size_sqft: float
+    bedrooms: Optional[int]
+    is_featured: bool
+
+    def snippet(self) -> str:
+        price_lakhs = self.price / 100000 if self.price else 0
+        return (
+            f"- {self.title}: {self.property_type} in {self.address} ({self.city}). "
+            f"Price: ₹{price_lakhs:.1f} Lakhs. "
+            f"Size: {self.size_sqft} sqft. "
+            f"Bedrooms: {self.bedrooms or 'N/A'}. "
+        )
+
+
+@dataclass(frozen=True)
+class PropertyFilters:
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    bedrooms: Optional[int] = None
+    property_type: Optional[str] = None
+
+    def matches(self, doc: IndexedProperty) -> bool:
+        if self.min_price is not None and doc.price < self.min_price:
+            return False
+        if self.max_price is not None and doc.price > self.max_price:
+            return False
+        if self.bedrooms is not None and doc.bedrooms != self.bedrooms:
+            return False
+        if self.property_type is not None and doc.property_type != self.property_type:
+            return False
+        return True
+
+
+def _price(match: Optional[re.Match]) -> Optional[float]:
+    if match is None:
+        return None
+    amount = float(match.group(1))
+    unit = match.group(2)
+    if unit:
+        return amount * _UNITS[unit]
+    # A bare small number ("under 50") is almost always lakhs in a property enquiry.
+    return amount if amount >= 10000 else amount * 1e5
+
+
+def filters_from_query(query: str) -> PropertyFilters:
+    """Structured filters stated in a free-text query ("2 bhk villa under 80 lakh")."""
+    text = (query or "").lower()
+    bedrooms = _BEDROOMS.search(text)
+    property_type = next((_TYPE_WORDS[t] for t in _TOKEN.findall(text) if t in _TYPE_WORDS), None)
+    return PropertyFilters(
+        min_price=_price(_MIN_PRICE.search(text)),
+        max_price=_price(_MAX_PRICE.search(text)),
+        bedrooms=int(bedrooms.group(1)) if bedrooms else None,
+        property_type=property_type,
+    )
+
+
+class PropertyIndex:
+    def __init__(self):
+        self._docs: Dict[int, IndexedProperty] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_length: Dict[int, int] = {}
+        self._total_length = 0
+        self._locations: Dict[str, Dict[str, Counter]] = {}
+        self._locations_text: Optional[str] = None
+        self._stale = StaleRows()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---- maintenance ----
+
+    def _add(self, row) -> None:
+        doc = IndexedProperty(
+            id=row.id,
+            title=row.title,
+            property_type=row.property_type,
+            address=row.address,
+            city=row.city,
+            state=row.state,
+            country=row.country or "India",
+            locality=row.locality,
+            price=row.price,
+            size_sqft=row.size_sqft,
+            bedrooms=row.bedrooms,
+            is_featured=bool(row.is_featured),
+        )
+        terms: Counter = Counter()
+        for field, weight in _FIELD_WEIGHTS:
+            for token in tokenize(getattr(row, field)):
+                terms[token] += weight
+        self._docs[doc.id] = doc
+        self._doc_terms[doc.id] = terms
+        self._doc_length[doc.id] = sum(terms.values())
+        self._total_length += self._doc_length[doc.id]
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[doc.id] = frequency
+        cities = self._locations.setdefault(doc.country, {}).setdefault(doc.state, Counter())
+        cities[doc.city] += 1
+        if cities[doc.city] == 1:
+            self._locations_text = None
+
+    def _remove(self, property_id: int) -> None:
+        doc = self._docs.pop(property_id, None)
+        if doc is None:
+            return
+        terms = self._doc_terms.pop(property_id)
+        self._total_length -= self._doc_length.pop(property_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[property_id]
+            if not postings:
+                del self._postings[term]
+        cities = self._locations[doc.country][doc.state]
+        cities[doc.city] -= 1
+        if cities[doc.city] <= 0:
+            del cities[doc.city]
+            if not cities:
+                del self._locations[doc.country][doc.state]
+                if not self._locations[doc.country]:
+                    del self._locations[doc.country]
+            self._locations_text = None
+
+    def _reset(self) -> None:
+        self._docs.clear()
+        self._postings.clear()
+        self._doc_terms.clear()
+        self._doc_length.clear()
+        self._total_length = 0
+        self._locations.clear()
+        self._locations_text = None
+
+    def invalidate(self, ids: Iterable) -> None:
+        """Refetch these listings (or reload everything for ``"*"``) before the next query."""
+        self._stale.mark(ids)
+
+    def clear(self) -> None:
+        self.invalidate([RELOAD])
+
+    async def _sync(self) -> None:
+        if self._stale.fresh:
+            return
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            if self._stale.fresh:
+                return
+            available = (
+                Property.status == PropertyStatus.AVAILABLE.value,
+                Property.is_active.is_(True),
+            )
+            ids = self._stale.take()
+            statement = select(*_COLUMNS).where(*available)
+            if ids is not None:
+                statement = statement.where(Property.id.in_(ids))
+            try:
+                async with async_session_maker() as db:
+                    rows = (await db.execute(statement)).all()
+            except Exception:
+                self._stale.restore(ids)
+                raise
+            if ids is None:
+                self._reset()
+            else:
+                for property_id in ids:
+                    self._remove(property_id)
+            for row in rows:
+                self._add(row)
+
+    # ---- queries ----
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    async def search(
+        self,
+        query: str,
+        *,
+        k: int,
+        filters: Optional[PropertyFilters] = None,
+    ) -> List[IndexedProperty]:
+        """The ``k`` best listings for ``query`` that pass ``filters``."""
+        await self._sync()
+        filters = filters or PropertyFilters()
+        scores = self._score(tokenize(query), filters)
+        if scores:
+            ranked = heapq.nlargest(
+                k,
+                scores.items(),
+                key=lambda item: (item[1], self._docs[item[0]].is_featured, item[0]),
+            )
+            return [self._docs[property_id] for property_id, _ in ranked]
+        # Nothing in the text matched: fall back to featured, then newest listings.
+        candidates = (doc for doc in self._docs.values() if filters.matches(doc))
+        return heapq.nlargest(k, candidates, key=lambda doc: (doc.is_featured, doc.id))
+
+    def _score(self, terms: List[str], filters: PropertyFilters) -> Dict[int, float]:
+        count = len(self._docs)
+        if not count or not terms:
+            return {}
+        average_length = self._total_length / count
+        allowed: Dict[int, bool] = {}
+        scores: Dict[int, float] = {}
+        # Rarest terms first. Terms in most listings carry little weight, so once
+        # rarer terms have found candidates they only re-rank those.
+        postings_by_term = sorted(
+            (postings for postings in map(self._postings.get, set(terms)) if postings), key=len
+        )
+        for postings in postings_by_term:
+            idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            if scores and len(postings) > count * _COMMON_TERM_SHARE:
+                matches = ((i, postings[i]) for i in list(scores) if i in postings)
+            else:
+                matches = postings.items()
+            for property_id, frequency in matches:
+                ok = allowed.get(property_id)
+                if ok is None:
+                    ok = allowed[property_id] = filters.matches(self._docs[property_id])
+                if not ok:
+                    continue
+                norm = _K1 * (1 - _B + _B * self._doc_length[property_id] / average_length)
+                scores[property_id] = scores.get(property_id, 0.0) + idf * frequency * (_K1 + 1) / (
+                    frequency + norm
+                )
+        return scores
+
+    async def locations(self) -> Dict[str, Dict[str, List[str]]]:
+        """Country -> state -> sorted cities with available listings."""
+        await self._sync()
+        return {
+            country: {state: sorted(cities) for state, cities in states.items()}
+            for country, states in self._locations.items()
+        }
+
+    async def locations_text(self) -> str:
+        """The location tree formatted for the prompt; rebuilt only after a change."""
+        await self._sync()
+        if self._locations_text is None:
+            if not self._locations:
+                self._locations_text = "No locations currently available."
+            else:
+                lines = ["AVAILABLE LOCATIONS:"]
+                for country, states in self._locations.items():
+                    lines.append(f"- Country: {country}")
+                    for state, cities in states.items():
+                        lines.append(f"  - State: {state}: {', '.join(sorted(cities))}")
+                self._locations_text = "\n".join(lines)
+        return self._locations_text
+
+
+property_index = PropertyIndex()
+WriteWatcher("property_index", Property, property_index.invalidate)
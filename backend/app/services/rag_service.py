@@ -1,77 +1,56 @@
-from sqlalchemy import select
+from typing import Optional
 
-from app.database import async_session_maker
-from app.models.property import Property, PropertyStatus
+from app.config import settings
+from app.services.property_index import PropertyFilters, filters_from_query, property_index
+from app.utils.logging import get_logger
+
+logger = get_logger("services.rag")
 
 
 class RAGService:
     async def get_available_locations(self) -> str:
         """
-        Fetch distinct available locations (Country, State, City) from DB.
+        Distinct available locations (Country, State, City), from the property index.
         """
         try:
-            async with async_session_maker() as db:
-                # Fetch available properties
-                result = await db.execute(
-                    select(Property).where(Property.status == PropertyStatus.AVAILABLE.value)
-                )
-                properties = result.scalars().all()
-                
-                if not properties:
-                    return "No locations currently available."
-
-                # Aggregate locations
-                locations = {}
-                for p in properties:
-                    country = p.country or "India"
-                    state = p.state
-                    city = p.city
-                    
-                    if country not in locations:
-                        locations[country] = {}
-                    if state not in locations[country]:
-                        locations[country][state] = set()
-                    locations[country][state].add(city)
-                
-                # Format output
-                lines = ["AVAILABLE LOCATIONS:"]
-                for country, states in locations.items():
-                    lines.append(f"- Country: {country}")
-                    for state, cities in states.items():
-                        lines.append(f"  - State: {state}: {', '.join(sorted(cities))}")
-                
-                return "\n".join(lines)
+            return await property_index.locations_text()
         except Exception as e:
-            print(f"Location Retrieval Error: {e}")
+            logger.error("location_retrieval_failed", error=str(e))
             return "Error retrieving location data."
 
-    async def retrieve(self, query: str) -> str:
+    async def retrieve(
+        self,
+        query: str,
+        *,
+        k: Optional[int] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        bedrooms: Optional[int] = None,
+        property_type: Optional[str] = None,
+    ) -> str:
         """
-        Dynamically fetch available properties from SQLite and format as context.
+        The available properties most relevant to ``query``, formatted as context.
+
+        Filters stated in the query ("2 bhk under 80 lakh") apply unless given explicitly.
         """
         try:
-            async with async_session_maker() as db:
-                # Fetch available properties
-                result = await db.execute(
-                    select(Property).where(Property.status == PropertyStatus.AVAILABLE.value)
-                )
-                properties = result.scalars().all()
-                
-                if not properties:
+            stated = filters_from_query(query)
+            filters = PropertyFilters(
+                min_price=min_price if min_price is not None else stated.min_price,
+                max_price=max_price if max_price is not None else stated.max_price,
+                bedrooms=bedrooms if bedrooms is not None else stated.bedrooms,
+                property_type=property_type or stated.property_type,
+            )
+            properties = await property_index.search(
+                query, k=k or settings.property_retrieval_top_k, filters=filters
+            )
+            if not properties:
+                if not len(property_index):
                     return "No properties currently available in the database."
+                return "No available properties match this request."
 
-                # Format property list for the AI
-                context_lines = []
-                for p in properties:
-                    price_lakhs = p.price / 100000 if p.price else 0
-                    context_lines.append(
-                        f"- {p.title}: {p.property_type} in {p.address} ({p.city}). "
-                        f"Price: ₹{price_lakhs:.1f} Lakhs. "
-                        f"Size: {p.size_sqft} sqft. "
-                        f"Bedrooms: {p.bedrooms or 'N/A'}. "
-                    )
-                
-                return "AVAILABLE INVENTORY FROM DATABASE:\n" + "\n".join(context_lines)
+            context_lines = [p.snippet() for p in properties]
+            return "AVAILABLE INVENTORY FROM DATABASE:\n" + "\n".join(context_lines)
         except Exception as e:
-            print(f"RAG Retrieval Error: {e}")
+            logger.error("property_retrieval_failed", error=str(e))
             return "Error retrieving property data."
@@ -0,0 +1,132 @@
+"""Persistent, size-bounded cache of LLM-generated reports.
+
+Entries are keyed by a hash of (prompt version, model, chunking settings,
+normalized transcript), so re-processing or replaying the same call is served from
+the database and bumping the prompt version (or changing how long transcripts are
+chunked) makes every older entry unreachable; unreachable entries are
+never touched again and are the first to go when the cache is over its byte budget.
+"""
+
+import hashlib
+import json
+import re
+import unicodedata
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.report_cache import ReportCacheEntry
+from app.utils.logging import get_logger
+
+logger = get_logger("services.report_cache")
+
+_WHITESPACE = re.compile(r"[ \t\u00a0]+")
+_DIALECT_INSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+_EVICT_CHUNK = 500
+
+
+def normalize_transcript(transcript: str) -> str:
+    """Canonical form for hashing: NFC, unified newlines, trimmed and collapsed spaces."""
+    text = unicodedata.normalize("NFC", transcript).replace("\r\n", "\n").replace("\r", "\n")
+    lines = (_WHITESPACE.sub(" ", line).strip() for line in text.split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def report_cache_key(prompt_version: str, model: str, transcript: str) -> str:
+    chunking = f"{settings.report_chunk_max_chars}/{settings.report_chunk_overlap_turns}"
+    payload = "\x1f".join((prompt_version, model, chunking, normalize_transcript(transcript)))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ReportCache:
+    """Each read and write runs in its own short-lived session.
+
+    Callers never hold a cache transaction open across an LLM round trip, and
+    cache writes never ride along in (or hold locks for) the caller's own work.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.report_cache_max_bytes
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(ReportCacheEntry.report).where(ReportCacheEntry.key == key)
+            )
+            report = result.scalar_one_or_none()
+            if report is None:
+                return None
+            await db.execute(
+                update(ReportCacheEntry)
+                .where(ReportCacheEntry.key == key)
+                .values(hit_count=ReportCacheEntry.hit_count + 1, last_used_at=func.now())
+            )
+            await db.commit()
+        return json.loads(report)
+
+    async def put(
+        self,
+        key: str,
+        prompt_version: str,
+        model: str,
+        report: Dict[str, Any],
+    ) -> None:
+        body = json.dumps(report, ensure_ascii=False, separators=(",", ":"))
+        values = {
+            "key": key,
+            "prompt_version": prompt_version,
+            "model": model,
+            "report": body,
+            "size_bytes": len(body.encode("utf-8")),
+            "hit_count": 0,
+        }
+        async with async_session_maker() as db:
+            dialect_insert = _DIALECT_INSERTS.get(db.get_bind().dialect.name)
+            if dialect_insert is not None:
+                # A concurrent worker may have stored the same key; keep whichever landed first.
+                await db.execute(
+                    dialect_insert(ReportCacheEntry).values(**values).on_conflict_do_nothing()
+                )
+            elif await db.get(ReportCacheEntry, key) is None:
+                await db.execute(insert(ReportCacheEntry).values(**values))
+            await self.evict(db)
+            await db.commit()
+
+    async def evict(self, db: AsyncSession) -> int:
+        """Drop least recently used entries until the cache fits ``max_bytes``."""
+        total = (
+            await db.execute(select(func.coalesce(func.sum(ReportCacheEntry.size_bytes), 0)))
+        ).scalar_one()
+        excess = total - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        victims = []
+        rows = await db.stream(
+            select(ReportCacheEntry.key, ReportCacheEntry.size_bytes).order_by(
+                ReportCacheEntry.last_used_at.asc(), ReportCacheEntry.key
+            )
+        )
+        async for key, size_bytes in rows:
+            victims.append(key)
+            excess -= size_bytes
+            if excess <= 0:
+                break
+        await rows.close()
+
+        for start in range(0, len(victims), _EVICT_CHUNK):
+            await db.execute(
+                delete(ReportCacheEntry).where(
+                    ReportCacheEntry.key.in_(victims[start:start + _EVICT_CHUNK])
+                )
+            )
+        logger.info("report_cache_evicted", entries=len(victims), bytes_over=total - self.max_bytes)
+        return len(victims)
+
+
+report_cache = ReportCache()
@@ -0,0 +1,143 @@
+"""Split long call transcripts into overlapping chunks and merge partial reports.
+
+Long calls are extracted chunk by chunk (concurrently) and the partial Section 7
+reports are reconciled here with fixed rules, so the merged report only depends
+on the chunk outputs and their order:
+
+* ``visit`` comes from the last chunk that mentions a visit date, so a visit
+  rescheduled later in the call wins over the one first discussed.
+* ``lead_classification`` comes from the final chunk that provides one, since
+  the end of the call is where the customer's position is settled.
+* Lists are unioned in order of first mention (case-insensitive).
+* Booleans are true if any chunk says so.
+* Other values keep the last informative one (not null, empty or "unknown").
+"""
+
+import re
+from typing import Any, Dict, List, Sequence
+
+# A turn starts with a short speaker label ("Agent:", "Customer:") at the start of a line.
+_TURN_START = re.compile(r"^\s*[^\W\d][\w .'-]{0,30}:\s")
+_UNINFORMATIVE = {"", "unknown", "null", "none", "n/a"}
+
+
+def split_turns(transcript: str) -> List[str]:
+    """Split a transcript into speaker turns; continuation lines stay with their turn."""
+    turns: List[str] = []
+    for line in transcript.replace("\r\n", "\n").split("\n"):
+        if not line.strip():
+            continue
+        if turns and not _TURN_START.match(line):
+            turns[-1] = f"{turns[-1]}\n{line}"
+        else:
+            turns.append(line)
+    return turns
+
+
+def _split_oversized(turn: str, max_chars: int) -> List[str]:
+    """Break a single turn longer than ``max_chars`` at whitespace."""
+    pieces: List[str] = []
+    while len(turn) > max_chars:
+        cut = turn.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(turn[:cut])
+        turn = turn[cut:].lstrip()
+    if turn:
+        pieces.append(turn)
+    return pieces
+
+
+def chunk_transcript(transcript: str, max_chars: int, overlap_turns: int) -> List[str]:
+    """Pack whole turns into chunks of at most ``max_chars``.
+
+    Each chunk after the first repeats the last ``overlap_turns`` turns of the
+    previous one (as long as they take at most half a chunk) so statements that
+    depend on the preceding question keep their context.
+    """
+    turns: List[str] = []
+    for turn in split_turns(transcript):
+        turns.extend(_split_oversized(turn, max_chars))
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    size = 0
+    for turn in turns:
+        added = len(turn) + (1 if current else 0)
+        if current and size + added > max_chars:
+            chunks.append(current)
+            carried: List[str] = []
+            carried_size = 0
+            for previous in reversed(current[-overlap_turns:] if overlap_turns else []):
+                if carried_size + len(previous) + 1 > max_chars // 2:
+                    break
+                carried.insert(0, previous)
+                carried_size += len(previous) + 1
+            # The carried turns must still leave room for the turn that overflowed.
+            while carried and carried_size + len(turn) > max_chars:
+                carried_size -= len(carried.pop(0)) + 1
+            current, size = carried, carried_size
+            added = len(turn) + (1 if current else 0)
+        current.append(turn)
+        size += added
+    if current:
+        chunks.append(current)
+    return ["\n".join(chunk) for chunk in chunks]
+
+
+def _informative(value: Any) -> bool:
+    if value is None:
+        return False
+    if isinstance(value, str):
+        return value.strip().lower() not in _UNINFORMATIVE
+    if isinstance(value, (list, dict)):
+        return bool(value)
+    return True
+
+
+def _union(first: Sequence[Any], second: Sequence[Any]) -> List[Any]:
+    merged = list(first)
+    seen = {str(item).strip().lower() for item in merged}
+    for item in second:
+        marker = str(item).strip().lower()
+        if _informative(item) and marker not in seen:
+            seen.add(marker)
+            merged.append(item)
+    return merged
+
+
+def _merge_values(earlier: Any, later: Any) -> Any:
+    if isinstance(earlier, dict) and isinstance(later, dict):
+        merged = dict(earlier)
+        for key, value in later.items():
+            merged[key] = _merge_values(merged[key], value) if key in merged else value
+        return merged
+    if isinstance(earlier, list) and isinstance(later, list):
+        return _union(earlier, later)
+    if isinstance(earlier, bool) and isinstance(later, bool):
+        return earlier or later
+    return later if _informative(later) or not _informative(earlier) else earlier
+
+
+def merge_reports(partials: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reconcile per-chunk reports, given in transcript order, into one report."""
+    partials = [p for p in partials if isinstance(p, dict) and p]
+    merged: Dict[str, Any] = {}
+    for partial in partials:
+        merged = _merge_values(merged, partial)
+
+    visits = [p["visit"] for p in partials if isinstance(p.get("visit"), dict)]
+    dated = [v for v in visits if _informative(v.get("visit_date"))]
+    if dated:
+        visit = dict(dated[-1])
+        visit["visit_scheduled"] = bool(visit.get("visit_scheduled")) or any(
+            v.get("visit_scheduled") is True for v in visits
+        )
+        merged["visit"] = visit
+
+    classifications = [
+        p["lead_classification"] for p in partials if _informative(p.get("lead_classification"))
+    ]
+    if classifications:
+        merged["lead_classification"] = dict(classifications[-1])
+    return merged
@@ -0,0 +1,456 @@
+"""Pattern-based Section 7 extraction that needs no LLM.
+
+``extract_local_report`` fills the high-value fields of the Section 7 schema
+(monthly bill, estimated kW, rooftop, subsidy/loan interest, visit date and slot,
+phone, city) from English, Hinglish and Devanagari transcripts with precompiled
+patterns. It takes milliseconds, so a call gets a usable report as soon as its
+transcript arrives; the LLM report replaces it once available. Reports carry
+``report_source`` so the two can be told apart.
+"""
+
+import re
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from app.services.report_chunking import split_turns
+
+REPORT_SOURCE_LOCAL = "local"
+REPORT_SOURCE_LLM = "llm"
+
+_CUSTOMER_SPEAKERS = {"customer", "user", "caller", "client"}
+_DEVANAGARI_DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+_DEVANAGARI = "\u0900-\u097f"
+
+
+def _words(*alternatives: str) -> str:
+    """Alternation matched as whole words, also inside Devanagari text."""
+    body = "|".join(sorted(alternatives, key=len, reverse=True))
+    return rf"(?<![\w{_DEVANAGARI}])(?:{body})(?![\w{_DEVANAGARI}])"
+
+
+def _compile(pattern: str) -> Pattern[str]:
+    return re.compile(pattern, re.IGNORECASE)
+
+
+_NEGATION = _compile(
+    _words(
+        "no", "nope", "not", "don't", "dont", "never", "without", "nahi", "nahin", "nai",
+        "नहीं", "नही", "ना", "मत",
+    )
+)
+# "no problem", "koi dikkat nahi" and friends are agreement, not refusal.
+_NOT_A_REFUSAL = _compile(_words("problem", "problems", "issue", "dikkat", "दिक्कत", "tension", "worries"))
+_AFFIRMATIVE_START = _compile(
+    r"^\W*"
+    + _words("yes", "yeah", "yup", "sure", "haan", "han", "ha", "ji", "हाँ", "हां", "जी", "bilkul", "बिल्कुल")
+)
+
+_AMOUNT = (
+    r"(?P<cur>rs\.?|₹|inr|रु\.?)?\s*"
+    r"(?P<num>\d{1,3}(?:,\d{2,3})+|\d+(?:\.\d+)?)\s*"
+    r"(?P<mult>k(?![a-z])|thousand|hazaa?r|hajaa?r|हज़ार|हजार)?\s*"
+    r"(?P<rupee>rupees|rupaye|rupay|rs\b|रुपये|रुपए|रुपया)?"
+)
+_BILL_WORD = r"(?:bill|बिल|bijli|बिजली|electricity)"
+_BILL_KEYWORD = _compile(_BILL_WORD)
+_BILL_AFTER = _compile(_BILL_WORD + r"[^\d\n.?!]{0,40}?" + _AMOUNT)
+_BILL_BEFORE = _compile(_AMOUNT + r"[^\d\n.?!]{0,25}?" + _BILL_WORD)
+_BARE_AMOUNT = _compile(_AMOUNT)
+_NOT_MONEY = _compile(r"\s*(?:kw|kilo|किलो|unit|यूनिट|%|percent|saal|years?|months?|din|days?)")
+
+_KW = _compile(r"(?P<num>\d+(?:\.\d+)?)\s*(?:kw(?![a-z])|kilo\s?watts?|किलो\s?वाट|किलोवाट)")
+
+_CLAUSE_BREAK = _compile(r"[,.;!?।|]|" + _words("but", "lekin", "magar", "however", "लेकिन", "मगर"))
+_ROOF = _compile(_words("roof", "rooftop", "roof top", "terrace", "chhat", "chhath", "छत", "छत्त"))
+_SUBSIDY = _compile(_words("subsidy", "subsidies", "surya ghar", "सब्सिडी", "सब्सीडी", "anudan", "अनुदान"))
+_LOAN = _compile(
+    _words("loan", "loans", "emi", "emis", "finance", "financing", "installments?", "kisht", "kist", "किस्त", "लोन", "ईएमआई")
+)
+_NET_METERING = _compile(_words("net metering", "net meter", "net-metering", "नेट मीटरिंग", "नेट मीटर"))
+_BATTERY = _compile(_words("battery", "batteries", "backup", "बैटरी"))
+
+_VISIT = _compile(
+    _words(
+        "visit", "site", "survey", "inspection", "technician", "engineer", "team",
+        "aayenge", "aaenge", "ayenge", "aa jayenge", "milne", "आएंगे", "आयेंगे",
+        "विज़िट", "विजिट", "सर्वे", "टीम", "इंजीनियर",
+    )
+)
+
+_MONTHS = {
+    "jan": 1, "january": 1, "जनवरी": 1,
+    "feb": 2, "february": 2, "फरवरी": 2, "फ़रवरी": 2,
+    "mar": 3, "march": 3, "मार्च": 3,
+    "apr": 4, "april": 4, "अप्रैल": 4,
+    "may": 5, "मई": 5,
+    "jun": 6, "june": 6, "जून": 6,
+    "jul": 7, "july": 7, "जुलाई": 7,
+    "aug": 8, "august": 8, "अगस्त": 8,
+    "sep": 9, "sept": 9, "september": 9, "सितंबर": 9, "सितम्बर": 9,
+    "oct": 10, "october": 10, "अक्टूबर": 10,
+    "nov": 11, "november": 11, "नवंबर": 11, "नवम्बर": 11,
+    "dec": 12, "december": 12, "दिसंबर": 12, "दिसम्बर": 12,
+}
+_MONTH = "(?P<month>" + "|".join(sorted(map(re.escape, _MONTHS), key=len, reverse=True)) + ")"
+_ISO_DATE = _compile(r"(?<!\d)(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?!\d)")
+# "3.5" and "2-3" are sizes and ranges, so only "/" dates may omit the year.
+_SLASH_DATE = _compile(r"(?<![\d.:/])(?P<day>\d{1,2})/(?P<month>\d{1,2})(?:/(?P<year>\d{2,4}))?(?![\d:/])")
+_DOTTED_DATE = _compile(r"(?<![\d.:])(?P<day>\d{1,2})[.-](?P<month>\d{1,2})[.-](?P<year>\d{4}|\d{2})(?![\d:])")
+_DAY_MONTH = _compile(
+    r"(?<!\d)(?P<day>\d{1,2})(?:st|nd|rd|th)?\s*(?:of\s+)?" + _MONTH + r"(?![a-z])(?:,?\s*(?P<year>\d{4}))?"
+)
+_MONTH_DAY = _compile(
+    r"(?<![a-z])" + _MONTH + r"\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?(?!\d)(?:,?\s*(?P<year>\d{4}))?"
+)
+_RELATIVE_DAYS = [
+    (_compile(_words("day after tomorrow", "parso", "parson", "परसों", "परसो")), 2),
+    (_compile(_words("tomorrow", "kal", "कल")), 1),
+    (_compile(_words("today", "aaj", "आज")), 0),
+]
+_WEEKDAYS = [
+    ("monday", "somvar", "somwar", "सोमवार"),
+    ("tuesday", "mangalvar", "mangalwar", "मंगलवार"),
+    ("wednesday", "budhvar", "budhwar", "बुधवार"),
+    ("thursday", "guruvar", "guruwar", "veervar", "गुरुवार", "वीरवार"),
+    ("friday", "shukravar", "shukrawar", "शुक्रवार"),
+    ("saturday", "shanivar", "shaniwar", "शनिवार"),
+    ("sunday", "ravivar", "raviwar", "itvaar", "itwar", "रविवार", "इतवार"),
+]
+_WEEKDAY_PATTERNS = [(_compile(_words(*names)), index) for index, names in enumerate(_WEEKDAYS)]
+
+_SLOT_WORDS = [
+    (_compile(_words("morning", "subah", "subha", "सुबह")), "morning"),
+    (_compile(_words("afternoon", "noon", "dopahar", "dopehar", "दोपहर")), "afternoon"),
+    (_compile(_words("evening", "shaam", "sham", "शाम")), "evening"),
+]
+_CLOCK = _compile(r"(?<![\d:])(?P<hour>\d{1,2})(?::\d{2})?\s*(?P<unit>a\.?m\.?|p\.?m\.?|baje|बजे)")
+
+_PHONE = _compile(r"(?<![\d+])(?:\+?91[\s-]*|0)?(?P<number>[6-9](?:[\s-]?\d){9})(?!\d)")
+
+_CITIES = {
+    "Delhi": ("delhi", "new delhi", "dilli", "दिल्ली"),
+    "Mumbai": ("mumbai", "bombay", "मुंबई"),
+    "Bengaluru": ("bengaluru", "bangalore", "बेंगलुरु", "बैंगलोर"),
+    "Chennai": ("chennai", "चेन्नई"),
+    "Hyderabad": ("hyderabad", "हैदराबाद"),
+    "Kolkata": ("kolkata", "calcutta", "कोलकाता"),
+    "Pune": ("pune", "पुणे"),
+    "Ahmedabad": ("ahmedabad", "अहमदाबाद"),
+    "Surat": ("surat", "सूरत"),
+    "Vadodara": ("vadodara", "baroda", "वडोदरा"),
+    "Jaipur": ("jaipur", "जयपुर"),
+    "Jodhpur": ("jodhpur", "जोधपुर"),
+    "Udaipur": ("udaipur", "उदयपुर"),
+    "Kota": ("kota", "कोटा"),
+    "Lucknow": ("lucknow", "लखनऊ"),
+    "Kanpur": ("kanpur", "कानपुर"),
+    "Noida": ("noida", "नोएडा"),
+    "Greater Noida": ("greater noida", "ग्रेटर नोएडा"),
+    "Ghaziabad": ("ghaziabad", "गाज़ियाबाद", "गाजियाबाद"),
+    "Gurugram": ("gurugram", "gurgaon", "गुरुग्राम", "गुड़गांव"),
+    "Faridabad": ("faridabad", "फरीदाबाद"),
+    "Agra": ("agra", "आगरा"),
+    "Varanasi": ("varanasi", "banaras", "benares", "वाराणसी", "बनारस"),
+    "Prayagraj": ("prayagraj", "allahabad", "प्रयागराज", "इलाहाबाद"),
+    "Meerut": ("meerut", "मेरठ"),
+    "Bareilly": ("bareilly", "बरेली"),
+    "Gorakhpur": ("gorakhpur", "गोरखपुर"),
+    "Aligarh": ("aligarh", "अलीगढ़"),
+    "Patna": ("patna", "पटना"),
+    "Ranchi": ("ranchi", "रांची"),
+    "Indore": ("indore", "इंदौर"),
+    "Bhopal": ("bhopal", "भोपाल"),
+    "Raipur": ("raipur", "रायपुर"),
+    "Nagpur": ("nagpur", "नागपुर"),
+    "Nashik": ("nashik", "नासिक"),
+    "Chandigarh": ("chandigarh", "चंडीगढ़"),
+    "Ludhiana": ("ludhiana", "लुधियाना"),
+    "Amritsar": ("amritsar", "अमृतसर"),
+    "Dehradun": ("dehradun", "देहरादून"),
+}
+_CITY_BY_ALIAS = {alias.lower(): city for city, aliases in _CITIES.items() for alias in aliases}
+_CITY = _compile(_words(*map(re.escape, _CITY_BY_ALIAS)))
+
+_LETTER = re.compile(r"[^\W\d_]")
+_DEVANAGARI_LETTER = re.compile(f"[{_DEVANAGARI}]")
+_HINGLISH = _compile(_words("hai", "haan", "nahi", "kya", "chahiye", "aap", "mera", "hum", "ji", "karna", "lagwana"))
+
+
+def empty_report() -> Dict[str, Any]:
+    """Section 7 skeleton with every field present and unknown."""
+    return {
+        "customer_info": {
+            "name": None,
+            "contact_number": None,
+            "contact_person_for_visit": None,
+            "address": None,
+            "city": None,
+            "preferred_language": "other",
+        },
+        "requirement": {
+            "installation_type": "unknown",
+            "estimated_kw": "unknown",
+            "monthly_electricity_bill": "unknown",
+            "preferred_brand": "no_preference",
+            "rooftop_available": "unknown",
+            "existing_solar": "unknown",
+        },
+        "interests": {
+            "subsidy_interested": False,
+            "loan_emi_required": False,
+            "net_metering_interested": False,
+            "battery_storage_interested": False,
+        },
+        "visit": {
+            "visit_scheduled": False,
+            "visit_date": None,
+            "visit_time_slot": None,
+            "visit_address": None,
+        },
+        "lead_classification": {
+            "lead_status": "unknown",
+            "confidence_score": None,
+            "buying_timeline": "no_timeline",
+        },
+        "call_analysis": {
+            "objections_raised": [],
+            "competitors_mentioned": [],
+            "key_concerns": [],
+            "positive_signals": [],
+            "call_outcome": None,
+            "call_summary_hindi": None,
+            "next_action": None,
+            "follow_up_required": False,
+            "follow_up_date": None,
+            "follow_up_notes": None,
+        },
+    }
+
+
+def _speaker_turns(transcript: str) -> List[Tuple[str, str]]:
+    turns = []
+    for turn in split_turns(transcript.translate(_DEVANAGARI_DIGITS)):
+        speaker, sep, text = turn.partition(":")
+        if sep and len(speaker) <= 32:
+            turns.append((speaker.strip().lower(), text.strip()))
+        else:
+            turns.append(("", turn.strip()))
+    return turns
+
+
+def _format_number(value: float) -> str:
+    return str(int(value)) if value == int(value) else f"{value:g}"
+
+
+def _amounts(text: str, pattern: Pattern[str], needs_unit: bool = False) -> List[float]:
+    amounts = []
+    for match in pattern.finditer(text):
+        if not match.group("mult") and _NOT_MONEY.match(text, match.end("num")):
+            continue
+        if needs_unit and not (match.group("cur") or match.group("mult") or match.group("rupee")):
+            continue
+        amount = float(match.group("num").replace(",", ""))
+        if match.group("mult"):
+            amount *= 1000
+        if 100 <= amount <= 10_000_000:
+            amounts.append(amount)
+    return amounts
+
+
+def _monthly_bill(turns: List[Tuple[str, str]]) -> Optional[str]:
+    """Last bill amount: stated next to "bill" or as the answer to a bill question."""
+    for index in range(len(turns) - 1, -1, -1):
+        text = turns[index][1]
+        if _BILL_KEYWORD.search(text):
+            amounts = _amounts(text, _BILL_AFTER) or _amounts(text, _BILL_BEFORE)
+        elif index > 0 and _BILL_KEYWORD.search(turns[index - 1][1]):
+            amounts = _amounts(text, _BARE_AMOUNT, needs_unit=True)
+        else:
+            continue
+        if amounts:
+            return _format_number(amounts[-1])
+    return None
+
+
+def _refused(clause: str) -> bool:
+    for negation in _NEGATION.finditer(clause):
+        before = " ".join(clause[:negation.start()].split()[-2:])
+        if _NOT_A_REFUSAL.search(before) or _NOT_A_REFUSAL.match(clause[negation.end():].lstrip()):
+            continue
+        return True
+    return False
+
+
+def _stance(text: str, topic: Pattern[str]) -> Optional[bool]:
+    """True/False when ``text`` mentions ``topic`` affirmatively/negated, else None."""
+    stance = None
+    for clause in _CLAUSE_BREAK.split(text):
+        if clause and topic.search(clause):
+            stance = not _refused(clause)
+    return stance
+
+
+def _reply_stance(text: str) -> Optional[bool]:
+    """Yes/no answer at the start of a reply ("ji nahi" is a no)."""
+    if _refused(" ".join(text.split()[:4])):
+        return False
+    if _AFFIRMATIVE_START.search(text):
+        return True
+    return None
+
+
+def _answer(turns: List[Tuple[str, str]], customer: List[bool], topic: Pattern[str]) -> Optional[bool]:
+    """Latest customer stance on ``topic``: stated directly or as a yes/no to the agent."""
+    for index in range(len(turns) - 1, -1, -1):
+        if not customer[index]:
+            continue
+        text = turns[index][1]
+        stance = _stance(text, topic)
+        if stance is None and index > 0 and not customer[index - 1]:
+            if topic.search(turns[index - 1][1]):
+                stance = _reply_stance(text)
+        if stance is not None:
+            return stance
+    return None
+
+
+def _safe_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _absolute_date(match: "re.Match[str]", reference: date) -> Optional[date]:
+    month = match.group("month")
+    month_number = int(month) if month.isdigit() else _MONTHS.get(month.lower())
+    if not month_number:
+        return None
+    year = match.group("year")
+    if year:
+        year_number = int(year) + (2000 if len(year) == 2 else 0)
+        return _safe_date(year_number, month_number, int(match.group("day")))
+    found = _safe_date(reference.year, month_number, int(match.group("day")))
+    if found is not None and found < reference - timedelta(days=7):
+        # A day-month without a year that has already passed means next year.
+        found = _safe_date(reference.year + 1, month_number, int(match.group("day")))
+    return found
+
+
+def _visit_date(text: str, reference: date) -> Optional[date]:
+    """Last date mentioned in ``text``, resolved against the call's ``reference`` day."""
+    found: List[Tuple[int, date]] = []
+    for pattern in (_ISO_DATE, _SLASH_DATE, _DOTTED_DATE, _DAY_MONTH, _MONTH_DAY):
+        for match in pattern.finditer(text):
+            resolved = _absolute_date(match, reference)
+            if resolved is not None:
+                found.append((match.start(), resolved))
+    taken: List[Tuple[int, int]] = []
+    for pattern, offset in _RELATIVE_DAYS:
+        for match in pattern.finditer(text):
+            # "tomorrow" inside "day after tomorrow" is already counted.
+            if not any(start <= match.start() < end for start, end in taken):
+                taken.append(match.span())
+                found.append((match.start(), reference + timedelta(days=offset)))
+    for pattern, weekday in _WEEKDAY_PATTERNS:
+        for match in pattern.finditer(text):
+            ahead = (weekday - reference.weekday()) % 7 or 7
+            found.append((match.start(), reference + timedelta(days=ahead)))
+    return max(found, key=lambda item: item[0])[1] if found else None
+
+
+def _time_slot(text: str) -> Optional[str]:
+    found: List[Tuple[int, str]] = []
+    for pattern, slot in _SLOT_WORDS:
+        found.extend((m.start(), slot) for m in pattern.finditer(text))
+    for match in _CLOCK.finditer(text):
+        hour = int(match.group("hour"))
+        unit = match.group("unit").lower()
+        if unit.startswith("p") and hour < 12:
+            hour += 12
+        elif not unit.startswith(("a", "p")) and hour < 7:
+            hour += 12  # "4 baje" for a site visit means the afternoon
+        if 0 <= hour < 24:
+            slot = "morning" if hour < 12 else "afternoon" if hour < 16 else "evening"
+            found.append((match.start(), slot))
+    return max(found)[1] if found else None
+
+
+def _visit(turns: List[Tuple[str, str]], reference: date) -> Optional[Tuple[date, Optional[str]]]:
+    """Date and slot from the last visit-related exchange that names a day."""
+    for index in range(len(turns) - 1, -1, -1):
+        if not _VISIT.search(turns[index][1]):
+            continue
+        # The date or slot is often given in the turns around the visit mention.
+        window = "\n".join(text for _, text in turns[max(index - 1, 0):index + 2])
+        visit_date = _visit_date(window, reference)
+        if visit_date is not None:
+            return visit_date, _time_slot(window)
+    return None
+
+
+def _last_match(texts: List[str], pattern: Pattern[str]) -> Optional["re.Match[str]"]:
+    for text in reversed(texts):
+        matches = list(pattern.finditer(text))
+        if matches:
+            return matches[-1]
+    return None
+
+
+def _language(text: str) -> str:
+    letters = len(_LETTER.findall(text))
+    if not letters:
+        return "other"
+    if len(_DEVANAGARI_LETTER.findall(text)) / letters > 0.2 or len(_HINGLISH.findall(text)) >= 3:
+        return "hindi"
+    return "english"
+
+
+def extract_local_report(transcript: str, reference: Optional[date] = None) -> Dict[str, Any]:
+    """Best-effort Section 7 report from ``transcript`` without calling an LLM.
+
+    ``reference`` is the call's date, used to resolve "tomorrow", weekdays and
+    dates without a year; it defaults to today.
+    """
+    reference = reference or date.today()
+    report = empty_report()
+    report["report_source"] = REPORT_SOURCE_LOCAL
+
+    turns = _speaker_turns(transcript or "")
+    if not turns:
+        return report
+    labelled = any(speaker in _CUSTOMER_SPEAKERS for speaker, _ in turns)
+    customer = [not labelled or speaker in _CUSTOMER_SPEAKERS for speaker, _ in turns]
+    texts = [text for _, text in turns]
+    customer_texts = [text for text, own in zip(texts, customer) if own]
+
+    info = report["customer_info"]
+    phone = _last_match(texts, _PHONE)
+    if phone is not None:
+        info["contact_number"] = "+91" + re.sub(r"\D", "", phone.group("number"))
+    city = _last_match(customer_texts, _CITY) or _last_match(texts, _CITY)
+    if city is not None:
+        info["city"] = _CITY_BY_ALIAS[city.group(0).lower()]
+    info["preferred_language"] = _language("\n".join(customer_texts))
+
+    requirement = report["requirement"]
+    requirement["monthly_electricity_bill"] = _monthly_bill(turns) or "unknown"
+    kw = _last_match(texts, _KW)
+    if kw is not None and 0.5 <= float(kw.group("num")) <= 1000:
+        requirement["estimated_kw"] = _format_number(float(kw.group("num")))
+    rooftop = _answer(turns, customer, _ROOF)
+    if rooftop is not None:
+        requirement["rooftop_available"] = "yes" if rooftop else "no"
+
+    interests = report["interests"]
+    interests["subsidy_interested"] = bool(_answer(turns, customer, _SUBSIDY))
+    interests["loan_emi_required"] = bool(_answer(turns, customer, _LOAN))
+    interests["net_metering_interested"] = bool(_answer(turns, customer, _NET_METERING))
+    interests["battery_storage_interested"] = bool(_answer(turns, customer, _BATTERY))
+
+    visit = _visit(turns, reference)
+    if visit is not None:
+        report["visit"].update(
+            visit_scheduled=True, visit_date=visit[0].isoformat(), visit_time_slot=visit[1]
+        )
+    return report
@@ -0,0 +1,240 @@
+"""Batch evaluation of solar telemetry alert rules.
+
+Rules are data: each is a conjunction of ``metric op threshold`` conditions plus a
+clear threshold per condition. A rule raises when every condition holds and only
+clears once some condition is back past its clear threshold, so a site hovering
+around a limit keeps a single open alert instead of flapping. Evaluation works on
+NumPy arrays of the latest metrics for any number of sites at once.
+"""
+
+import operator
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.database import async_session_maker
+from app.models.solar_telemetry import SolarAlert
+from app.utils.logging import get_logger
+
+logger = get_logger("services.solar_alert_engine")
+
+_OPERATORS: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+}
+_NEGATED = {"<": ">=", "<=": ">", ">": "<=", ">=": "<"}
+
+
+@dataclass(frozen=True)
+class AlertCondition:
+    metric: str
+    op: str
+    threshold: float
+    clear_threshold: Optional[float] = None
+
+    def triggered(self, values: np.ndarray) -> np.ndarray:
+        return _OPERATORS[self.op](values, self.threshold)
+
+    def cleared(self, values: np.ndarray) -> np.ndarray:
+        threshold = self.threshold if self.clear_threshold is None else self.clear_threshold
+        return _OPERATORS[_NEGATED[self.op]](values, threshold)
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    id: str
+    severity: str
+    message: str
+    conditions: Tuple[AlertCondition, ...]
+
+    @property
+    def metrics(self) -> Set[str]:
+        return {condition.metric for condition in self.conditions}
+
+
+DEFAULT_RULES: Tuple[AlertRule, ...] = (
+    AlertRule(
+        id="low_efficiency",
+        severity="warning",
+        message="System efficiency below expected threshold.",
+        conditions=(
+            AlertCondition("system_efficiency_pct", "<", 75.0, clear_threshold=78.0),
+        ),
+    ),
+    AlertRule(
+        id="low_output",
+        severity="warning",
+        message="High irradiance but low power output detected.",
+        conditions=(
+            AlertCondition("solar_irradiance_w_m2", ">", 800.0, clear_threshold=700.0),
+            AlertCondition("output_ratio", "<", 0.5, clear_threshold=0.6),
+        ),
+    ),
+)
+
+
+@dataclass(frozen=True)
+class AlertTransition:
+    site_id: str
+    rule: AlertRule
+    raised: bool
+
+
+# (rule id, site slots, state before, state after) for one rule in one batch.
+_StateChange = Tuple[str, np.ndarray, np.ndarray, np.ndarray]
+
+
+class SolarAlertEngine:
+    """Holds per-site alert state as boolean arrays indexed by a site slot."""
+
+    def __init__(self, rules: Sequence[AlertRule] = DEFAULT_RULES):
+        self.rules = tuple(rules)
+        self._slots: Dict[str, int] = {}
+        self._site_ids: List[str] = []
+        self._active: Dict[str, np.ndarray] = {
+            rule.id: np.zeros(0, dtype=bool) for rule in self.rules
+        }
+        self._loaded = False
+
+    def _slot_indices(self, site_ids: Sequence[str]) -> np.ndarray:
+        for site_id in site_ids:
+            if site_id not in self._slots:
+                self._slots[site_id] = len(self._site_ids)
+                self._site_ids.append(site_id)
+        size = len(self._site_ids)
+        for rule_id, active in self._active.items():
+            if active.size < size:
+                grown = np.zeros(max(size, active.size * 2), dtype=bool)
+                grown[: active.size] = active
+                self._active[rule_id] = grown
+        return np.fromiter((self._slots[s] for s in site_ids), dtype=np.intp, count=len(site_ids))
+
+    def evaluate(
+        self, site_ids: Sequence[str], metrics: Mapping[str, np.ndarray]
+    ) -> List[AlertTransition]:
+        """Evaluate every rule for a batch of sites and return raise/clear transitions.
+
+        ``metrics`` maps metric names to arrays aligned with ``site_ids``; each site
+        should appear once per batch. Rules whose metrics are missing are skipped.
+        """
+        return self._evaluate(site_ids, metrics)[0]
+
+    def _evaluate(
+        self, site_ids: Sequence[str], metrics: Mapping[str, np.ndarray]
+    ) -> Tuple[List[AlertTransition], List[_StateChange]]:
+        if not site_ids:
+            return [], []
+        slots = self._slot_indices(site_ids)
+        transitions: List[AlertTransition] = []
+        changes: List[_StateChange] = []
+        for rule in self.rules:
+            if not rule.metrics.issubset(metrics):
+                continue
+            triggered = np.ones(len(site_ids), dtype=bool)
+            cleared = np.zeros(len(site_ids), dtype=bool)
+            for condition in rule.conditions:
+                values = np.asarray(metrics[condition.metric], dtype=float)
+                triggered &= condition.triggered(values)
+                cleared |= condition.cleared(values)
+
+            active = self._active[rule.id]
+            previous = active[slots]
+            current = np.where(previous, ~cleared, triggered)
+            active[slots] = current
+            changes.append((rule.id, slots, previous, current))
+
+            for i in np.flatnonzero(current & ~previous):
+                transitions.append(AlertTransition(site_ids[i], rule, raised=True))
+            for i in np.flatnonzero(previous & ~current):
+                transitions.append(AlertTransition(site_ids[i], rule, raised=False))
+        return transitions, changes
+
+    def _revert(self, changes: List[_StateChange]) -> None:
+        """Undo ``changes``, except on slots a later evaluation has moved on since."""
+        for rule_id, slots, previous, current in changes:
+            active = self._active[rule_id]
+            state = active[slots]
+            active[slots] = np.where(state == current, previous, state)
+
+    async def load_active(self) -> None:
+        """Seed in-memory state from alerts left open by a previous process."""
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(SolarAlert.site_id, SolarAlert.rule_id).where(SolarAlert.status == "active")
+            )
+            rows = result.all()
+        site_ids = sorted({site_id for site_id, _ in rows})
+        slots = dict(zip(site_ids, self._slot_indices(site_ids)))
+        for site_id, rule_id in rows:
+            if rule_id in self._active:
+                self._active[rule_id][slots[site_id]] = True
+        self._loaded = True
+
+    async def evaluate_and_persist(
+        self, site_ids: Sequence[str], metrics: Mapping[str, np.ndarray]
+    ) -> List[AlertTransition]:
+        if not self._loaded:
+            await self.load_active()
+        transitions, changes = self._evaluate(site_ids, metrics)
+        if transitions:
+            try:
+                await self._persist(transitions)
+            except Exception:
+                # Unstored transitions must be seen again by the next batch.
+                self._revert(changes)
+                raise
+        return transitions
+
+    async def _persist(self, transitions: List[AlertTransition]) -> None:
+        now = datetime.now(timezone.utc)
+        cleared: Dict[str, Set[str]] = {}
+        async with async_session_maker() as db:
+            for transition in transitions:
+                if transition.raised:
+                    db.add(
+                        SolarAlert(
+                            site_id=transition.site_id,
+                            rule_id=transition.rule.id,
+                            severity=transition.rule.severity,
+                            message=transition.rule.message,
+                            status="active",
+                            raised_at=now,
+                        )
+                    )
+                else:
+                    cleared.setdefault(transition.rule.id, set()).add(transition.site_id)
+            for rule_id, site_ids in cleared.items():
+                result = await db.execute(
+                    select(SolarAlert).where(
+                        SolarAlert.rule_id == rule_id,
+                        SolarAlert.site_id.in_(site_ids),
+                        SolarAlert.status == "active",
+                    )
+                )
+                for alert in result.scalars().all():
+                    alert.status = "resolved"
+                    alert.resolved_at = now
+            await db.commit()
+        logger.info(
+            "solar_alerts_updated",
+            raised=sum(1 for t in transitions if t.raised),
+            resolved=sum(1 for t in transitions if not t.raised),
+        )
+
+
+async def get_active_alerts(site_id: str) -> List[SolarAlert]:
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(SolarAlert)
+            .where(SolarAlert.site_id == site_id, SolarAlert.status == "active")
+            .order_by(SolarAlert.raised_at.desc())
+        )
+        return list(result.scalars().all())
+
+
+solar_alert_engine = SolarAlertEngine()
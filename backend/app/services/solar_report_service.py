@@ -1,16 +1,20 @@
 """Service for generating structured solar sales reports (Section 7)."""
 
 import asyncio
-import json
-from typing import Any, Dict
-
-from openai import AzureOpenAI, OpenAI
+from typing import Any, Dict, Optional, Tuple
 
 from app.config import settings
+from app.services.llm_gateway import LLMGateway, LLMGatewayError, llm_gateway
+from app.services.report_cache import ReportCache, report_cache, report_cache_key
+from app.services.report_chunking import chunk_transcript, merge_reports
 from app.utils.logging import get_logger
 
 logger = get_logger("services.solar_report")
 
+# Bump whenever SECTION_7_PROMPT or the system message changes: it is part of the
+# report cache key, so older cached reports stop being served.
+SECTION_7_PROMPT_VERSION = "1"
+
 SECTION_7_PROMPT = """
 You are an expert sales analyst for Ujjwal Energies, a solar panel company in India.
 Analyze the provided transcript of a sales call and extract the data into the following JSON
@@ -70,45 +74,115 @@ TRANSCRIPT:
 {transcript}
 """
 
+CHUNK_NOTE = """
+NOTE: The transcript below is part {part} of {parts} of one long call; consecutive
+parts overlap by a few turns. Only report what this part states and use null or
+"unknown" for everything it does not cover.
+"""
+
+SYSTEM_MESSAGE = "You are a helpful assistant that extracts structured data from transcripts."
+
 class SolarReportService:
-    def __init__(self):
-        self.client, self.model = self._get_client()
-
-    def _get_client(self):
-        if settings.azure_openai_api_key:
-            return AzureOpenAI(
-                api_key=settings.azure_openai_api_key,
-                azure_endpoint=settings.azure_openai_endpoint,
-                api_version=settings.azure_openai_api_version,
-            ), settings.azure_openai_deployment
-        return OpenAI(api_key=settings.openai_api_key), "gpt-4o-mini"
+    _inflight: Dict[str, "asyncio.Future[Dict[str, Any]]"] = {}
+
+    def __init__(self, gateway: Optional[LLMGateway] = None, cache: Optional[ReportCache] = None):
+        self.gateway = gateway or llm_gateway
+        self.cache = cache or report_cache
 
     async def generate_report(self, transcript: str) -> Dict[str, Any]:
+        """Return the Section 7 report for ``transcript``, from the cache when possible."""
         if not transcript:
             return {}
+        return await self._cached_or_generate(transcript)
+
+    async def _cached_or_generate(self, transcript: str) -> Dict[str, Any]:
+        model = self.gateway.model
+        key = report_cache_key(SECTION_7_PROMPT_VERSION, model, transcript)
+
+        # Concurrent replays of one transcript share the owner's cache lookup and
+        # LLM requests. The key stays claimed until the owner has stored the report.
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return dict(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The owner was cancelled; generate on our own below.
+                return await self._cached_or_generate(transcript)
+
+        claim = asyncio.get_running_loop().create_future()
+        self._inflight[key] = claim
+        try:
+            report = await self._lookup_or_extract(key, model, transcript)
+        except BaseException:
+            claim.cancel()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        claim.set_result(report)
+        return report
+
+    async def _lookup_or_extract(self, key: str, model: str, transcript: str) -> Dict[str, Any]:
+        try:
+            cached = await self.cache.get(key)
+        except Exception as e:
+            logger.warning("report_cache_read_failed", error=str(e))
+            cached = None
+        if cached is not None:
+            logger.info("solar_report_cache_hit", key=key[:12])
+            return cached
+
+        report, complete = await self._extract(transcript)
+        # A report missing failed chunks is returned but not cached.
+        if report and complete:
+            try:
+                await self.cache.put(key, SECTION_7_PROMPT_VERSION, model, report)
+            except Exception as e:
+                logger.warning("report_cache_write_failed", error=str(e))
+        return report
 
-        prompt = SECTION_7_PROMPT.format(transcript=transcript)
+    async def _extract(self, transcript: str) -> Tuple[Dict[str, Any], bool]:
+        """Extract the report; returns it with whether every LLM request succeeded.
 
+        Transcripts over ``report_chunk_max_chars`` are split on turn boundaries
+        and the chunks are extracted concurrently, so latency follows the slowest
+        chunk rather than the length of the call.
+        """
+        chunks = chunk_transcript(
+            transcript, settings.report_chunk_max_chars, settings.report_chunk_overlap_turns
+        )
+        if len(chunks) <= 1:
+            report = await self._extract_prompt(SECTION_7_PROMPT.replace("{transcript}", transcript))
+            return report, bool(report)
+
+        prompt_head, _ = SECTION_7_PROMPT.split("TRANSCRIPT:", 1)
+        partials = await asyncio.gather(
+            *(
+                self._extract_prompt(
+                    prompt_head
+                    + CHUNK_NOTE.format(part=number, parts=len(chunks))
+                    + "\nTRANSCRIPT:\n"
+                    + chunk
+                    + "\n"
+                )
+                for number, chunk in enumerate(chunks, start=1)
+            )
+        )
+        failed = sum(1 for partial in partials if not partial)
+        logger.info("solar_report_chunked", chunks=len(chunks), failed_chunks=failed)
+        return merge_reports(partials), failed == 0
+
+    async def _extract_prompt(self, prompt: str) -> Dict[str, Any]:
         try:
-            response = await asyncio.to_thread(
-                self.client.chat.completions.create,
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a helpful assistant that extracts structured data "
-                            "from transcripts."
-                        ),
-                    },
+            return await self.gateway.complete_json(
+                [
+                    {"role": "system", "content": SYSTEM_MESSAGE},
                     {"role": "user", "content": prompt},
                 ],
-                response_format={"type": "json_object"},
+                purpose="report",
                 temperature=0.1,
             )
-            
-            report = json.loads(response.choices[0].message.content)
-            return report
-        except Exception as e:
+        except LLMGatewayError as e:
             logger.error("generate_report_failed", error=str(e))
             return {}
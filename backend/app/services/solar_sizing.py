@@ -0,0 +1,229 @@
+"""Rooftop solar sizing and quotes from the active product catalog.
+
+A monthly electricity bill becomes a target size (units billed over the units one
+kW generates a month). Every active panel model is then quoted at the panel count
+that reaches that size, with the smallest standard inverter that carries the
+array. Price, size and inverter for each (panel model, panel count) pair up to
+``solar_max_system_kw`` are precomputed once per catalog, each model's counts
+stored back to back (a 250 W panel needs twice the counts of a 500 W one), so a
+quote is a single fancy-index lookup plus a vectorised score over the models: price per watt
+(lower is better), panel efficiency and warranty, each normalised across the
+models that fit. The tables are rebuilt lazily after any committed write to
+``products``.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.product import Product
+from app.services import change_events
+from app.utils.logging import get_logger
+
+logger = get_logger("services.solar_sizing")
+
+_PRICE_WEIGHT, _EFFICIENCY_WEIGHT, _WARRANTY_WEIGHT = 0.5, 0.3, 0.2
+_SQFT_PER_MM2 = 10.7639 / 1_000_000
+_EPSILON = 1e-9
+
+_PRODUCT_COLUMNS = (
+    Product.id,
+    Product.name,
+    Product.manufacturer,
+    Product.wattage,
+    Product.efficiency,
+    Product.price_inr,
+    Product.warranty_years,
+    Product.length_mm,
+    Product.width_mm,
+)
+
+
+def size_for_bill(monthly_bill_inr: float) -> float:
+    """kW of panels that would generate a month's bill worth of units."""
+    units = monthly_bill_inr / settings.solar_tariff_inr_per_kwh
+    return units / settings.solar_generation_kwh_per_kw_month
+
+
+@dataclass(frozen=True)
+class Quote:
+    product_id: int
+    name: str
+    manufacturer: str
+    panel_wattage: int
+    panel_count: int
+    system_kw: float
+    inverter_kw: float
+    price_inr: float
+    price_per_watt: float
+    efficiency: float
+    warranty_years: int
+    roof_area_sqft: Optional[float]  # None when the panel dimensions are unknown
+    monthly_generation_kwh: float
+    score: float
+
+
+def _normalised(values: np.ndarray) -> np.ndarray:
+    """Min-max scale to [0, 1]; a column with no spread counts as best everywhere."""
+    if values.size == 0:
+        return values
+    low, span = values.min(), np.ptp(values)
+    if span <= 0:
+        return np.ones_like(values)
+    return (values - low) / span
+
+
+class _CombinationTable:
+    """Per-model columns and flat (model, panel count) columns for one catalog snapshot."""
+
+    def __init__(self, rows: Sequence[Sequence]) -> None:
+        ids, names, makers, wattage, efficiency, price, warranty, length, width = (
+            zip(*rows) if rows else [()] * len(_PRODUCT_COLUMNS)
+        )
+        self.ids = np.array(ids, dtype=np.int64)
+        self.names = list(names)
+        self.manufacturers = list(makers)
+        self.wattage = np.array(wattage, dtype=np.float64)
+        self.efficiency = np.array(efficiency, dtype=np.float64)
+        self.unit_price = np.array(price, dtype=np.float64)
+        self.warranty = np.array(warranty, dtype=np.float64)
+        # NaN where either dimension is missing.
+        self.panel_sqft = (
+            np.array(length, dtype=np.float64) * np.array(width, dtype=np.float64) * _SQFT_PER_MM2
+        )
+
+        max_watts = settings.solar_max_system_kw * 1000
+        # Model m owns slots offsets[m] .. offsets[m] + max_counts[m] - 1, one per count.
+        self.max_counts = np.ceil(max_watts / self.wattage).astype(np.int64)
+        self.offsets = np.cumsum(self.max_counts) - self.max_counts
+        model = np.repeat(np.arange(self.ids.size), self.max_counts)
+        counts = (np.arange(model.size) - self.offsets[model] + 1).astype(np.float64)
+        self.system_kw = self.wattage[model] * counts / 1000
+        inverters = np.array(sorted(settings.solar_inverter_sizes_kw), dtype=np.float64)
+        slot = np.searchsorted(inverters, self.system_kw - _EPSILON)
+        fits = (slot < inverters.size) & (self.system_kw <= settings.solar_max_system_kw + _EPSILON)
+        self.inverter_kw = np.where(fits, inverters[np.minimum(slot, inverters.size - 1)], np.nan)
+        # NaN marks combinations no standard inverter (or the size cap) allows.
+        self.price = (
+            counts * self.unit_price[model]
+            + self.inverter_kw * settings.solar_inverter_cost_inr_per_kw
+            + self.system_kw * settings.solar_installation_cost_inr_per_kw
+        )
+
+    def __len__(self) -> int:
+        return self.ids.size
+
+    def quote(
+        self, target_kw: float, roof_area_sqft: Optional[float], limit: int
+    ) -> Tuple[int, List[Quote]]:
+        if not len(self):
+            return 0, []
+        needed = np.maximum(np.ceil(target_kw * 1000 / self.wattage - _EPSILON), 1).astype(np.int64)
+        models = np.flatnonzero(needed <= self.max_counts)
+        counts = needed[models]
+        slots = self.offsets[models] + counts - 1
+        price = self.price[slots]
+        system_kw = self.system_kw[slots]
+        area = self.panel_sqft[models] * counts
+        fits = np.isfinite(price)
+        if roof_area_sqft is not None:
+            # Models without dimensions are kept; the quote says the area is unknown.
+            fits &= ~(area > roof_area_sqft)
+        models, counts, slots, price, system_kw, area = (
+            models[fits],
+            counts[fits],
+            slots[fits],
+            price[fits],
+            system_kw[fits],
+            area[fits],
+        )
+        price_per_watt = price / (system_kw * 1000)
+        score = (
+            _PRICE_WEIGHT * (1 - _normalised(price_per_watt))
+            + _EFFICIENCY_WEIGHT * _normalised(self.efficiency[models])
+            + _WARRANTY_WEIGHT * _normalised(self.warranty[models])
+        )
+        order = np.lexsort((price, -score))[:limit]
+        quotes = [
+            Quote(
+                product_id=int(self.ids[models[i]]),
+                name=self.names[models[i]],
+                manufacturer=self.manufacturers[models[i]],
+                panel_wattage=int(self.wattage[models[i]]),
+                panel_count=int(counts[i]),
+                system_kw=round(float(system_kw[i]), 3),
+                inverter_kw=float(self.inverter_kw[slots[i]]),
+                price_inr=round(float(price[i]), 2),
+                price_per_watt=round(float(price_per_watt[i]), 2),
+                efficiency=float(self.efficiency[models[i]]),
+                warranty_years=int(self.warranty[models[i]]),
+                roof_area_sqft=round(float(area[i]), 1) if np.isfinite(area[i]) else None,
+                monthly_generation_kwh=round(
+                    float(system_kw[i]) * settings.solar_generation_kwh_per_kw_month, 1
+                ),
+                score=round(float(score[i]), 4),
+            )
+            for i in order
+        ]
+        return int(models.size), quotes
+
+
+class SolarSizer:
+    """Quotes systems from a combination table rebuilt after product writes."""
+
+    def __init__(self) -> None:
+        self._table: Optional[_CombinationTable] = None
+        self._stale = True
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def invalidate(self, tables: Set[str]) -> None:
+        if Product.__tablename__ in tables:
+            self._stale = True
+
+    def clear(self) -> None:
+        self._stale = True
+
+    async def _table_for_quote(self) -> _CombinationTable:
+        if not self._stale and self._table is not None:
+            return self._table
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+        async with self._lock:
+            if self._stale or self._table is None:
+                # Writes committed during the load mark the new table stale again.
+                self._stale = False
+                async with async_session_maker() as db:
+                    rows = (
+                        await db.execute(
+                            select(*_PRODUCT_COLUMNS).where(
+                                Product.is_active.is_(True),
+                                Product.wattage > 0,
+                                Product.price_inr > 0,
+                            )
+                        )
+                    ).all()
+                self._table = _CombinationTable(rows)
+                logger.info(
+                    "solar_combinations_built",
+                    products=len(self._table),
+                    combinations=self._table.price.size,
+                )
+        return self._table
+
+    async def quote(
+        self, target_kw: float, *, roof_area_sqft: Optional[float] = None, limit: int = 3
+    ) -> Tuple[int, List[Quote]]:
+        """Return ``(models that can build target_kw, best quotes first)``."""
+        table = await self._table_for_quote()
+        return table.quote(target_kw, roof_area_sqft, limit)
+
+
+solar_sizer = SolarSizer()
+change_events.subscribe(solar_sizer.invalidate)
@@ -0,0 +1,371 @@
+"""In-memory live window and persisted rollups for solar inverter telemetry.
+
+Each site keeps a fixed-size ring buffer of raw samples (stdlib ``array`` columns,
+so the live window costs 40 bytes per sample instead of a Python object each), plus
+open 1-minute, 15-minute and daily aggregates. Aggregates are upserted into
+``solar_telemetry_rollups`` by a background flush at most once per
+``solar_rollup_flush_interval_seconds`` and pruned per tier retention. The first
+flush of a bucket folds in whatever an earlier process already stored for it, so
+a restart mid-day continues the day's totals instead of overwriting them.
+"""
+
+import asyncio
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.solar_telemetry import SolarTelemetryRollup
+from app.services.tool_runtime import deferred_tasks
+from app.utils.logging import get_logger
+
+logger = get_logger("services.solar_telemetry_store")
+
+# Daily buckets follow the IST calendar day, like the rest of the dashboard.
+_IST_OFFSET_SECONDS = 5 * 3600 + 30 * 60
+_TIERS: Tuple[Tuple[str, int], ...] = (("1m", 60), ("15m", 900), ("1d", 86400))
+_TREND_DAYS = 7
+# Gaps longer than this are treated as an outage rather than integrated as output.
+_MAX_INTEGRATION_GAP_SECONDS = 300.0
+_PRUNE_INTERVAL_SECONDS = 3600.0
+
+
+@dataclass
+class TelemetrySample:
+    site_id: str
+    timestamp: float
+    power_kw: float
+    irradiance_w_m2: float
+    temperature_c: float
+    efficiency_pct: float
+    snapshot: Dict[str, Any] = field(default_factory=dict)
+
+
+class _RingBuffer:
+    """Fixed-capacity columnar buffer of the most recent raw samples."""
+
+    _COLUMNS = ("timestamp", "power_kw", "irradiance_w_m2", "temperature_c", "efficiency_pct")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.size = 0
+        self._head = 0
+        self.columns: Dict[str, array] = {
+            name: array("d", bytes(8 * capacity)) for name in self._COLUMNS
+        }
+
+    def append(self, sample: TelemetrySample) -> None:
+        for name, column in self.columns.items():
+            column[self._head] = getattr(sample, name)
+        self._head = (self._head + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def window(self, name: str, seconds: Optional[float] = None) -> List[float]:
+        """Return a column oldest-first, optionally limited to the last ``seconds``."""
+        column = self.columns[name]
+        start = (self._head - self.size) % self.capacity
+        if start + self.size <= self.capacity:
+            values = column[start:start + self.size]
+            stamps = self.columns["timestamp"][start:start + self.size]
+        else:
+            values = column[start:] + column[:self._head]
+            stamps = self.columns["timestamp"][start:] + self.columns["timestamp"][:self._head]
+        if seconds is None or not stamps:
+            return list(values)
+        cutoff = stamps[-1] - seconds
+        return [v for v, ts in zip(values, stamps) if ts >= cutoff]
+
+
+class _Rollup:
+    __slots__ = (
+        "site_id",
+        "resolution",
+        "bucket_start",
+        "sample_count",
+        "power_sum",
+        "power_max",
+        "energy_kwh",
+        "irradiance_sum",
+        "temperature_sum",
+        "efficiency_sum",
+        "seeded",
+    )
+
+    def __init__(self, site_id: str, resolution: str, bucket_start: int):
+        self.site_id = site_id
+        self.resolution = resolution
+        self.bucket_start = bucket_start
+        self.sample_count = 0
+        self.power_sum = 0.0
+        self.power_max = 0.0
+        self.energy_kwh = 0.0
+        self.irradiance_sum = 0.0
+        self.temperature_sum = 0.0
+        self.efficiency_sum = 0.0
+        # Whether the persisted row for this bucket has been folded in yet.
+        self.seeded = False
+
+    def add(self, sample: TelemetrySample, energy_kwh: float) -> None:
+        self.sample_count += 1
+        self.power_sum += sample.power_kw
+        self.power_max = max(self.power_max, sample.power_kw)
+        self.energy_kwh += energy_kwh
+        self.irradiance_sum += sample.irradiance_w_m2
+        self.temperature_sum += sample.temperature_c
+        self.efficiency_sum += sample.efficiency_pct
+
+    def seed_from(self, row: SolarTelemetryRollup) -> None:
+        """Fold in totals a previous process stored for this bucket."""
+        n = row.sample_count or 0
+        self.sample_count += n
+        self.power_sum += row.avg_power_kw * n
+        self.power_max = max(self.power_max, row.max_power_kw)
+        self.energy_kwh += row.energy_kwh
+        self.irradiance_sum += row.avg_irradiance_w_m2 * n
+        self.temperature_sum += row.avg_temperature_c * n
+        self.efficiency_sum += row.avg_efficiency_pct * n
+
+    def apply_to(self, row: SolarTelemetryRollup) -> None:
+        n = self.sample_count or 1
+        row.sample_count = self.sample_count
+        row.avg_power_kw = self.power_sum / n
+        row.max_power_kw = self.power_max
+        row.energy_kwh = self.energy_kwh
+        row.avg_irradiance_w_m2 = self.irradiance_sum / n
+        row.avg_temperature_c = self.temperature_sum / n
+        row.avg_efficiency_pct = self.efficiency_sum / n
+
+    @property
+    def bucket_start_dt(self) -> datetime:
+        return datetime.fromtimestamp(self.bucket_start, tz=timezone.utc)
+
+
+def _bucket_start(timestamp: float, width: int) -> int:
+    if width == 86400:
+        local = int(timestamp) + _IST_OFFSET_SECONDS
+        return local - local % width - _IST_OFFSET_SECONDS
+    ts = int(timestamp)
+    return ts - ts % width
+
+
+class _SiteState:
+    def __init__(self, site_id: str, capacity: int):
+        self.site_id = site_id
+        self.ring = _RingBuffer(capacity)
+        self.latest: Optional[TelemetrySample] = None
+        self.open_rollups: Dict[str, _Rollup] = {}
+        self.closed_days: Deque[_Rollup] = deque(maxlen=_TREND_DAYS - 1)
+
+
+class SolarTelemetryStore:
+    def __init__(self, live_window_samples: int):
+        self.live_window_samples = live_window_samples
+        self._sites: Dict[str, _SiteState] = {}
+        self._dirty: Dict[Tuple[str, str, int], _Rollup] = {}
+        self._last_prune = 0.0
+        self._flush_timer: Optional[asyncio.Task] = None
+
+    def ingest(self, samples: List[TelemetrySample]) -> int:
+        """Fold samples into the live window and open rollups; return how many were kept.
+
+        Samples at or before a site's latest timestamp are treated as retransmits
+        and dropped, which keeps each ring buffer time-ordered.
+        """
+        accepted = 0
+        for sample in sorted(samples, key=lambda s: s.timestamp):
+            state = self._sites.get(sample.site_id)
+            if state is None:
+                state = _SiteState(sample.site_id, self.live_window_samples)
+                self._sites[sample.site_id] = state
+            previous = state.latest
+            if previous is not None and sample.timestamp <= previous.timestamp:
+                continue
+
+            energy_kwh = 0.0
+            if previous is not None:
+                gap = sample.timestamp - previous.timestamp
+                if gap <= _MAX_INTEGRATION_GAP_SECONDS:
+                    energy_kwh = (previous.power_kw + sample.power_kw) / 2 * gap / 3600
+
+            state.ring.append(sample)
+            state.latest = sample
+            for resolution, width in _TIERS:
+                self._add_to_tier(state, resolution, width, sample, energy_kwh)
+            accepted += 1
+        return accepted
+
+    def _add_to_tier(
+        self,
+        state: _SiteState,
+        resolution: str,
+        width: int,
+        sample: TelemetrySample,
+        energy_kwh: float,
+    ) -> None:
+        start = _bucket_start(sample.timestamp, width)
+        rollup = state.open_rollups.get(resolution)
+        if rollup is None or rollup.bucket_start != start:
+            if rollup is not None and resolution == "1d":
+                state.closed_days.append(rollup)
+            rollup = _Rollup(state.site_id, resolution, start)
+            state.open_rollups[resolution] = rollup
+        rollup.add(sample, energy_kwh)
+        self._dirty[(state.site_id, resolution, start)] = rollup
+
+    def latest(self, site_id: str) -> Optional[TelemetrySample]:
+        state = self._sites.get(site_id)
+        return state.latest if state else None
+
+    def live_window(self, site_id: str, column: str, seconds: Optional[float] = None) -> List[float]:
+        state = self._sites.get(site_id)
+        return state.ring.window(column, seconds) if state else []
+
+    async def energy_trend(self, site_id: str) -> List[Tuple[datetime, float]]:
+        """Daily energy for up to the last seven IST days, oldest first.
+
+        Reads the persisted daily tier and overlays the days still held in memory,
+        which may not have been flushed yet.
+        """
+        state = self._sites.get(site_id)
+        anchor = state.latest.timestamp if state and state.latest else time.time()
+        since = _bucket_start(anchor, 86400) - (_TREND_DAYS - 1) * 86400
+
+        async with async_session_maker() as db:
+            result = await db.execute(
+                select(SolarTelemetryRollup.bucket_start, SolarTelemetryRollup.energy_kwh).where(
+                    SolarTelemetryRollup.site_id == site_id,
+                    SolarTelemetryRollup.resolution == "1d",
+                    SolarTelemetryRollup.bucket_start >= datetime.fromtimestamp(since, tz=timezone.utc),
+                )
+            )
+            persisted = {
+                int(_as_utc(bucket_start).timestamp()): energy_kwh
+                for bucket_start, energy_kwh in result.all()
+            }
+
+        days = dict(persisted)
+        if state is not None:
+            in_memory = list(state.closed_days)
+            today = state.open_rollups.get("1d")
+            if today is not None:
+                in_memory.append(today)
+            for day in in_memory:
+                if day.bucket_start < since:
+                    continue
+                # An unseeded rollup only holds what this process has seen so far.
+                base = 0.0 if day.seeded else persisted.get(day.bucket_start, 0.0)
+                days[day.bucket_start] = base + day.energy_kwh
+        return [
+            (datetime.fromtimestamp(start, tz=timezone.utc), round(energy, 3))
+            for start, energy in sorted(days.items())
+        ]
+
+    def schedule_flush(self) -> None:
+        """Flush once ``solar_rollup_flush_interval_seconds`` from now, unless already due.
+
+        The write itself runs as a deferred task, so shutdown (and tests) can wait
+        for it instead of cancelling it mid-commit.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        timer = self._flush_timer
+        if timer is None or timer.done() or timer.get_loop() is not loop:
+            self._flush_timer = loop.create_task(self._flush_after_interval())
+
+    async def _flush_after_interval(self) -> None:
+        await asyncio.sleep(settings.solar_rollup_flush_interval_seconds)
+        deferred_tasks.defer("flush_solar_rollups", self.flush)
+
+    async def flush(self) -> int:
+        """Upsert every rollup touched since the last flush, one lookup per tier."""
+        if not self._dirty:
+            return 0
+        dirty, self._dirty = self._dirty, {}
+        by_tier: Dict[str, Dict[Tuple[str, datetime], _Rollup]] = {}
+        for rollup in dirty.values():
+            by_tier.setdefault(rollup.resolution, {})[
+                (rollup.site_id, rollup.bucket_start_dt)
+            ] = rollup
+
+        try:
+            async with async_session_maker() as db:
+                for resolution, rollups in by_tier.items():
+                    # Sites x starts may match a few rows we did not touch; they are ignored.
+                    result = await db.execute(
+                        select(SolarTelemetryRollup).where(
+                            SolarTelemetryRollup.resolution == resolution,
+                            SolarTelemetryRollup.site_id.in_({site for site, _ in rollups}),
+                            SolarTelemetryRollup.bucket_start.in_({start for _, start in rollups}),
+                        )
+                    )
+                    existing = {
+                        (row.site_id, _as_utc(row.bucket_start)): row
+                        for row in result.scalars().all()
+                    }
+                    for (site_id, bucket_start), rollup in rollups.items():
+                        row = existing.get((site_id, bucket_start))
+                        if not rollup.seeded:
+                            if row is not None:
+                                rollup.seed_from(row)
+                            rollup.seeded = True
+                        if row is None:
+                            row = SolarTelemetryRollup(
+                                site_id=site_id,
+                                resolution=resolution,
+                                bucket_start=bucket_start,
+                            )
+                            db.add(row)
+                        rollup.apply_to(row)
+                await db.commit()
+                if time.monotonic() - self._last_prune >= _PRUNE_INTERVAL_SECONDS:
+                    await self.prune(db)
+        except Exception as e:
+            # Keep the rollups so the next flush retries them.
+            for key, rollup in dirty.items():
+                self._dirty.setdefault(key, rollup)
+            self.schedule_flush()
+            logger.error("solar_rollup_flush_failed", rollups=len(dirty), error=str(e))
+            return 0
+        return len(dirty)
+
+    async def prune(self, db) -> int:
+        """Delete rollups that fell out of their tier's retention window."""
+        now = datetime.now(timezone.utc)
+        retention_days = {
+            "1m": settings.solar_retention_1m_days,
+            "15m": settings.solar_retention_15m_days,
+            "1d": settings.solar_retention_1d_days,
+        }
+        deleted = 0
+        for resolution, days in retention_days.items():
+            result = await db.execute(
+                delete(SolarTelemetryRollup).where(
+                    and_(
+                        SolarTelemetryRollup.resolution == resolution,
+                        SolarTelemetryRollup.bucket_start < now - timedelta(days=days),
+                    )
+                )
+            )
+            deleted += result.rowcount or 0
+        await db.commit()
+        self._last_prune = time.monotonic()
+        if deleted:
+            logger.info("solar_rollups_pruned", deleted=deleted)
+        return deleted
+
+
+def _as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+solar_telemetry_store = SolarTelemetryStore(live_window_samples=settings.solar_live_window_samples)
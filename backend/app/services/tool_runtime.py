@@ -0,0 +1,129 @@
+"""Latency tracking and deferred side effects for the voice agent's tool endpoints.
+
+The ``/calls/tools/*`` endpoints are called mid-conversation, so their response
+should only wait for the writes the agent needs an answer about. Everything else
+(notifications, audit trails) is handed to a single post-response worker that
+runs the jobs one at a time on its own sessions, which also keeps them from
+competing with live tool calls for SQLite's write lock.
+
+Each tool's recent latencies are kept in a rolling window so p50/p99 can be
+compared against ``tool_latency_budget_ms``.
+"""
+
+import asyncio
+import functools
+import math
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+from app.config import settings
+from app.utils.logging import get_logger
+
+logger = get_logger("services.tool_runtime")
+
+
+def _percentile(ordered: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class ToolLatencyTracker:
+    def __init__(self, budget_ms: Optional[float] = None, window: Optional[int] = None):
+        self.budget_ms = budget_ms or settings.tool_latency_budget_ms
+        self.window = window or settings.tool_latency_window
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, tool: str, latency_ms: float) -> None:
+        samples = self._samples.get(tool)
+        if samples is None:
+            samples = self._samples[tool] = deque(maxlen=self.window)
+        samples.append(latency_ms)
+        if latency_ms > self.budget_ms:
+            logger.warning(
+                "tool_latency_over_budget",
+                tool=tool,
+                latency_ms=round(latency_ms, 1),
+                budget_ms=self.budget_ms,
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        stats: Dict[str, Dict[str, Any]] = {}
+        for tool, samples in self._samples.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+            p99 = _percentile(ordered, 99)
+            stats[tool] = {
+                "count": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50), 1),
+                "p99_ms": round(p99, 1),
+                "max_ms": round(ordered[-1], 1),
+                "budget_ms": self.budget_ms,
+                "within_budget": p99 <= self.budget_ms,
+            }
+        return stats
+
+    def reset(self) -> None:
+        self._samples.clear()
+
+    def timed(self, tool: str) -> Callable:
+        """Decorate an async endpoint so every call's wall time is recorded under ``tool``."""
+
+        def decorator(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+            @functools.wraps(endpoint)
+            async def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await endpoint(*args, **kwargs)
+                finally:
+                    self.record(tool, (time.perf_counter() - started) * 1000)
+
+            return wrapper
+
+        return decorator
+
+
+class DeferredTasks:
+    """FIFO of side-effect jobs drained by one worker task that exits when idle."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def defer(self, name: str, job: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> None:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            self._queue, self._worker, self._loop = asyncio.Queue(), None, loop
+        self._queue.put_nowait((name, job, args, kwargs))
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run(self._queue))
+
+    async def _run(self, queue: asyncio.Queue) -> None:
+        while not queue.empty():
+            name, job, args, kwargs = queue.get_nowait()
+            try:
+                await job(*args, **kwargs)
+            except Exception as e:
+                logger.error("deferred_task_failed", task=name, error=str(e))
+            finally:
+                queue.task_done()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def drain(self, timeout: Optional[float] = None) -> None:
+        """Wait until every job queued so far has run (used on shutdown and in tests)."""
+        if self._queue is None or self._loop is not asyncio.get_running_loop():
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("deferred_tasks_drain_timeout", pending=self.pending)
+
+
+tool_latency = ToolLatencyTracker()
+deferred_tasks = DeferredTasks()
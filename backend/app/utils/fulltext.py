@@ -0,0 +1,294 @@
+"""Full-text search for property and appointment lists.
+
+SQLite keeps FTS5 tables (``properties_fts``, ``appointments_fts``) in sync with
+triggers. PostgreSQL uses GIN indexes on ``simple`` tsvector expressions, plus
+trigram indexes so phone numbers still match on any fragment. Every search
+term is a prefix match, and all terms must match. Other dialects keep the old
+``ILIKE`` scans.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Select, func, literal_column, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.appointment import Appointment
+from app.models.lead import Lead
+from app.models.property import Property
+
+PROPERTY_FTS = "properties_fts"
+APPOINTMENT_FTS = "appointments_fts"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_PROPERTY_FIELDS = ("title", "city", "locality", "address", "landmark", "description")
+# bm25() weights, in _PROPERTY_FIELDS order: a hit in the title counts most.
+_PROPERTY_WEIGHTS = (4.0, 2.0, 3.0, 1.0, 1.0, 0.5)
+_APPOINTMENT_FIELDS = (
+    "client_name",
+    "client_phone",
+    "client_email",
+    "address",
+    "notes",
+    "contact_number",
+)
+_SNIPPET_TOKENS = 12
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    return _WORD.findall((query or "").lower())
+
+
+def _fts5_match(terms: Sequence[str]) -> str:
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms: Sequence[str]) -> str:
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def _pg_document(fields: Sequence[str], table: str = "") -> str:
+    prefix = f"{table}." if table else ""
+    parts = " || ' ' || ".join(f"coalesce({prefix}{field}, '')" for field in fields)
+    return f"to_tsvector('simple'::regconfig, {parts})"
+
+
+_PG_APPOINTMENT_FIELDS = ("address", "notes")
+_PG_LEAD_FIELDS = ("name", "email")
+
+
+def uses_fulltext(dialect: str) -> bool:
+    return dialect in ("sqlite", "postgresql")
+
+
+# ---- queries ----
+
+
+def property_matches(dialect: str, terms: Sequence[str]) -> Select:
+    """``(id, rank)`` of properties matching every term; lower rank is better."""
+    if dialect == "sqlite":
+        fts = literal_column(PROPERTY_FTS)
+        return (
+            select(
+                literal_column("rowid").label("id"),
+                func.bm25(fts, *_PROPERTY_WEIGHTS).label("rank"),
+            )
+            .select_from(text(PROPERTY_FTS))
+            .where(fts.op("MATCH")(_fts5_match(terms)))
+        )
+    document = literal_column(_pg_document(_PROPERTY_FIELDS, "properties"))
+    query = func.to_tsquery(literal_column("'simple'::regconfig"), _tsquery(terms))
+    return (
+        select(Property.id.label("id"), (-func.ts_rank(document, query)).label("rank"))
+        .where(document.op("@@")(query))
+        .correlate(None)
+    )
+
+
+def appointment_matches(dialect: str, terms: Sequence[str], raw: str) -> Select:
+    """``(id, rank)`` of appointments whose own or client fields match; lower rank is better."""
+    if dialect == "sqlite":
+        fts = literal_column(APPOINTMENT_FTS)
+        return (
+            select(literal_column("rowid").label("id"), func.bm25(fts).label("rank"))
+            .select_from(text(APPOINTMENT_FTS))
+            .where(fts.op("MATCH")(_fts5_match(terms)))
+        )
+    own = literal_column(_pg_document(_PG_APPOINTMENT_FIELDS, "appointments"))
+    client = literal_column(_pg_document(_PG_LEAD_FIELDS, "leads"))
+    query = func.to_tsquery(literal_column("'simple'::regconfig"), _tsquery(terms))
+    fragment = f"%{raw.strip()}%"
+    return (
+        select(
+            Appointment.id.label("id"),
+            (-(func.ts_rank(own, query) + func.ts_rank(client, query))).label("rank"),
+        )
+        .join(Lead, Lead.id == Appointment.lead_id)
+        .where(
+            or_(
+                own.op("@@")(query),
+                client.op("@@")(query),
+                Lead.phone.ilike(fragment),
+                Appointment.contact_number.ilike(fragment),
+            )
+        )
+        .correlate(None)
+    )
+
+
+async def _sqlite_snippets(
+    db: AsyncSession, table: str, terms: Sequence[str], ids: Sequence[int]
+) -> Dict[int, str]:
+    fts = literal_column(table)
+    result = await db.execute(
+        select(
+            literal_column("rowid"),
+            func.snippet(fts, -1, HIGHLIGHT_START, HIGHLIGHT_END, "…", _SNIPPET_TOKENS),
+        )
+        .select_from(text(table))
+        .where(fts.op("MATCH")(_fts5_match(terms)), literal_column("rowid").in_(ids))
+    )
+    return {row_id: snippet for row_id, snippet in result.all()}
+
+
+async def _pg_snippets(
+    db: AsyncSession, id_column, document: str, terms: Sequence[str], ids: Sequence[int], *joins
+) -> Dict[int, str]:
+    query = func.to_tsquery(literal_column("'simple'::regconfig"), _tsquery(terms))
+    options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, MaxWords=20, MinWords=5"
+    statement = select(
+        id_column,
+        func.ts_headline(
+            literal_column("'simple'::regconfig"), literal_column(document), query, options
+        ),
+    ).where(id_column.in_(ids))
+    for target, onclause in joins:
+        statement = statement.join(target, onclause)
+    result = await db.execute(statement)
+    return {row_id: snippet for row_id, snippet in result.all()}
+
+
+async def property_snippets(
+    db: AsyncSession, terms: Sequence[str], ids: Sequence[int]
+) -> Dict[int, str]:
+    """Highlighted excerpts for one page of matching properties."""
+    if not ids:
+        return {}
+    if db.get_bind().dialect.name == "sqlite":
+        return await _sqlite_snippets(db, PROPERTY_FTS, terms, ids)
+    fields = " || ' ' || ".join(f"coalesce(properties.{field}, '')" for field in _PROPERTY_FIELDS)
+    return await _pg_snippets(db, Property.id, fields, terms, ids)
+
+
+async def appointment_snippets(
+    db: AsyncSession, terms: Sequence[str], ids: Sequence[int]
+) -> Dict[int, str]:
+    """Highlighted excerpts for one page of matching appointments."""
+    if not ids:
+        return {}
+    if db.get_bind().dialect.name == "sqlite":
+        return await _sqlite_snippets(db, APPOINTMENT_FTS, terms, ids)
+    fields = " || ' ' || ".join(
+        [f"coalesce(leads.{field}, '')" for field in _PG_LEAD_FIELDS]
+        + [f"coalesce(appointments.{field}, '')" for field in _PG_APPOINTMENT_FIELDS]
+    )
+    return await _pg_snippets(
+        db, Appointment.id, fields, terms, ids, (Lead, Lead.id == Appointment.lead_id)
+    )
+
+
+# ---- schema ----
+
+
+def _digits(column: str) -> str:
+    expression = f"coalesce({column}, '')"
+    for char in ("+", " ", "-", "(", ")"):
+        expression = f"replace({expression}, '{char}', '')"
+    return expression
+
+
+def _phone_tokens(column: str) -> str:
+    """Digits plus the 10-digit national number, so prefix searches work either way."""
+    digits = _digits(column)
+    return f"{digits} || ' ' || substr({digits}, -10)"
+
+
+def _appointment_row(appointment: str) -> str:
+    """The appointments_fts column values for ``appointment`` (``new`` or a table alias)."""
+    lead = f"(SELECT {{}} FROM leads WHERE leads.id = {appointment}.lead_id)"
+    return ", ".join(
+        [
+            lead.format("name"),
+            lead.format(_phone_tokens("phone")),
+            lead.format("email"),
+            f"{appointment}.address",
+            f"{appointment}.notes",
+            _phone_tokens(f"{appointment}.contact_number"),
+        ]
+    )
+
+
+def _sqlite_statements() -> List[str]:
+    property_columns = ", ".join(_PROPERTY_FIELDS)
+    new_values = ", ".join(f"new.{field}" for field in _PROPERTY_FIELDS)
+    old_values = ", ".join(f"old.{field}" for field in _PROPERTY_FIELDS)
+    appointment_columns = ", ".join(_APPOINTMENT_FIELDS)
+    delete_old_property = (
+        f"INSERT INTO {PROPERTY_FTS}({PROPERTY_FTS}, rowid, {property_columns}) "
+        f"VALUES ('delete', old.id, {old_values});"
+    )
+    insert_new_property = (
+        f"INSERT INTO {PROPERTY_FTS}(rowid, {property_columns}) VALUES (new.id, {new_values});"
+    )
+    insert_new_appointment = (
+        f"INSERT INTO {APPOINTMENT_FTS}(rowid, {appointment_columns}) "
+        f"VALUES (new.id, {_appointment_row('new')});"
+    )
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS properties_fts_ai AFTER INSERT ON properties BEGIN "
+        f"{insert_new_property} END",
+        f"CREATE TRIGGER IF NOT EXISTS properties_fts_ad AFTER DELETE ON properties BEGIN "
+        f"{delete_old_property} END",
+        f"CREATE TRIGGER IF NOT EXISTS properties_fts_au AFTER UPDATE OF {property_columns} "
+        f"ON properties BEGIN {delete_old_property} {insert_new_property} END",
+        f"CREATE TRIGGER IF NOT EXISTS appointments_fts_ai AFTER INSERT ON appointments BEGIN "
+        f"{insert_new_appointment} END",
+        f"CREATE TRIGGER IF NOT EXISTS appointments_fts_ad AFTER DELETE ON appointments BEGIN "
+        f"DELETE FROM {APPOINTMENT_FTS} WHERE rowid = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS appointments_fts_au AFTER UPDATE OF "
+        f"lead_id, address, notes, contact_number ON appointments BEGIN "
+        f"DELETE FROM {APPOINTMENT_FTS} WHERE rowid = old.id; {insert_new_appointment} END",
+        f"CREATE TRIGGER IF NOT EXISTS appointments_fts_lead_au AFTER UPDATE OF name, phone, email "
+        f"ON leads BEGIN "
+        f"DELETE FROM {APPOINTMENT_FTS} WHERE rowid IN "
+        f"(SELECT id FROM appointments WHERE lead_id = new.id); "
+        f"INSERT INTO {APPOINTMENT_FTS}(rowid, {appointment_columns}) "
+        f"SELECT a.id, {_appointment_row('a')} FROM appointments AS a "
+        f"WHERE a.lead_id = new.id; END",
+    ]
+
+
+def ensure_sqlite_fulltext(connection) -> None:
+    """Create the FTS5 tables and triggers, filling the tables the first time."""
+    existing = {
+        name
+        for (name,) in connection.exec_driver_sql(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name IN (?, ?)",
+            (PROPERTY_FTS, APPOINTMENT_FTS),
+        )
+    }
+    if PROPERTY_FTS not in existing:
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {PROPERTY_FTS} USING fts5({', '.join(_PROPERTY_FIELDS)}, "
+            f"content='properties', content_rowid='id', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        connection.exec_driver_sql(f"INSERT INTO {PROPERTY_FTS}({PROPERTY_FTS}) VALUES ('rebuild')")
+    if APPOINTMENT_FTS not in existing:
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {APPOINTMENT_FTS} USING fts5({', '.join(_APPOINTMENT_FIELDS)}, "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        connection.exec_driver_sql(
+            f"INSERT INTO {APPOINTMENT_FTS}(rowid, {', '.join(_APPOINTMENT_FIELDS)}) "
+            f"SELECT a.id, {_appointment_row('a')} FROM appointments AS a"
+        )
+    for statement in _sqlite_statements():
+        connection.exec_driver_sql(statement)
+
+
+def ensure_postgres_fulltext(connection) -> None:
+    """Create the tsvector and trigram GIN indexes the search queries use."""
+    connection.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, expression in (
+        ("ix_properties_search_tsv", "properties", _pg_document(_PROPERTY_FIELDS)),
+        ("ix_appointments_search_tsv", "appointments", _pg_document(_PG_APPOINTMENT_FIELDS)),
+        ("ix_leads_search_tsv", "leads", _pg_document(_PG_LEAD_FIELDS)),
+        ("ix_leads_phone_trgm", "leads", "phone gin_trgm_ops"),
+        ("ix_appointments_contact_number_trgm", "appointments", "contact_number gin_trgm_ops"),
+    ):
+        connection.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression})"
+        )
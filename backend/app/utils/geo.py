@@ -0,0 +1,204 @@
+"""Radius and bounding-box lookups over property coordinates.
+
+SQLite keeps an R-tree (``properties_geo``) of active properties that have
+coordinates, synced by triggers. PostgreSQL uses a partial GiST index on
+``point(longitude, latitude)``, with no PostGIS needed. Other dialects fall back
+to range predicates on the latitude and longitude columns. Candidates come from
+the index by bounding box. Distance is then filtered and ordered with an
+equirectangular approximation, which is plain arithmetic on every dialect and
+well under 0.1% off at city scale.
+"""
+
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from sqlalchemy import ColumnElement, Select, and_, column, func, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.property import Property, PropertyStatus
+
+PROPERTY_GEO = "properties_geo"
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.pi / 180
+MAX_RADIUS_KM = 100
+
+_geo = table(
+    PROPERTY_GEO,
+    column("id"),
+    column("min_lat"),
+    column("max_lat"),
+    column("min_lon"),
+    column("max_lon"),
+)
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    min_lat: float
+    max_lat: float
+    min_lon: float
+    max_lon: float
+
+    @classmethod
+    def around(cls, lat: float, lon: float, radius_km: float) -> "BoundingBox":
+        """The smallest box that contains the circle of ``radius_km`` around a point."""
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = dlat / max(math.cos(math.radians(lat)), 1e-6)
+        return cls(
+            min_lat=max(lat - dlat, -90.0),
+            max_lat=min(lat + dlat, 90.0),
+            min_lon=max(lon - dlon, -180.0),
+            max_lon=min(lon + dlon, 180.0),
+        )
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        return (self.min_lat + self.max_lat) / 2, (self.min_lon + self.max_lon) / 2
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+# ---- queries ----
+
+
+def properties_in_box(dialect: str, box: BoundingBox) -> Select:
+    """Ids of active properties whose coordinates fall inside ``box``."""
+    if dialect == "sqlite":
+        # The R-tree only holds active properties.
+        return select(_geo.c.id).where(
+            _geo.c.min_lat <= box.max_lat,
+            _geo.c.max_lat >= box.min_lat,
+            _geo.c.min_lon <= box.max_lon,
+            _geo.c.max_lon >= box.min_lon,
+        )
+    if dialect == "postgresql":
+        point = func.point(Property.longitude, Property.latitude)
+        bounds = func.box(
+            func.point(box.min_lon, box.min_lat), func.point(box.max_lon, box.max_lat)
+        )
+        # Repeats the partial index predicate so the planner can use it.
+        return select(Property.id).where(
+            Property.is_active.is_(True),
+            Property.latitude.is_not(None),
+            Property.longitude.is_not(None),
+            point.op("<@")(bounds),
+        )
+    return select(Property.id).where(
+        Property.is_active.is_(True),
+        Property.latitude.between(box.min_lat, box.max_lat),
+        Property.longitude.between(box.min_lon, box.max_lon),
+    )
+
+
+def squared_distance_km(lat: float, lon: float) -> ColumnElement:
+    """Approximate squared distance in km² from ``(lat, lon)`` to each property."""
+    lon_scale = KM_PER_DEGREE * math.cos(math.radians(lat))
+    dy = (Property.latitude - lat) * KM_PER_DEGREE
+    dx = (Property.longitude - lon) * lon_scale
+    return dy * dy + dx * dx
+
+
+def within_box(box: BoundingBox) -> ColumnElement:
+    """Exact bounds check; R-tree coordinates are single precision, rounded outwards."""
+    return and_(
+        Property.latitude.between(box.min_lat, box.max_lat),
+        Property.longitude.between(box.min_lon, box.max_lon),
+    )
+
+
+def nearby(
+    dialect: str,
+    lat: float,
+    lon: float,
+    *,
+    radius_km: Optional[float] = None,
+    box: Optional[BoundingBox] = None,
+) -> Select:
+    """Active properties within ``radius_km`` of a point and/or inside ``box``, nearest first."""
+    if box is None:
+        box = BoundingBox.around(lat, lon, radius_km)
+    distance = squared_distance_km(lat, lon)
+    # Activity is checked inside the box lookup, so SQLite drives the query from the R-tree
+    # rather than the is_active index.
+    query = select(Property).where(
+        Property.id.in_(properties_in_box(dialect, box)), within_box(box)
+    )
+    if radius_km is not None:
+        query = query.where(distance <= radius_km * radius_km)
+    return query.order_by(distance, Property.id)
+
+
+async def locate(db: AsyncSession, place: str) -> Optional[Tuple[float, float]]:
+    """Centre of the available properties in a locality (or, failing that, a city) named ``place``."""
+    place = place.strip()
+    if not place:
+        return None
+    for field in (Property.locality, Property.city):
+        result = await db.execute(
+            select(func.avg(Property.latitude), func.avg(Property.longitude)).where(
+                Property.is_active.is_(True),
+                Property.status == PropertyStatus.AVAILABLE.value,
+                Property.latitude.is_not(None),
+                Property.longitude.is_not(None),
+                func.lower(field) == place.lower(),
+            )
+        )
+        lat, lon = result.one()
+        if lat is not None and lon is not None:
+            return float(lat), float(lon)
+    return None
+
+
+# ---- schema ----
+
+
+def _sqlite_statements() -> List[str]:
+    located = "new.is_active AND new.latitude IS NOT NULL AND new.longitude IS NOT NULL"
+    insert_new = (
+        f"INSERT INTO {PROPERTY_GEO}(id, min_lat, max_lat, min_lon, max_lon) "
+        f"SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude WHERE {located};"
+    )
+    delete_old = f"DELETE FROM {PROPERTY_GEO} WHERE id = old.id;"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS properties_geo_ai AFTER INSERT ON properties BEGIN "
+        f"{insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS properties_geo_ad AFTER DELETE ON properties BEGIN "
+        f"{delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS properties_geo_au AFTER UPDATE OF "
+        f"latitude, longitude, is_active ON properties BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def ensure_sqlite_geo(connection) -> None:
+    """Create the R-tree and its triggers, filling it the first time."""
+    exists = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (PROPERTY_GEO,)
+    ).first()
+    if not exists:
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {PROPERTY_GEO} "
+            f"USING rtree(id, min_lat, max_lat, min_lon, max_lon)"
+        )
+        connection.exec_driver_sql(
+            f"INSERT INTO {PROPERTY_GEO}(id, min_lat, max_lat, min_lon, max_lon) "
+            f"SELECT id, latitude, latitude, longitude, longitude FROM properties "
+            f"WHERE is_active AND latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+    for statement in _sqlite_statements():
+        connection.exec_driver_sql(statement)
+
+
+def ensure_postgres_geo(connection) -> None:
+    """Create the partial GiST index on property coordinates."""
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_properties_location_gist ON properties "
+        "USING gist (point(longitude, latitude)) "
+        "WHERE is_active AND latitude IS NOT NULL AND longitude IS NOT NULL"
+    )
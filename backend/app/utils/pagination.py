@@ -0,0 +1,145 @@
+"""Keyset (cursor) pagination and cached list totals."""
+
+import base64
+import json
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.util import find_tables
+
+from app.config import settings
+from app.services import change_events
+
+
+@dataclass(frozen=True)
+class SortKey:
+    column: Any
+    descending: bool = True
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(payload, list):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+            for value in payload
+        ]
+    except (ValueError, TypeError, KeyError, UnicodeError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+
+def _after(keys: Sequence[SortKey], values: Sequence[Any]):
+    """Rows strictly after ``values`` in ``keys`` order, as an OR-chain of prefixes."""
+    clauses = []
+    for i, key in enumerate(keys):
+        equal_prefix = [keys[j].column == values[j] for j in range(i)]
+        beyond = key.column < values[i] if key.descending else key.column > values[i]
+        clauses.append(and_(*equal_prefix, beyond))
+    return or_(*clauses)
+
+
+def keyset_page(
+    query: Select,
+    keys: Sequence[SortKey],
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1,
+) -> Select:
+    """Order ``query`` by ``keys`` and window it by cursor, or by offset when no cursor.
+
+    The last key must be unique (normally the primary key) so the order is total.
+    One extra row is fetched so ``split_page`` can tell whether a next page exists.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(keys):
+            raise ValueError("Invalid pagination cursor")
+        query = query.where(_after(keys, values))
+    else:
+        query = query.offset((page - 1) * page_size)
+    order = [key.column.desc() if key.descending else key.column.asc() for key in keys]
+    return query.order_by(*order).limit(page_size + 1)
+
+
+def split_page(
+    rows: Sequence[Any],
+    keys: Sequence[SortKey],
+    page_size: int,
+    values_of: Optional[Callable[[Any], Sequence[Any]]] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """Trim the look-ahead row and build the cursor for the following page."""
+    items = list(rows[:page_size])
+    if len(rows) <= page_size or not items:
+        return items, None
+    last = items[-1]
+    if values_of is not None:
+        values = values_of(last)
+    else:
+        values = [getattr(last, key.column.key) for key in keys]
+    return items, encode_cursor(values)
+
+
+class _CountCache:
+    """Short-lived COUNT(*) results, dropped as soon as a counted table is written."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[str, Tuple[float, int, Set[str]]] = {}
+
+    def get(self, key: str) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key: str, value: int, tables: Set[str]) -> None:
+        self._entries[key] = (time.monotonic() + settings.list_count_cache_ttl_seconds, value, tables)
+
+    def invalidate(self, tables: Set[str]) -> None:
+        stale = [key for key, entry in self._entries.items() if entry[2] & tables]
+        for key in stale:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = _CountCache()
+change_events.subscribe(count_cache.invalidate)
+
+
+async def count_rows(
+    db: AsyncSession, query: Select, exact: bool = False
+) -> Tuple[int, bool]:
+    """Return ``(total, is_estimate)`` for the rows ``query`` would select.
+
+    Unless ``exact`` is requested, a recent cached count is reused; it is at most
+    ``list_count_cache_ttl_seconds`` old and is discarded on any committed write to
+    the tables involved.
+    """
+    count_query = select(func.count()).select_from(query.order_by(None).subquery())
+    compiled = count_query.compile(db.get_bind())
+    key = f"{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])!r}"
+    if not exact:
+        cached = count_cache.get(key)
+        if cached is not None:
+            return cached, True
+    total = (await db.execute(count_query)).scalar() or 0
+    tables = {table.name for table in find_tables(query, include_joins=True)}
+    count_cache.put(key, total, tables)
+    return total, False
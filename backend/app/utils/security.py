@@ -11,7 +11,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import settings
-from app.database import get_db
+from app.database import async_session_maker, get_db
 from app.models.user import User, UserRole
 from app.schemas.auth import TokenPayload
 
@@ -128,6 +128,21 @@ async def get_current_user(
     return user
 
 
+async def get_websocket_user(token: Optional[str]) -> Optional[User]:
+    """Resolve the active user for a websocket handshake token, or None."""
+    if not token:
+        return None
+    token_data = decode_access_token(token)
+    if token_data is None:
+        return None
+    async with async_session_maker() as db:
+        result = await db.execute(select(User).where(User.id == token_data.sub))
+        user = result.scalar_one_or_none()
+    if not user or not user.is_active:
+        return None
+    return user
+
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
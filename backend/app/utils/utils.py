@@ -1,6 +1,8 @@
-from typing import Final
+import re
+from typing import Final, Optional
 
 INDIAN_MOBILE_LENGTH: Final[int] = 10
+_NON_DIGITS = re.compile(r"\D")
 
 
 def clean_indian_number(number: str) -> str:
@@ -16,3 +18,26 @@ def clean_indian_number(number: str) -> str:
         raise ValueError("Phone number must be exactly 10 digits after normalization.")
     return f"+91{raw}"
 
+
+
+def normalize_phone(number: Optional[str]) -> Optional[str]:
+    """E.164 form of ``number``; national numbers are taken as Indian.
+
+    ``+91 98765-43210``, ``919876543210``, ``09876543210`` and ``9876543210`` all
+    map to ``+919876543210``. Returns None when there are too few or too many digits.
+    """
+    if not number:
+        return None
+    raw = number.strip()
+    digits = _NON_DIGITS.sub("", raw)
+    if raw.startswith("+"):
+        pass
+    elif digits.startswith("00"):
+        digits = digits[2:]
+    elif len(digits) == INDIAN_MOBILE_LENGTH:
+        digits = f"91{digits}"
+    elif len(digits) == INDIAN_MOBILE_LENGTH + 1 and digits.startswith("0"):
+        digits = f"91{digits[1:]}"
+    if not 8 <= len(digits) <= 15:
+        return None
+    return f"+{digits}"
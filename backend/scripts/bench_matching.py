@@ -0,0 +1,122 @@
+"""Benchmark lead <-> property matching.
+
+Builds a throwaway SQLite database of 200k leads with preferences and 50k
+listings (by default), then times the first load of both sides and matches in
+each direction.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  (registers every table)
+from app.database import _init_and_migrate
+from app.models.lead import Lead
+from app.models.property import Property, PropertyType
+from app.services import lead_matching
+from app.services.lead_matching import LeadMatcher, Preferences
+
+CITIES = ["Bangalore", "Mumbai", "Pune", "Hyderabad", "Chennai", "Delhi"]
+LOCALITIES = [f"Locality{i}" for i in range(300)]
+TYPES = [kind.value for kind in PropertyType]
+BATCH = 20_000
+LAKH = 100_000
+
+
+async def seed(session_maker, leads: int, properties: int) -> None:
+    rng = random.Random(5)
+    async with session_maker() as db:
+        for start in range(0, properties, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, properties)):
+                rows.append(
+                    {
+                        "title": f"Listing {i}",
+                        "property_type": rng.choice(TYPES[:2]),
+                        "address": f"{i} Main Road",
+                        "city": rng.choice(CITIES),
+                        "state": "State",
+                        "pincode": "560001",
+                        "locality": rng.choice(LOCALITIES),
+                        "price": rng.randint(20, 300) * LAKH,
+                        "size_sqft": rng.randint(500, 4000),
+                        "is_active": True,
+                        "created_by": 1,
+                    }
+                )
+            await db.execute(insert(Property), rows)
+        for start in range(0, leads, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, leads)):
+                budget = rng.randint(30, 250) * LAKH
+                rows.append(
+                    {
+                        "name": f"Lead {i}",
+                        "phone": f"+91 9{i:09d}",
+                        "preferred_location": rng.choice(LOCALITIES + CITIES + [None]),
+                        "preferred_property_type": rng.choice(TYPES[:2] + [None]),
+                        "budget_min": budget * 0.7,
+                        "budget_max": budget,
+                        "lead_score": rng.randint(0, 100),
+                    }
+                )
+            await db.execute(insert(Lead), rows)
+        await db.commit()
+
+
+async def timed(label: str, runs: int, call) -> None:
+    samples = []
+    total = 0
+    for _ in range(runs):
+        started = time.perf_counter()
+        total, _ = await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"  {label:<44} median {statistics.median(samples):8.2f} ms  (matches={total})")
+
+
+async def main(leads: int, properties: int, runs: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench_matching.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(_init_and_migrate)
+
+    started = time.perf_counter()
+    await seed(session_maker, leads, properties)
+    elapsed = time.perf_counter() - started
+    print(f"Seeded {leads} leads / {properties} properties in {elapsed:.1f}s ({path})")
+
+    # The matcher reads through the app's session factory.
+    lead_matching.async_session_maker = session_maker
+    matcher = LeadMatcher()
+    started = time.perf_counter()
+    await matcher.properties_for(Preferences(location="Pune"), limit=1)
+    print(f"Initial load: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    async with session_maker() as db:
+        mid_priced = Property.price.between(60 * LAKH, 90 * LAKH)
+        listing = (await db.execute(select(Property).where(mid_priced).limit(1))).scalar_one()
+    print(f"one listing against {leads} leads")
+    await timed("leads_for", runs, lambda: matcher.leads_for(listing, limit=50))
+    print(f"one lead against {properties} listings")
+    preferences = Preferences(
+        location="Locality7", property_type="apartment", budget_min=60 * LAKH, budget_max=90 * LAKH
+    )
+    await timed("properties_for", runs, lambda: matcher.properties_for(preferences, limit=20))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--leads", type=int, default=200_000)
+    parser.add_argument("--properties", type=int, default=50_000)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.leads, args.properties, args.runs))
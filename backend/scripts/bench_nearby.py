@@ -0,0 +1,127 @@
+"""Benchmark /properties/nearby: R-tree lookup vs a plain latitude/longitude range scan.
+
+Builds a throwaway SQLite database of 1M properties (by default), most of them
+clustered around a handful of cities, then times radius and bounding-box
+queries through the API handler.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  (registers every table)
+from app.api import properties as properties_api
+from app.database import _init_and_migrate
+from app.models.property import Property
+
+CITIES = {
+    "Bangalore": (12.9716, 77.5946),
+    "Mumbai": (19.0760, 72.8777),
+    "Pune": (18.5204, 73.8567),
+    "Hyderabad": (17.3850, 78.4867),
+    "Chennai": (13.0827, 80.2707),
+    "Delhi": (28.7041, 77.1025),
+}
+BATCH = 20_000
+
+
+async def seed(session_maker, properties: int) -> None:
+    rng = random.Random(11)
+    names = list(CITIES)
+    async with session_maker() as db:
+        for start in range(0, properties, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, properties)):
+                if rng.random() < 0.8:
+                    city = rng.choice(names)
+                    lat = rng.gauss(CITIES[city][0], 0.15)
+                    lon = rng.gauss(CITIES[city][1], 0.15)
+                else:
+                    city = "Rural"
+                    lat, lon = rng.uniform(8, 35), rng.uniform(68, 97)
+                rows.append(
+                    {
+                        "title": f"Listing {i}",
+                        "address": f"{i} Main Road",
+                        "city": city,
+                        "state": "State",
+                        "pincode": "560001",
+                        "latitude": lat,
+                        "longitude": lon,
+                        "price": rng.randint(20, 300) * 100_000,
+                        "size_sqft": rng.randint(500, 4000),
+                        "bedrooms": rng.randint(1, 4),
+                        "is_active": True,
+                        "created_by": 1,
+                    }
+                )
+            await db.execute(insert(Property), rows)
+        await db.commit()
+
+
+async def timed(label: str, runs: int, call) -> None:
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"  {label:<44} median {statistics.median(samples):8.1f} ms  (total={result.total})")
+
+
+def _kwargs(**overrides):
+    kwargs = dict(
+        lat=None, lon=None, radius_km=None, min_lat=None, max_lat=None, min_lon=None,
+        max_lon=None, property_type=None, min_price=None, max_price=None, bedrooms=None,
+        page=1, page_size=20, exact_total=True,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+async def main(properties: int, runs: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench_nearby.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(_init_and_migrate)
+
+    started = time.perf_counter()
+    await seed(session_maker, properties)
+    print(f"Seeded {properties} properties in {time.perf_counter() - started:.1f}s ({path})")
+
+    lat, lon = CITIES["Bangalore"]
+    async with session_maker() as db:
+        for radius in (1, 5, 20):
+            print(f"radius {radius} km around Bangalore")
+            await timed("r-tree", runs, lambda: properties_api.nearby_properties(
+                db=db, **_kwargs(lat=lat, lon=lon, radius_km=radius)))
+            original = properties_api.nearby
+            properties_api.nearby = lambda dialect, *args, **kwargs: original(
+                "generic", *args, **kwargs)
+            try:
+                await timed("range scan", runs, lambda: properties_api.nearby_properties(
+                    db=db, **_kwargs(lat=lat, lon=lon, radius_km=radius)))
+            finally:
+                properties_api.nearby = original
+        print("bounding box 0.1° x 0.1° in central Mumbai")
+        mlat, mlon = CITIES["Mumbai"]
+        await timed("r-tree", runs, lambda: properties_api.nearby_properties(
+            db=db, **_kwargs(min_lat=mlat - 0.05, max_lat=mlat + 0.05,
+                             min_lon=mlon - 0.05, max_lon=mlon + 0.05)))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--properties", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.properties, args.runs))
@@ -0,0 +1,96 @@
+"""Benchmark solar system quotes.
+
+Builds a throwaway SQLite database with a product catalog (500 panel models by
+default), then times building the combination tables and quoting systems of a
+few sizes through the voice-agent tool handler.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  (registers every table)
+from app.api.calls import ToolQuoteSystemRequest, tool_quote_system
+from app.database import _init_and_migrate
+from app.models.product import Product, ProductType
+from app.services import solar_sizing
+from app.services.solar_sizing import solar_sizer
+
+TYPES = [kind.value for kind in ProductType]
+
+
+async def seed(session_maker, products: int) -> None:
+    rng = random.Random(7)
+    rows = []
+    for i in range(products):
+        wattage = rng.choice(range(250, 701, 10))
+        rows.append(
+            {
+                "name": f"Panel {i}",
+                "model_number": f"P-{i}",
+                "type": rng.choice(TYPES),
+                "wattage": wattage,
+                "efficiency": round(rng.uniform(16, 23), 1),
+                "price_inr": round(wattage * rng.uniform(18, 35)),
+                "warranty_years": rng.choice([10, 12, 15, 25, 30]),
+                "manufacturer": f"Maker {i % 40}",
+                "length_mm": rng.choice([1650, 1760, 2000, 2280]),
+                "width_mm": rng.choice([990, 1040, 1134]),
+                "is_active": True,
+            }
+        )
+    async with session_maker() as db:
+        await db.execute(insert(Product), rows)
+        await db.commit()
+
+
+async def timed(label: str, runs: int, call) -> None:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        response = await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(
+        f"  {label:<36} median {statistics.median(samples):6.2f} ms  "
+        f"max {max(samples):6.2f} ms  (options={response.total})"
+    )
+
+
+async def main(products: int, runs: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench_quote.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(_init_and_migrate)
+    await seed(session_maker, products)
+
+    # The sizer reads through the app's session factory.
+    solar_sizing.async_session_maker = session_maker
+    solar_sizer.clear()
+    started = time.perf_counter()
+    await solar_sizer.quote(3.0)
+    print(f"{products} products: tables built in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    for bill in (1_500, 4_000, 12_000, 40_000):
+        request = ToolQuoteSystemRequest(monthly_bill=bill, roof_area_sqft=600)
+        await timed(
+            f"quote_system bill=Rs {bill}",
+            runs,
+            lambda: tool_quote_system(request, api_key="bench"),
+        )
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--products", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.products, args.runs))
@@ -0,0 +1,154 @@
+"""Benchmark /properties/search and appointment search: full-text index vs ILIKE scan.
+
+Builds a throwaway SQLite database (500k properties / 1M appointments by
+default), then times each search through the API handlers against the FTS5
+path and the old ILIKE predicates.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+import app.models  # noqa: F401  (registers every table)
+from app.api import appointments as appointments_api
+from app.api import properties as properties_api
+from app.database import _init_and_migrate
+from app.models.appointment import Appointment
+from app.models.lead import Lead
+from app.models.property import Property
+from app.models.user import User, UserRole
+
+CITIES = ["Bangalore", "Mumbai", "Pune", "Hyderabad", "Chennai", "Delhi", "Kolkata", "Jaipur"]
+LOCALITIES = [f"{prefix}{suffix}" for prefix in ("Green", "Lake", "Palm", "Hill", "Royal", "Silver")
+              for suffix in ("field", "view", "wood", "side", "park", "nagar", "pura", "halli")]
+WORDS = ["spacious", "modern", "premium", "corner", "garden", "metro", "school", "gated",
+         "sunlit", "renovated", "family", "quiet", "airy", "vastu", "furnished", "balcony"]
+NAMES = ["Asha", "Ravi", "Meera", "Arjun", "Kavya", "Rohan", "Divya", "Nikhil", "Sneha", "Vikram"]
+BATCH = 20_000
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+async def seed(session_maker, properties: int, leads: int, appointments: int) -> None:
+    rng = random.Random(7)
+    async with session_maker() as db:
+        for start in range(0, properties, BATCH):
+            rows = []
+            for i in range(start, min(start + BATCH, properties)):
+                locality = rng.choice(LOCALITIES)
+                rows.append(
+                    {
+                        "title": f"{rng.choice(WORDS).title()} {rng.randint(1, 4)}BHK in {locality}",
+                        "description": _sentence(rng, 12),
+                        "address": f"{i} {locality} Main Road",
+                        "city": rng.choice(CITIES),
+                        "state": "State",
+                        "country": "India",
+                        "pincode": "560001",
+                        "locality": locality,
+                        "landmark": f"Near {rng.choice(LOCALITIES)} Metro",
+                        "price": rng.randint(20, 300) * 100_000,
+                        "size_sqft": rng.randint(500, 4000),
+                        "bedrooms": rng.randint(1, 4),
+                        "is_active": True,
+                        "created_by": 1,
+                    }
+                )
+            await db.execute(insert(Property), rows)
+        for start in range(0, leads, BATCH):
+            await db.execute(
+                insert(Lead),
+                [
+                    {
+                        "name": f"{rng.choice(NAMES)} {i}",
+                        "phone": f"+91 9{i:09d}",
+                        "email": f"lead{i}@example.com",
+                    }
+                    for i in range(start, min(start + BATCH, leads))
+                ],
+            )
+        lead_ids = (await db.execute(select(Lead.id))).scalars().all()
+        now = datetime.now(timezone.utc)
+        for start in range(0, appointments, BATCH):
+            await db.execute(
+                insert(Appointment),
+                [
+                    {
+                        "call_id": 1,
+                        "lead_id": rng.choice(lead_ids),
+                        "scheduled_for": now + timedelta(hours=i % 2000),
+                        "address": f"{i} {rng.choice(LOCALITIES)} Cross",
+                        "notes": _sentence(rng, 6),
+                        "status": "scheduled",
+                    }
+                    for i in range(start, min(start + BATCH, appointments))
+                ],
+            )
+        await db.commit()
+
+
+async def timed(label: str, runs: int, call) -> None:
+    samples = []
+    result = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = await call()
+        samples.append((time.perf_counter() - started) * 1000)
+    print(f"  {label:<44} median {statistics.median(samples):8.1f} ms  (total={result.total})")
+
+
+async def main(properties: int, appointments: int, runs: int) -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench_search.db")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(_init_and_migrate)
+
+    started = time.perf_counter()
+    await seed(session_maker, properties, max(1, appointments // 10), appointments)
+    print(f"Seeded {properties} properties / {appointments} appointments "
+          f"in {time.perf_counter() - started:.1f}s ({path})")
+
+    admin = User(id=1, email="bench@example.com", hashed_password="x", full_name="Bench",
+                 role=UserRole.ADMIN.value)
+    list_kwargs = dict(page=1, page_size=20, date_from=None, date_to=None, status_filter=None,
+                       staff_id=None, sort_order="desc", cursor=None, exact_total=True)
+    async with session_maker() as db:
+        for query in ("palmwood", "renovated vastu", "lake"):
+            print(f"properties q={query!r}")
+            await timed("fts", runs, lambda: properties_api.search_properties(
+                q=query, page=1, page_size=20, db=db))
+            await timed("ilike scan", runs, lambda: properties_api._scan_properties(db, query, 1, 20))
+        for query in ("Meera 12", "90000123", "sunlit"):
+            print(f"appointments search={query!r}")
+            await timed("fts (scheduled_for order)", runs, lambda: appointments_api.list_appointments(
+                db=db, current_user=admin, search=query, sort_by="scheduled_for", **list_kwargs))
+            await timed("fts (relevance order)", runs, lambda: appointments_api.list_appointments(
+                db=db, current_user=admin, search=query, sort_by="relevance", **list_kwargs))
+            original = appointments_api.uses_fulltext
+            appointments_api.uses_fulltext = lambda dialect: False
+            try:
+                await timed("ilike scan", runs, lambda: appointments_api.list_appointments(
+                    db=db, current_user=admin, search=query, sort_by="scheduled_for", **list_kwargs))
+            finally:
+                appointments_api.uses_fulltext = original
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--properties", type=int, default=500_000)
+    parser.add_argument("--appointments", type=int, default=1_000_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.properties, args.appointments, args.runs))
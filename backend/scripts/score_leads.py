@@ -0,0 +1,20 @@
+"""Refresh precomputed lead scores; run from cron for the follow-up queue."""
+
+import argparse
+import asyncio
+
+from app.database import async_session_maker, init_db
+from app.services.lead_scoring import score_leads
+
+
+async def main(full: bool) -> None:
+    await init_db()
+    async with async_session_maker() as db:
+        scored = await score_leads(db, full=full)
+    print(f"✅ Scored {scored} leads.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--full", action="store_true", help="rescore every lead")
+    asyncio.run(main(parser.parse_args().full))
@@ -0,0 +1,10 @@
+import pytest
+
+from app.services.tool_runtime import deferred_tasks
+
+
+@pytest.fixture(autouse=True)
+async def drain_deferred_tasks():
+    """Finish post-commit jobs before the test's event loop closes, as the app lifespan does."""
+    yield
+    await deferred_tasks.drain(timeout=10)
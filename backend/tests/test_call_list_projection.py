@@ -0,0 +1,130 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.api.calls import list_calls
+from app.database import async_session_maker
+from app.models.call import Call, CallStatus
+from app.models.user import User, UserRole
+from app.schemas.call import CallListResponse, CallResponse
+
+PAGE_SIZE = 20
+
+
+def _list_kwargs(**overrides):
+    kwargs = dict(
+        page=1,
+        page_size=PAGE_SIZE,
+        direction=None,
+        status=None,
+        outcome=None,
+        handled_by_ai=None,
+        escalated=None,
+        from_number=None,
+        lead_id=None,
+        date_from=None,
+        date_to=None,
+        cursor=None,
+        exact_total=False,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+async def _seed_calls(db, from_number: str) -> None:
+    prefix = f"TEST_PROJECTION_{int(time.time() * 1000)}"
+    transcript = "Customer: I am looking for a 3BHK near the metro.\n" * 400
+    db.add_all(
+        Call(
+            call_sid=f"{prefix}_{i}",
+            from_number=from_number,
+            to_number="+20000000077",
+            direction="inbound",
+            status=CallStatus.COMPLETED.value,
+            transcript_text=transcript,
+            transcript_summary="Interested in a 3BHK. " * 20,
+            structured_report='{"section": "7"}' * 200,
+            outcome_notes="Call back on Monday. " * 10,
+        )
+        for i in range(PAGE_SIZE)
+    )
+    await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_list_page_is_smaller_than_full_rows():
+    from_number = f"+1777{int(time.time() * 1000) % 10**7:07d}"
+    async with async_session_maker() as db:
+        await _seed_calls(db, from_number)
+        current_user = User(
+            email="projection@example.com",
+            hashed_password="x",
+            full_name="Projection",
+            role=UserRole.ADMIN.value,
+        )
+
+        # Baseline: what the list endpoint used to do, full rows through CallResponse.
+        start = time.perf_counter()
+        result = await db.execute(
+            select(Call)
+            .where(Call.from_number == from_number)
+            .order_by(Call.created_at.desc(), Call.id.desc())
+            .limit(PAGE_SIZE)
+        )
+        full_payload = CallListResponse.model_construct(
+            calls=[CallResponse.model_validate(call) for call in result.scalars().all()],
+            total=PAGE_SIZE,
+            page=1,
+            page_size=PAGE_SIZE,
+        ).model_dump_json()
+        full_seconds = time.perf_counter() - start
+        db.expunge_all()
+
+        start = time.perf_counter()
+        slim = await list_calls(
+            db=db, current_user=current_user, **_list_kwargs(from_number=from_number)
+        )
+        slim_payload = slim.model_dump_json(exclude_unset=True)
+        slim_seconds = time.perf_counter() - start
+
+        assert len(slim.calls) == PAGE_SIZE
+        assert "transcript_summary" not in slim_payload
+        assert "outcome_notes" not in slim_payload
+        assert len(slim_payload) * 2 < len(full_payload)
+        assert slim_seconds < 0.5 and full_seconds < 0.5
+
+
+@pytest.mark.asyncio
+async def test_fields_selector_adds_text_columns_and_rejects_unknown():
+    from_number = f"+1778{int(time.time() * 1000) % 10**7:07d}"
+    async with async_session_maker() as db:
+        await _seed_calls(db, from_number)
+        db.expunge_all()
+        current_user = User(
+            email="projection@example.com",
+            hashed_password="x",
+            full_name="Projection",
+            role=UserRole.ADMIN.value,
+        )
+
+        response = await list_calls(
+            db=db,
+            current_user=current_user,
+            fields="transcript_text,outcome_notes",
+            **_list_kwargs(from_number=from_number, page_size=2),
+        )
+        item = response.calls[0].model_dump(exclude_unset=True)
+        assert item["transcript_text"].startswith("Customer:")
+        assert item["outcome_notes"].startswith("Call back")
+        assert "structured_report" not in item
+
+        with pytest.raises(HTTPException) as exc:
+            await list_calls(
+                db=db,
+                current_user=current_user,
+                fields="hashed_password",
+                **_list_kwargs(from_number=from_number),
+            )
+        assert exc.value.status_code == 400
@@ -1,7 +1,9 @@
+import json
 import time
 from datetime import datetime, timezone
 
 import pytest
+from starlette.requests import Request
 from sqlalchemy import select
 
 from app.api.calls import list_calls
@@ -81,11 +83,14 @@ async def test_dashboard_recent_calls_returns_exact_calls_table_from_to_numbers(
         db.add(call)
         await db.commit()
 
-    recent = await get_recent_calls(limit=50)
-    returned = next((c for c in recent if c.call_sid == call_sid), None)
+    response = await get_recent_calls(
+        request=Request({"type": "http", "headers": []}), limit=50
+    )
+    recent = json.loads(response.body)
+    returned = next((c for c in recent if c["call_sid"] == call_sid), None)
     assert returned is not None
-    assert returned.from_number == expected_from
-    assert returned.to_number == expected_to
+    assert returned["from_number"] == expected_from
+    assert returned["to_number"] == expected_to
 
 
 @pytest.mark.asyncio
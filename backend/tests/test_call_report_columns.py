@@ -0,0 +1,143 @@
+import json
+import time
+from datetime import date
+
+import pytest
+from sqlalchemy import select, update
+
+from app.api.calls import list_calls, search_call_reports
+from app.database import _backfill_call_report_columns, async_session_maker, engine
+from app.models.call import Call, CallStatus, structured_report_columns
+from app.models.lead import Lead
+from app.models.user import User, UserRole
+
+
+def _report(status, kw, visit_date=None, follow_up=False, source=None):
+    report = {
+        "requirement": {"estimated_kw": kw, "monthly_electricity_bill": "₹3,200"},
+        "visit": {"visit_scheduled": visit_date is not None, "visit_date": visit_date},
+        "lead_classification": {"lead_status": status, "confidence_score": "8"},
+        "call_analysis": {"follow_up_required": follow_up},
+    }
+    if source:
+        report["report_source"] = source
+    return json.dumps(report)
+
+
+def _user() -> User:
+    return User(
+        email="reports@example.com",
+        hashed_password="unused",
+        full_name="Report Viewer",
+        role=UserRole.ADMIN.value,
+        is_active=True,
+        is_verified=True,
+    )
+
+
+def test_columns_parse_loose_llm_values():
+    columns = structured_report_columns(_report("HOT", "5 kW", "2024-07-05T10:00", True))
+    assert columns["report_lead_status"] == "hot"
+    assert columns["report_estimated_kw"] == 5.0
+    assert columns["report_monthly_bill"] == 3200.0
+    assert columns["report_confidence_score"] == 8
+    assert columns["report_visit_date"] == date(2024, 7, 5)
+    assert columns["report_visit_scheduled"] is True
+    assert columns["report_follow_up_required"] is True
+    assert columns["report_source"] == "llm"
+
+    assert set(structured_report_columns("not json").values()) == {None}
+    assert structured_report_columns(_report("unknown", "unknown"))["report_estimated_kw"] is None
+
+
+async def _seed(db, stamp: int) -> int:
+    lead = Lead(phone=f"+1555{stamp % 10**7:07d}")
+    db.add(lead)
+    await db.flush()
+    reports = [
+        _report("hot", "5", "2024-07-05", follow_up=True),
+        _report("hot", 3, None, follow_up=True),
+        _report("warm", "8.5 kW", "2024-07-09"),
+        _report("cold", "unknown", source="local"),
+        None,
+    ]
+    db.add_all(
+        Call(
+            call_sid=f"TEST_REPORTCOLS_{stamp}_{i}",
+            from_number="+20000000088",
+            to_number="+20000000089",
+            direction="inbound",
+            status=CallStatus.COMPLETED.value,
+            lead_id=lead.id,
+            structured_report=report,
+        )
+        for i, report in enumerate(reports)
+    )
+    await db.commit()
+    return lead.id
+
+
+@pytest.mark.asyncio
+async def test_report_search_filters_and_facets_in_sql():
+    stamp = int(time.time() * 1000)
+    async with async_session_maker() as db:
+        lead_id = await _seed(db, stamp)
+
+        search = dict(
+            page=1, page_size=2, cursor=None, lead_status=None, min_estimated_kw=None,
+            max_estimated_kw=None, visit_scheduled=None, follow_up_required=None,
+            visit_date_from=None, visit_date_to=None, report_source=None, lead_id=lead_id,
+            date_from=None, date_to=None, fields=None, db=db, current_user=_user(),
+        )
+        everything = await search_call_reports(**search)
+        assert everything.total == 4
+        assert everything.facets.by_lead_status == {"hot": 2, "warm": 1, "cold": 1}
+        assert everything.facets.visits_scheduled == 2
+        assert everything.facets.follow_ups_required == 2
+        assert everything.facets.total_estimated_kw == 16.5
+        assert everything.facets.avg_estimated_kw == 5.5
+        assert len(everything.calls) == 2 and everything.next_cursor
+
+        hot_big = await search_call_reports(**{**search, "lead_status": "hot,warm", "min_estimated_kw": 4})
+        assert sorted(c.report_estimated_kw for c in hot_big.calls) == [5.0, 8.5]
+        visits = await search_call_reports(
+            **{**search, "visit_date_from": date(2024, 7, 6), "page_size": 10}
+        )
+        assert [c.report_lead_status for c in visits.calls] == ["warm"]
+
+        listed = await list_calls(
+            page=1, page_size=20, direction=None, status=None, outcome=None, handled_by_ai=None,
+            escalated=None, from_number=None, lead_id=lead_id, date_from=None, date_to=None,
+            cursor=None, exact_total=True, follow_up_required=True, db=db, current_user=_user(),
+        )
+        assert listed.total == 2
+        assert {c.report_lead_status for c in listed.calls} == {"hot"}
+
+
+@pytest.mark.asyncio
+async def test_report_columns_follow_updates_and_backfill():
+    stamp = int(time.time() * 1000)
+    async with async_session_maker() as db:
+        lead_id = await _seed(db, stamp)
+        call = (
+            await db.execute(select(Call).where(Call.call_sid == f"TEST_REPORTCOLS_{stamp}_3"))
+        ).scalar_one()
+        call.structured_report = _report("warm", "6")
+        await db.commit()
+        assert (call.report_lead_status, call.report_estimated_kw) == ("warm", 6.0)
+
+        await db.execute(
+            update(Call).where(Call.lead_id == lead_id).values(report_lead_status=None, report_source=None)
+        )
+        await db.commit()
+
+    async with engine.begin() as connection:
+        await connection.run_sync(_backfill_call_report_columns)
+
+    async with async_session_maker() as db:
+        statuses = (
+            await db.execute(
+                select(Call.report_lead_status).where(Call.lead_id == lead_id).order_by(Call.id)
+            )
+        ).scalars().all()
+    assert statuses == ["hot", "hot", "warm", "warm", None]
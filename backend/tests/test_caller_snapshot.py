@@ -0,0 +1,186 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api.calls import ToolSaveSummaryRequest, tool_save_summary
+from app.api.elevenlabs_conversation_init import conversation_init
+from app.config import settings
+from app.database import async_session_maker
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.call import Call, CallDirection, CallStatus
+from app.models.caller_snapshot import CallerSnapshot
+from app.models.lead import Lead, LeadQuality, LeadStatus
+from app.services import caller_snapshot
+from app.services.caller_snapshot import (
+    _RefreshQueue,
+    fit_to_budget,
+    get_caller_variables,
+    unknown_caller_variables,
+)
+from app.services.tool_runtime import deferred_tasks
+
+
+async def _seed_caller(stamp: int, calls: int = 4) -> tuple[str, int]:
+    national = f"90{stamp % 10**8:08d}"
+    now = datetime.now(timezone.utc)
+    async with async_session_maker() as db:
+        lead = Lead(
+            name=f"Caller {stamp}",
+            phone=f"+91 {national}",
+            quality=LeadQuality.WARM.value,
+            status=LeadStatus.CONTACTED.value,
+        )
+        db.add(lead)
+        await db.flush()
+        call_rows = []
+        for index in range(calls):
+            call_rows.append(
+                Call(
+                    call_sid=f"SNAPSHOT_{stamp}_{index}",
+                    direction=CallDirection.INBOUND.value,
+                    from_number=f"0{national}",
+                    to_number="+918000000000",
+                    status=CallStatus.COMPLETED.value,
+                    lead_id=lead.id,
+                    transcript_summary=f"Call {index} about a rooftop system " + "details " * 40,
+                    created_at=now - timedelta(days=calls - index),
+                )
+            )
+        db.add_all(call_rows)
+        await db.flush()
+        db.add(
+            Appointment(
+                call_id=call_rows[-1].id,
+                lead_id=lead.id,
+                scheduled_for=now + timedelta(days=2),
+                address="12 MG Road",
+                status=AppointmentStatus.SCHEDULED.value,
+            )
+        )
+        await db.commit()
+    await deferred_tasks.drain(timeout=10)
+    return national, lead.id
+
+
+class _FakeRequest:
+    def __init__(self, data):
+        self._data = data
+
+    async def json(self):
+        return self._data
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_precomputed_on_commit_and_within_budget():
+    stamp = int(time.time() * 1000)
+    national, lead_id = await _seed_caller(stamp)
+
+    async with async_session_maker() as db:
+        snapshot = await db.get(CallerSnapshot, f"+91{national}")
+    assert snapshot is not None and snapshot.lead_id == lead_id
+    assert snapshot.size_bytes <= settings.caller_snapshot_max_bytes
+
+    variables = json.loads(snapshot.variables)
+    assert set(variables) == set(unknown_caller_variables())
+    assert variables["caller_known"] is True
+    assert variables["caller_name"] == f"Caller {stamp}"
+    assert variables["caller_previous_calls"] == 4
+    assert variables["caller_history"].splitlines()[0].split(": ", 1)[1].startswith("Call 3")
+    assert "12 MG Road" in variables["caller_upcoming_appointment"]
+
+    started = time.perf_counter()
+    assert await get_caller_variables(f"+91-{national}") == variables
+    assert time.perf_counter() - started < 0.05
+
+
+@pytest.mark.asyncio
+async def test_save_summary_refreshes_snapshot_and_init_returns_variables():
+    stamp = int(time.time() * 1000) + 1
+    national, _ = await _seed_caller(stamp, calls=1)
+
+    async with async_session_maker() as db:
+        response = await tool_save_summary(
+            payload=ToolSaveSummaryRequest(
+                external_call_id=f"SNAPSHOT_{stamp}_0", summary=f"Wants 5 kW quote {stamp}"
+            ),
+            db=db,
+            api_key="test",
+        )
+    assert response.success
+    await deferred_tasks.drain(timeout=10)
+
+    result = await conversation_init(
+        _FakeRequest({"from_number": f"+91{national}", "to_number": "+918000000000"})
+    )
+    variables = result.conversation_initiation_client_data.dynamic_variables
+    assert f"Wants 5 kW quote {stamp}" in variables["caller_history"]
+
+
+@pytest.mark.asyncio
+async def test_unknown_and_missing_snapshots():
+    assert await get_caller_variables("+15550000123") == unknown_caller_variables()
+    assert await get_caller_variables(None) == unknown_caller_variables()
+
+    stamp = int(time.time() * 1000) + 2
+    national, _ = await _seed_caller(stamp, calls=2)
+    async with async_session_maker() as db:
+        await db.delete(await db.get(CallerSnapshot, f"+91{national}"))
+        await db.commit()
+
+    # A missing snapshot is built inline and stored in the background.
+    variables = await get_caller_variables(national)
+    assert variables["caller_previous_calls"] == 2
+    await deferred_tasks.drain(timeout=10)
+    async with async_session_maker() as db:
+        assert await db.get(CallerSnapshot, f"+91{national}") is not None
+
+
+def test_fit_to_budget_shortens_summaries_then_drops_oldest_calls():
+    class Row:
+        def __init__(self, index):
+            self.created_at = datetime(2026, 1, index + 1, tzinfo=timezone.utc)
+            self.direction = "inbound"
+            self.outcome = None
+            self.transcript_summary = f"summary {index} " + "x" * 500
+
+    variables = unknown_caller_variables()
+    encoded = fit_to_budget(variables, [Row(2), Row(1), Row(0)], 400)
+    assert len(encoded.encode("utf-8")) <= 400
+    history = json.loads(encoded)["caller_history"].splitlines()
+    assert history and history[0].startswith("2026-01-03")
+    assert len(history) < 3
+
+
+def test_refresh_queue_recovers_from_dropped_and_running_jobs(monkeypatch):
+    jobs = []
+    monkeypatch.setattr(deferred_tasks, "defer", lambda name, run, job: jobs.append((run, job)))
+    refreshed = []
+
+    async def refresh(phones, lead_ids, call_ids):
+        refreshed.append(phones)
+
+    monkeypatch.setattr(caller_snapshot, "refresh_caller_snapshots", refresh)
+    queue = _RefreshQueue()
+
+    async def add(*phones):
+        for phone in phones:
+            queue.add([phone], [], [])
+
+    async def add_during_refresh():
+        queue.add(["+913"], [], [])
+        run, job = jobs[-1]
+        await run(job)
+        # The running job no longer covers new callers.
+        queue.add(["+914"], [], [])
+
+    asyncio.run(add("+911", "+912"))
+    assert len(jobs) == 1
+    # The first loop closed before its job ran; the next write still gets one.
+    asyncio.run(add("+912"))
+    assert len(jobs) == 2
+    asyncio.run(add_during_refresh())
+    assert refreshed == [{"+911", "+912", "+913"}]
+    assert len(jobs) == 4
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.companies import create_company
+from app.database import async_session_maker
+from app.models.company import Company, CompanyPolicy, Offer, PolicyKind
+from app.models.product import Product
+from app.models.user import User, UserRole
+from app.schemas.company import CompanyCreate
+from app.services import elevenlabs_conversation_init_service as init_service
+from app.services.elevenlabs_conversation_init_service import (
+    ConversationContextCache,
+    build_dynamic_context,
+    conversation_context_cache,
+)
+
+
+async def _seed_company(stamp: int) -> tuple[int, str]:
+    national = f"80{stamp % 10**8:08d}"
+    now = datetime.now(timezone.utc)
+    async with async_session_maker() as db:
+        company = Company(name=f"Sunrise Solar {stamp}", phone_number=f"+91 {national}")
+        db.add(company)
+        await db.flush()
+        db.add_all(
+            [
+                Product(
+                    name=f"Panel {stamp}",
+                    model_number=f"P-{stamp}",
+                    wattage=540,
+                    efficiency=21.0,
+                    price_inr=18500,
+                    warranty_years=25,
+                    manufacturer="Acme",
+                ),
+                CompanyPolicy(
+                    company_id=company.id,
+                    kind=PolicyKind.SUBSIDY.value,
+                    details=json.dumps({"scheme": "PM Surya Ghar", "max_inr": 78000}),
+                ),
+                CompanyPolicy(
+                    company_id=company.id,
+                    kind=PolicyKind.EMI.value,
+                    details=json.dumps({"tenure_months": 36, "interest_pct": 9.5}),
+                ),
+                Offer(company_id=company.id, title=f"Diwali {stamp}", starts_at=now - timedelta(days=1)),
+                Offer(company_id=company.id, title=f"Expired {stamp}", ends_at=now - timedelta(hours=1)),
+                Offer(company_id=company.id, title=f"Upcoming {stamp}", starts_at=now + timedelta(days=2)),
+            ]
+        )
+        await db.commit()
+        return company.id, national
+
+
+@pytest.mark.asyncio
+async def test_context_is_rendered_from_the_db_and_served_from_cache(monkeypatch):
+    stamp = int(time.time() * 1000)
+    _, national = await _seed_company(stamp)
+
+    context = await build_dynamic_context(to_number=f"0{national}")
+    assert f"Company name: Sunrise Solar {stamp}" in context
+    assert f"- Panel {stamp} | Price: 18500.0 | SKU: P-{stamp}" in context
+    assert '"scheme": "PM Surya Ghar"' in context
+    assert '"tenure_months": 36' in context
+    assert f"- Diwali {stamp}" in context
+    assert f"Expired {stamp}" not in context
+    assert f"Upcoming {stamp}" not in context
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("cache hit expected")
+
+    monkeypatch.setattr(init_service, "get_company_by_number", fail)
+    started = time.perf_counter()
+    assert await build_dynamic_context(to_number=f"+91{national}") == context
+    assert time.perf_counter() - started < 0.005
+
+
+@pytest.mark.asyncio
+async def test_offer_write_invalidates_cached_context():
+    stamp = int(time.time() * 1000) + 1
+    company_id, national = await _seed_company(stamp)
+    before = await build_dynamic_context(to_number=national)
+    assert f"Flash sale {stamp}" not in before
+
+    async with async_session_maker() as db:
+        db.add(Offer(company_id=company_id, title=f"Flash sale {stamp}"))
+        await db.commit()
+
+    after = await build_dynamic_context(to_number=national)
+    assert f"- Flash sale {stamp}" in after
+
+
+@pytest.mark.asyncio
+async def test_unknown_number_and_concurrent_misses(monkeypatch):
+    conversation_context_cache.clear()
+    context = await build_dynamic_context(to_number="+15550000199")
+    assert context.startswith("Company name: Unknown Company\n")
+
+    calls = {"company": 0}
+
+    async def slow_company(to_number):
+        calls["company"] += 1
+        return {"id": "1", "name": "Slow Co"}
+
+    async def slow_fetch(company_id):
+        await asyncio.sleep(0.05)
+        return None
+
+    monkeypatch.setattr(init_service, "get_company_by_number", slow_company)
+    for name in ("get_products", "get_subsidy", "get_emi_policy", "get_active_offers"):
+        monkeypatch.setattr(init_service, name, slow_fetch)
+
+    conversation_context_cache.clear()
+    started = time.perf_counter()
+    contexts = await asyncio.gather(*(build_dynamic_context(to_number="+15550000198") for _ in range(5)))
+    elapsed = time.perf_counter() - started
+    conversation_context_cache.clear()
+
+    assert calls["company"] == 1
+    assert len(set(contexts)) == 1 and "Company name: Slow Co" in contexts[0]
+    # The four fetches run side by side, not one after another.
+    assert elapsed < 0.15
+
+
+@pytest.mark.asyncio
+async def test_waiters_build_the_context_when_the_leader_is_cancelled():
+    cache = ConversationContextCache(ttl_seconds=60)
+    builds = 0
+
+    async def build():
+        nonlocal builds
+        builds += 1
+        await asyncio.sleep(0.05)
+        return f"context {builds}", None
+
+    leader = asyncio.create_task(cache.get_or_build("+15550000197", build))
+    await asyncio.sleep(0)
+    waiter = asyncio.create_task(cache.get_or_build("+15550000197", build))
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    assert await waiter == "context 2"
+    assert leader.cancelled()
+
+@pytest.mark.asyncio
+async def test_company_numbers_are_unique_across_formats():
+    stamp = int(time.time() * 1000) + 2
+    national = f"70{stamp % 10**8:08d}"
+    admin = User(email="companies@example.com", hashed_password="x", full_name="Admin", role=UserRole.ADMIN.value)
+    async with async_session_maker() as db:
+        created = await create_company(
+            request=CompanyCreate(name="First Co", phone_number=national), db=db, current_user=admin
+        )
+        assert created.phone_e164 == f"+91{national}"
+        await db.commit()
+    async with async_session_maker() as db:
+        with pytest.raises(HTTPException) as exc:
+            await create_company(
+                request=CompanyCreate(name="Second Co", phone_number=f"+91-{national}"),
+                db=db,
+                current_user=admin,
+            )
+        assert exc.value.status_code == 400
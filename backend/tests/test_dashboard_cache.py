@@ -0,0 +1,75 @@
+import asyncio
+import time
+
+import pytest
+
+from app.database import async_session_maker
+from app.models.lead import Lead
+from app.services.dashboard_cache import DashboardCache, dashboard_cache
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_computation():
+    cache = DashboardCache(ttl_seconds=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"value": 1}
+
+    entries = await asyncio.gather(
+        *(cache.get_or_compute("k", frozenset({"leads"}), compute) for _ in range(5))
+    )
+
+    assert calls == 1
+    assert len({entry.etag for entry in entries}) == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_compute_the_entry_when_the_leader_is_cancelled():
+    cache = DashboardCache(ttl_seconds=60)
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"value": calls}
+
+    leader = asyncio.create_task(cache.get_or_compute("k", frozenset({"leads"}), compute))
+    await asyncio.sleep(0)
+    waiters = [
+        asyncio.create_task(cache.get_or_compute("k", frozenset({"leads"}), compute))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0.01)
+    leader.cancel()
+
+    entries = await asyncio.gather(*waiters)
+    assert leader.cancelled()
+    assert calls == 2
+    assert {entry.body for entry in entries} == {b'{"value":2}'}
+
+@pytest.mark.asyncio
+async def test_committed_lead_write_invalidates_dependent_entries():
+    dashboard_cache.clear()
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return {"calls": calls}
+
+    await dashboard_cache.get_or_compute("leads-key", frozenset({"leads"}), compute)
+    await dashboard_cache.get_or_compute("calls-key", frozenset({"calls"}), compute)
+    assert calls == 2
+
+    async with async_session_maker() as db:
+        db.add(Lead(phone=f"+91{int(time.time() * 1000) % 10**10:010d}", name="Cache Test"))
+        await db.commit()
+
+    await dashboard_cache.get_or_compute("leads-key", frozenset({"leads"}), compute)
+    await dashboard_cache.get_or_compute("calls-key", frozenset({"calls"}), compute)
+    assert calls == 3
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.api.elevenlabs_webhook import _upsert_call_by_sid
+from app.config import settings
+from app.database import async_session_maker
+from app.models.call import Call, CallStatus
+from app.models.lead import Lead, LeadQuality, LeadStatus
+from app.services import dashboard_realtime
+
+
+class _RecordingWebSocket:
+    def __init__(self):
+        self.frames = []
+
+    async def send_json(self, payload):
+        self.frames.append(payload)
+
+
+@pytest.mark.asyncio
+async def test_burst_of_writes_is_pushed_as_one_delta_frame(monkeypatch):
+    monkeypatch.setattr(settings, "dashboard_push_tick_seconds", 0.05)
+    ws = _RecordingWebSocket()
+    await dashboard_realtime.register_connection(ws)
+    try:
+        suffix = int(time.time() * 1000)
+        async with async_session_maker() as db:
+            lead = Lead(
+                phone=f"+9198{suffix % 10**8:08d}",
+                name="Realtime Test",
+                quality=LeadQuality.COLD.value,
+            )
+            call = Call(
+                call_sid=f"TEST_DASH_PUSH_{suffix}",
+                from_number="+10000000009",
+                to_number="+20000000009",
+                direction="inbound",
+                status=CallStatus.IN_PROGRESS.value,
+            )
+            db.add_all([lead, call])
+            await db.commit()
+
+            lead.quality = LeadQuality.HOT.value
+            lead.status = LeadStatus.CONTACTED.value
+            call.status = CallStatus.COMPLETED.value
+            await db.commit()
+
+        await asyncio.sleep(0.2)
+    finally:
+        await dashboard_realtime.unregister_connection(ws)
+
+    assert len(ws.frames) == 1
+    deltas = ws.frames[0]["deltas"]
+    assert deltas["calls_created"] == 1
+    assert deltas["calls_completed"] == 1
+    assert deltas["active_calls"] == 0
+    assert deltas["leads_created"] == 1
+    assert deltas["leads_by_quality"] == {LeadQuality.HOT.value: 1}
+    assert deltas["lead_status_changes"] == [
+        {"lead_id": lead.id, "from": LeadStatus.NEW.value, "to": LeadStatus.CONTACTED.value}
+    ]
+
+
+class _PostgresSession:
+    """Stands in for an AsyncSession bound to Postgres; returns canned upsert rows."""
+
+    def __init__(self, rows):
+        self.info = {}
+        self.statements = []
+        self._rows = list(rows)
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    async def execute(self, statement):
+        self.statements.append(statement)
+        row = self._rows.pop(0) if statement.is_insert else None
+        return SimpleNamespace(one=lambda: row)
+
+
+@pytest.mark.asyncio
+async def test_postgres_call_upsert_pushes_deltas(monkeypatch):
+    monkeypatch.setattr(settings, "dashboard_push_tick_seconds", 0.05)
+    ws = _RecordingWebSocket()
+    await dashboard_realtime.register_connection(ws)
+    try:
+        sid = f"TEST_DASH_UPSERT_{int(time.time() * 1000)}"
+        started = Call(id=1, call_sid=sid, status=CallStatus.IN_PROGRESS.value)
+        ended = Call(id=1, call_sid=sid, status=CallStatus.COMPLETED.value)
+        db = _PostgresSession([(started, None), (ended, CallStatus.IN_PROGRESS.value)])
+
+        await _upsert_call_by_sid(db, {"call_sid": sid, "status": CallStatus.IN_PROGRESS.value})
+        await _upsert_call_by_sid(db, {"call_sid": sid, "status": CallStatus.COMPLETED.value})
+        sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+        assert "ON CONFLICT" in sql and "RETURNING" in sql
+
+        # What the session's after_commit hook does.
+        dashboard_realtime._queue_committed_deltas(db)
+        await asyncio.sleep(0.2)
+    finally:
+        await dashboard_realtime.unregister_connection(ws)
+
+    assert len(ws.frames) == 1
+    deltas = ws.frames[0]["deltas"]
+    assert deltas["calls_created"] == 1
+    assert deltas["calls_completed"] == 1
+    assert deltas["active_calls"] == 0
@@ -1,13 +1,16 @@
 import base64
 import time
+from datetime import date, datetime
 
 import pytest
 from sqlalchemy import select
 
+from app.api import elevenlabs_webhook
 from app.api.elevenlabs_webhook import (
     _extract_username_from_transcript,
     _handle_post_call_audio,
     _handle_post_call_transcription,
+    _upgrade_structured_report,
 )
 from app.api.elevenlabs_webhook import (
     logger as elevenlabs_logger,
@@ -15,6 +18,9 @@ from app.api.elevenlabs_webhook import (
 from app.database import async_session_maker
 from app.models.call import Call
 from app.models.lead import Lead
+from app.models.notification import Notification
+from app.models.user import User, UserRole
+from app.services.solar_report_service import SolarReportService
 
 
 @pytest.mark.asyncio
@@ -342,3 +348,72 @@ async def test_post_call_audio_handles_full_audio_base64(monkeypatch):
         assert updated.recording_url is not None
         assert updated.recording_duration == 30
         assert updated.webhook_processed_at is not None
+
+
+@pytest.mark.asyncio
+async def test_report_upgrade_notifies_managers_with_call_id(monkeypatch):
+    stamp = int(time.time() * 1000)
+    async with async_session_maker() as db:
+        manager = User(
+            email=f"report-manager-{stamp}@example.com",
+            hashed_password="x",
+            full_name="Report Manager",
+            role=UserRole.MANAGER.value,
+        )
+        call = Call(
+            call_sid=f"EL_REPORT_UPGRADE_{stamp}",
+            from_number="+10000000000",
+            to_number="+19999999999",
+        )
+        db.add_all([manager, call])
+        await db.commit()
+
+    async def _report(self, transcript):
+        return {"lead_classification": {"lead_status": "warm"}}
+
+    monkeypatch.setattr(SolarReportService, "generate_report", _report)
+    await _upgrade_structured_report(call.id, call.call_sid, None, "Customer: hello")
+
+    async with async_session_maker() as db:
+        result = await db.execute(select(Notification).where(Notification.user_id == manager.id))
+        notification = result.scalar_one()
+    assert notification.related_call_id == call.id
+
+
+@pytest.mark.asyncio
+async def test_llm_report_is_scheduled_when_local_extraction_fails(monkeypatch):
+    references, upgrades = [], []
+
+    def _failing_extract(transcript, reference):
+        references.append(reference)
+        raise ValueError("unparseable transcript")
+
+    monkeypatch.setattr(elevenlabs_webhook, "extract_local_report", _failing_extract)
+    monkeypatch.setattr(
+        elevenlabs_webhook,
+        "_schedule_report_upgrade",
+        lambda call_id, call_sid, lead_id, transcript: upgrades.append(call_sid),
+    )
+    async with async_session_maker() as db:
+        call_sid = f"EL_LOCAL_REPORT_FAILS_{int(time.time() * 1000)}"
+        # Naive, as SQLite returns it: 20:00 UTC is already the next day in IST.
+        db.add(
+            Call(
+                call_sid=call_sid,
+                from_number="+10000000000",
+                to_number="+19999999999",
+                started_at=datetime(2024, 1, 1, 20, 0),
+            )
+        )
+        await db.commit()
+
+        event_timestamp = int(time.time())
+        payload = {
+            "type": "post_call_transcription",
+            "event_timestamp": event_timestamp,
+            "data": {"call_id": call_sid, "transcript": "Customer: I want solar panels."},
+        }
+        await _handle_post_call_transcription(db, payload, event_timestamp)
+
+    assert references == [date(2024, 1, 2)]
+    assert upgrades == [call_sid]
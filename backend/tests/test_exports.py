@@ -0,0 +1,106 @@
+import csv
+import gzip
+import io
+import json
+import time
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.calls import export_calls
+from app.database import async_session_maker
+from app.models.call import Call, CallStatus
+from app.models.user import User, UserRole
+
+
+def _admin(tag: str) -> User:
+    return User(
+        email=f"test_export_{tag}@example.com",
+        hashed_password="unused",
+        full_name="Test Admin",
+        role=UserRole.ADMIN.value,
+        is_active=True,
+        is_verified=True,
+    )
+
+
+async def _read(response) -> bytes:
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+async def _seed_calls(prefix: str, count: int) -> str:
+    from_number = f"+1555{int(time.time() * 1000) % 10**7:07d}"
+    async with async_session_maker() as db:
+        db.add_all(
+            Call(
+                call_sid=f"{prefix}_{i}",
+                from_number=from_number,
+                to_number="+20000000077",
+                direction="inbound",
+                status=CallStatus.COMPLETED.value,
+                started_at=datetime.now(timezone.utc),
+                duration_seconds=i,
+            )
+            for i in range(count)
+        )
+        await db.commit()
+    return from_number
+
+
+def _export_kwargs(**overrides):
+    kwargs = dict(
+        format="csv",
+        columns=None,
+        gzip=False,
+        direction=None,
+        status=None,
+        outcome=None,
+        handled_by_ai=None,
+        escalated=None,
+        from_number=None,
+        lead_id=None,
+        date_from=None,
+        date_to=None,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+@pytest.mark.asyncio
+async def test_call_export_streams_selected_columns_as_csv():
+    prefix = f"TEST_EXPORT_CSV_{int(time.time() * 1000)}"
+    from_number = await _seed_calls(prefix, 5)
+
+    response = await export_calls(
+        **_export_kwargs(columns="call_sid,duration_seconds", from_number=from_number),
+        current_user=_admin(prefix),
+    )
+    rows = list(csv.reader(io.StringIO((await _read(response)).decode())))
+
+    assert rows[0] == ["call_sid", "duration_seconds"]
+    assert rows[1:] == [[f"{prefix}_{i}", str(i)] for i in range(5)]
+
+
+@pytest.mark.asyncio
+async def test_call_export_streams_gzipped_ndjson():
+    prefix = f"TEST_EXPORT_NDJSON_{int(time.time() * 1000)}"
+    from_number = await _seed_calls(prefix, 3)
+
+    response = await export_calls(
+        **_export_kwargs(format="ndjson", gzip=True, columns="call_sid", from_number=from_number),
+        current_user=_admin(prefix),
+    )
+    body = gzip.decompress(await _read(response)).decode()
+
+    assert response.media_type == "application/gzip"
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"call_sid": f"{prefix}_{i}"} for i in range(3)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_call_export_rejects_unknown_columns():
+    with pytest.raises(HTTPException) as exc_info:
+        await export_calls(**_export_kwargs(columns="call_sid,secret"), current_user=_admin("bad"))
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,137 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.api.appointments import list_appointments
+from app.api.properties import search_properties
+from app.database import async_session_maker
+from app.models.appointment import Appointment, AppointmentStatus
+from app.models.call import Call, CallDirection, CallStatus
+from app.models.lead import Lead
+from app.models.property import Property, PropertyStatus
+from app.models.user import User, UserRole
+
+ADMIN = User(
+    id=1, email="search@example.com", hashed_password="x", full_name="Admin", role=UserRole.ADMIN.value
+)
+
+
+def _list_kwargs(**overrides):
+    kwargs = dict(
+        page=1,
+        page_size=20,
+        date_from=None,
+        date_to=None,
+        status_filter=None,
+        staff_id=None,
+        search=None,
+        sort_by="scheduled_for",
+        sort_order="desc",
+        cursor=None,
+        exact_total=True,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+def _property(title: str, description: str) -> Property:
+    return Property(
+        title=title,
+        description=description,
+        address="14 Outer Ring Road",
+        city="Bangalore",
+        state="Karnataka",
+        pincode="560103",
+        locality="Bellandur",
+        price=7_500_000,
+        size_sqft=1250,
+        status=PropertyStatus.AVAILABLE.value,
+        is_active=True,
+        created_by=1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_property_search_ranks_prefix_matches_and_follows_updates():
+    stamp = int(time.time() * 1000)
+    word = f"zephyr{stamp}"
+    async with async_session_maker() as db:
+        in_title = _property(f"{word}heights Residency", "Corner unit")
+        in_description = _property("Lakeview Residency", f"Close to {word}heights mall")
+        db.add_all([in_description, in_title])
+        await db.commit()
+
+        result = await search_properties(q=f"{word} residency", page=1, page_size=20, db=db)
+        assert result.total == 2
+        assert [p.id for p in result.properties] == [in_title.id, in_description.id]
+        assert f"<mark>{word}heights</mark>" in result.properties[0].search_snippet
+
+        in_title.title = "Renamed Residency"
+        in_description.is_active = False
+        await db.commit()
+        result = await search_properties(q=word, page=1, page_size=20, db=db)
+        assert result.total == 0
+
+
+@pytest.mark.asyncio
+async def test_appointment_search_covers_client_fields_and_lead_edits():
+    stamp = int(time.time() * 1000) + 1
+    national = f"97{stamp % 10**8:08d}"
+    async with async_session_maker() as db:
+        lead = Lead(name=f"Quillon{stamp} Rao", phone=f"+91 {national}", email=f"q{stamp}@example.com")
+        db.add(lead)
+        await db.flush()
+        call = Call(
+            call_sid=f"FTS_{stamp}",
+            direction=CallDirection.OUTBOUND.value,
+            from_number="+918000000000",
+            to_number=lead.phone,
+            status=CallStatus.COMPLETED.value,
+            lead_id=lead.id,
+        )
+        db.add(call)
+        await db.flush()
+        now = datetime.now(timezone.utc)
+        first = Appointment(
+            call_id=call.id,
+            lead_id=lead.id,
+            scheduled_for=now + timedelta(days=1),
+            address="7 Church Street",
+            notes=f"Roof survey for Quillon{stamp} family",
+            status=AppointmentStatus.SCHEDULED.value,
+        )
+        second = Appointment(
+            call_id=call.id,
+            lead_id=lead.id,
+            scheduled_for=now + timedelta(days=2),
+            address="9 Brigade Road",
+            status=AppointmentStatus.SCHEDULED.value,
+        )
+        db.add_all([first, second])
+        await db.commit()
+
+        by_name = await list_appointments(
+            db=db, current_user=ADMIN, **_list_kwargs(search=f"quillon{stamp}", sort_by="relevance")
+        )
+        assert by_name.total == 2
+        # The appointment whose notes also mention the name ranks first.
+        assert by_name.appointments[0].id == first.id
+        assert "<mark>" in by_name.appointments[0].search_snippet
+
+        by_phone = await list_appointments(
+            db=db, current_user=ADMIN, **_list_kwargs(search=national[:6])
+        )
+        assert {a.id for a in by_phone.appointments} == {first.id, second.id}
+
+        by_address = await list_appointments(
+            db=db, current_user=ADMIN, **_list_kwargs(search=f"brigade quillon{stamp}")
+        )
+        assert [a.id for a in by_address.appointments] == [second.id]
+
+        lead.name = f"Marlow{stamp} Rao"
+        await db.commit()
+        renamed = await list_appointments(
+            db=db, current_user=ADMIN, **_list_kwargs(search=f"marlow{stamp}")
+        )
+        assert renamed.total == 2
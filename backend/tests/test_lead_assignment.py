@@ -36,7 +36,7 @@ async def test_assign_lead_happy_path():
         )
         lead = Lead(
             name="Assign Lead",
-            phone="+19990000000",
+            phone=f"+1999{ts % 10**7:07d}",
             email=f"assign.lead_{ts}@test.com",
             source=LeadSource.OUTBOUND_CALL.value,
             quality=LeadQuality.COLD.value,
@@ -105,7 +105,7 @@ async def test_assign_lead_rejects_inactive_agent():
         )
         lead = Lead(
             name="Inactive Agent Lead",
-            phone="+19990000001",
+            phone=f"+1998{ts % 10**7:07d}",
             email=f"inactive.lead_{ts}@test.com",
             source=LeadSource.OUTBOUND_CALL.value,
             quality=LeadQuality.COLD.value,
@@ -155,7 +155,7 @@ async def test_bulk_assign_leads_happy_path():
         leads = [
             Lead(
                 name=f"Bulk Lead {i}",
-                phone=f"+1888000000{i}",
+                phone=f"+1888{ts % 10**6:06d}{i}",
                 email=f"bulk{i}_{ts}@test.com",
                 source=LeadSource.OUTBOUND_CALL.value,
                 quality=LeadQuality.COLD.value,
@@ -212,7 +212,7 @@ async def test_bulk_assign_leads_rejects_missing_leads():
         )
         lead = Lead(
             name="Existing Lead",
-            phone="+17770000000",
+            phone=f"+1777{ts % 10**7:07d}",
             email=f"existing_{ts}@test.com",
             source=LeadSource.OUTBOUND_CALL.value,
             quality=LeadQuality.COLD.value,
@@ -0,0 +1,89 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.api.leads import list_leads
+from app.database import async_session_maker
+from app.models.call import Call, CallStatus
+from app.models.lead import Lead
+from app.models.user import User, UserRole
+
+
+def _call(lead_id: int, sid: str, created_at: datetime, notes: str) -> Call:
+    return Call(
+        call_sid=sid,
+        from_number="+20000000066",
+        to_number="+20000000067",
+        direction="inbound",
+        status=CallStatus.COMPLETED.value,
+        lead_id=lead_id,
+        outcome_notes=notes,
+        created_at=created_at,
+    )
+
+
+async def _last_call_id(db, lead_id: int):
+    result = await db.execute(select(Lead.last_call_id).where(Lead.id == lead_id))
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_last_call_pointer_follows_newest_call():
+    stamp = int(time.time() * 1000)
+    phone = f"+1555{stamp % 10**7:07d}"
+    base = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    async with async_session_maker() as db:
+        lead = Lead(phone=phone)
+        other = Lead(phone=f"{phone}9")
+        db.add_all([lead, other])
+        await db.flush()
+
+        older = _call(lead.id, f"TEST_LAST_CALL_{stamp}_a", base, "first")
+        newest = _call(lead.id, f"TEST_LAST_CALL_{stamp}_b", base + timedelta(hours=1), "second")
+        # Inserted after ``newest`` but older, so insertion order must not win.
+        backdated = _call(lead.id, f"TEST_LAST_CALL_{stamp}_c", base - timedelta(days=1), "old")
+        db.add_all([older, newest])
+        await db.flush()
+        db.add(backdated)
+        await db.commit()
+        assert await _last_call_id(db, lead.id) == newest.id
+        await db.execute(update(Lead).where(Lead.id == other.id).values(updated_at=base))
+        await db.commit()
+
+        newest.lead_id = other.id
+        await db.commit()
+        assert await _last_call_id(db, lead.id) == older.id
+        assert await _last_call_id(db, other.id) == newest.id
+        # Moving the pointer is not an edit of the lead.
+        moved = (await db.execute(select(Lead.updated_at).where(Lead.id == other.id))).scalar_one()
+        assert moved.replace(tzinfo=timezone.utc) == base
+
+        await db.delete(older)
+        await db.commit()
+        assert await _last_call_id(db, lead.id) == backdated.id
+
+        db.expunge_all()
+        current_user = User(
+            email="last-call@example.com",
+            hashed_password="x",
+            full_name="Last Call",
+            role=UserRole.ADMIN.value,
+        )
+        response = await list_leads(
+            page=1,
+            page_size=20,
+            quality=None,
+            status=None,
+            source=None,
+            assigned_agent_id=None,
+            unassigned=None,
+            phone=phone,
+            cursor=None,
+            exact_total=True,
+            db=db,
+            current_user=current_user,
+        )
+        notes = {item.phone: item.last_call_notes for item in response.leads}
+        assert notes == {phone: "old", f"{phone}9": "second"}
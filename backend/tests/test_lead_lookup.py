@@ -0,0 +1,117 @@
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.api.calls import (
+    ToolCreateLeadRequest,
+    ToolGetExistingLeadRequest,
+    tool_create_lead,
+    tool_get_existing_lead,
+)
+from app.database import async_session_maker
+from app.models.lead import Lead, LeadQuality, LeadSource, LeadStatus
+from app.services.lead_lookup import LeadPhoneCache, lead_phone_cache
+from app.utils.utils import normalize_phone
+
+
+def test_normalize_phone_formats():
+    expected = "+919876543210"
+    for raw in ("+91 98765 43210", "919876543210", "9876543210", "09876543210", "0091-98765-43210"):
+        assert normalize_phone(raw) == expected
+    assert normalize_phone("+1 (555) 010-9999") == "+15550109999"
+    assert normalize_phone("12345") is None
+    assert normalize_phone("") is None
+
+
+def _national(stamp: int) -> str:
+    return f"9{stamp % 10**9:09d}"
+
+
+@pytest.mark.asyncio
+async def test_tool_lookups_match_any_format_and_hit_the_cache():
+    stamp = int(time.time() * 1000)
+    national = _national(stamp)
+    async with async_session_maker() as db:
+        lead = Lead(
+            name="Format Lead",
+            phone=f"+91 {national[:5]} {national[5:]}",
+            source=LeadSource.INBOUND_CALL.value,
+            quality=LeadQuality.COLD.value,
+            status=LeadStatus.NEW.value,
+        )
+        db.add(lead)
+        await db.commit()
+        assert lead.phone_e164 == f"+91{national}"
+
+        hits = lead_phone_cache.hits
+        for phone in (national, f"91{national}", f"+91{national}"):
+            found = await tool_get_existing_lead(
+                payload=ToolGetExistingLeadRequest(phone=phone), db=db, api_key="test-key"
+            )
+            assert found.found is True
+            assert found.lead_id == lead.id
+        assert lead_phone_cache.hits - hits == 2
+
+        created = await tool_create_lead(
+            payload=ToolCreateLeadRequest(phone=f"0{national}", name="Someone Else"),
+            db=db,
+            api_key="test-key",
+        )
+        await db.commit()
+        assert created.existing is True
+        assert created.lead_id == lead.id
+        count = await db.scalar(select(func.count()).select_from(Lead).where(Lead.phone_e164 == f"+91{national}"))
+        assert count == 1
+
+
+@pytest.mark.asyncio
+async def test_cache_is_invalidated_by_committed_lead_writes():
+    stamp = int(time.time() * 1000) + 7
+    national = _national(stamp)
+    async with async_session_maker() as db:
+        missing = await tool_get_existing_lead(
+            payload=ToolGetExistingLeadRequest(phone=national), db=db, api_key="test-key"
+        )
+        assert missing.found is False
+
+        created = await tool_create_lead(
+            payload=ToolCreateLeadRequest(phone=national),
+            db=db,
+            api_key="test-key",
+        )
+        assert created.existing is False
+        await db.commit()
+
+        found = await tool_get_existing_lead(
+            payload=ToolGetExistingLeadRequest(phone=f"+91{national}"), db=db, api_key="test-key"
+        )
+        assert found.found is True
+        assert found.name is None
+
+    async with async_session_maker() as other:
+        lead = await other.get(Lead, created.lead_id)
+        lead.name = "Renamed Lead"
+        lead.quality = LeadQuality.HOT.value
+        await other.commit()
+
+    async with async_session_maker() as db:
+        found = await tool_get_existing_lead(
+            payload=ToolGetExistingLeadRequest(phone=national), db=db, api_key="test-key"
+        )
+        assert found.name == "Renamed Lead"
+        assert found.quality == LeadQuality.HOT.value
+
+
+@pytest.mark.asyncio
+async def test_lru_evicts_least_recently_used():
+    stamp = int(time.time() * 1000) + 13
+    cache = LeadPhoneCache(max_entries=2)
+    numbers = [_national(stamp + i) for i in range(3)]
+    async with async_session_maker() as db:
+        for number in numbers:
+            assert await cache.lookup(db, number) is None
+        assert len(cache) == 2
+        misses = cache.misses
+        await cache.lookup(db, numbers[0])
+        assert cache.misses == misses + 1
@@ -0,0 +1,154 @@
+import time
+from contextlib import asynccontextmanager
+
+import numpy as np
+import pytest
+
+from app.api.calls import ToolMatchPropertiesRequest, tool_match_properties
+from app.api.leads import get_lead_property_matches
+from app.api.properties import get_property_matching_leads
+from app.database import async_session_maker
+from app.models.lead import Lead, LeadStatus
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.models.user import User, UserRole
+from app.services import lead_matching
+from app.services.lead_matching import LeadMatcher, Preferences, _Columns
+
+ADMIN = User(
+    id=1,
+    email="match@example.com",
+    hashed_password="x",
+    full_name="Admin",
+    role=UserRole.ADMIN.value,
+)
+LAKH = 100_000
+
+
+def _property(locality: str, price_lakhs: float, **overrides) -> Property:
+    values = dict(
+        title=f"{locality} {price_lakhs}L",
+        property_type=PropertyType.APARTMENT.value,
+        address="5 Lake Road",
+        city="Bangalore",
+        state="Karnataka",
+        pincode="560034",
+        locality=locality,
+        price=price_lakhs * LAKH,
+        size_sqft=1100,
+        status=PropertyStatus.AVAILABLE.value,
+        is_active=True,
+        created_by=1,
+    )
+    values.update(overrides)
+    return Property(**values)
+
+
+def _lead(stamp: int, suffix: int, **preferences) -> Lead:
+    return Lead(name=f"Match {suffix}", phone=f"+91 8{(stamp + suffix) % 10**9:09d}", **preferences)
+
+
+@pytest.mark.asyncio
+async def test_matches_leads_and_listings_both_ways():
+    stamp = int(time.time() * 1000)
+    locality = f"Matchpur{stamp}"
+    async with async_session_maker() as db:
+        in_budget = _property(locality, 60)
+        stretch = _property(locality, 85)
+        too_dear = _property(locality, 95)
+        villa = _property(locality, 70, property_type=PropertyType.VILLA.value)
+        buyer = _lead(
+            stamp,
+            1,
+            preferred_location=f"{locality}, Bangalore",
+            preferred_property_type="flat",
+            budget_min=50 * LAKH,
+            budget_max=80 * LAKH,
+        )
+        anywhere = _lead(
+            stamp,
+            2,
+            preferred_property_type="apartment",
+            budget_min=55 * LAKH,
+            budget_max=65 * LAKH,
+            preferred_size_min=1000,
+        )
+        elsewhere = _lead(stamp, 3, preferred_location=f"Elsewhere{stamp}")
+        converted = _lead(
+            stamp, 4, preferred_location=locality, status=LeadStatus.CONVERTED.value
+        )
+        db.add_all([in_budget, stretch, too_dear, villa, buyer, anywhere, elsewhere, converted])
+        await db.commit()
+
+        for_buyer = await get_lead_property_matches(buyer.id, limit=20, db=db, current_user=ADMIN)
+        assert for_buyer.total == 2
+        assert [m.property.id for m in for_buyer.matches] == [in_budget.id, stretch.id]
+        assert for_buyer.matches[0].score > for_buyer.matches[1].score
+
+        for_listing = await get_property_matching_leads(
+            in_budget.id, limit=500, db=db, current_user=ADMIN
+        )
+        lead_ids = [m.lead.id for m in for_listing.matches]
+        assert buyer.id in lead_ids and anywhere.id in lead_ids
+        assert lead_ids.index(buyer.id) < lead_ids.index(anywhere.id)
+        assert elsewhere.id not in lead_ids and converted.id not in lead_ids
+
+        # Edits and new listings are picked up on the next match.
+        elsewhere.preferred_location = locality
+        fresh = _property(locality, 75)
+        db.add(fresh)
+        await db.commit()
+        for_listing = await get_property_matching_leads(
+            in_budget.id, limit=500, db=db, current_user=ADMIN
+        )
+        assert elsewhere.id in [m.lead.id for m in for_listing.matches]
+        for_buyer = await get_lead_property_matches(buyer.id, limit=20, db=db, current_user=ADMIN)
+        assert {m.property.id for m in for_buyer.matches} == {in_budget.id, stretch.id, fresh.id}
+
+        tool = await tool_match_properties(
+            ToolMatchPropertiesRequest(phone=buyer.phone, budget_max=65 * LAKH),
+            db=db,
+            api_key="test",
+        )
+        assert tool.success and tool.lead_id == buyer.id
+        assert [p.id for p in tool.properties] == [in_budget.id]
+
+
+def test_columns_reuse_rows_and_compact():
+    columns = _Columns({"id": np.int64, "value": np.float64})
+    columns.load({"id": np.arange(3000), "value": np.arange(3000, dtype=np.float64)})
+    columns.put({"id": np.array([7]), "value": np.array([70.0])})
+    assert len(columns) == 3000
+    assert columns["value"][columns.alive & (columns["id"] == 7)].tolist() == [70.0]
+
+    for i in range(2000):
+        columns.remove(i)
+    assert len(columns) == 1000
+    # Compaction dropped most removed rows; the survivors keep their values.
+    assert columns.alive.size < 1500
+    assert sorted(columns["id"][columns.alive].tolist()) == list(range(2000, 3000))
+
+
+@pytest.mark.asyncio
+async def test_sync_keeps_invalidations_from_a_running_or_failed_load(monkeypatch):
+    matcher = LeadMatcher()
+    loads = []
+
+    @asynccontextmanager
+    async def session_maker():
+        loads.append(len(loads))
+        if len(loads) == 2:
+            # Listings are bulk-updated while the first listing load is reading.
+            matcher.invalidate("properties", ["*"])
+        if len(loads) == 3:
+            raise ConnectionError("database went away")
+        async with async_session_maker() as db:
+            yield db
+
+    monkeypatch.setattr(lead_matching, "async_session_maker", session_maker)
+    await matcher.properties_for(Preferences(), limit=1)
+    assert len(loads) == 2
+    with pytest.raises(ConnectionError):
+        await matcher.properties_for(Preferences(), limit=1)
+    await matcher.properties_for(Preferences(), limit=1)
+    await matcher.properties_for(Preferences(), limit=1)
+    assert len(loads) == 4
@@ -0,0 +1,208 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.api.leads import get_follow_up_queue, refresh_lead_scores
+from app.database import async_session_maker
+from app.models.appointment import Appointment
+from app.models.call import Call, CallStatus
+from app.models.lead import Lead, LeadQuality, LeadStatus
+from app.models.user import User, UserRole
+from app.services.lead_scoring import _needs_scoring, score_chunk, score_leads
+from app.services.lead_summary_service import build_heuristic_summary
+from app.services.tool_runtime import deferred_tasks
+
+
+def _call(lead_id: int, sid: str, minutes: int, sentiment=None, satisfaction=None) -> Call:
+    return Call(
+        call_sid=sid,
+        from_number="+20000000044",
+        to_number="+20000000045",
+        direction="inbound",
+        status=CallStatus.COMPLETED.value,
+        lead_id=lead_id,
+        sentiment_score=sentiment,
+        customer_satisfaction=satisfaction,
+        created_at=datetime(2024, 6, 1, tzinfo=timezone.utc) + timedelta(minutes=minutes),
+    )
+
+
+async def _seed(db, stamp: int, agent_id: int) -> list[Lead]:
+    now = datetime.now(timezone.utc)
+    leads = [
+        Lead(phone=f"+1333{stamp % 10**6:06d}0", quality=LeadQuality.HOT.value,
+             status=LeadStatus.NEGOTIATING.value, last_contacted_at=now - timedelta(days=1)),
+        Lead(phone=f"+1333{stamp % 10**6:06d}1", quality=LeadQuality.WARM.value,
+             status=LeadStatus.CONTACTED.value, follow_up_count=3,
+             last_contacted_at=now - timedelta(days=40)),
+        Lead(phone=f"+1333{stamp % 10**6:06d}2", quality=LeadQuality.COLD.value,
+             status=LeadStatus.NEW.value),
+        Lead(phone=f"+1333{stamp % 10**6:06d}3", quality=LeadQuality.WARM.value,
+             status=LeadStatus.QUALIFIED.value, last_contacted_at=now - timedelta(days=5)),
+    ]
+    for lead in leads:
+        lead.assigned_agent_id = agent_id
+    db.add_all(leads)
+    await db.flush()
+
+    # Seven calls for the first lead: only the latest five count.
+    for i in range(7):
+        db.add(_call(leads[0].id, f"TEST_SCORE_{stamp}_a{i}", i, sentiment=-0.8 if i < 2 else 0.6,
+                     satisfaction=1 if i < 2 else 5))
+    db.add(_call(leads[1].id, f"TEST_SCORE_{stamp}_b", 0, sentiment=-0.5))
+    visit_call = _call(leads[3].id, f"TEST_SCORE_{stamp}_d", 0, satisfaction=2)
+    db.add(visit_call)
+    await db.flush()
+    db.add(
+        Appointment(
+            call_id=visit_call.id,
+            lead_id=leads[3].id,
+            scheduled_for=now + timedelta(days=2),
+            address="Site office",
+            status="scheduled",
+        )
+    )
+    await db.commit()
+    return leads
+
+
+@pytest.mark.asyncio
+async def test_batch_scores_match_single_lead_heuristic():
+    stamp = int(time.time() * 1000)
+    async with async_session_maker() as db:
+        leads = await _seed(db, stamp, agent_id=900000 + stamp % 10**5)
+        lead_ids = [lead.id for lead in leads]
+        batch = await score_chunk(db, lead_ids, datetime.now(timezone.utc))
+
+        for lead_id, score, likelihood, engagement in zip(
+            batch.lead_ids, batch.scores, batch.likelihoods, batch.engagement
+        ):
+            lead = (await db.execute(select(Lead).where(Lead.id == int(lead_id)))).scalar_one()
+            calls = (
+                await db.execute(
+                    select(Call)
+                    .where(Call.lead_id == lead.id)
+                    .order_by(Call.created_at.desc(), Call.id.desc())
+                    .limit(5)
+                )
+            ).scalars().all()
+            expected = build_heuristic_summary(lead, list(calls), lead.id == lead_ids[3])
+            assert (score, likelihood, engagement) == (
+                expected.lead_quality_score,
+                expected.likelihood_to_convert,
+                expected.engagement_level,
+            )
+
+
+@pytest.mark.asyncio
+async def test_incremental_run_and_follow_up_queue_order():
+    stamp = int(time.time() * 1000)
+    agent_id = 800000 + stamp % 10**5
+    async with async_session_maker() as db:
+        leads = await _seed(db, stamp, agent_id=agent_id)
+        lead_ids = [lead.id for lead in leads]
+
+        await score_leads(db)
+        pending = select(Lead.id).where(
+            Lead.id.in_(lead_ids), _needs_scoring("sqlite", datetime.now(timezone.utc))
+        )
+        # Leads and calls seeded within the last second stay eligible for one more run.
+        db.expunge_all()
+        await db.execute(
+            Lead.__table__.update()
+            .where(Lead.__table__.c.id.in_(lead_ids))
+            .values(updated_at=datetime(2024, 1, 1), lead_scored_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+        )
+        await db.execute(
+            Call.__table__.update()
+            .where(Call.__table__.c.lead_id.in_(lead_ids))
+            .values(updated_at=datetime(2024, 1, 1))
+        )
+        await db.execute(
+            Appointment.__table__.update()
+            .where(Appointment.__table__.c.lead_id.in_(lead_ids))
+            .values(updated_at=datetime(2024, 1, 1))
+        )
+        await db.commit()
+        assert (await db.execute(pending)).scalars().all() == []
+
+        db.add(_call(lead_ids[2], f"TEST_SCORE_{stamp}_c", 10, sentiment=0.9))
+        await db.commit()
+        assert (await db.execute(pending)).scalars().all() == [lead_ids[2]]
+
+        current_user = User(
+            email="score@example.com",
+            hashed_password="x",
+            full_name="Scorer",
+            role=UserRole.ADMIN.value,
+        )
+        queue = await get_follow_up_queue(
+            page=1,
+            page_size=2,
+            quality=None,
+            assigned_agent_id=agent_id,
+            cursor=None,
+            exact_total=True,
+            db=db,
+            current_user=current_user,
+        )
+        assert queue.total == 4
+        scores = [lead.lead_score for lead in queue.leads]
+        assert scores == sorted(scores, reverse=True)
+        assert queue.next_cursor is not None
+
+
+@pytest.mark.asyncio
+async def test_leads_are_rescored_when_time_alone_moves_their_score():
+    stamp = int(time.time() * 1000) + 1
+    now = datetime.now(timezone.utc)
+    async with async_session_maker() as db:
+        leads = await _seed(db, stamp, agent_id=1)
+        lead_ids = [lead.id for lead in leads]
+        db.expunge_all()
+        leads_table = Lead.__table__
+        await db.execute(
+            leads_table.update()
+            .where(leads_table.c.id.in_(lead_ids))
+            .values(updated_at=datetime(2024, 1, 1), lead_scored_at=now - timedelta(hours=1))
+        )
+        await db.execute(
+            Call.__table__.update()
+            .where(Call.__table__.c.lead_id.in_(lead_ids))
+            .values(updated_at=datetime(2024, 1, 1))
+        )
+        await db.execute(
+            Appointment.__table__.update()
+            .where(Appointment.__table__.c.lead_id.in_(lead_ids))
+            .values(updated_at=datetime(2024, 1, 1))
+        )
+        # Scored an hour ago: the first lead was then two days and 23 hours past
+        # its last contact, and the last lead's visit had not started yet.
+        await db.execute(
+            leads_table.update()
+            .where(leads_table.c.id == lead_ids[0])
+            .values(
+                last_contacted_at=now - timedelta(days=3, minutes=30),
+                updated_at=datetime(2024, 1, 1),
+            )
+        )
+        await db.execute(
+            Appointment.__table__.update()
+            .where(Appointment.__table__.c.lead_id == lead_ids[3])
+            .values(scheduled_for=now - timedelta(minutes=30), updated_at=datetime(2024, 1, 1))
+        )
+        await db.commit()
+
+        pending = select(Lead.id).where(Lead.id.in_(lead_ids), _needs_scoring("sqlite", now))
+        assert (await db.execute(pending)).scalars().all() == [lead_ids[0], lead_ids[3]]
+
+        response = await refresh_lead_scores(full=False, current_user=None)
+        assert response == {"queued": True, "full": False}
+
+    await deferred_tasks.drain(timeout=10)
+    async with async_session_maker() as db:
+        later = datetime.now(timezone.utc)
+        pending = select(Lead.id).where(Lead.id.in_(lead_ids), _needs_scoring("sqlite", later))
+        assert (await db.execute(pending)).scalars().all() == []
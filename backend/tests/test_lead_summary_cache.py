@@ -0,0 +1,124 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import select
+
+from app.api.elevenlabs_webhook import _upsert_call_by_sid
+from app.database import async_session_maker
+from app.models.call import Call, CallStatus
+from app.models.lead import Lead
+from app.services import lead_summary_service as summary_module
+from app.services.lead_summary_service import LeadSummaryService, lead_summary_service
+from tests.test_dashboard_realtime import _PostgresSession
+
+
+async def _load_lead(db, lead_id: int) -> Lead:
+    db.expunge_all()
+    result = await db.execute(select(Lead).where(Lead.id == lead_id))
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_summary_is_generated_once_and_served_from_storage(monkeypatch):
+    generated = []
+    original = summary_module.build_heuristic_summary
+
+    def _counting(lead, calls, has_future_appointment):
+        generated.append(lead.id)
+        return original(lead, calls, has_future_appointment)
+
+    monkeypatch.setattr(summary_module, "build_heuristic_summary", _counting)
+    service = LeadSummaryService()
+    stamp = int(time.time() * 1000)
+
+    async with async_session_maker() as db:
+        lead = Lead(phone=f"+1444{stamp % 10**7:07d}", preferred_location="Whitefield")
+        db.add(lead)
+        await db.flush()
+        db.add(
+            Call(
+                call_sid=f"TEST_SUMMARY_{stamp}_a",
+                from_number="+20000000055",
+                to_number="+20000000056",
+                direction="inbound",
+                status=CallStatus.COMPLETED.value,
+                lead_id=lead.id,
+                transcript_summary="Wants a villa. Budget is flexible.",
+            )
+        )
+        await db.commit()
+        lead_id = lead.id
+
+        # Concurrent first views share one generation.
+        first, second = await asyncio.gather(
+            service.get_summary(db, await _load_lead(db, lead_id)),
+            service.get_summary(db, await _load_lead(db, lead_id)),
+        )
+        assert generated == [lead_id]
+        assert first.generated_at == second.generated_at
+        assert "Wants a villa" in first.key_conversation_points
+
+        lead = await _load_lead(db, lead_id)
+        assert lead.ai_summary and lead.ai_summary_fingerprint
+        cached = await service.get_summary(db, lead)
+        assert cached.generated_at == first.generated_at
+        assert not cached.is_stale
+        assert generated == [lead_id]
+
+        db.add(
+            Call(
+                call_sid=f"TEST_SUMMARY_{stamp}_b",
+                from_number="+20000000055",
+                to_number="+20000000056",
+                direction="inbound",
+                status=CallStatus.COMPLETED.value,
+                lead_id=lead_id,
+                transcript_summary="Booked a site visit.",
+            )
+        )
+        await db.commit()
+
+        stale = await service.get_summary(db, await _load_lead(db, lead_id))
+        assert stale.is_stale
+        refreshed = await service.refresh(lead_id)
+        assert "Booked a site visit" in refreshed.key_conversation_points
+        assert generated == [lead_id, lead_id]
+
+        current = await service.get_summary(db, await _load_lead(db, lead_id))
+        assert not current.is_stale
+        assert current.generated_at == refreshed.generated_at
+
+
+@pytest.mark.asyncio
+async def test_leads_scheduled_during_a_refresh_are_not_dropped(monkeypatch):
+    monkeypatch.setattr(summary_module.settings, "lead_summary_refresh_delay_seconds", 0)
+    service = LeadSummaryService()
+    refreshed = []
+
+    async def _refresh(lead_id):
+        refreshed.append(lead_id)
+        if lead_id == 1:
+            # New call data lands while the first batch is still refreshing.
+            service.schedule({2})
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(service, "refresh", _refresh)
+    service.schedule({1})
+    await service._refresh_task
+    assert refreshed == [1, 2]
+    assert not service._pending
+
+
+@pytest.mark.asyncio
+async def test_postgres_call_upsert_schedules_summary_refresh(monkeypatch):
+    scheduled = []
+    monkeypatch.setattr(lead_summary_service, "_tracked", {4242})
+    monkeypatch.setattr(lead_summary_service, "schedule", scheduled.append)
+    sid = f"TEST_SUMMARY_UPSERT_{int(time.time() * 1000)}"
+    db = _PostgresSession([(Call(id=1, call_sid=sid, lead_id=4242), None)])
+
+    await _upsert_call_by_sid(db, {"call_sid": sid, "lead_id": 4242})
+    # What the session's after_commit hook does.
+    summary_module._schedule_summary_refreshes(db)
+    assert scheduled == [{4242}]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.services.llm_gateway import LLMGateway, LLMGatewayError
+from app.services.solar_report_service import SolarReportService
+
+
+def _completion(content: str) -> dict:
+    return {
+        "id": "chatcmpl-test",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "fake-model",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 12, "completion_tokens": 7, "total_tokens": 19},
+    }
+
+
+class FakeLLMServer:
+    """In-process stand-in for an OpenAI-compatible chat completions endpoint."""
+
+    def __init__(self, failures: int = 0, content: str = '{"ok": true}'):
+        self.failures = failures
+        self.content = content
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(json.loads(request.content))
+        if self.failures:
+            self.failures -= 1
+            return httpx.Response(503, json={"error": {"message": "overloaded"}})
+        return httpx.Response(200, json=_completion(self.content))
+
+
+def _gateway(server: FakeLLMServer, **kwargs) -> LLMGateway:
+    kwargs.setdefault("retry_base_delay_seconds", 0.001)
+    return LLMGateway(transport=httpx.MockTransport(server), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_retries_transient_errors_and_records_usage():
+    server = FakeLLMServer(failures=2)
+    gateway = _gateway(server, max_retries=2)
+
+    result = await gateway.complete_json([{"role": "user", "content": "hi"}], purpose="summary")
+
+    assert result == {"ok": True}
+    assert len(server.requests) == 3
+    assert server.requests[0]["response_format"] == {"type": "json_object"}
+    usage = gateway.recent_usage[-1]
+    assert (usage.attempts, usage.prompt_tokens, usage.completion_tokens) == (3, 12, 7)
+    assert gateway.token_totals["summary.prompt"] == 12
+
+    failing = _gateway(FakeLLMServer(failures=5), max_retries=1)
+    with pytest.raises(LLMGatewayError):
+        await failing.complete([{"role": "user", "content": "hi"}], purpose="summary")
+
+
+@pytest.mark.asyncio
+async def test_reports_are_served_before_queued_summaries():
+    gateway = _gateway(FakeLLMServer(), max_concurrency=1)
+    order = []
+
+    async def _run(purpose: str) -> None:
+        async with gateway._slot(purpose):
+            order.append(purpose)
+
+    async with gateway._slot("summary"):
+        waiting = [asyncio.create_task(_run("summary")), asyncio.create_task(_run("report"))]
+        await asyncio.sleep(0)
+    await asyncio.gather(*waiting)
+
+    assert order == ["report", "summary"]
+
+
+@pytest.mark.asyncio
+async def test_solar_report_uses_gateway_with_literal_schema_braces():
+    server = FakeLLMServer(content='{"lead_classification": {"lead_status": "hot"}}')
+    service = SolarReportService(gateway=_gateway(server))
+
+    # Unique transcript so the persistent report cache cannot answer for the LLM.
+    report = await service.generate_report(f"Customer {time.time_ns()}: I want a 5kW system.")
+
+    assert report["lead_classification"]["lead_status"] == "hot"
+    prompt = server.requests[0]["messages"][1]["content"]
+    assert "I want a 5kW system" in prompt and '"customer_info"' in prompt
@@ -0,0 +1,105 @@
+import time
+from datetime import datetime, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.api.calls import list_calls
+from app.database import async_session_maker
+from app.models.call import Call, CallStatus
+from app.models.user import User, UserRole
+from app.utils.pagination import count_rows, decode_cursor, encode_cursor
+
+
+def _list_kwargs(**overrides):
+    kwargs = dict(
+        page=1,
+        page_size=2,
+        direction=None,
+        status=None,
+        outcome=None,
+        handled_by_ai=None,
+        escalated=None,
+        from_number=None,
+        lead_id=None,
+        date_from=None,
+        date_to=None,
+        cursor=None,
+        exact_total=False,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+def test_cursor_round_trips_datetimes_and_ids():
+    values = [datetime(2024, 5, 1, 10, 30, 15, 123000), 42]
+    assert decode_cursor(encode_cursor(values)) == values
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_walk_every_row_once_with_shared_timestamps():
+    prefix = f"TEST_KEYSET_{int(time.time() * 1000)}"
+    from_number = f"+1666{int(time.time() * 1000) % 10**7:07d}"
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    async with async_session_maker() as db:
+        db.add_all(
+            Call(
+                call_sid=f"{prefix}_{i}",
+                from_number=from_number,
+                to_number="+20000000088",
+                direction="inbound",
+                status=CallStatus.COMPLETED.value,
+                created_at=created_at,
+            )
+            for i in range(5)
+        )
+        await db.commit()
+
+        current_user = User(
+            email=f"test_{prefix}@example.com",
+            hashed_password="unused",
+            full_name="Test Admin",
+            role=UserRole.ADMIN.value,
+            is_active=True,
+            is_verified=True,
+        )
+
+        seen = []
+        cursor = None
+        while True:
+            response = await list_calls(
+                **_list_kwargs(from_number=from_number, cursor=cursor),
+                db=db,
+                current_user=current_user,
+            )
+            seen.extend(call.call_sid for call in response.calls)
+            cursor = response.next_cursor
+            if cursor is None:
+                break
+
+    assert response.total == 5
+    assert sorted(seen) == sorted(f"{prefix}_{i}" for i in range(5))
+    assert len(seen) == len(set(seen))
+
+
+@pytest.mark.asyncio
+async def test_cached_count_is_dropped_after_a_committed_write():
+    from_number = f"+1777{int(time.time() * 1000) % 10**7:07d}"
+    query = select(Call).where(Call.from_number == from_number)
+    async with async_session_maker() as db:
+        assert await count_rows(db, query) == (0, False)
+        assert await count_rows(db, query) == (0, True)
+
+        db.add(
+            Call(
+                call_sid=f"TEST_COUNT_{from_number}",
+                from_number=from_number,
+                to_number="+20000000099",
+                direction="inbound",
+            )
+        )
+        await db.commit()
+
+        assert await count_rows(db, query) == (1, False)
@@ -0,0 +1,120 @@
+import time
+
+import pytest
+
+from app.api.properties import list_properties_faceted
+from app.database import async_session_maker
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.services.property_facets import _FacetCache
+
+
+def _property(locality: str, city: str, property_type: str, bedrooms: int, price: float):
+    return Property(
+        title=f"{city} {bedrooms}BHK",
+        address="3 Market Road",
+        city=city,
+        state="Maharashtra",
+        pincode="411001",
+        locality=locality,
+        property_type=property_type,
+        bedrooms=bedrooms,
+        price=price,
+        size_sqft=1000,
+        status=PropertyStatus.AVAILABLE.value,
+        is_active=True,
+        created_by=1,
+    )
+
+
+def _kwargs(locality: str, **overrides):
+    kwargs = dict(
+        page=1,
+        page_size=20,
+        city=[],
+        property_type=[],
+        bedrooms=[],
+        price_band=[],
+        locality=locality,
+        status=None,
+        is_featured=None,
+        cursor=None,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+def _facet(result, name):
+    return {item.value: item.count for item in getattr(result.facets, name)}
+
+
+@pytest.mark.asyncio
+async def test_facet_counts_ignore_own_selection_and_follow_writes():
+    stamp = int(time.time() * 1000)
+    locality = f"Facetville{stamp}"
+    apartment, villa = PropertyType.APARTMENT.value, PropertyType.VILLA.value
+    async with async_session_maker() as db:
+        rows = [
+            _property(locality, "Pune", apartment, 2, 4_000_000),
+            _property(locality, "Pune", apartment, 3, 8_000_000),
+            _property(locality, "Pune", villa, 4, 30_000_000),
+            _property(locality, "Mumbai", apartment, 2, 12_000_000),
+            _property(locality, "Mumbai", apartment, 2, 9_000_000),
+        ]
+        db.add_all(rows)
+        await db.commit()
+
+        everything = await list_properties_faceted(db=db, **_kwargs(locality))
+        assert everything.total == 5
+        assert _facet(everything, "city") == {"Pune": 3, "Mumbai": 2}
+        assert [item.value for item in everything.facets.bedrooms] == ["2", "3", "4"]
+        assert _facet(everything, "price_band") == {
+            "2500000-5000000": 1,
+            "5000000-10000000": 2,
+            "10000000-20000000": 1,
+            "20000000-50000000": 1,
+        }
+
+        pune_apartments = await list_properties_faceted(
+            db=db, **_kwargs(locality, city=["Pune"], property_type=[apartment])
+        )
+        assert pune_apartments.total == 2
+        assert {p.id for p in pune_apartments.properties} == {rows[0].id, rows[1].id}
+        # Each facet still offers the values its own selection excludes.
+        assert _facet(pune_apartments, "city") == {"Pune": 2, "Mumbai": 2}
+        assert _facet(pune_apartments, "property_type") == {apartment: 2, villa: 1}
+        assert _facet(pune_apartments, "bedrooms") == {"2": 1, "3": 1}
+
+        banded = await list_properties_faceted(
+            db=db, **_kwargs(locality, price_band=["5000000-10000000", "10000000-20000000"])
+        )
+        assert banded.total == 3
+        assert _facet(banded, "city") == {"Pune": 1, "Mumbai": 2}
+
+        paged = await list_properties_faceted(db=db, **_kwargs(locality, page_size=2))
+        assert len(paged.properties) == 2 and paged.next_cursor
+        # Served from the cached combinations, and still exact.
+        assert paged.total == 5 and not paged.total_is_estimate
+
+        rows[3].is_active = False
+        await db.commit()
+        after = await list_properties_faceted(db=db, **_kwargs(locality))
+        assert after.total == 4
+        assert not after.total_is_estimate
+        assert _facet(after, "city") == {"Pune": 3, "Mumbai": 1}
+
+
+def test_facet_cache_keeps_recent_unexpired_entries(monkeypatch):
+    cache = _FacetCache(max_entries=2)
+    clock = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+
+    cache.put("a", [])
+    cache.put("b", [])
+    assert cache.get("a") == []
+    cache.put("c", [])
+    # "b" was least recently used.
+    assert cache.get("b") is None and len(cache) == 2
+
+    clock[0] += 3600
+    cache.put("d", [])
+    assert len(cache) == 1 and cache.get("d") == []
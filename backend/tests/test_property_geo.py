@@ -0,0 +1,128 @@
+import time
+
+import pytest
+
+from app.api.calls import ToolFindNearbyPropertiesRequest, tool_find_nearby_properties
+from app.api.properties import nearby_properties
+from app.database import async_session_maker
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.utils.geo import KM_PER_DEGREE
+
+
+def _nearby_kwargs(**overrides):
+    kwargs = dict(
+        lat=None,
+        lon=None,
+        radius_km=None,
+        min_lat=None,
+        max_lat=None,
+        min_lon=None,
+        max_lon=None,
+        property_type=None,
+        min_price=None,
+        max_price=None,
+        bedrooms=None,
+        status=None,
+        page=1,
+        page_size=20,
+        exact_total=True,
+    )
+    kwargs.update(overrides)
+    return kwargs
+
+
+def _property(title: str, lat: float, lon: float, **overrides) -> Property:
+    values = dict(
+        title=title,
+        property_type=PropertyType.APARTMENT.value,
+        address="1 Beach Road",
+        city="Geoville",
+        state="Karnataka",
+        pincode="560001",
+        locality=title.split()[0],
+        latitude=lat,
+        longitude=lon,
+        price=5_000_000,
+        size_sqft=1000,
+        bedrooms=2,
+        status=PropertyStatus.AVAILABLE.value,
+        is_active=True,
+        created_by=1,
+    )
+    values.update(overrides)
+    return Property(**values)
+
+
+@pytest.mark.asyncio
+async def test_nearby_radius_and_box_queries_follow_writes():
+    stamp = int(time.time() * 1000)
+    # A fresh patch of open sea per run, 11 km from the previous second's.
+    lat, lon = -60 + (stamp // 1000 % 1000) * 0.1, 150.0
+    north = 1 / KM_PER_DEGREE
+    async with async_session_maker() as db:
+        close = _property(f"Close{stamp} Homes", lat + 0.5 * north, lon)
+        villa = _property(
+            f"Villa{stamp} Estate", lat - 2 * north, lon, property_type=PropertyType.VILLA.value
+        )
+        edge = _property(f"Edge{stamp} Towers", lat + 3 * north, lon)
+        far = _property(f"Far{stamp} Plaza", lat + 8 * north, lon)
+        hidden = _property(f"Hidden{stamp} Court", lat + 1 * north, lon, is_active=False)
+        db.add_all([close, villa, edge, far, hidden])
+        await db.commit()
+
+        result = await nearby_properties(db=db, **_nearby_kwargs(lat=lat, lon=lon, radius_km=5))
+        assert [p.id for p in result.properties] == [close.id, villa.id, edge.id]
+        assert result.total == 3
+        assert result.properties[2].distance_km == pytest.approx(3.0, abs=0.01)
+
+        apartments = await nearby_properties(
+            db=db, **_nearby_kwargs(lat=lat, lon=lon, radius_km=5, property_type="apartment")
+        )
+        assert [p.id for p in apartments.properties] == [close.id, edge.id]
+
+        box = await nearby_properties(
+            db=db,
+            **_nearby_kwargs(
+                min_lat=lat + 2.5 * north,
+                max_lat=lat + 9 * north,
+                min_lon=lon - 0.01,
+                max_lon=lon + 0.01,
+            ),
+        )
+        assert {p.id for p in box.properties} == {edge.id, far.id}
+
+        far.latitude = lat - 0.2 * north
+        close.is_active = False
+        await db.commit()
+        moved = await nearby_properties(db=db, **_nearby_kwargs(lat=lat, lon=lon, radius_km=5))
+        assert [p.id for p in moved.properties] == [far.id, villa.id, edge.id]
+
+        # Listings that are no longer for sale are only shown when asked for.
+        sold = _property(
+            f"Sold{stamp} Lane", lat - 1.9 * north, lon, status=PropertyStatus.SOLD.value
+        )
+        db.add(sold)
+        await db.commit()
+        with_sold = await nearby_properties(db=db, **_nearby_kwargs(lat=lat, lon=lon, radius_km=5))
+        assert sold.id in {p.id for p in with_sold.properties}
+        available = await nearby_properties(
+            db=db,
+            **_nearby_kwargs(lat=lat, lon=lon, radius_km=5, status=PropertyStatus.AVAILABLE.value),
+        )
+        assert [p.id for p in available.properties] == [far.id, villa.id, edge.id]
+        assert not (
+            await tool_find_nearby_properties(
+                ToolFindNearbyPropertiesRequest(location=f"sold{stamp}", radius_km=2.5),
+                db=db,
+                api_key="test",
+            )
+        ).success
+
+        tool = await tool_find_nearby_properties(
+            ToolFindNearbyPropertiesRequest(location=f"villa{stamp}", radius_km=2.5, limit=2),
+            db=db,
+            api_key="test",
+        )
+        assert tool.success
+        assert [p.id for p in tool.properties] == [villa.id, far.id]
+        assert tool.properties[1].distance_km == pytest.approx(1.8, abs=0.05)
@@ -0,0 +1,128 @@
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+from sqlalchemy import update
+
+from app.database import async_session_maker
+from app.models.property import Property, PropertyStatus, PropertyType
+from app.services import property_index as property_index_module
+from app.services.property_index import PropertyIndex, filters_from_query, property_index
+from app.services.rag_service import RAGService
+
+
+def _property(stamp: int, title: str, **overrides) -> Property:
+    values = dict(
+        title=title,
+        description="Spacious home with park view",
+        property_type=PropertyType.APARTMENT.value,
+        address=f"{stamp} Ring Road",
+        city=f"Indexpur{stamp}",
+        state=f"State{stamp}",
+        pincode="560001",
+        locality=f"Lakeside{stamp}",
+        price=6_500_000,
+        size_sqft=1200,
+        bedrooms=2,
+        status=PropertyStatus.AVAILABLE.value,
+        is_active=True,
+        created_by=1,
+    )
+    values.update(overrides)
+    return Property(**values)
+
+
+@pytest.mark.asyncio
+async def test_retrieve_ranks_by_query_and_applies_stated_filters():
+    stamp = int(time.time() * 1000)
+    async with async_session_maker() as db:
+        db.add_all(
+            [
+                _property(stamp, f"Lakeside{stamp} Residency 2BHK"),
+                _property(stamp, f"Hilltop{stamp} Villa", property_type=PropertyType.VILLA.value,
+                          locality=f"Hilltop{stamp}", price=15_000_000, bedrooms=4),
+                _property(stamp, f"Lakeside{stamp} Towers 3BHK", price=9_000_000, bedrooms=3),
+            ]
+        )
+        await db.commit()
+
+    context = await RAGService().retrieve(f"2 bhk in lakeside{stamp} under 70 lakh")
+    assert context.startswith("AVAILABLE INVENTORY FROM DATABASE:\n")
+    lines = context.splitlines()[1:]
+    assert lines[0].startswith(f"- Lakeside{stamp} Residency 2BHK: apartment")
+    assert not any(f"Lakeside{stamp} Towers" in line for line in lines)
+
+    villas = await property_index.search(f"hilltop{stamp}", k=5)
+    assert [doc.title for doc in villas] == [f"Hilltop{stamp} Villa"]
+
+
+@pytest.mark.asyncio
+async def test_index_follows_writes_and_location_cache():
+    stamp = int(time.time() * 1000) + 1
+    async with async_session_maker() as db:
+        listing = _property(stamp, f"Orchard{stamp} Homes")
+        db.add(listing)
+        await db.commit()
+
+    assert [doc.id for doc in await property_index.search(f"orchard{stamp}", k=3)] == [listing.id]
+    locations = await property_index.locations()
+    assert locations["India"][f"State{stamp}"] == [f"Indexpur{stamp}"]
+    text = await RAGService().get_available_locations()
+    assert f"  - State: State{stamp}: Indexpur{stamp}" in text
+
+    async with async_session_maker() as db:
+        listing = await db.get(Property, listing.id)
+        listing.title = f"Meadow{stamp} Homes"
+        await db.commit()
+    stale = await property_index.search(f"orchard{stamp}", k=3)
+    assert all(doc.title != f"Orchard{stamp} Homes" for doc in stale)
+    assert [doc.id for doc in await property_index.search(f"meadow{stamp}", k=3)] == [listing.id]
+
+    async with async_session_maker() as db:
+        listing = await db.get(Property, listing.id)
+        listing.status = PropertyStatus.SOLD.value
+        await db.commit()
+    assert f"State{stamp}" not in (await property_index.locations()).get("India", {})
+    assert f"State: State{stamp}" not in await RAGService().get_available_locations()
+
+    # Bulk statements cannot name their rows, so they reload the index.
+    async with async_session_maker() as db:
+        await db.execute(
+            update(Property).where(Property.id == listing.id).values(status=PropertyStatus.AVAILABLE.value)
+        )
+        await db.commit()
+    assert [doc.id for doc in await property_index.search(f"meadow{stamp}", k=3)] == [listing.id]
+
+
+@pytest.mark.asyncio
+async def test_reload_requested_during_a_load_is_not_lost(monkeypatch):
+    index = PropertyIndex()
+    loads = []
+
+    @asynccontextmanager
+    async def session_maker():
+        loads.append(len(loads))
+        if len(loads) == 1:
+            # A commit lands while the first load is still reading.
+            index.invalidate(["*"])
+        async with async_session_maker() as db:
+            yield db
+
+    monkeypatch.setattr(property_index_module, "async_session_maker", session_maker)
+    await index.search("anything", k=1)
+    await index.search("anything", k=1)
+    await index.search("anything", k=1)
+    assert len(loads) == 2
+
+
+def test_filters_from_query():
+    filters = filters_from_query("3 BHK flat under 1.2 crore")
+    assert filters.bedrooms == 3
+    assert filters.property_type == PropertyType.APARTMENT.value
+    assert filters.max_price == pytest.approx(12_000_000)
+    assert filters.min_price is None
+
+    filters = filters_from_query("villa above 80 lakhs")
+    assert filters.property_type == PropertyType.VILLA.value
+    assert filters.min_price == pytest.approx(8_000_000)
+    assert filters_from_query("anything in Pune").bedrooms is None
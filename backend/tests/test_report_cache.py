@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config import settings
+from app.database import async_session_maker
+from app.models.report_cache import ReportCacheEntry
+from app.services import solar_report_service as report_module
+from app.services.report_cache import ReportCache, normalize_transcript, report_cache_key
+from app.services.solar_report_service import SolarReportService
+from tests.test_llm_gateway import FakeLLMServer, _gateway
+
+
+def test_key_ignores_formatting_noise(monkeypatch):
+    messy = "  Agent:\tHello   there\r\n\r\nCustomer: Hi \r\n"
+    assert normalize_transcript(messy) == "Agent: Hello there\nCustomer: Hi"
+    assert report_cache_key("1", "m", messy) == report_cache_key("1", "m", "Agent: Hello there\nCustomer: Hi")
+    assert report_cache_key("1", "m", messy) != report_cache_key("2", "m", messy)
+    assert report_cache_key("1", "m", messy) != report_cache_key("1", "other", messy)
+    # Long transcripts are extracted chunk by chunk, so the chunking is part of the key.
+    key = report_cache_key("1", "m", messy)
+    monkeypatch.setattr(settings, "report_chunk_max_chars", settings.report_chunk_max_chars // 2)
+    assert report_cache_key("1", "m", messy) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(settings, "report_chunk_overlap_turns", settings.report_chunk_overlap_turns + 1)
+    assert report_cache_key("1", "m", messy) != key
+
+
+@pytest.mark.asyncio
+async def test_replayed_transcript_is_served_from_cache(monkeypatch):
+    server = FakeLLMServer(content='{"lead_classification": {"lead_status": "warm"}}')
+    service = SolarReportService(gateway=_gateway(server))
+    transcript = f"Customer {time.time_ns()}: quote for a 3kW rooftop system please."
+
+    first, second = await asyncio.gather(
+        service.generate_report(transcript), service.generate_report(transcript)
+    )
+    assert first == second == {"lead_classification": {"lead_status": "warm"}}
+    assert len(server.requests) == 1
+
+    replay = await service.generate_report("  " + transcript.replace(" ", "  ") + "\n")
+    async with async_session_maker() as db:
+        key = report_cache_key(report_module.SECTION_7_PROMPT_VERSION, service.gateway.model, transcript)
+        entry = await db.get(ReportCacheEntry, key)
+    assert replay == first
+    assert entry.hit_count == 1
+    assert len(server.requests) == 1
+
+    monkeypatch.setattr(report_module, "SECTION_7_PROMPT_VERSION", "test-bump")
+    await service.generate_report(transcript)
+    assert len(server.requests) == 2
+
+
+@pytest.mark.asyncio
+async def test_eviction_drops_least_recently_used_entries():
+    stamp = time.time_ns()
+    async with async_session_maker() as db:
+        total = (
+            await db.execute(select(func.coalesce(func.sum(ReportCacheEntry.size_bytes), 0)))
+        ).scalar_one()
+    report = {"notes": "x" * 200}
+    # Room for everything already stored plus two of these entries.
+    cache = ReportCache(max_bytes=total + 2 * 215)
+    keys = [f"evict-{stamp}-{i}" for i in range(3)]
+    for key in keys[:2]:
+        await cache.put(key, "test", "m", report)
+    async with async_session_maker() as db:
+        await db.execute(
+            ReportCacheEntry.__table__.update()
+            .where(ReportCacheEntry.key == keys[0])
+            .values(last_used_at=func.datetime("now", "-1 day"))
+        )
+        await db.commit()
+    assert await cache.get(keys[1]) == report
+
+    await cache.put(keys[2], "test", "m", report)
+    async with async_session_maker() as db:
+        remaining = (
+            await db.execute(select(ReportCacheEntry.key).where(ReportCacheEntry.key.in_(keys)))
+        ).scalars().all()
+    assert sorted(remaining) == keys[1:]
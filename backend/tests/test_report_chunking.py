@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services.llm_gateway import LLMGateway
+from app.services.report_chunking import chunk_transcript, merge_reports, split_turns
+from app.services.solar_report_service import SolarReportService
+from tests.test_llm_gateway import _completion
+
+
+def test_chunks_follow_turn_boundaries_with_overlap():
+    turns = [f"{'Agent' if i % 2 else 'Customer'}: message number {i:03d}" for i in range(40)]
+    transcript = "\n".join(turns[:5]) + "\n  and a continuation line\n" + "\n".join(turns[5:])
+    assert len(split_turns(transcript)) == 40
+
+    chunks = chunk_transcript(transcript, max_chars=200, overlap_turns=2)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        assert split_turns(current)[:2] == split_turns(previous)[-2:]
+    covered = {turn for chunk in chunks for turn in split_turns(chunk)}
+    assert set(turns[5:]) <= covered and len(covered) == 40
+
+    assert chunk_transcript("Customer: " + "word " * 100, max_chars=120, overlap_turns=0)[0].startswith(
+        "Customer: word"
+    )
+    assert chunk_transcript("Agent: hi", max_chars=200, overlap_turns=2) == ["Agent: hi"]
+
+
+def test_merge_rules():
+    merged = merge_reports(
+        [
+            {
+                "customer_info": {"name": "Ravi", "city": "unknown"},
+                "interests": {"subsidy_interested": True, "loan_emi_required": False},
+                "visit": {"visit_scheduled": True, "visit_date": "2024-07-01", "visit_time_slot": "morning"},
+                "lead_classification": {"lead_status": "hot", "confidence_score": 9},
+                "call_analysis": {"objections_raised": ["Price", "Roof space"]},
+            },
+            {},
+            {
+                "customer_info": {"name": None, "city": "Pune"},
+                "interests": {"subsidy_interested": False, "loan_emi_required": True},
+                "visit": {"visit_scheduled": True, "visit_date": "2024-07-05", "visit_time_slot": None},
+                "call_analysis": {"objections_raised": ["price", "Warranty"]},
+            },
+            {
+                "visit": {"visit_scheduled": False, "visit_date": None},
+                "lead_classification": {"lead_status": "callback", "confidence_score": 6},
+            },
+        ]
+    )
+    assert merged["customer_info"] == {"name": "Ravi", "city": "Pune"}
+    assert merged["interests"] == {"subsidy_interested": True, "loan_emi_required": True}
+    assert merged["visit"] == {"visit_scheduled": True, "visit_date": "2024-07-05", "visit_time_slot": None}
+    assert merged["lead_classification"] == {"lead_status": "callback", "confidence_score": 6}
+    assert merged["call_analysis"]["objections_raised"] == ["Price", "Roof space", "Warranty"]
+
+
+@pytest.mark.asyncio
+async def test_long_transcript_is_extracted_concurrently_and_merged(monkeypatch):
+    monkeypatch.setattr(settings, "report_chunk_max_chars", 300)
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        prompt = json.loads(request.content)["messages"][1]["content"]
+        part = int(prompt.split("is part ", 1)[1].split(" ", 1)[0])
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.05)
+        in_flight -= 1
+        partial = {
+            "call_analysis": {"key_concerns": [f"concern {part}"]},
+            "lead_classification": {"lead_status": f"status {part}"},
+        }
+        return httpx.Response(200, json=_completion(json.dumps(partial)))
+
+    gateway = LLMGateway(
+        transport=httpx.MockTransport(handler), max_concurrency=32, retry_base_delay_seconds=0.001
+    )
+    service = SolarReportService(gateway=gateway)
+    stamp = time.time_ns()
+    transcript = "\n".join(f"Customer: turn {i} of call {stamp}, talking about panels" for i in range(30))
+
+    report = await service.generate_report(transcript)
+
+    parts = len(chunk_transcript(transcript, 300, settings.report_chunk_overlap_turns))
+    assert parts > 2 and peak == parts
+    assert report["call_analysis"]["key_concerns"] == [f"concern {n}" for n in range(1, parts + 1)]
+    assert report["lead_classification"] == {"lead_status": f"status {parts}"}
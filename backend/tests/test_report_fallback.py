@@ -0,0 +1,87 @@
+import json
+import time
+from datetime import date
+
+from app.api.elevenlabs_webhook import _report_source
+from app.services.report_fallback import REPORT_SOURCE_LLM, REPORT_SOURCE_LOCAL, extract_local_report
+
+HINGLISH = """Agent: Namaste, Ujjwal Energies se bol rahi hoon. Aapka bijli ka bill kitna aata hai?
+Customer: Haan ji, mera bill around 4,500 rupees aata hai har mahine. Lucknow mein rehte hain.
+Agent: Aapke paas chhat hai?
+Customer: Ji haan, badi terrace hai, koi dikkat nahi.
+Agent: Subsidy ke baare mein jaanna chahenge?
+Customer: Haan subsidy chahiye, but loan nahi chahiye.
+Agent: 3 kw system theek rahega. Hamari team site visit ke liye kal subah 10 baje aa sakti hai?
+Customer: Kal nahi, parso shaam ko aaiye. Mera number 98765 43210 hai.
+Agent: Theek hai, team parso aayegi."""
+
+DEVANAGARI = """एजेंट: आपका बिजली का बिल कितना है?
+ग्राहक: लगभग ३००० रुपये का बिल आता है। हम जयपुर में हैं।
+एजेंट: क्या आपके पास छत है?
+ग्राहक: नहीं, हमारे पास छत नहीं है। सब्सिडी चाहिए।
+एजेंट: हमारी टीम सोमवार सुबह विजिट करेगी।"""
+
+ENGLISH = """Agent: What's your monthly electricity bill?
+Customer: It's about Rs. 2.5k. We're in Gurgaon. No, I don't need a loan.
+Agent: Do you have a roof available?
+Customer: Yes.
+Agent: Our engineer can visit on 15th July at 3 pm, size will be 5 kW.
+Customer: Sure, works for me."""
+
+
+def _fields(report):
+    return (
+        report["requirement"]["monthly_electricity_bill"],
+        report["requirement"]["estimated_kw"],
+        report["requirement"]["rooftop_available"],
+        report["interests"]["subsidy_interested"],
+        report["interests"]["loan_emi_required"],
+        report["visit"]["visit_date"],
+        report["visit"]["visit_time_slot"],
+        report["customer_info"]["contact_number"],
+        report["customer_info"]["city"],
+    )
+
+
+def test_extracts_hinglish_transcript():
+    report = extract_local_report(HINGLISH, reference=date(2024, 7, 1))
+    assert report["report_source"] == REPORT_SOURCE_LOCAL
+    assert _fields(report) == (
+        "4500", "3", "yes", True, False, "2024-07-03", "evening", "+919876543210", "Lucknow",
+    )
+    assert report["visit"]["visit_scheduled"] is True
+    assert report["customer_info"]["preferred_language"] == "hindi"
+
+
+def test_extracts_devanagari_transcript():
+    report = extract_local_report(DEVANAGARI, reference=date(2024, 7, 3))
+    assert _fields(report) == (
+        "3000", "unknown", "no", True, False, "2024-07-08", "morning", None, "Jaipur",
+    )
+
+
+def test_extracts_english_answers_to_agent_questions():
+    report = extract_local_report(ENGLISH, reference=date(2024, 7, 1))
+    assert _fields(report) == (
+        "2500", "5", "yes", False, False, "2024-07-15", "afternoon", None, "Gurugram",
+    )
+    assert report["customer_info"]["preferred_language"] == "english"
+
+
+def test_empty_transcript_keeps_full_schema_and_runs_fast():
+    report = extract_local_report("", reference=date(2024, 7, 1))
+    assert report["lead_classification"]["lead_status"] == "unknown"
+    assert report["call_analysis"]["objections_raised"] == []
+    assert report["visit"]["visit_scheduled"] is False
+
+    long_call = "\n".join([HINGLISH, ENGLISH] * 40)
+    started = time.perf_counter()
+    extract_local_report(long_call, reference=date(2024, 7, 1))
+    assert time.perf_counter() - started < 0.5
+
+
+def test_untagged_reports_count_as_llm_reports():
+    assert _report_source(None) is None
+    assert _report_source("{}") is None
+    assert _report_source(json.dumps({"report_source": "local"})) == REPORT_SOURCE_LOCAL
+    assert _report_source(json.dumps({"lead_classification": {}})) == REPORT_SOURCE_LLM
@@ -0,0 +1,113 @@
+import time
+
+import numpy as np
+import pytest
+
+from app.services.solar_alert_engine import (
+    AlertCondition,
+    AlertRule,
+    SolarAlertEngine,
+    get_active_alerts,
+)
+
+_EFFICIENCY_RULE = AlertRule(
+    id="low_efficiency",
+    severity="warning",
+    message="System efficiency below expected threshold.",
+    conditions=(AlertCondition("system_efficiency_pct", "<", 75.0, clear_threshold=78.0),),
+)
+
+
+def test_flapping_site_raises_once_until_past_clear_threshold():
+    engine = SolarAlertEngine(rules=[_EFFICIENCY_RULE])
+    raised = []
+    for value in (74.0, 76.0, 74.5, 77.0, 74.0):
+        transitions = engine.evaluate(["site-a"], {"system_efficiency_pct": np.array([value])})
+        raised.extend(t for t in transitions if t.raised)
+    assert len(raised) == 1
+
+    transitions = engine.evaluate(["site-a"], {"system_efficiency_pct": np.array([80.0])})
+    assert [(t.site_id, t.raised) for t in transitions] == [("site-a", False)]
+
+
+def test_multi_condition_rule_requires_all_conditions():
+    engine = SolarAlertEngine()
+    transitions = engine.evaluate(
+        ["sunny-low", "cloudy-low", "sunny-ok"],
+        {
+            "system_efficiency_pct": np.array([90.0, 90.0, 90.0]),
+            "solar_irradiance_w_m2": np.array([900.0, 300.0, 900.0]),
+            "output_ratio": np.array([0.3, 0.3, 0.9]),
+        },
+    )
+    assert [(t.site_id, t.rule.id) for t in transitions] == [("sunny-low", "low_output")]
+
+
+def test_evaluates_ten_thousand_sites_well_under_a_second():
+    engine = SolarAlertEngine()
+    rng = np.random.default_rng(7)
+    site_ids = [f"bench-{i}" for i in range(10_000)]
+    metrics = {
+        "system_efficiency_pct": rng.uniform(60, 100, size=len(site_ids)),
+        "solar_irradiance_w_m2": rng.uniform(0, 1100, size=len(site_ids)),
+        "output_ratio": rng.uniform(0, 1, size=len(site_ids)),
+    }
+    engine.evaluate(site_ids, metrics)
+
+    start = time.perf_counter()
+    for _ in range(5):
+        metrics["system_efficiency_pct"] = rng.uniform(60, 100, size=len(site_ids))
+        engine.evaluate(site_ids, metrics)
+    elapsed = (time.perf_counter() - start) / 5
+
+    assert elapsed < 0.25
+
+
+@pytest.mark.asyncio
+async def test_transitions_are_persisted_and_resolved():
+    engine = SolarAlertEngine(rules=[_EFFICIENCY_RULE])
+    site_id = f"test-alert-site-{int(time.time() * 1000)}"
+
+    await engine.evaluate_and_persist([site_id], {"system_efficiency_pct": np.array([70.0])})
+    active = await get_active_alerts(site_id)
+    assert [a.rule_id for a in active] == ["low_efficiency"]
+
+    restarted = SolarAlertEngine(rules=[_EFFICIENCY_RULE])
+    transitions = await restarted.evaluate_and_persist(
+        [site_id], {"system_efficiency_pct": np.array([72.0])}
+    )
+    assert transitions == []
+
+    await restarted.evaluate_and_persist([site_id], {"system_efficiency_pct": np.array([90.0])})
+    assert await get_active_alerts(site_id) == []
+
+
+@pytest.mark.asyncio
+async def test_failed_persist_leaves_transitions_to_the_next_batch(monkeypatch):
+    engine = SolarAlertEngine(rules=[_EFFICIENCY_RULE])
+    engine._loaded = True
+    site_id = f"test-alert-retry-{int(time.time() * 1000)}"
+    low = {"system_efficiency_pct": np.array([70.0])}
+
+    async def _locked(transitions):
+        raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(engine, "_persist", _locked)
+    with pytest.raises(RuntimeError):
+        await engine.evaluate_and_persist([site_id], low)
+
+    monkeypatch.undo()
+    transitions = await engine.evaluate_and_persist([site_id], low)
+    assert [(t.site_id, t.raised) for t in transitions] == [(site_id, True)]
+    assert [a.rule_id for a in await get_active_alerts(site_id)] == ["low_efficiency"]
+
+    # A clear that fails to store is retried the same way.
+    monkeypatch.setattr(engine, "_persist", _locked)
+    with pytest.raises(RuntimeError):
+        await engine.evaluate_and_persist([site_id], {"system_efficiency_pct": np.array([90.0])})
+    monkeypatch.undo()
+    transitions = await engine.evaluate_and_persist(
+        [site_id], {"system_efficiency_pct": np.array([90.0])}
+    )
+    assert [(t.site_id, t.raised) for t in transitions] == [(site_id, False)]
+    assert await get_active_alerts(site_id) == []
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from app.api.calls import ToolQuoteSystemRequest, tool_quote_system
+from app.database import async_session_maker
+from app.models.product import Product, ProductType
+from app.services.solar_sizing import _CombinationTable, size_for_bill, solar_sizer
+
+
+def _panel(stamp: int, name: str, wattage: int, price: float, **overrides) -> Product:
+    values = dict(
+        name=f"{name} {stamp}",
+        model_number=f"{name}-{stamp}",
+        type=ProductType.MONOCRYSTALLINE.value,
+        wattage=wattage,
+        efficiency=21.0,
+        price_inr=price,
+        warranty_years=25,
+        manufacturer=f"Sizing Test {stamp}",
+        length_mm=1700,
+        width_mm=1000,
+        is_active=True,
+    )
+    values.update(overrides)
+    return Product(**values)
+
+
+@pytest.mark.asyncio
+async def test_quotes_follow_bill_catalog_and_roof():
+    stamp = int(time.time() * 1000)
+    async with async_session_maker() as db:
+        cheap = _panel(stamp, "Budget", 500, 10_000, efficiency=19.0, warranty_years=10)
+        premium = _panel(stamp, "Premium", 550, 16_500, efficiency=22.5)
+        dearer = _panel(stamp, "Dearer", 550, 18_000, efficiency=22.5)
+        huge = _panel(stamp, "Oversize", 600, 15_000, length_mm=2600, width_mm=1300)
+        db.add_all([cheap, premium, dearer, huge])
+        await db.commit()
+        ours = {cheap.id, premium.id, dearer.id, huge.id}
+
+        # 4 kW from a bill worth 480 units a month at the configured tariff.
+        assert size_for_bill(3840) == pytest.approx(4.0)
+        _, quotes = await solar_sizer.quote(4.0, limit=10_000)
+        by_id = {q.product_id: q for q in quotes if q.product_id in ours}
+        assert by_id[cheap.id].panel_count == 8 and by_id[cheap.id].system_kw == 4.0
+        assert by_id[cheap.id].inverter_kw == 5.0
+        assert by_id[premium.id].panel_count == 8 and by_id[premium.id].inverter_kw == 5.0
+        assert by_id[huge.id].panel_count == 7 and by_id[huge.id].system_kw == 4.2
+        # 8 panels at Rs 10,000 plus a 5 kW inverter plus installation of 4 kW.
+        assert by_id[cheap.id].price_inr == 80_000 + 5 * 8_000 + 4 * 15_000
+        ranked = [q.product_id for q in quotes]
+        assert ranked.index(premium.id) < ranked.index(dearer.id)
+
+        # Panels whose total footprint exceeds the roof drop out.
+        _, on_roof = await solar_sizer.quote(4.0, roof_area_sqft=160, limit=10_000)
+        assert {q.product_id for q in on_roof} & ours == {cheap.id, premium.id, dearer.id}
+
+        # Catalog writes rebuild the combinations.
+        huge.is_active = False
+        await db.commit()
+        _, quotes = await solar_sizer.quote(4.0, limit=10_000)
+        assert huge.id not in {q.product_id for q in quotes}
+
+    tool = await tool_quote_system(ToolQuoteSystemRequest(monthly_bill=3840), api_key="test")
+    assert tool.success and tool.target_kw == 4.0 and tool.quotes
+    assert tool.quotes[0].score >= tool.quotes[-1].score
+    no_roof = await tool_quote_system(
+        ToolQuoteSystemRequest(monthly_bill=3840, rooftop_available=False), api_key="test"
+    )
+    assert not no_roof.success
+    oversized = await tool_quote_system(ToolQuoteSystemRequest(estimated_kw=500), api_key="test")
+    assert not oversized.success
+
+
+def test_each_model_gets_counts_for_its_own_wattage():
+    rows = [
+        (1, "Tiny", "Acme", 50, 20.0, 1_500, 10, None, None),
+        (2, "Large", "Acme", 500, 21.0, 10_000, 25, 1700, 1000),
+    ]
+    table = _CombinationTable(rows)
+    # 50 kW takes 1000 of the small panel but only 100 of the large one.
+    assert table.max_counts.tolist() == [1000, 100]
+    assert table.price.size == 1100
+
+    total, quotes = table.quote(50.0, None, limit=5)
+    assert total == 2
+    by_id = {q.product_id: q for q in quotes}
+    assert by_id[1].panel_count == 1000 and by_id[1].roof_area_sqft is None
+    assert by_id[2].panel_count == 100 and by_id[2].inverter_kw == 50.0
+    assert by_id[2].price_inr == 100 * 10_000 + 50 * 8_000 + 50 * 15_000
+    assert table.quote(50.1, None, limit=5) == (0, [])
@@ -0,0 +1,197 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.api.dashboard import SolarTelemetryBatch, update_solar_telemetry
+from app.database import async_session_maker
+from app.models.solar_telemetry import SolarTelemetryRollup
+from app.services import solar_telemetry_store as store_module
+from app.services.solar_telemetry_store import (
+    SolarTelemetryStore,
+    TelemetrySample,
+    solar_telemetry_store,
+)
+from app.services.tool_runtime import deferred_tasks
+
+
+def _sample(site_id, ts, power_kw=3.0):
+    return TelemetrySample(
+        site_id=site_id,
+        timestamp=ts,
+        power_kw=power_kw,
+        irradiance_w_m2=700.0,
+        temperature_c=30.0,
+        efficiency_pct=90.0,
+        snapshot={"performance": {"current_power_kw": power_kw}},
+    )
+
+
+def test_ring_buffer_keeps_latest_window_in_order():
+    store = SolarTelemetryStore(live_window_samples=4)
+    base = 1_700_000_000.0
+    store.ingest([_sample("site-a", base + i * 10, power_kw=float(i)) for i in range(6)])
+
+    assert store.live_window("site-a", "power_kw") == [2.0, 3.0, 4.0, 5.0]
+    assert store.live_window("site-a", "power_kw", seconds=10) == [4.0, 5.0]
+    assert store.latest("site-a").power_kw == 5.0
+
+
+def test_retransmitted_samples_are_dropped():
+    store = SolarTelemetryStore(live_window_samples=8)
+    base = 1_700_000_000.0
+    assert store.ingest([_sample("site-a", base), _sample("site-a", base + 60)]) == 2
+    assert store.ingest([_sample("site-a", base + 60), _sample("site-a", base + 30)]) == 0
+
+
+@pytest.mark.asyncio
+async def test_energy_trend_rolls_over_ist_days():
+    store = SolarTelemetryStore(live_window_samples=8)
+    # 2024-01-01 23:58 IST, then two samples just after midnight IST.
+    day_one = 1_704_133_680.0
+    store.ingest(
+        [
+            _sample("site-a", day_one, power_kw=6.0),
+            _sample("site-a", day_one + 60, power_kw=6.0),
+            _sample("site-a", day_one + 180, power_kw=6.0),
+            _sample("site-a", day_one + 240, power_kw=6.0),
+        ]
+    )
+
+    trend = await store.energy_trend("site-a")
+    assert len(trend) == 2
+    assert trend[0][1] == pytest.approx(0.1)
+    assert trend[1][1] == pytest.approx(0.3)
+
+
+@pytest.mark.asyncio
+async def test_flush_upserts_rollup_tiers():
+    store = SolarTelemetryStore(live_window_samples=8)
+    site_id = f"test-site-{int(time.time() * 1000)}"
+    base = float(int(time.time()) // 60 * 60)
+    store.ingest([_sample(site_id, base), _sample(site_id, base + 30)])
+    assert await store.flush() == 3
+
+    store.ingest([_sample(site_id, base + 45, power_kw=9.0)])
+    assert await store.flush() == 3
+
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(SolarTelemetryRollup).where(SolarTelemetryRollup.site_id == site_id)
+        )
+        rows = {row.resolution: row for row in result.scalars().all()}
+
+    assert set(rows) == {"1m", "15m", "1d"}
+    assert rows["1m"].sample_count == 3
+    assert rows["1m"].max_power_kw == 9.0
+
+
+@pytest.mark.asyncio
+async def test_restarted_store_continues_persisted_day():
+    site_id = f"restart-site-{int(time.time() * 1000)}"
+    # Ten minutes into the current IST day, so all four samples share a day.
+    now = int(time.time())
+    base = float(now - (now + 19800) % 86400 + 600)
+    before = SolarTelemetryStore(live_window_samples=8)
+    before.ingest([_sample(site_id, base, power_kw=6.0), _sample(site_id, base + 60, power_kw=6.0)])
+    await before.flush()
+
+    # A fresh process sees the day so far through the trend, then adds to it.
+    after = SolarTelemetryStore(live_window_samples=8)
+    assert (await after.energy_trend(site_id))[-1][1] == pytest.approx(0.1)
+    after.ingest([_sample(site_id, base + 120, power_kw=6.0), _sample(site_id, base + 180, power_kw=6.0)])
+    assert (await after.energy_trend(site_id))[-1][1] == pytest.approx(0.2)
+    await after.flush()
+    assert (await after.energy_trend(site_id))[-1][1] == pytest.approx(0.2)
+
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(SolarTelemetryRollup).where(
+                SolarTelemetryRollup.site_id == site_id,
+                SolarTelemetryRollup.resolution == "1d",
+            )
+        )
+        day = result.scalar_one()
+    assert day.sample_count == 4
+    assert day.energy_kwh == pytest.approx(0.2)
+    assert day.avg_power_kw == pytest.approx(6.0)
+
+
+def _payload(site_id, timestamp, power_kw, efficiency_pct=90.0):
+    return {
+        "site_id": site_id,
+        "timestamp": timestamp.isoformat(),
+        "performance": {
+            "current_power_kw": power_kw,
+            "daily_energy_kwh": 12.0,
+            "monthly_energy_kwh": 300.0,
+            "performance_ratio": 0.8,
+            "system_efficiency_pct": efficiency_pct,
+            "total_capacity_kw": 5.0,
+        },
+        "environment": {
+            "temperature_c": 30.0,
+            "weather_condition": "sunny",
+            "solar_irradiance_w_m2": 700.0,
+            "wind_speed_m_s": 2.0,
+        },
+        "financial": {
+            "daily_savings_inr": 90.0,
+            "monthly_savings_inr": 2700.0,
+            "lifetime_savings_inr": 50000.0,
+            "roi_percent": 12.0,
+            "payback_years": 5.0,
+            "carbon_offset_kg": 800.0,
+            "trees_equivalent": 30.0,
+        },
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_with_naive_timestamps_for_one_site():
+    site_id = f"naive-site-{int(time.time() * 1000)}"
+    observed = datetime.utcnow().replace(microsecond=0)
+    batch = SolarTelemetryBatch.model_validate(
+        {
+            "samples": [
+                _payload(site_id, observed + timedelta(seconds=30), 4.0),
+                _payload(site_id, observed, 2.0),
+                _payload(site_id, observed + timedelta(seconds=60), 5.0),
+            ]
+        }
+    )
+    assert batch.samples[0].timestamp.tzinfo is None
+
+    result = await update_solar_telemetry(batch)
+    assert result["success"] and result["received"] == 3
+    assert solar_telemetry_store.latest(site_id).power_kw == 5.0
+
+
+@pytest.mark.asyncio
+async def test_ingest_flushes_in_the_background_and_skips_stale_alerts(monkeypatch):
+    monkeypatch.setattr(store_module.settings, "solar_rollup_flush_interval_seconds", 0.01)
+    site_id = f"alert-site-{int(time.time() * 1000)}"
+    observed = datetime.utcnow().replace(microsecond=0)
+
+    low = SolarTelemetryBatch.model_validate(
+        {"samples": [_payload(site_id, observed, 4.0, efficiency_pct=60.0)]}
+    )
+    result = await update_solar_telemetry(low)
+    assert result["accepted"] == 1 and result["alerts_raised"] == 1
+
+    # A late retransmit of a healthy reading is dropped and must not clear the alert.
+    late = SolarTelemetryBatch.model_validate(
+        {"samples": [_payload(site_id, observed - timedelta(seconds=30), 4.0)]}
+    )
+    result = await update_solar_telemetry(late)
+    assert result["accepted"] == 0 and result["alerts_resolved"] == 0
+
+    await asyncio.sleep(0.05)
+    await deferred_tasks.drain(timeout=5)
+    async with async_session_maker() as db:
+        result = await db.execute(
+            select(SolarTelemetryRollup.resolution).where(SolarTelemetryRollup.site_id == site_id)
+        )
+        assert set(result.scalars().all()) == {"1m", "15m", "1d"}
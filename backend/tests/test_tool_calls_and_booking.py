@@ -6,7 +6,9 @@ from sqlalchemy import select
 
 from app.api.calls import (
     ToolBookAppointmentRequest,
+    ToolSaveSummaryRequest,
     tool_book_appointment,
+    tool_save_summary,
 )
 from app.config import settings
 from app.database import async_session_maker
@@ -14,6 +16,9 @@ from app.models.appointment import Appointment
 from app.models.call import Call, CallDirection, CallStatus
 from app.models.enquiry import Enquiry, EnquiryType
 from app.models.lead import Lead, LeadQuality, LeadSource, LeadStatus
+from app.models.notification import Notification, NotificationType
+from app.models.user import User, UserRole
+from app.services.tool_runtime import ToolLatencyTracker, deferred_tasks, tool_latency
 
 
 @pytest.mark.asyncio
@@ -56,6 +61,7 @@ async def test_tool_book_appointment_creates_records_and_returns_success():
         )
 
         response = await tool_book_appointment(payload=payload, db=db, api_key="test-key")
+        await deferred_tasks.drain(timeout=10)
 
         assert response.success is True
         assert response.lead_id == lead.id
@@ -116,6 +122,7 @@ async def test_tool_book_appointment_creates_call_when_external_id_provided():
         )
 
         response = await tool_book_appointment(payload=payload, db=db, api_key="test-key")
+        await deferred_tasks.drain(timeout=10)
 
         assert response.success is True
         assert response.lead_id == lead.id
@@ -147,3 +154,98 @@ async def test_tool_book_appointment_creates_call_when_external_id_provided():
         enquiry = result_enquiry.scalar_one()
 
         assert enquiry.id == response.enquiry_id
+
+
+@pytest.mark.asyncio
+async def test_tool_book_appointment_defers_notifications_and_records_latency():
+    async with async_session_maker() as db:
+        ts = int(time.time() * 1000)
+        admin = User(
+            email=f"tool_admin_{ts}@example.com",
+            hashed_password="x",
+            full_name="Tool Admin",
+            role=UserRole.ADMIN.value,
+        )
+        lead = Lead(
+            name="Deferred Lead",
+            phone=f"+1556{ts % 10000000000:010d}",
+            source=LeadSource.OUTBOUND_CALL.value,
+            quality=LeadQuality.COLD.value,
+            status=LeadStatus.NEW.value,
+        )
+        db.add_all([admin, lead])
+        await db.commit()
+        tool_latency.reset()
+
+        payload = ToolBookAppointmentRequest(
+            lead_id=lead.id,
+            scheduled_for=datetime.now(timezone.utc) + timedelta(days=3),
+            address="789 Deferred Road",
+            external_call_id=f"TEST_BOOK_APPOINTMENT_DEFERRED_{ts}",
+        )
+        response = await tool_book_appointment(payload=payload, db=db, api_key="test-key")
+        assert response.success is True
+
+        notifications = select(Notification).where(
+            Notification.user_id == admin.id,
+            Notification.related_lead_id == lead.id,
+            Notification.type == NotificationType.APPOINTMENT_BOOKED.value,
+        )
+        assert (await db.execute(notifications)).scalars().all() == []
+
+        await deferred_tasks.drain(timeout=10)
+        db.expire_all()
+        assert len((await db.execute(notifications)).scalars().all()) == 1
+
+        stats = tool_latency.snapshot()["book_appointment"]
+        assert stats["count"] == 1
+        assert stats["p99_ms"] == stats["max_ms"]
+
+
+@pytest.mark.asyncio
+async def test_tool_save_summary_updates_call_in_one_statement():
+    async with async_session_maker() as db:
+        ts = int(time.time() * 1000)
+        call = Call(
+            call_sid=f"TEST_SAVE_SUMMARY_{ts}",
+            from_number=settings.twilio_phone_number,
+            to_number="+15550001111",
+            direction=CallDirection.OUTBOUND.value,
+            status=CallStatus.IN_PROGRESS.value,
+        )
+        db.add(call)
+        await db.commit()
+
+        saved = await tool_save_summary(
+            payload=ToolSaveSummaryRequest(external_call_id=call.call_sid, summary="Wants 5 kW"),
+            db=db,
+            api_key="test-key",
+        )
+        missing = await tool_save_summary(
+            payload=ToolSaveSummaryRequest(external_call_id=f"MISSING_{ts}", summary="x"),
+            db=db,
+            api_key="test-key",
+        )
+        assert saved.success is True
+        assert missing.success is False
+        await db.refresh(call)
+        assert call.transcript_summary == "Wants 5 kW"
+
+
+def test_latency_tracker_percentiles_against_budget():
+    tracker = ToolLatencyTracker(budget_ms=100, window=200)
+    for latency in range(1, 201):
+        tracker.record("lookup", float(latency))
+    tracker.record("lookup", 50.0)
+
+    stats = tracker.snapshot()["lookup"]
+    assert stats["count"] == 200
+    assert stats["p50_ms"] == 100.0
+    assert stats["p99_ms"] == 198.0
+    assert stats["within_budget"] is False
+
+    tracker.reset()
+    for _ in range(99):
+        tracker.record("lookup", 20.0)
+    tracker.record("lookup", 400.0)
+    assert tracker.snapshot()["lookup"]["within_budget"] is True
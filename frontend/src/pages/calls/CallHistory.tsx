@@ -80,7 +80,8 @@ export const CallHistory: React.FC<CallHistoryProps> = ({ receptionFilter }) =>
         try {
             const params = new URLSearchParams({
                 page: page.toString(),
-                page_size: '20'
+                page_size: '20',
+                fields: 'transcript_summary,outcome_notes'
             });
 
             if (statusFilter) params.append('status', statusFilter);
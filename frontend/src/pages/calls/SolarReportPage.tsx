@@ -75,6 +75,13 @@ export const SolarReportPage: React.FC = () => {
                 </div>
             </header>
 
+            {report.report_source === 'local' && (
+                <div className="report-preliminary">
+                    <AlertCircle size={18} />
+                    <span>Preliminary report from keyword matching. The full AI analysis will replace it when ready.</span>
+                </div>
+            )}
+
             <div className="report-grid">
                 {/* section: Customer & Classification */}
                 <section className="report-card customer-section">
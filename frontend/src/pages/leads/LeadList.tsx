@@ -382,6 +382,7 @@ export const LeadList: React.FC = () => {
                 lead_id: leadId,
                 page: 1,
                 page_size: 10,
+                fields: 'transcript_summary,outcome_notes',
             },
         });
         const incomingCalls = response.data.calls || [];
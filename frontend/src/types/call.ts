@@ -29,6 +29,11 @@ export interface Call {
     sentiment_score?: number;
     customer_satisfaction?: number;
     structured_report?: string;
+    report_lead_status?: string;
+    report_estimated_kw?: number;
+    report_visit_scheduled?: boolean;
+    report_visit_date?: string;
+    report_follow_up_required?: boolean;
 }
 
 export interface CallListResponse {